@@ -2,9 +2,7 @@ import esphome.codegen as cg
 import esphome.config_validation as cv
 from esphome.components import sensor, binary_sensor, button, number, select, switch, text_sensor, canbus, text
 from esphome.const import *
-from esphome.core import Lambda
 from esphome.cpp_generator import MockObj
-from esphome.cpp_types import std_ns
 from esphome.components.canbus import CanbusComponent
 from esphome import core
 from .translations.translate import (
@@ -14,19 +12,30 @@ from .translations.translate import (
     translate,
     apply_translation_to_mapping,
     set_language,
-    check_translations_integrity,
+    collect_translation_keys,
     write_cpp_file
 )
+from .bus_schedule import format_schedule, plan_schedule
+from .codec import InvalidCodecError, parse_codec
+from .footprint import estimate_footprint, format_footprint
+from .descriptors import (
+    InvalidCommandError,
+    build_descriptors,
+    build_value_maps,
+    parse_command,
+    value_map_label_refs,
+    write_descriptors_file
+)
 
+import functools
 import subprocess
 import logging
 import os
+import re
+import textwrap
 
 _LOGGER = logging.getLogger(__name__) 
 
-# Before starting, check the integrity of the translation dictionaries
-check_translations_integrity()
-
 daikin_rotex_can_ns = cg.esphome_ns.namespace('daikin_rotex_can')
 DaikinRotexCanComponent = daikin_rotex_can_ns.class_('DaikinRotexCanComponent', cg.Component)
 
@@ -51,9 +60,78 @@ UNIT_LITER_PER_MIN = "L/min"
 ########## Icons ##########
 ICON_SUN_SNOWFLAKE_VARIANT = "mdi:sun-snowflake-variant"
 
-result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.realpath(__file__)))
-git_hash = result.stdout.strip()
-_LOGGER.info("Project Git Hash %s", git_hash)
+GIT_HASH_LENGTH = 7
+
+def _find_git_dir(path):
+    while True:
+        git_path = os.path.join(path, ".git")
+        if os.path.isdir(git_path):
+            return git_path
+        if os.path.isfile(git_path):
+            # Worktrees and submodules: ".git" is a file containing "gitdir: <path>"
+            with open(git_path, encoding="utf-8") as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                return os.path.join(path, content[len("gitdir:"):].strip())
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def _read_git_hash(git_dir):
+    with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+        head = f.read().strip()
+    if not head.startswith("ref:"):
+        return head     # Detached HEAD
+
+    ref = head[len("ref:"):].strip()
+    # Worktrees keep their refs in the common dir
+    common_dir = git_dir
+    if os.path.isfile(os.path.join(git_dir, "commondir")):
+        with open(os.path.join(git_dir, "commondir"), encoding="utf-8") as f:
+            common_dir = os.path.join(git_dir, f.read().strip())
+
+    for base_dir in [git_dir, common_dir]:
+        ref_path = os.path.join(base_dir, *ref.split("/"))
+        if os.path.isfile(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                return f.read().strip()
+
+    packed_refs = os.path.join(common_dir, "packed-refs")
+    if os.path.isfile(packed_refs):
+        with open(packed_refs, encoding="utf-8") as f:
+            for line in f:
+                parts = line.strip().split(" ")
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    return None
+
+@functools.lru_cache(maxsize=None)
+def get_git_hash():
+    """
+    Returns the short hash of the checked out commit. It is read from .git/HEAD, only if that fails
+    git is called. The result is cached, so the lookup happens at most once per process.
+    """
+    component_dir = os.path.dirname(os.path.realpath(__file__))
+    git_hash = None
+    try:
+        git_dir = _find_git_dir(component_dir)
+        if git_dir is not None:
+            git_hash = _read_git_hash(git_dir)
+    except OSError as err:
+        _LOGGER.debug("Reading .git failed: %s", err)
+
+    if not git_hash:
+        try:
+            result = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=component_dir)
+            git_hash = result.stdout.strip()
+        except OSError as err:
+            _LOGGER.warning("Unable to determine the git hash: %s", err)
+            git_hash = ""
+
+    git_hash = git_hash[:GIT_HASH_LENGTH]
+    _LOGGER.info("Project Git Hash %s", git_hash)
+    return git_hash
 
 ########## Configuration of Sensors, TextSensors, BinarySensors, Selects, Switches and Numbers ##########
 
@@ -146,7 +224,7 @@ sensor_configuration = [
         "type": "select",
         "name": "building_insulation" ,
         "icon": ICON_SUN_SNOWFLAKE_VARIANT,
-        "command": "31 00 FA 01 OC 00 00",
+        "command": "31 00 FA 01 0C 00 00",
         "data_offset": 5,
         "data_size": 1,
         "map": {
@@ -1127,9 +1205,7 @@ sensor_configuration = [
         "command": "31 00 FA 09 61 00 00",
         "data_offset": 6,
         "data_size": 1,
-        "handle_lambda": """
-            return data[6] == 0x05;
-        """
+        "codec": {"op": "equals", "value": 0x05}
     },
     {
         "type": "binary_sensor",
@@ -1206,14 +1282,9 @@ sensor_configuration = [
         "max_value": 40,
         "step": 1,
         "command": "31 00 FA 06 68 00 00",
-        "handle_lambda": """
-            return ((data[5] << 8) | data[6]) / 0x64;
-        """,
-        "set_lambda": """
-            const uint16_t u16val = value * 0x64;
-            data[5] = (u16val >> 8) & 0xFF;
-            data[6] = u16val & 0xFF;
-        """,
+        "data_offset": 5,
+        "data_size": 2,
+        "codec": {"op": "scale", "factor": 0x64},
         "map": {
             3: "3 kW",
             6: "6 kW",
@@ -1232,14 +1303,9 @@ sensor_configuration = [
         "max_value": 40,
         "step": 1,
         "command": "31 00 FA 06 69 00 00",
-        "handle_lambda": """
-            return ((data[5] << 8) | data[6]) / 0x64;
-        """,
-        "set_lambda": """
-            const uint16_t u16val = value * 0x64;
-            data[5] = (u16val >> 8) & 0xFF;
-            data[6] = u16val & 0xFF;
-        """
+        "data_offset": 5,
+        "data_size": 2,
+        "codec": {"op": "scale", "factor": 0x64}
     },
     {
         "type": "number",
@@ -1253,14 +1319,9 @@ sensor_configuration = [
         "max_value": 40,
         "step": 1,
         "command": "31 00 FA 06 6A 00 00",
-       "handle_lambda": """
-            return ((data[5] << 8) | data[6]) / 0x64;
-        """,
-        "set_lambda": """
-            const uint16_t u16val = value * 0x64;
-            data[5] = (u16val >> 8) & 0xFF;
-            data[6] = u16val & 0xFF;
-        """
+        "data_offset": 5,
+        "data_size": 2,
+        "codec": {"op": "scale", "factor": 0x64}
     },
     {
         "type": "number",
@@ -1274,14 +1335,9 @@ sensor_configuration = [
         "max_value": 40,
         "step": 1,
         "command": "31 00 FA 06 6B 00 00",
-       "handle_lambda": """
-            return ((data[5] << 8) | data[6]) / 0x64;
-        """,
-        "set_lambda": """
-            const uint16_t u16val = value * 0x64;
-            data[5] = (u16val >> 8) & 0xFF;
-            data[6] = u16val & 0xFF;
-        """
+        "data_offset": 5,
+        "data_size": 2,
+        "codec": {"op": "scale", "factor": 0x64}
     },
     {
         "type": "select",
@@ -1293,25 +1349,14 @@ sensor_configuration = [
         "icon": "mdi:induction",
         "command": "31 00 FA 0A 20 00 00",
         "data_offset": 5,
-        "data_size": 2,
+        "data_size": 1,
         "map": {
             0x00: delayed_translate("off"),
             0x03: "3 kW",
             0x06: "6 kW",
             0x09: "9 kW"
         },
-        "handle_lambda": """
-            return
-                bool(data[5] & 0b00001000) * 3 +
-                bool(data[5] & 0b00000100) * 3 +
-                bool(data[5] & 0b00000010) * 3;
-        """,
-        "set_lambda": """
-            data[5] = 0b00000001;
-            if (value >= 3) data[5] |= 0b00001000;
-            if (value >= 6) data[5] |= 0b00000100;
-            if (value >= 9) data[5] |= 0b00000010;
-        """
+        "codec": {"op": "bit_count", "mask": 0b00001110, "weight": 3, "set_bits": 0b00000001}
     },
     {
         "type": "text_sensor",
@@ -1690,11 +1735,26 @@ CONF_TVBH_OFFSET = "tvbh_offset"
 CONF_TR_OFFSET = "tr_offset"
 CONF_MAX_SPREAD_TVBH_TV = "max_spread_tvbh_tv"
 CONF_MAX_SPREAD_TVBH_TR = "max_spread_tvbh_tr"
+CONF_MIN_SPREAD_OFFSET = "min_spread_offset"
+CONF_MIXER_ERROR_DETECTION_TIME = "mixer_error_detection_time"
+CONF_BPV_ERROR_DETECTION_TIME = "bpv_error_detection_time"
+CONF_SPREAD_ERROR_DETECTION_TIME = "spread_error_detection_time"
+CONF_DHW_ERROR_DETECTION_TIME = "dhw_error_detection_time"
+CONF_SMOOTHING_PID = "smoothing_pid"
 CONF_LOG_FILTER_TEXT = "log_filter"
 CONF_CUSTOM_REQUEST_TEXT = "custom_request"
 CONF_ENTITIES = "entities"
 CONF_SELECT_OPTIONS = "options"
 CONF_PROJECT_GIT_HASH = "project_git_hash"
+CONF_UNHANDLED_FRAMES = "unhandled_frames"
+CONF_LOG_UNHANDLED_FRAMES = "log_unhandled_frames"
+CONF_MAX_BUS_UTILIZATION = "max_bus_utilization"
+CONF_BUS_OVERLOAD = "bus_overload"
+CONF_MAX_REQUESTS_IN_FLIGHT = "max_requests_in_flight"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_MAX_FRAMES_PER_SECOND = "max_frames_per_second"
+CONF_HEAP_BUDGET = "heap_budget"
+CONF_FLASH_BUDGET = "flash_budget"
 
 ########## Sensors ##########
 
@@ -1705,186 +1765,516 @@ CONF_TEMPERATURE_SPREAD_RAW = "temperature_spread_raw"
 CONF_TV_TVBH_DELTA = "tv_tvbh_delta"
 CONF_TVBH_TR_DELTA = "tvbh_tr_delta"
 CONF_VORLAUF_SOLL_TV_DELTA = "vorlauf_soll_tv_delta"
+CONF_ADAPTIVE_HEATING_CURVE = "adaptive_heating_curve"
+
+CONF_MIN_SUPPLY_TEMPERATURE = "min_supply_temperature"
+CONF_MAX_SUPPLY_TEMPERATURE = "max_supply_temperature"
+CONF_LOG_FACTOR = "log_factor"
+CONF_MIN_OUTSIDE_TEMPERATURE = "min_outside_temperature"
+CONF_ROOM_TEMPERATURE = "room_temperature"
+CONF_TARGET_ROOM_TEMPERATURE = "target_room_temperature"
+CONF_ROOM_FACTOR = "room_factor"
+
+# Calculated by the component, can be triggered by update_entities
+DERIVED_SENSORS = [
+    CONF_THERMAL_POWER,
+    CONF_TEMPERATURE_SPREAD,
+    CONF_TV_TVBH_DELTA,
+    CONF_TVBH_TR_DELTA,
+    CONF_VORLAUF_SOLL_TV_DELTA
+]
 
 CONF_DUMP = "dump"
 CONF_DHW_RUN = "dhw_run"
 CONF_SUPPLY_SETPOINT_REGULATED = "supply_setpoint_regulated"
 
-DEFAULT_UPDATE_INTERVAL = 30 * 1000 # milliseconds (30 seconds)
+DEFAULT_UPDATE_INTERVAL = "30s"
 DEFAULT_DELAY_BETWEEN_REQUESTS = 250 # milliseconds
 DEFAULT_TV_OFFSET = 0.0
 DEFAULT_TVBH_OFFSET = 0.0
 DEFAULT_TR_OFFSET = 0.0
 DEFAULT_MAX_SPREAD_TVBH_TV = 0.3
 DEFAULT_MAX_SPREAD_TVBH_TR = 0.3
-
-entity_schemas = {}
-
-for sensor_conf in sensor_configuration:
-    name = sensor_conf.get("name")
-    icon = sensor_conf.get("icon", cv.UNDEFINED)
-    divider = sensor_conf.get("divider", 1.0)
-
+DEFAULT_MIN_SPREAD_OFFSET = 0.0
+DEFAULT_MIXER_ERROR_DETECTION_TIME = "10min"
+DEFAULT_BPV_ERROR_DETECTION_TIME = "10min"
+DEFAULT_SPREAD_ERROR_DETECTION_TIME = "20min"
+DEFAULT_DHW_ERROR_DETECTION_TIME = "5min"
+
+# PID(p, i, d, max_integral, alpha_p, alpha_d) of the smoothed thermal_power and temperature_spread
+DEFAULT_SMOOTHING_PID = {
+    "p": 0.2,
+    "i": 0.05,
+    "d": 0.05,
+    "max_integral": 0.2,
+    "alpha_p": 0.2,
+    "alpha_d": 0.1,
+}
+DEFAULT_MAX_BUS_UTILIZATION = 1.0
+DEFAULT_MAX_REQUESTS_IN_FLIGHT = 1 # One GET at a time
+DEFAULT_REQUEST_TIMEOUT = "3s"
+DEFAULT_MAX_FRAMES_PER_SECOND = 20 # Requests and responses, about 11% of a 20 kbps bus
+
+# Logarithmic heating curve like templates/Adaptive_Heizkurve.yaml, written to the day and night flow temperatures
+DEFAULT_ADAPTIVE_HEATING_CURVE = {
+    CONF_MIN_SUPPLY_TEMPERATURE: 24.0,
+    CONF_MAX_SUPPLY_TEMPERATURE: 35.0,
+    CONF_LOG_FACTOR: 2.9,
+    CONF_MIN_OUTSIDE_TEMPERATURE: -15.0,
+    CONF_TARGET_ROOM_TEMPERATURE: 21.0,
+    CONF_ROOM_FACTOR: 0.0,
+}
+DEFAULT_ADAPTIVE_HEATING_CURVE_UPDATE_INTERVAL = "1h"
+
+BUS_OVERLOAD_WARN = "warn"
+BUS_OVERLOAD_FAIL = "fail"
+BUS_OVERLOAD_STRETCH = "stretch"
+BUS_OVERLOAD_ACTIONS = [BUS_OVERLOAD_WARN, BUS_OVERLOAD_FAIL, BUS_OVERLOAD_STRETCH]
+
+SENSOR_CONFIGURATION_BY_NAME = {sensor_conf.get("name"): sensor_conf for sensor_conf in sensor_configuration}
+
+# Source entities of the calculations in daikin_rotex_can.cpp. Sources which are not configured
+# are added as internal entities, so the component never runs into a missing entity at runtime.
+ENTITY_DEPENDENCIES = {
+    CONF_THERMAL_POWER: ["tv", "tr", "flow_rate"],
+    CONF_THERMAL_POWER_RAW: ["tv", "tr", "flow_rate"],
+    CONF_TEMPERATURE_SPREAD: ["tv", "tr"],
+    CONF_TEMPERATURE_SPREAD_RAW: ["tv", "tr"],
+    CONF_TV_TVBH_DELTA: ["tv", "tvbh"],
+    CONF_TVBH_TR_DELTA: ["tvbh", "tr"],
+    CONF_VORLAUF_SOLL_TV_DELTA: ["target_supply_temperature", "tv"],
+    CONF_SUPPLY_SETPOINT_REGULATED: ["mode_of_operating", "status_kompressor", "max_target_flow_temp", "tv", "target_supply_temperature"],
+    CONF_ADAPTIVE_HEATING_CURVE: ["temperature_outside", "flow_temperature_day", "flow_temperature_night"],
+    "error_code": ["tv", "tvbh", "tr", "flow_rate", "dhw_mixer_position", "bypass_valve", "tdhw1", "mode_of_operating", "status_kompressor"],
+}
+
+def build_entity_schema(sensor_conf):
+    """Builds the schema of one CAN entity from its sensor_configuration entry."""
     match sensor_conf.get("type"):
         case "sensor":
-            entity_schemas.update({
-                cv.Optional(name): sensor.sensor_schema(
-                    CanSensor,
-                    device_class=(sensor_conf.get("device_class") if sensor_conf.get("device_class") != None else cv.UNDEFINED),
-                    unit_of_measurement=sensor_conf.get("unit_of_measurement", cv.UNDEFINED),
-                    accuracy_decimals=sensor_conf.get("accuracy_decimals", cv.UNDEFINED),
-                    state_class=sensor_conf.get("state_class", cv.UNDEFINED),
-                    icon=sensor_conf.get("icon", cv.UNDEFINED)
-                ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds}),
-            })
+            return sensor.sensor_schema(
+                CanSensor,
+                device_class=(sensor_conf.get("device_class") if sensor_conf.get("device_class") != None else cv.UNDEFINED),
+                unit_of_measurement=sensor_conf.get("unit_of_measurement", cv.UNDEFINED),
+                accuracy_decimals=sensor_conf.get("accuracy_decimals", cv.UNDEFINED),
+                state_class=sensor_conf.get("state_class", cv.UNDEFINED),
+                icon=sensor_conf.get("icon", cv.UNDEFINED)
+            ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds})
         case "text_sensor":
-            entity_schemas.update({
-                cv.Optional(name): text_sensor.text_sensor_schema(
-                    CanTextSensor,
-                    icon=sensor_conf.get("icon", cv.UNDEFINED)
-                ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds}),
-            })
+            return text_sensor.text_sensor_schema(
+                CanTextSensor,
+                icon=sensor_conf.get("icon", cv.UNDEFINED)
+            ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds})
         case "binary_sensor":
-            entity_schemas.update({
-                cv.Optional(name): binary_sensor.binary_sensor_schema(
-                    CanBinarySensor,
-                    icon=sensor_conf.get("icon", cv.UNDEFINED)
-                ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds}),
-            })
+            return binary_sensor.binary_sensor_schema(
+                CanBinarySensor,
+                icon=sensor_conf.get("icon", cv.UNDEFINED)
+            ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds})
         case "select":
-            entity_schemas.update({
-                cv.Optional(name): select.select_schema(
-                    CanSelect,
-                    entity_category=ENTITY_CATEGORY_CONFIG,
-                    icon=sensor_conf.get("icon", cv.UNDEFINED)
-                ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds}),
-            })
+            return select.select_schema(
+                CanSelect,
+                entity_category=ENTITY_CATEGORY_CONFIG,
+                icon=sensor_conf.get("icon", cv.UNDEFINED)
+            ).extend({cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds})
         case "switch":
-            entity_schemas.update({
-                cv.Optional(name): cv.typed_schema(
-                    {
-                        "switch": switch.switch_schema(
-                            CanSwitch,
-                            entity_category=ENTITY_CATEGORY_CONFIG,
-                            icon=sensor_conf.get("icon", cv.UNDEFINED)
-                        ),
-                        "select": select.select_schema(
-                            CanSelect,
-                            entity_category=ENTITY_CATEGORY_CONFIG,
-                            icon=sensor_conf.get("icon", cv.UNDEFINED)
-                        ),
-                    },
-                    default_type="select"
-                )
-            })
+            return cv.typed_schema(
+                {
+                    "switch": switch.switch_schema(
+                        CanSwitch,
+                        entity_category=ENTITY_CATEGORY_CONFIG,
+                        icon=sensor_conf.get("icon", cv.UNDEFINED)
+                    ),
+                    "select": select.select_schema(
+                        CanSelect,
+                        entity_category=ENTITY_CATEGORY_CONFIG,
+                        icon=sensor_conf.get("icon", cv.UNDEFINED)
+                    ),
+                },
+                default_type="select"
+            )
         case "number":
             select_options_schema = cv.Optional(CONF_SELECT_OPTIONS) if "map" in sensor_conf else cv.Required(CONF_SELECT_OPTIONS)
-            entity_schemas.update({
-                cv.Optional(name): cv.typed_schema(
-                    {
-                        "number": number.number_schema(
-                            CanNumber,
-                            entity_category=ENTITY_CATEGORY_CONFIG,
-                            icon=sensor_conf.get("icon", cv.UNDEFINED)
-                        ).extend({
-                            cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds,
-                            cv.Optional(CONF_MODE, default="BOX"): cv.enum(number.NUMBER_MODES, upper=True)
-                        }),
-                        "select": select.select_schema(
-                            CanSelect,
-                            entity_category=ENTITY_CATEGORY_CONFIG,
-                            icon=sensor_conf.get("icon", cv.UNDEFINED)
-                        ).extend({
-                            cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds,
-                            select_options_schema: cv.Schema({
-                                cv.float_range(
-                                    min=sensor_conf.get("min_value"),
-                                    max=sensor_conf.get("max_value")
-                                ): cv.string
-                            })
-                        }),
-                    },
-                    default_type="number"
-                )
-            })
+            return cv.typed_schema(
+                {
+                    "number": number.number_schema(
+                        CanNumber,
+                        entity_category=ENTITY_CATEGORY_CONFIG,
+                        icon=sensor_conf.get("icon", cv.UNDEFINED)
+                    ).extend({
+                        cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds,
+                        cv.Optional(CONF_MODE, default="BOX"): cv.enum(number.NUMBER_MODES, upper=True)
+                    }),
+                    "select": select.select_schema(
+                        CanSelect,
+                        entity_category=ENTITY_CATEGORY_CONFIG,
+                        icon=sensor_conf.get("icon", cv.UNDEFINED)
+                    ).extend({
+                        cv.Optional(CONF_UPDATE_INTERVAL): cv.positive_time_period_milliseconds,
+                        select_options_schema: cv.Schema({
+                            cv.float_range(
+                                min=sensor_conf.get("min_value"),
+                                max=sensor_conf.get("max_value")
+                            ): cv.string
+                        })
+                    }),
+                },
+                default_type="number"
+            )
+
+def validate_adaptive_heating_curve(config):
+    if config[CONF_MIN_SUPPLY_TEMPERATURE] >= config[CONF_MAX_SUPPLY_TEMPERATURE]:
+        raise cv.Invalid(f"{CONF_MIN_SUPPLY_TEMPERATURE} has to be below {CONF_MAX_SUPPLY_TEMPERATURE}", path=[CONF_MIN_SUPPLY_TEMPERATURE])
+    if config[CONF_LOG_FACTOR] <= 0.0:
+        raise cv.Invalid(f"{CONF_LOG_FACTOR} has to be positive", path=[CONF_LOG_FACTOR])
+    return config
+
+@functools.lru_cache(maxsize=None)
+def component_entity_schemas():
+    """Schemas of the entities which are calculated or provided by the component itself."""
+    return {
+        ########## Sensors ##########
 
-entity_schemas.update({
-    ########## Sensors ##########
-
-    cv.Optional(CONF_THERMAL_POWER): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_POWER,
-        unit_of_measurement=UNIT_KILOWATT,
-        accuracy_decimals=2,
-        state_class=STATE_CLASS_MEASUREMENT
-    ),
-    cv.Optional(CONF_THERMAL_POWER_RAW): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_POWER,
-        unit_of_measurement=UNIT_KILOWATT,
-        accuracy_decimals=2,
-        state_class=STATE_CLASS_MEASUREMENT
-    ).extend(),
-    cv.Optional(CONF_TEMPERATURE_SPREAD): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_TEMPERATURE,
-        unit_of_measurement=UNIT_CELSIUS,
-        accuracy_decimals=1,
-        state_class=STATE_CLASS_MEASUREMENT,
-        icon="mdi:thermometer-lines"
-    ).extend(),
-    cv.Optional(CONF_TEMPERATURE_SPREAD_RAW): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_TEMPERATURE,
-        unit_of_measurement=UNIT_CELSIUS,
-        accuracy_decimals=1,
-        state_class=STATE_CLASS_MEASUREMENT,
-        icon="mdi:thermometer-lines"
-    ).extend(),
-    cv.Optional(CONF_TV_TVBH_DELTA): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_TEMPERATURE,
-        unit_of_measurement=UNIT_CELSIUS,
-        accuracy_decimals=1,
-        state_class=STATE_CLASS_MEASUREMENT,
-        icon="mdi:thermometer-lines"
-    ).extend(),
-    cv.Optional(CONF_TVBH_TR_DELTA): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_TEMPERATURE,
-        unit_of_measurement=UNIT_CELSIUS,
-        accuracy_decimals=1,
-        state_class=STATE_CLASS_MEASUREMENT,
-        icon="mdi:thermometer-lines"
-    ).extend(),
-    cv.Optional(CONF_VORLAUF_SOLL_TV_DELTA): sensor.sensor_schema(
-        CanSensor,
-        device_class=DEVICE_CLASS_TEMPERATURE,
-        unit_of_measurement=UNIT_CELSIUS,
-        accuracy_decimals=1,
-        state_class=STATE_CLASS_MEASUREMENT,
-        icon="mdi:thermometer-lines"
-    ).extend(),
+        CONF_THERMAL_POWER: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_POWER,
+            unit_of_measurement=UNIT_KILOWATT,
+            accuracy_decimals=2,
+            state_class=STATE_CLASS_MEASUREMENT
+        ),
+        CONF_THERMAL_POWER_RAW: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_POWER,
+            unit_of_measurement=UNIT_KILOWATT,
+            accuracy_decimals=2,
+            state_class=STATE_CLASS_MEASUREMENT
+        ).extend(),
+        CONF_TEMPERATURE_SPREAD: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:thermometer-lines"
+        ).extend(),
+        CONF_TEMPERATURE_SPREAD_RAW: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:thermometer-lines"
+        ).extend(),
+        CONF_TV_TVBH_DELTA: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:thermometer-lines"
+        ).extend(),
+        CONF_TVBH_TR_DELTA: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:thermometer-lines"
+        ).extend(),
+        CONF_VORLAUF_SOLL_TV_DELTA: sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:thermometer-lines"
+        ).extend(),
+        CONF_ADAPTIVE_HEATING_CURVE: cv.All(sensor.sensor_schema(
+            CanSensor,
+            device_class=DEVICE_CLASS_TEMPERATURE,
+            unit_of_measurement=UNIT_CELSIUS,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            icon="mdi:chart-bell-curve-cumulative"
+        ).extend({
+            cv.Optional(name, default=default): cv.float_ for name, default in DEFAULT_ADAPTIVE_HEATING_CURVE.items()
+        }).extend({
+            cv.Optional(CONF_ROOM_TEMPERATURE): cv.use_id(sensor.Sensor),
+            cv.Optional(CONF_UPDATE_INTERVAL, default=DEFAULT_ADAPTIVE_HEATING_CURVE_UPDATE_INTERVAL): cv.positive_time_period_milliseconds,
+        }), validate_adaptive_heating_curve),
 
-    ########## Buttons ##########
+        ########## Buttons ##########
 
-    cv.Optional(CONF_DHW_RUN): button.button_schema(
-        DHWRunButton,
-        entity_category=ENTITY_CATEGORY_CONFIG,
-        icon=ICON_SUN_SNOWFLAKE_VARIANT
-    ).extend(),
+        CONF_DHW_RUN: button.button_schema(
+            DHWRunButton,
+            entity_category=ENTITY_CATEGORY_CONFIG,
+            icon=ICON_SUN_SNOWFLAKE_VARIANT
+        ).extend(),
 
-    ########## Numbers ##########
+        ########## Numbers ##########
 
-    cv.Optional(CONF_SUPPLY_SETPOINT_REGULATED): number.number_schema(
-        CustomNumber,
-        entity_category=ENTITY_CATEGORY_CONFIG
-    ).extend({
-        cv.Optional(CONF_MODE, default="BOX"): cv.enum(number.NUMBER_MODES, upper=True)
-    })
-})
+        CONF_SUPPLY_SETPOINT_REGULATED: number.number_schema(
+            CustomNumber,
+            entity_category=ENTITY_CATEGORY_CONFIG
+        ).extend({
+            cv.Optional(CONF_MODE, default="BOX"): cv.enum(number.NUMBER_MODES, upper=True)
+        })
+    }
 
-CONFIG_SCHEMA = cv.Schema(
+@functools.lru_cache(maxsize=None)
+def get_entity_schema(name):
+    if name in SENSOR_CONFIGURATION_BY_NAME:
+        return build_entity_schema(SENSOR_CONFIGURATION_BY_NAME[name])
+    return component_entity_schemas().get(name)
+
+# accessor.get_sensor_value("tv") and accessor.get_number_value("tv") inside update_lambdas
+ACCESSOR_REFERENCE_PATTERN = re.compile(r'\baccessor\.get_(sensor|number)_value\(\s*"([^"]*)"\s*\)')
+
+@functools.lru_cache(maxsize=None)
+def get_entity_dependencies(name):
+    """
+    Returns the entities read by the entity name as (entity, type) tuples: its ENTITY_DEPENDENCIES
+    and the accessor reads of its update_lambda.
+    """
+    dependencies = [
+        (dependency, SENSOR_CONFIGURATION_BY_NAME[dependency].get("type"))
+        for dependency in ENTITY_DEPENDENCIES.get(name, [])
+    ]
+    sens_conf = SENSOR_CONFIGURATION_BY_NAME.get(name, {})
+    for kind, reference in ACCESSOR_REFERENCE_PATTERN.findall(str(sens_conf.get("update_lambda", ""))):
+        if (reference, kind) not in dependencies:
+            dependencies.append((reference, kind))
+    return tuple(dependencies)
+
+def add_entity_dependencies(entities):
+    """Adds the missing dependencies of the configured entities as internal entities."""
+    if not isinstance(entities, dict):
+        raise cv.Invalid("Expected a dictionary of entities")
+
+    entities = dict(entities)
+    pending = list(entities)
+    while pending:
+        name = pending.pop()
+        for dependency, _ in get_entity_dependencies(name):
+            if dependency not in entities:
+                _LOGGER.info("Adding internal entity '%s' required by '%s'", dependency, name)
+                entities[dependency] = {CONF_NAME: dependency, CONF_INTERNAL: True}
+                pending.append(dependency)
+    return entities
+
+def validate_entities(entities):
+    """
+    Validates the entities section. Only the schemas of the configured entities are built,
+    unknown entities are rejected by the schema like before.
+    """
+    if not isinstance(entities, dict):
+        raise cv.Invalid("Expected a dictionary of entities")
+
+    entity_schemas = {}
+    for name in entities:
+        if isinstance(name, str) and (schema := get_entity_schema(name)) is not None:
+            # The YAML keys are ESPHome's EStr, voluptuous only accepts plain str as schema key
+            entity_schemas[cv.Optional(str(name))] = schema
+    return cv.Schema(entity_schemas)(entities)
+
+
+def validate_entity_commands(entities):
+    for sens_conf in sensor_configuration:
+        name = sens_conf.get("name")
+        if name in entities:
+            try:
+                parse_command(sens_conf.get("command", ""))
+            except InvalidCommandError as err:
+                raise cv.Invalid(f"Entity '{name}' has an invalid CAN command: {err}", path=[name])
+            try:
+                parse_codec(sens_conf.get("codec"))
+            except InvalidCodecError as err:
+                raise cv.Invalid(f"Entity '{name}' has an invalid codec: {err}", path=[name])
+    return entities
+
+def validate_entity_dependencies(entities):
+    """
+    The dependencies of an entity are bound at code generation, so a configured dependency
+    has to use the C++ type its readers expect (e.g. no number configured as select).
+    """
+    for name in entities:
+        for dependency, kind in get_entity_dependencies(name):
+            dependency_conf = SENSOR_CONFIGURATION_BY_NAME.get(dependency, {})
+            yaml_type = entities.get(dependency, {}).get("type", dependency_conf.get("type"))
+            if dependency_conf.get("type") != kind or yaml_type != kind:
+                raise cv.Invalid(
+                    f"Entity '{name}' reads '{dependency}', '{dependency}' has to be configured as {kind}",
+                    path=[dependency]
+                )
+    return entities
+
+def get_update_function(sens_conf, update_functions, descriptor_index):
+    """
+    Returns the C++ function for the update_lambda of an entity, nullptr if it has none.
+    Accessor reads by entity name are replaced by the descriptor index of the entity.
+    Identical bodies share one generated function, update_functions maps the normalized body to its name.
+    """
+    if "update_lambda" not in sens_conf:
+        return "nullptr"
+
+    lamb = ACCESSOR_REFERENCE_PATTERN.sub(
+        lambda match: f"accessor.get_{match.group(1)}_value({descriptor_index[match.group(2)]} /* {match.group(2)} */)",
+        str(sens_conf.get("update_lambda"))
+    )
+    body = textwrap.indent(textwrap.dedent(lamb).strip(), "    ")
+    if body not in update_functions:
+        name = f"daikin_rotex_can_update_{len(update_functions)}"
+        cg.add_global(cg.RawStatement(
+            f"static std::string {name}(esphome::daikin_rotex_can::IAccessor const& accessor) {{\n{body}\n}}"
+        ))
+        update_functions[body] = name
+    return update_functions[body]
+
+def get_entity_mapping(sens_conf, yaml_sensor_conf):
+    """Returns the translated {CAN value: label} map of a select or text sensor, {} for all other entities."""
+    if sens_conf.get("type") == "switch":
+        if yaml_sensor_conf.get("type") == "select":
+            return {0x00: translate("off"), 0x01: translate("on")}
+        return {}
+
+    if sens_conf.get("type") not in ["select", "text_sensor"] and yaml_sensor_conf.get("type") != "select":
+        return {}
+
+    mapping = apply_translation_to_mapping(sens_conf.get("map", {}))
+    if yaml_sensor_conf.get("type") == "select" and "options" in yaml_sensor_conf:
+        mapping = yaml_sensor_conf.get("options")
+
+    divider = sens_conf.get("divider", 1.0)
+    return {int(key * divider) & 0xFFFF: value for key, value in mapping.items()}
+
+def get_update_interval(config, yaml_sensor_conf) -> int:
+    """Update interval of an entity in milliseconds, the global update_interval if it has none."""
+    update_interval = yaml_sensor_conf.get(CONF_UPDATE_INTERVAL, None)
+    if update_interval is None:
+        update_interval = config[CONF_UPDATE_INTERVAL]
+
+    # Convert TimePeriodMilliseconds to integer milliseconds
+    if hasattr(update_interval, 'total_milliseconds'):
+        return int(update_interval.total_milliseconds)
+    return int(update_interval)
+
+def validate_bus_schedule(config):
+    """
+    Checks whether the GETs of the polled entities fit into the polling loop and logs the expected schedule.
+    Depending on bus_overload an overloaded schedule is reported, rejected or its shortest intervals are stretched.
+    """
+    entities = config[CONF_ENTITIES]
+    intervals = {
+        name: get_update_interval(config, yaml_sensor_conf)
+        for name, yaml_sensor_conf in entities.items()
+        if name in SENSOR_CONFIGURATION_BY_NAME and any(parse_command(SENSOR_CONFIGURATION_BY_NAME[name].get("command", "")))
+    }
+    if not intervals:
+        return config
+
+    max_utilization = config[CONF_MAX_BUS_UTILIZATION]
+    overload = config[CONF_BUS_OVERLOAD]
+    plan = plan_schedule(
+        intervals, config[CONF_DELAY_BETWEEN_REQUESTS], max_utilization, overload == BUS_OVERLOAD_STRETCH,
+        config[CONF_MAX_REQUESTS_IN_FLIGHT], config[CONF_MAX_FRAMES_PER_SECOND]
+    )
+    _LOGGER.info("CAN bus schedule:\n%s", format_schedule(plan))
+
+    if plan["utilization"] > max_utilization:
+        message = (
+            f"The polled entities need {plan['utilization']:.0%} of the CAN bus, more than {CONF_MAX_BUS_UTILIZATION} "
+            f"({max_utilization:.0%}). Increase their {CONF_UPDATE_INTERVAL}, reduce {CONF_DELAY_BETWEEN_REQUESTS}, "
+            f"raise {CONF_MAX_REQUESTS_IN_FLIGHT} or set {CONF_BUS_OVERLOAD} to {BUS_OVERLOAD_STRETCH}"
+        )
+        if overload == BUS_OVERLOAD_FAIL:
+            raise cv.Invalid(message, path=[CONF_ENTITIES])
+        _LOGGER.warning(message)
+
+    config = dict(config, **{CONF_ENTITIES: dict(entities)})
+    for name, configured, interval, _, _ in plan["rows"]:
+        if interval != configured:
+            config[CONF_ENTITIES][name] = dict(
+                entities[name], **{CONF_UPDATE_INTERVAL: core.TimePeriodMilliseconds(milliseconds=interval)}
+            )
+    return config
+
+def get_cpp_class(sens_conf, yaml_sensor_conf) -> str:
+    """C++ class which to_code() creates for a CAN entity."""
+    match sens_conf.get("type"), yaml_sensor_conf.get("type"):
+        case "sensor", _:
+            return "CanSensor"
+        case "text_sensor", _:
+            return "CanTextSensor"
+        case "binary_sensor", _:
+            return "CanBinarySensor"
+        case "switch", "switch":
+            return "CanSwitch"
+        case "number", "number":
+            return "CanNumber"
+    return "CanSelect"
+
+COMPONENT_ENTITY_CLASSES = {
+    CONF_THERMAL_POWER: "CanSensor",
+    CONF_THERMAL_POWER_RAW: "CanSensor",
+    CONF_TEMPERATURE_SPREAD: "CanSensor",
+    CONF_TEMPERATURE_SPREAD_RAW: "CanSensor",
+    CONF_TV_TVBH_DELTA: "CanSensor",
+    CONF_TVBH_TR_DELTA: "CanSensor",
+    CONF_VORLAUF_SOLL_TV_DELTA: "CanSensor",
+    CONF_ADAPTIVE_HEATING_CURVE: "CanSensor",
+    CONF_DHW_RUN: "DHWRunButton",
+    CONF_SUPPLY_SETPOINT_REGULATED: "CustomNumber",
+}
+
+def validate_footprint(config):
+    """
+    Estimates the heap and flash needed by the configured entities, logs the report and
+    rejects the configuration if it exceeds heap_budget or flash_budget.
+    """
+    set_language(config[CONF_LANGUAGE])
+
+    entities = config[CONF_ENTITIES]
+    footprint_entities = []
+    for sens_conf in sensor_configuration:
+        name = sens_conf.get("name")
+        if (yaml_sensor_conf := entities.get(name)) is None:
+            continue
+
+        mapping = get_entity_mapping(sens_conf, yaml_sensor_conf)
+        cpp_class = get_cpp_class(sens_conf, yaml_sensor_conf)
+        footprint_entities.append({
+            "name": name,
+            "cpp_class": cpp_class,
+            "display_name": yaml_sensor_conf.get(CONF_NAME, name),
+            "descriptor": True,
+            "command": bool(sens_conf.get("command")),
+            "update_entities": len(sens_conf.get("update_entities", [])),
+            "value_map": tuple(sorted(mapping.items())) if mapping else None,
+            "options": list(mapping.values()) if cpp_class == "CanSelect" else [],
+            "update_function": textwrap.dedent(str(sens_conf["update_lambda"])).strip() if "update_lambda" in sens_conf else None,
+        })
+    for name, cpp_class in COMPONENT_ENTITY_CLASSES.items():
+        if yaml_sensor_conf := entities.get(name):
+            footprint_entities.append({
+                "name": name,
+                "cpp_class": cpp_class,
+                "display_name": yaml_sensor_conf.get(CONF_NAME, name),
+            })
+
+    report = estimate_footprint(footprint_entities)
+    _LOGGER.info("Estimated heap and flash of the entities in bytes:\n%s", format_footprint(report))
+
+    for budget, key in [(CONF_HEAP_BUDGET, "heap"), (CONF_FLASH_BUDGET, "flash")]:
+        if budget in config and report[key] > config[budget]:
+            column = 2 if key == "heap" else 3
+            largest = sorted(report["rows"], key=lambda row: row[column], reverse=True)[:5]
+            raise cv.Invalid(
+                f"The entities need about {report[key]} bytes of {key}, more than {budget} ({config[budget]} bytes). "
+                f"Largest: {', '.join(f'{row[0]} ({row[column]})' for row in largest)}",
+                path=[budget]
+            )
+    return config
+
+CONFIG_SCHEMA = cv.All(cv.Schema(
     {
         cv.GenerateID(): cv.declare_id(DaikinRotexCanComponent),
         cv.Required(CONF_CAN_ID): cv.use_id(CanbusComponent),
@@ -1895,6 +2285,22 @@ CONFIG_SCHEMA = cv.Schema(
         cv.Optional(CONF_TR_OFFSET, default=DEFAULT_TR_OFFSET): cv.float_,
         cv.Optional(CONF_MAX_SPREAD_TVBH_TV, default=DEFAULT_MAX_SPREAD_TVBH_TV): cv.float_,
         cv.Optional(CONF_MAX_SPREAD_TVBH_TR, default=DEFAULT_MAX_SPREAD_TVBH_TR): cv.float_,
+        cv.Optional(CONF_MIN_SPREAD_OFFSET, default=DEFAULT_MIN_SPREAD_OFFSET): cv.float_,
+        cv.Optional(CONF_MIXER_ERROR_DETECTION_TIME, default=DEFAULT_MIXER_ERROR_DETECTION_TIME): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_BPV_ERROR_DETECTION_TIME, default=DEFAULT_BPV_ERROR_DETECTION_TIME): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_SPREAD_ERROR_DETECTION_TIME, default=DEFAULT_SPREAD_ERROR_DETECTION_TIME): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_DHW_ERROR_DETECTION_TIME, default=DEFAULT_DHW_ERROR_DETECTION_TIME): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_SMOOTHING_PID, default={}): cv.Schema({
+            cv.Optional(name, default=default): cv.float_ for name, default in DEFAULT_SMOOTHING_PID.items()
+        }),
+        cv.Optional(CONF_MAX_BUS_UTILIZATION, default=DEFAULT_MAX_BUS_UTILIZATION): cv.percentage,
+        cv.Optional(CONF_BUS_OVERLOAD, default=BUS_OVERLOAD_WARN): cv.one_of(*BUS_OVERLOAD_ACTIONS, lower=True),
+        cv.Optional(CONF_MAX_REQUESTS_IN_FLIGHT, default=DEFAULT_MAX_REQUESTS_IN_FLIGHT): cv.int_range(min=1, max=16),
+        cv.Optional(CONF_REQUEST_TIMEOUT, default=DEFAULT_REQUEST_TIMEOUT): cv.positive_time_period_milliseconds,
+        cv.Optional(CONF_MAX_FRAMES_PER_SECOND, default=DEFAULT_MAX_FRAMES_PER_SECOND): cv.int_range(min=1, max=200),
+        cv.Optional(CONF_HEAP_BUDGET): cv.positive_int,
+        cv.Optional(CONF_FLASH_BUDGET): cv.positive_int,
+        cv.Optional(CONF_LOG_UNHANDLED_FRAMES, default=False): cv.boolean,
         cv.Required(CONF_LANGUAGE): cv.enum(SUPPORTED_LANGUAGES, lower=True, space="_"),
 
         ########## Texts ##########
@@ -1911,6 +2317,10 @@ CONFIG_SCHEMA = cv.Schema(
             icon="mdi:git",
             entity_category=ENTITY_CATEGORY_DIAGNOSTIC
         ),
+        cv.Optional(CONF_UNHANDLED_FRAMES): text_sensor.text_sensor_schema(
+            icon="mdi:help-network-outline",
+            entity_category=ENTITY_CATEGORY_DIAGNOSTIC
+        ),
 
         ########## Buttons ##########
 
@@ -1920,27 +2330,27 @@ CONFIG_SCHEMA = cv.Schema(
             icon=ICON_SUN_SNOWFLAKE_VARIANT
         ).extend(),
 
-        cv.Required(CONF_ENTITIES): cv.Schema(
-            entity_schemas
+        cv.Required(CONF_ENTITIES): cv.All(
+            add_entity_dependencies,
+            validate_entities,
+            validate_entity_commands,
+            validate_entity_dependencies
         ),
     }
-).extend(cv.COMPONENT_SCHEMA)
+).extend(cv.COMPONENT_SCHEMA), validate_bus_schedule, validate_footprint)
 
 async def to_code(config):
 
     cg.set_cpp_standard("gnu++20")
-    cg.add_build_unflag("-fno-rtti")
 
     cg.add_global(cg.RawStatement("#include \"esphome/components/daikin_rotex_can/accessor.h\""))
     cg.add_global(cg.RawStatement("#include \"esphome/components/daikin_rotex_can/utils.h\""))
+    cg.add_global(cg.RawStatement("#include \"esphome/components/daikin_rotex_can/value_map.h\""))
 
     if CONF_LANGUAGE in config:
         lang = config[CONF_LANGUAGE]
         set_language(lang)
 
-    std_array_u8_7_const_ref = std_ns.class_("array<uint8_t, 7> const&")
-    std_array_u8_7_ref = std_ns.class_("array<uint8_t, 7>&")
-    accessor_const_ref = daikin_rotex_can_ns.class_("IAccessor const&")
 
     var = cg.new_Pvariable(config[CONF_ID])
     await cg.register_component(var, config)
@@ -1952,11 +2362,57 @@ async def to_code(config):
 
     cg.add(var.set_max_spread(config[CONF_MAX_SPREAD_TVBH_TV], config[CONF_MAX_SPREAD_TVBH_TR]))
     cg.add(var.set_tv_tvbh_tr_offset(config[CONF_TV_OFFSET], config[CONF_TVBH_OFFSET], config[CONF_TR_OFFSET]))
+    cg.add(var.set_min_spread_offset(config[CONF_MIN_SPREAD_OFFSET]))
+    cg.add(var.set_error_detection_times(
+        config[CONF_MIXER_ERROR_DETECTION_TIME].total_milliseconds,
+        config[CONF_BPV_ERROR_DETECTION_TIME].total_milliseconds,
+        config[CONF_SPREAD_ERROR_DETECTION_TIME].total_milliseconds,
+        config[CONF_DHW_ERROR_DETECTION_TIME].total_milliseconds
+    ))
+    cg.add(var.set_smoothing_pid(*(config[CONF_SMOOTHING_PID][name] for name in DEFAULT_SMOOTHING_PID)))
 
     cg.add(var.set_delay_between_requests(config[CONF_DELAY_BETWEEN_REQUESTS]))
-
-    # Write cpp translation file
-    write_cpp_file(os.path.dirname(__file__))
+    cg.add(var.set_request_pipeline(
+        config[CONF_MAX_REQUESTS_IN_FLIGHT],
+        config[CONF_REQUEST_TIMEOUT].total_milliseconds,
+        config[CONF_MAX_FRAMES_PER_SECOND]
+    ))
+    cg.add(var.set_log_unhandled_frames(config[CONF_LOG_UNHANDLED_FRAMES]))
+
+    # Generated sources go into the build directory and are only rewritten when their content changes
+    generated_dir = core.CORE.relative_src_path("daikin_rotex_can")
+
+    selected_entities = []
+    for sens_conf in sensor_configuration:
+        if yaml_sensor_conf := config.get(CONF_ENTITIES, {}).get(sens_conf.get("name")):
+            selected_entities.append((sens_conf, get_update_interval(config, yaml_sensor_conf)))
+
+    # Write cpp translation file, pruned to the keys used by the component sources and the entity lambdas
+    translation_sources = [
+        sens_conf.get("update_lambda")
+        for sens_conf, _ in selected_entities
+        if "update_lambda" in sens_conf
+    ]
+    component_dir = os.path.dirname(__file__)
+    for file_name in sorted(os.listdir(component_dir)):
+        if file_name.endswith((".h", ".cpp")):
+            with open(os.path.join(component_dir, file_name), encoding="utf-8") as f:
+                translation_sources.append(f.read())
+    write_cpp_file(generated_dir, collect_translation_keys(translation_sources))
+
+    # Write cpp entity descriptor and value map tables
+    # Derived sensors are only updated if all their sources are configured, the dummy sensors of the component included
+    derived_sensors = [
+        name for name in DERIVED_SENSORS
+        if all(dependency in config[CONF_ENTITIES] for dependency, _ in get_entity_dependencies(name))
+    ]
+    descriptors, descriptor_index = build_descriptors(selected_entities, derived_sensors)
+    value_maps, value_map_index = build_value_maps({
+        sens_conf.get("name"): mapping
+        for sens_conf, _ in selected_entities
+        if (mapping := get_entity_mapping(sens_conf, config[CONF_ENTITIES][sens_conf.get("name")]))
+    })
+    write_descriptors_file(generated_dir, descriptors, value_maps)
 
     ########## Texts ##########
 
@@ -1971,7 +2427,11 @@ async def to_code(config):
 
     if text_conf := config.get(CONF_PROJECT_GIT_HASH):
         t = await text_sensor.new_text_sensor(text_conf)
-        cg.add(var.set_project_git_hash(t, git_hash))
+        cg.add(var.set_project_git_hash(t, get_git_hash()))
+
+    if text_conf := config.get(CONF_UNHANDLED_FRAMES):
+        t = await text_sensor.new_text_sensor(text_conf)
+        cg.add(var.set_unhandled_frames_sensor(t))
 
     ########## Buttons ##########
 
@@ -1980,17 +2440,17 @@ async def to_code(config):
         await cg.register_parented(but, var)
 
     if entities := config.get(CONF_ENTITIES):
-        for sens_conf in sensor_configuration:
+        update_functions = {}
+        for sens_conf, _ in selected_entities:
             if yaml_sensor_conf := entities.get(sens_conf.get("name")):
                 entity = None
-                divider = sens_conf.get("divider", 1.0)
-
-                # translate maps
-                mapping = apply_translation_to_mapping(sens_conf.get("map", {}))
+                name = sens_conf.get("name")
 
-                if yaml_sensor_conf.get("type") == "select" and "options" in yaml_sensor_conf:
-                    mapping = yaml_sensor_conf.get("options")
-                str_map = "|".join([f"0x{int(key * divider) & 0xFFFF :02X}:{value}" for key, value in mapping.items()])
+                # Select options reference the labels of the generated value map
+                mapping = get_entity_mapping(sens_conf, yaml_sensor_conf)
+                options = []
+                if mapping:
+                    options = [cg.RawExpression(ref) for ref in value_map_label_refs(value_maps, value_map_index[name], mapping.values())]
 
                 match sens_conf.get("type"):
                     case "sensor":
@@ -1998,22 +2458,21 @@ async def to_code(config):
                         cg.add(entity.set_range(sens_conf.get("range", [0, 0])))
                     case "text_sensor":
                         entity = await text_sensor.new_text_sensor(yaml_sensor_conf)
-                        cg.add(entity.set_map(str_map))
+                        if mapping:
+                            cg.add(entity.set_value_map(value_map_index[name]))
                     case "binary_sensor":
                         entity = await binary_sensor.new_binary_sensor(yaml_sensor_conf)
                     case "select":
-                        entity = await select.new_select(yaml_sensor_conf, options = list(mapping.values()))
-                        cg.add(entity.set_map(str_map))
+                        entity = await select.new_select(yaml_sensor_conf, options=options)
+                        cg.add(entity.set_value_map(value_map_index[name]))
                         await cg.register_parented(entity, var)
                     case "switch":
                         match yaml_sensor_conf.get("type"):
                             case "switch":
                                 entity = await switch.new_switch(yaml_sensor_conf)
                             case "select":
-                                mapping = {0x00: translate("off"), 0x01: translate("on")}
-                                str_map = "|".join([f"0x{int(key):02X}:{value}" for key, value in mapping.items()])
-                                entity = await select.new_select(yaml_sensor_conf, options=list(mapping.values()))
-                                cg.add(entity.set_map(str_map))
+                                entity = await select.new_select(yaml_sensor_conf, options=options)
+                                cg.add(entity.set_value_map(value_map_index[name]))
                         await cg.register_parented(entity, var)
 
                     case "number":
@@ -2033,67 +2492,17 @@ async def to_code(config):
                                     step=sens_conf.get("step")
                                 )
                             case "select":
-                                entity = await select.new_select(yaml_sensor_conf, options = list(mapping.values()))
-                                cg.add(entity.set_map(str_map))
+                                entity = await select.new_select(yaml_sensor_conf, options=options)
+                                cg.add(entity.set_value_map(value_map_index[name]))
 
                         await cg.register_parented(entity, var)
                     case _:
                         raise Exception("Unknown type: " + sens_conf.get("type"))
 
-                update_interval = yaml_sensor_conf.get(CONF_UPDATE_INTERVAL, None)
-                if update_interval is None:
-                    update_interval = config[CONF_UPDATE_INTERVAL]
-                
-                # Convert TimePeriodMilliseconds to integer milliseconds
-                if hasattr(update_interval, 'total_milliseconds'):
-                    update_interval = int(update_interval.total_milliseconds)
-                else:
-                    update_interval = int(update_interval)
-
-                async def handle_lambda():
-                    lamb = str(sens_conf.get("handle_lambda")) if "handle_lambda" in sens_conf else "return 0;"
-                    return await cg.process_lambda(
-                        Lambda(lamb),
-                        [(std_array_u8_7_const_ref, "data")],
-                        return_type=cg.uint16,
-                    )
-
-                async def update_lambda():
-                    lamb = str(sens_conf.get("update_lambda")) if "update_lambda" in sens_conf else "return {};"
-                    return await cg.process_lambda(
-                        Lambda(lamb),
-                        [(accessor_const_ref, "accessor")],
-                        return_type=cg.std_string,
-                    )
-
-                async def set_lambda():
-                    lamb = str(sens_conf.get("set_lambda")) if "set_lambda" in sens_conf else ""
-                    return await cg.process_lambda(
-                        Lambda(lamb),
-                        [(std_array_u8_7_ref, "data"), (cg.uint16, "value")],
-                        return_type=cg.void,
-                    )
-
                 cg.add(entity.set_entity(
-                    sens_conf.get("name"),
-                    [
-                        entity,
-                        sens_conf.get("name"), # Entity id
-                        sens_conf.get("can_id", 0x180),
-                        sens_conf.get("command", ""),
-                        sens_conf.get("data_offset", 5),
-                        sens_conf.get("data_size", 1),
-                        divider,
-                        sens_conf.get("signed", False),
-                        sens_conf.get("update_entities", []),
-                        update_interval,
-                        await handle_lambda(),
-                        await update_lambda(),
-                        await set_lambda(),
-                        "handle_lambda" in sens_conf,
-                        "update_lambda" in sens_conf,
-                        "set_lambda" in sens_conf
-                    ],
+                    descriptor_index[sens_conf.get("name")],
+                    entity,
+                    cg.RawExpression(get_update_function(sens_conf, update_functions, descriptor_index)),
                     var
                 ))
                 cg.add(var.add_entity(entity))
@@ -2128,6 +2537,17 @@ async def to_code(config):
             sens = await sensor.new_sensor(yaml_sensor_conf)
             cg.add(sens.set_id(CONF_VORLAUF_SOLL_TV_DELTA))
             cg.add(var.set_vorlauf_soll_tv_delta(sens))
+        if yaml_sensor_conf := entities.get(CONF_ADAPTIVE_HEATING_CURVE):
+            sens = await sensor.new_sensor(yaml_sensor_conf)
+            cg.add(sens.set_id(CONF_ADAPTIVE_HEATING_CURVE))
+            cg.add(var.set_adaptive_heating_curve(
+                sens,
+                *(yaml_sensor_conf[name] for name in DEFAULT_ADAPTIVE_HEATING_CURVE),
+                yaml_sensor_conf[CONF_UPDATE_INTERVAL].total_milliseconds
+            ))
+            if room_temperature := yaml_sensor_conf.get(CONF_ROOM_TEMPERATURE):
+                room_sensor = await cg.get_variable(room_temperature)
+                cg.add(var.set_adaptive_heating_curve_room_temperature(room_sensor))
 
         ########## Buttons ##########
 
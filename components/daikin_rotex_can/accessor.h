@@ -1,14 +1,16 @@
 #pragma once
 
-#include <string>
+#include <cstdint>
 
 namespace esphome {
 namespace daikin_rotex_can {
 
+// Read access for the update_lambdas. The index of an entity is its row in g_entity_descriptors,
+// it is resolved and type checked by to_code().
 class IAccessor {
 public:
-    virtual float get_sensor_value(std::string const& sensor_id) const = 0;
-    virtual float get_number_value(std::string const& sensor_id) const = 0;
+    virtual float get_sensor_value(uint16_t index) const = 0;
+    virtual float get_number_value(uint16_t index) const = 0;
 };
 
 }
@@ -0,0 +1,103 @@
+"""
+    Config time capacity planning of the GET polling.
+
+    TEntityManager keeps up to max_requests_in_flight GETs on the bus, paced by max_frames_per_second
+    (every GET is a request and a response frame). A slot of the window is refilled as soon as its GET
+    is answered, so a GET occupies the pacing or its share of the round trip, whichever is longer. With
+    one GET in flight every GET occupies a slot of delay_between_requests plus the round trip, with more
+    the delay does not apply. The most overdue entity is always sent first.
+"""
+
+import math
+
+RESPONSE_TIME = 20 # milliseconds, request and response at 20 kbps plus the processing time of the HPSU
+
+def slot_time(delay_between_requests, requests_in_flight=1, max_frames_per_second=None) -> int:
+    """Bus time in milliseconds occupied by one GET."""
+    spacing = 2000.0 / max_frames_per_second if max_frames_per_second else 0.0
+    if requests_in_flight == 1:
+        return math.ceil(max(spacing, RESPONSE_TIME + delay_between_requests))
+    return math.ceil(max(spacing, RESPONSE_TIME / requests_in_flight))
+
+def utilization(intervals, slot) -> float:
+    """Share of the polling loop which is needed for {entity: update_interval in ms}."""
+    return sum(slot / interval for interval in intervals.values())
+
+def waiting_time(intervals, slot) -> float:
+    """
+    Expected delay in milliseconds between an entity becoming due and its GET being sent.
+
+    Below full load the GETs queue up like in a M/D/1 queue. Above it, sending the most overdue
+    entity first equalizes the delays, so every entity is polled each interval + delay with
+    sum(slot / (interval + delay)) == 1.
+    """
+    load = utilization(intervals, slot)
+    if load < 1.0:
+        return load * slot / (2.0 * (1.0 - load))
+
+    low, high = 0.0, slot * len(intervals)
+    for _ in range(50):
+        delay = (low + high) / 2.0
+        if sum(slot / (interval + delay) for interval in intervals.values()) > 1.0:
+            low = delay
+        else:
+            high = delay
+    return high
+
+def stretch_intervals(intervals, slot, max_utilization) -> dict:
+    """
+    Raises the shortest update intervals to a common lower bound, rounded up to full seconds, until
+    the utilization is at most max_utilization. Longer intervals stay unchanged.
+    """
+    if utilization(intervals, slot) <= max_utilization:
+        return dict(intervals)
+
+    ordered = sorted(intervals.values())
+    for count in range(1, len(ordered) + 1):
+        remaining = sum(slot / interval for interval in ordered[count:])
+        if remaining >= max_utilization:
+            continue
+        bound = math.ceil(count * slot / (max_utilization - remaining) / 1000.0) * 1000
+        if count == len(ordered) or bound <= ordered[count]:
+            return {name: max(interval, bound) for name, interval in intervals.items()}
+    return dict(intervals)
+
+def plan_schedule(intervals, delay_between_requests, max_utilization=1.0, stretch=False, requests_in_flight=1,
+                  max_frames_per_second=None) -> dict:
+    """
+    Returns the expected schedule of the polled entities {entity: update_interval in ms}:
+        slot, utilization, waiting_time and per entity rows of
+        (name, configured interval, planned interval, share of the loop, expected staleness)
+    Staleness is the expected age of a value right before it is refreshed.
+    """
+    slot = slot_time(delay_between_requests, requests_in_flight, max_frames_per_second)
+    planned = stretch_intervals(intervals, slot, max_utilization) if stretch else dict(intervals)
+    wait = waiting_time(planned, slot) if planned else 0.0
+
+    rows = [
+        (name, intervals[name], interval, slot / interval, interval + wait + slot)
+        for name, interval in sorted(planned.items(), key=lambda item: (item[1], item[0]))
+    ]
+    return {
+        "slot": slot,
+        "requests_in_flight": requests_in_flight,
+        "utilization": utilization(planned, slot),
+        "waiting_time": wait,
+        "rows": rows,
+    }
+
+def format_schedule(plan) -> str:
+    """Summary table of a plan_schedule() result."""
+    lines = [f"{'Entity':<40} {'Interval':>10} {'GETs/min':>9} {'Share':>7} {'Staleness':>10}"]
+    for name, configured, interval, share, staleness in plan["rows"]:
+        stretched = "*" if interval != configured else " "
+        lines.append(
+            f"{name:<40} {interval / 1000.0:>9.1f}s{stretched}{60000.0 / interval:>9.1f} {share:>7.1%} {staleness / 1000.0:>9.1f}s"
+        )
+    lines.append(
+        f"{len(plan['rows'])} polled entities, one GET per {plan['slot']} ms "
+        f"({plan['requests_in_flight']} in flight), full refresh in {len(plan['rows']) * plan['slot'] / 1000.0:.1f}s, "
+        f"{sum(60000.0 / row[2] for row in plan['rows']):.1f} GETs/min, utilization {plan['utilization']:.0%}, "
+        f"expected waiting time {plan['waiting_time'] / 1000.0:.1f}s (* stretched interval)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,32 @@
+#include "esphome/components/daikin_rotex_can/can_filter.h"
+
+#include <algorithm>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+static constexpr uint32_t STANDARD_ID_MASK = 0x7FF;
+static constexpr uint32_t TWAI_ID_SHIFT = 21;   // Single filter mode, standard frames: id in bits 31..21, rtr and data below
+
+bool TCanFilter::isAccepted(uint32_t can_id) const {
+    if ((can_id & mask) != (code & mask)) {
+        return false;
+    }
+    if (can_ids == nullptr) {
+        return true;
+    }
+    uint16_t const* end = can_ids + can_ids_size;
+    return std::binary_search(can_ids, end, can_id);
+}
+
+uint32_t TCanFilter::getTwaiAcceptanceCode() const {
+    return (code & STANDARD_ID_MASK) << TWAI_ID_SHIFT;
+}
+
+// TWAI ignores the bits which are set in the acceptance mask
+uint32_t TCanFilter::getTwaiAcceptanceMask() const {
+    return ((~mask & STANDARD_ID_MASK) << TWAI_ID_SHIFT) | ((1u << TWAI_ID_SHIFT) - 1u);
+}
+
+}
+}
@@ -0,0 +1,26 @@
+#pragma once
+
+#include <cstdint>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Acceptance filter of the received frames, derived by to_code() from the can ids of the configured entities
+// and the RoCon control panel (0x10A). It is generated into entity_descriptors.cpp.
+// Stage 1 is a single code/mask filter like one TWAI acceptance filter. If it accepts more ids than
+// listened to, stage 2 looks the id up in the sorted can_ids.
+struct TCanFilter {
+    uint32_t code;
+    uint32_t mask;                  // Bits which have to match code
+    uint16_t const* can_ids;        // Sorted ascending, nullptr if stage 1 is exact
+    uint8_t can_ids_size;
+
+    bool isAccepted(uint32_t can_id) const;
+    uint32_t getTwaiAcceptanceCode() const;
+    uint32_t getTwaiAcceptanceMask() const;
+};
+
+extern const TCanFilter g_can_filter;
+
+}
+}
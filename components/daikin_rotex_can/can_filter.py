@@ -0,0 +1,77 @@
+"""
+    Config time derivation of the CAN acceptance filter from the configured entities.
+
+    The component only consumes frames on the can ids of its entities and the responses and sets of
+    the RoCon control panel on 0x10A. The tightest single code/mask filter for a set of 11 bit standard
+    ids compares the bits which are equal in all of them. If it accepts further ids, the exact set is
+    checked in software behind it (two stage prefilter).
+"""
+
+ROCON_CAN_ID = 0x10A
+STANDARD_ID_BITS = 11
+STANDARD_ID_MASK = (1 << STANDARD_ID_BITS) - 1
+TWAI_ID_SHIFT = 21      # TWAI single filter mode, standard frames: id in bits 31..21, rtr and data bytes below
+
+def listened_can_ids(rows) -> list:
+    """Sorted can ids of the descriptor rows with the RoCon control panel, derived rows have no can id."""
+    return sorted({row["can_id"] for row in rows if row["can_id"] != 0x0} | {ROCON_CAN_ID})
+
+def build_can_filter(can_ids) -> dict:
+    """
+    Returns the single filter for the given standard ids:
+        code, mask (set bits have to match), can_ids, accepted (number of ids passing the filter)
+        and exact (no further ids pass it)
+    """
+    can_ids = sorted(set(can_ids))
+    if not can_ids:
+        raise ValueError("No can ids to listen to")
+    if any(not 0 <= can_id <= STANDARD_ID_MASK for can_id in can_ids):
+        raise ValueError(f"Can ids must be standard 11 bit ids: {[hex(can_id) for can_id in can_ids]}")
+
+    differing = 0
+    for can_id in can_ids:
+        differing |= can_id ^ can_ids[0]
+    mask = ~differing & STANDARD_ID_MASK
+    accepted = 1 << (STANDARD_ID_BITS - bin(mask).count("1"))
+    return {
+        "code": can_ids[0] & mask,
+        "mask": mask,
+        "can_ids": can_ids,
+        "accepted": accepted,
+        "exact": accepted == len(can_ids),
+    }
+
+def is_accepted(can_filter, can_id) -> bool:
+    """Both stages like TCanFilter::isAccepted()."""
+    if (can_id & can_filter["mask"]) != can_filter["code"]:
+        return False
+    return can_filter["exact"] or can_id in can_filter["can_ids"]
+
+def twai_single_filter(can_filter) -> tuple:
+    """acceptance_code and acceptance_mask of a twai_filter_config_t in single filter mode, set mask bits are ignored."""
+    acceptance_code = can_filter["code"] << TWAI_ID_SHIFT
+    acceptance_mask = ((~can_filter["mask"] & STANDARD_ID_MASK) << TWAI_ID_SHIFT) | ((1 << TWAI_ID_SHIFT) - 1)
+    return acceptance_code, acceptance_mask
+
+def format_can_filter(can_filter) -> str:
+    acceptance_code, acceptance_mask = twai_single_filter(can_filter)
+    can_ids = ", ".join(f"0x{can_id:03X}" for can_id in can_filter["can_ids"])
+    text = (
+        f"CAN filter for {can_ids}: code 0x{can_filter['code']:03X} mask 0x{can_filter['mask']:03X} "
+        f"(TWAI acceptance_code 0x{acceptance_code:08X} acceptance_mask 0x{acceptance_mask:08X})"
+    )
+    if can_filter["exact"]:
+        return text + ", exact"
+    return text + f", passes {can_filter['accepted']} ids, the others are dropped in software"
+
+def generate_cpp_can_filter(can_filter) -> str:
+    cpp_code = ''
+    can_ids = 'nullptr'
+    if not can_filter["exact"]:
+        cpp_code += f'static constexpr uint16_t CAN_FILTER_IDS[] = {{{", ".join(f"0x{can_id:03X}" for can_id in can_filter["can_ids"])}}};\n\n'
+        can_ids = 'CAN_FILTER_IDS'
+    cpp_code += (
+        f'constexpr TCanFilter g_can_filter = {{0x{can_filter["code"]:03X}, 0x{can_filter["mask"]:03X}, '
+        f'{can_ids}, {0 if can_filter["exact"] else len(can_filter["can_ids"])}}};\n\n'
+    )
+    return cpp_code
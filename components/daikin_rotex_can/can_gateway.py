@@ -0,0 +1,292 @@
+"""
+    asyncio polling engine for Linux CAN gateways, which poll the Rotex / Daikin HPSU with python-can
+    instead of an ESP32.
+
+    The engine follows TEntityManager: GETs are sent to 0x680 one at a time, the next one not before
+    delay_between_requests after the last received frame, and always for the most overdue entity.
+    A frame is consumed by the first entity (in sensor_configuration order) which listens on its can id
+    or, for responses and sets of the RoCon control panel, on 0x10A. Entities are compiled and decoded
+    like in the offline decoder (can_log_decoder.py), labels come from the translation dictionaries.
+
+    Decoded values are passed to callbacks and to the async iterators of updates():
+
+        poller = HpsuPoller(bus, sensor_configuration, update_intervals={"tv": 5.0})
+        task = asyncio.create_task(poller.run())
+        async for update in poller.updates():
+            print(update.name, update.value, update.label)
+
+    Usage (from the components directory, requires esphome, numpy and python-can):
+        python3 -m daikin_rotex_can.can_gateway [--interface socketcan] [--channel can0] [--entities tv,tr]
+"""
+
+import argparse
+import asyncio
+import bisect
+import logging
+import math
+import time
+from typing import NamedTuple, Optional
+
+import can
+
+from . import codec, sensor_configuration
+from .can_log_decoder import FRAME_SIZE, ROCON_CAN_ID, compile_entity
+from .descriptors import parse_command
+from .translations.translate import SUPPORTED_LANGUAGES, set_language
+
+_LOGGER = logging.getLogger(__name__)
+
+REQUEST_CAN_ID = 0x680
+GET_TIMEOUT = 3.0                       # seconds, like TEntity::isGetInProgress()
+DEFAULT_UPDATE_INTERVAL = 30.0          # seconds
+DEFAULT_DELAY_BETWEEN_REQUESTS = 0.25   # seconds
+UPDATE_QUEUE_SIZE = 1024
+
+class EntityUpdate(NamedTuple):
+    timestamp: float
+    name: str
+    value: object
+    label: Optional[str]
+    changed: bool
+    can_id: int
+    data: bytes
+
+def decode_frame(entity, data):
+    """
+    Converts the data of one frame like decode_values() of the offline decoder, for a single frame.
+    Returns (value, label), None if the value is invalid.
+    """
+    offset = entity["data_offset"]
+    size = entity["data_size"]
+    if not (offset > 0 and offset + size <= FRAME_SIZE and 1 <= size <= 2):
+        return None
+
+    raw = (data[offset] << 8) + data[offset + 1] if size == 2 else data[offset]
+    raw = int(codec.decode(entity["codec"], raw, size)) & 0xFFFF
+
+    match entity["type"]:
+        case "sensor" | "number":
+            value = ((raw ^ 0x8000) - 0x8000 if entity["signed"] else raw) / entity["divider"]
+            range_min, range_max = entity["range"]
+            if entity["type"] == "sensor" and range_min != 0 and range_max != 0 and not range_min <= value <= range_max:
+                return None
+            return value, None
+        case "binary_sensor" | "switch":
+            return raw > 0, None
+        case "select" | "text_sensor":
+            keys = entity["keys"]
+            if not keys:
+                return raw, None
+            position = bisect.bisect_left(keys, raw)
+            if position < len(keys) and keys[position] == raw:
+                return raw, entity["labels"][position]
+            if entity["type"] == "text_sensor":
+                return raw, None
+            # findNextByKey(): the closest key, on equal distance the lower one
+            if position == 0:
+                return raw, entity["labels"][0]
+            if position == len(keys) or raw - keys[position - 1] <= keys[position] - raw:
+                return raw, entity["labels"][position - 1]
+            return raw, entity["labels"][position]
+    raise ValueError(f"Unknown type: {entity['type']}")
+
+class PolledEntity:
+    def __init__(self, sens_conf, update_interval):
+        self.entity = compile_entity(sens_conf)
+        self.name = self.entity["name"]
+        self.command = bytes(parse_command(sens_conf.get("command", "")))
+        self.update_interval = update_interval
+        self.last_get = None
+        self.last_handle = None
+        self.value = None
+
+    def is_polled(self) -> bool:
+        return any(self.command)
+
+    def is_get_needed(self, now) -> bool:
+        return self.last_handle is None or now > self.last_handle + self.update_interval
+
+    def overdue_time(self, now) -> float:
+        """Like TEntity::getOverdueTime(), entities which were never handled come first."""
+        if self.last_handle is None:
+            return math.inf
+        return now - (self.last_handle + self.update_interval)
+
+    def is_get_in_progress(self, now) -> bool:
+        return (
+            self.last_get is not None
+            and (self.last_handle is None or self.last_get > self.last_handle)
+            and now - self.last_get < GET_TIMEOUT
+        )
+
+class HpsuPoller:
+    """Polls the entities of the given sensor_configuration entries on a python-can bus."""
+
+    def __init__(self, bus, sens_confs, update_intervals=None, default_update_interval=DEFAULT_UPDATE_INTERVAL,
+                 delay_between_requests=DEFAULT_DELAY_BETWEEN_REQUESTS, clock=time.monotonic):
+        update_intervals = update_intervals or {}
+        self.bus = bus
+        self.delay_between_requests = delay_between_requests
+        self.entities = [
+            PolledEntity(sens_conf, update_intervals.get(sens_conf.get("name"), default_update_interval))
+            for sens_conf in sens_confs
+        ]
+        self._clock = clock
+        self._last_frame = None
+        self._callbacks = []
+        self._queues = []
+        self._wakeup = None
+
+        # First entity wins like in TEntityManager::handle(): by (match key, can id) and for RoCon frames by match key.
+        # Entities without command are left out like in TFrameIndex
+        self._by_can_id = {}
+        self._by_key = {}
+        for entity in self.entities:
+            if not entity.is_polled():
+                continue
+            key = entity.entity["match_key"]
+            self._by_can_id.setdefault((key, entity.entity["can_id"]), entity)
+            self._by_key.setdefault(key, entity)
+        self._polled = [entity for entity in self.entities if entity.is_polled()]
+
+    def add_callback(self, callback):
+        """callback(update) is called for every decoded value."""
+        self._callbacks.append(callback)
+
+    async def updates(self):
+        """Async iterator of the decoded values, updates are dropped while the consumer lags behind by more than UPDATE_QUEUE_SIZE."""
+        queue = asyncio.Queue(UPDATE_QUEUE_SIZE)
+        self._queues.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def find_entity(self, can_id, data):
+        """Entity which consumes the frame like TEntityManager::handle(), None for unhandled frames."""
+        if len(data) < FRAME_SIZE:
+            return None
+        key = (data[2] << 16) | (data[3] << 8) | data[4] if data[2] == 0xFA else data[2]
+        mode = data[0] & 0x0F
+        if can_id == ROCON_CAN_ID and mode in (0x00, 0x02):
+            return self._by_key.get(key)
+        return self._by_can_id.get((key, can_id))
+
+    def handle(self, can_id, data, timestamp=None):
+        """Handles one received frame, returns the EntityUpdate or None."""
+        now = self._clock() if timestamp is None else timestamp
+        self._last_frame = now
+        data = bytes(data[:FRAME_SIZE])
+
+        entity = self.find_entity(can_id, data)
+        if entity is None:
+            _LOGGER.debug("unhandled can_id<0x%X> data<%s>", can_id, data.hex(" ").upper())
+            return None
+
+        entity.last_handle = now
+        decoded = decode_frame(entity.entity, data)
+        if decoded is None:
+            return None
+
+        value, label = decoded
+        update = EntityUpdate(now, entity.name, value, label, value != entity.value, can_id, data)
+        entity.value = value
+
+        for callback in self._callbacks:
+            callback(update)
+        for queue in self._queues:
+            if not queue.full():
+                queue.put_nowait(update)
+        return update
+
+    def next_request(self, now):
+        """The entity whose GET has to be sent now like TEntityManager::getNextRequestToSend(), None if none."""
+        if self._last_frame is not None and now < self._last_frame + self.delay_between_requests:
+            return None
+        if any(entity.is_get_in_progress(now) for entity in self._polled):
+            return None
+
+        next_entity = None
+        for entity in self._polled:
+            if entity.is_get_needed(now) and (next_entity is None or entity.overdue_time(now) > next_entity.overdue_time(now)):
+                next_entity = entity
+        return next_entity
+
+    def next_request_time(self, now):
+        """Earliest time at which next_request() can return an entity, as long as no frame is received before."""
+        earliest = now if self._last_frame is None else self._last_frame + self.delay_between_requests
+        for entity in self._polled:
+            if entity.is_get_in_progress(now):
+                earliest = max(earliest, entity.last_get + GET_TIMEOUT)
+        due = min((now - entity.overdue_time(now) for entity in self._polled), default=None)
+        return None if due is None else max(earliest, due)
+
+    def send_get(self, entity, now):
+        self.bus.send(can.Message(arbitration_id=REQUEST_CAN_ID, data=entity.command, is_extended_id=False))
+        entity.last_get = now
+        _LOGGER.debug("sendGet %s command<%s>", entity.name, entity.command.hex(" ").upper())
+
+    async def run(self):
+        """Receives and polls until cancelled."""
+        loop = asyncio.get_running_loop()
+        reader = can.AsyncBufferedReader()
+        notifier = can.Notifier(self.bus, [reader], loop=loop)
+        self._wakeup = asyncio.Event()
+        try:
+            await asyncio.gather(self._receive(reader), self._poll())
+        finally:
+            notifier.stop()
+
+    async def _receive(self, reader):
+        while True:
+            message = await reader.get_message()
+            if message.arbitration_id != REQUEST_CAN_ID and not message.is_error_frame:
+                self.handle(message.arbitration_id, message.data)
+                self._wakeup.set()
+
+    async def _poll(self):
+        while True:
+            now = self._clock()
+            entity = self.next_request(now)
+            if entity is not None:
+                self.send_get(entity, now)
+                continue
+
+            self._wakeup.clear()
+            next_time = self.next_request_time(now)
+            timeout = None if next_time is None else max(next_time - now, 0.001)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interface", default="socketcan", help="python-can interface")
+    parser.add_argument("--channel", default="can0", help="python-can channel")
+    parser.add_argument("--language", choices=sorted(SUPPORTED_LANGUAGES), default="de", help="Language of the select and text sensor labels")
+    parser.add_argument("--entities", help="Comma separated entity names, all entities of sensor_configuration by default")
+    parser.add_argument("--update-interval", type=float, default=DEFAULT_UPDATE_INTERVAL, help="Update interval in seconds")
+    parser.add_argument("--delay-between-requests", type=float, default=DEFAULT_DELAY_BETWEEN_REQUESTS, help="Delay after the last frame in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    set_language(args.language)
+    names = args.entities.split(",") if args.entities else None
+    sens_confs = [sens_conf for sens_conf in sensor_configuration if names is None or sens_conf.get("name") in names]
+
+    async def poll():
+        with can.Bus(interface=args.interface, channel=args.channel) as bus:
+            poller = HpsuPoller(bus, sens_confs, default_update_interval=args.update_interval,
+                                delay_between_requests=args.delay_between_requests)
+            poller.add_callback(lambda update: print(f"{update.timestamp:.3f} {update.name} {update.label or update.value}", flush=True))
+            await poller.run()
+
+    try:
+        asyncio.run(poll())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+    Offline decoder for recorded CAN traffic of the Rotex / Daikin HPSU.
+
+    sensor_configuration is compiled into a lookup index which reproduces TEntity::isMatch() and
+    TEntity::handle(): a frame is consumed by the first entity (in sensor_configuration order) whose
+    expected response matches, frames on 0x10A are accepted by every entity as long as they are
+    responses or sets of the RoCon control panel. candump logs and ESPHome logs containing the
+    "handle" / "unhandled" lines of the component are decoded in chunks with NumPy, several files
+    are decoded in parallel and written as per entity columns to NPZ or Parquet files.
+
+    Usage (from the components directory, requires esphome, numpy and for Parquet pyarrow):
+        python3 -m daikin_rotex_can.can_log_decoder [--output DIR] [--format npz|parquet] [--jobs N] LOG [LOG ...]
+"""
+
+import argparse
+import binascii
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import codec, get_entity_mapping, sensor_configuration
+from .descriptors import DEFAULT_CAN_ID, DEFAULT_DATA_OFFSET, DEFAULT_DATA_SIZE, parse_command
+from .translations.translate import SUPPORTED_LANGUAGES, set_language
+
+_LOGGER = logging.getLogger(__name__)
+
+ROCON_CAN_ID = 0x10A
+FRAME_SIZE = 7
+NO_ENTITY = -1
+NO_LABEL = -1
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+FORMAT_DETECTION_SIZE = 1024 * 1024
+
+# Every pattern yields (timestamp, can_id, data) per frame. Frames with more than 7 bytes are cut to 7
+# bytes like in DaikinRotexCanComponent::handle(), shorter frames are ignored.
+LOG_FORMATS = {
+    # (1700000000.123456) can0 180#3100FA0A0C0123 (candump -l / -L)
+    "candump_compact": (
+        re.compile(rb"^[ \t]*(?:\((\d+\.\d+)\)[ \t]+)?\S+[ \t]+([0-9A-Fa-f]{1,8})#([0-9A-Fa-f]{14})", re.M),
+        1.0
+    ),
+    # (1700000000.123456)  can0  180   [7]  31 00 FA 0A 0C 01 23 (candump, candump -t a|d|z)
+    "candump": (
+        re.compile(rb"^[ \t]*(?:\((\d+\.\d+)\)[ \t]+)?\S+[ \t]+([0-9A-Fa-f]{1,8})[ \t]+\[\d\][ \t]+((?:[0-9A-Fa-f]{2}[ \t]+){6}[0-9A-Fa-f]{2})", re.M),
+        1.0
+    ),
+    # [I][handle :136]: millis: 12345|tv<30.5> can_id<0x180> data<D2 00 FA 00 0F 01 31> changed<1>
+    "esphome": (
+        re.compile(rb"millis: (\d+)\|[^\n]*?can_id<0x([0-9A-Fa-f]{1,8})> data<((?:[0-9A-Fa-f]{2} ){6}[0-9A-Fa-f]{2})>"),
+        0.001
+    ),
+}
+
+########## Index ##########
+
+def match_key(command) -> int:
+    """The bytes compared by isMatch(), see TEntity::calculate_reponse(): bytes 2-4 for 0xFA commands, otherwise byte 2."""
+    if command[2] == 0xFA:
+        return (command[2] << 16) | (command[3] << 8) | command[4]
+    return command[2]
+
+def compile_entity(sens_conf):
+    mapping = get_entity_mapping(sens_conf, {})
+    command = parse_command(sens_conf.get("command", ""))
+    return {
+        "name": sens_conf.get("name"),
+        "type": sens_conf.get("type"),
+        "can_id": sens_conf.get("can_id", DEFAULT_CAN_ID),
+        "match_key": match_key(command),
+        "polled": any(command),
+        "data_offset": sens_conf.get("data_offset", DEFAULT_DATA_OFFSET),
+        "data_size": sens_conf.get("data_size", DEFAULT_DATA_SIZE),
+        "divider": sens_conf.get("divider", 1.0),
+        "signed": sens_conf.get("signed", False),
+        "codec": codec.parse_codec(sens_conf.get("codec")),
+        "range": sens_conf.get("range", [0, 0]),
+        "keys": sorted(mapping),
+        "labels": [mapping[key] for key in sorted(mapping)],
+    }
+
+class DecoderIndex:
+    """
+    Lookup table from (match key, can id) to the entity which handles a frame.
+    The last column holds the owners of RoCon panel frames (0x10A), which are accepted regardless of the can id.
+    """
+
+    def __init__(self, entities):
+        if not entities:
+            raise ValueError("No entities to decode")
+
+        self.entities = entities
+        keys = sorted({entity["match_key"] for entity in entities})
+        can_ids = sorted({entity["can_id"] for entity in entities})
+        key_index = {key: index for index, key in enumerate(keys)}
+        can_index = {can_id: index for index, can_id in enumerate(can_ids)}
+
+        self.keys = np.array(keys, dtype=np.uint32)
+        self.can_ids = np.array(can_ids, dtype=np.uint32)
+        self.owners = np.full((len(keys), len(can_ids) + 1), NO_ENTITY, dtype=np.int32)
+
+        # Reverse order, so the first entity of TEntityManager::handle() wins. Like TFrameIndex, entities
+        # without command handle no frames
+        for index in reversed(range(len(entities))):
+            entity = entities[index]
+            if not entity["polled"]:
+                continue
+            row = key_index[entity["match_key"]]
+            self.owners[row, can_index[entity["can_id"]]] = index
+            self.owners[row, -1] = index
+
+    def match(self, can_ids, data):
+        """Returns the index of the entity which handles each frame, NO_ENTITY for unhandled frames."""
+        byte2 = data[:, 2].astype(np.uint32)
+        keys = np.where(
+            byte2 == 0xFA,
+            (byte2 << 16) | (data[:, 3].astype(np.uint32) << 8) | data[:, 4],
+            byte2
+        )
+        key_index = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        key_found = self.keys[key_index] == keys
+
+        can_index = np.minimum(np.searchsorted(self.can_ids, can_ids), len(self.can_ids) - 1)
+        can_found = self.can_ids[can_index] == can_ids
+
+        mode = data[:, 0] & 0x0F
+        rocon = (can_ids == ROCON_CAN_ID) & ((mode == 0x02) | (mode == 0x00))
+        column = np.where(rocon, len(self.can_ids), can_index)
+
+        return np.where(key_found & (rocon | can_found), self.owners[key_index, column], NO_ENTITY)
+
+def build_index(sens_confs, names=None):
+    """Compiles the given sensor_configuration entries, optionally restricted to the given entity names."""
+    return DecoderIndex([
+        compile_entity(sens_conf) for sens_conf in sens_confs
+        if names is None or sens_conf.get("name") in names
+    ])
+
+########## Decoding ##########
+
+def _find_label(keys, values):
+    """Index of the exact key like TValueMap::findByKey(), NO_LABEL if not found."""
+    position = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where(keys[position] == values, position, NO_LABEL)
+
+def _find_next_label(keys, values):
+    """Index of the closest key like TValueMap::findNextByKey(), on equal distance the lower key wins."""
+    position = np.searchsorted(keys, values)
+    upper = np.minimum(position, len(keys) - 1)
+    lower = np.maximum(position - 1, 0)
+    closest = np.where(values - keys[lower] <= keys[upper] - values, lower, upper)
+    return np.where(
+        position == len(keys),
+        len(keys) - 1,
+        np.where((position == 0) | (keys[upper] == values), upper, closest)
+    )
+
+def decode_values(entity, data):
+    """
+    Converts the frames of one entity like TEntity::handle() and the handleValue() of the entity class.
+    Returns the values, the label index per value (None for entities without map) and the mask of valid values,
+    or None if handle() would reject every frame.
+    """
+    offset = entity["data_offset"]
+    size = entity["data_size"]
+    if not (offset > 0 and offset + size <= FRAME_SIZE and 1 <= size <= 2):
+        return None
+
+    if size == 2:
+        raw = (data[:, offset].astype(np.uint16) << 8) + data[:, offset + 1]
+    else:
+        raw = data[:, offset].astype(np.uint16)
+    raw = np.asarray(codec.decode(entity["codec"], raw, size)).astype(np.uint16)
+
+    valid = np.ones(len(raw), dtype=bool)
+    labels = None
+
+    match entity["type"]:
+        case "sensor" | "number":
+            values = (raw.view(np.int16) if entity["signed"] else raw).astype(np.float32) / np.float32(entity["divider"])
+            range_min, range_max = entity["range"]
+            if entity["type"] == "sensor" and range_min != 0 and range_max != 0:
+                valid = (values >= range_min) & (values <= range_max)
+        case "binary_sensor" | "switch":
+            values = raw > 0
+        case "select" | "text_sensor":
+            values = raw
+            keys = np.array(entity["keys"], dtype=np.int32)
+            if len(keys) == 0:
+                labels = np.full(len(raw), NO_LABEL, dtype=np.int16)
+            elif entity["type"] == "select":
+                labels = _find_next_label(keys, raw.astype(np.int32)).astype(np.int16)
+            else:
+                labels = _find_label(keys, raw.astype(np.int32)).astype(np.int16)
+        case _:
+            raise ValueError(f"Unknown type: {entity['type']}")
+
+    return values, labels, valid
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields the file in chunks of complete lines."""
+    with open(path, "rb") as f:
+        rest = b""
+        while block := f.read(chunk_size):
+            block = rest + block
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            if end > 0:
+                yield block[:end]
+        if rest:
+            yield rest
+
+def detect_log_format(chunk):
+    sample = chunk[:FORMAT_DETECTION_SIZE]
+    counts = {name: len(pattern.findall(sample)) for name, (pattern, _) in LOG_FORMATS.items()}
+    log_format = max(counts, key=counts.get)
+    return log_format if counts[log_format] > 0 else None
+
+def parse_frames(chunk, log_format):
+    """Returns the timestamps in seconds (NaN if the log has none), can ids and (n, 7) frame bytes of a chunk."""
+    pattern, timestamp_scale = LOG_FORMATS[log_format]
+    matches = pattern.findall(chunk)
+    if not matches:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.uint32), np.empty((0, FRAME_SIZE), dtype=np.uint8)
+
+    timestamps, can_ids, data = zip(*matches)
+
+    timestamps = np.array(timestamps, dtype="S32")
+    timestamps[timestamps == b""] = b"nan"
+    timestamps = timestamps.astype(np.float64) * timestamp_scale
+
+    can_ids = np.frombuffer(binascii.unhexlify(b"".join(can_id.rjust(8, b"0") for can_id in can_ids)), dtype=">u4").astype(np.uint32)
+    data = np.frombuffer(binascii.unhexlify(b"".join(data).translate(None, b" \t")), dtype=np.uint8).reshape(-1, FRAME_SIZE)
+    return timestamps, can_ids, data
+
+def decode_file(path, index, log_format=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Decodes one log file. Returns {entity name: {column: array}} and the statistics of the file.
+    Columns are "timestamp", "value" and for selects and text sensors "label" (index into "labels", -1 if unknown).
+    """
+    columns = {}
+    stats = {"file": path, "format": log_format, "frames": 0, "handled": 0, "unhandled": 0, "invalid": 0}
+
+    for chunk in read_chunks(path, chunk_size):
+        if log_format is None:
+            log_format = stats["format"] = detect_log_format(chunk)
+            if log_format is None:
+                continue
+
+        timestamps, can_ids, data = parse_frames(chunk, log_format)
+        owners = index.match(can_ids, data)
+
+        order = np.argsort(owners, kind="stable")
+        sorted_owners = owners[order]
+        entity_indices = np.unique(sorted_owners)
+
+        stats["frames"] += len(owners)
+        stats["unhandled"] += int(np.count_nonzero(owners == NO_ENTITY))
+
+        for entity_index in entity_indices[entity_indices != NO_ENTITY]:
+            rows = order[np.searchsorted(sorted_owners, entity_index, "left"):np.searchsorted(sorted_owners, entity_index, "right")]
+            entity = index.entities[entity_index]
+            stats["handled"] += len(rows)
+
+            decoded = decode_values(entity, data[rows])
+            if decoded is None:
+                stats["invalid"] += len(rows)
+                continue
+
+            values, labels, valid = decoded
+            stats["invalid"] += int(np.count_nonzero(~valid))
+
+            entity_columns = columns.setdefault(entity["name"], {"timestamp": [], "value": [], "label": []})
+            entity_columns["timestamp"].append(timestamps[rows][valid])
+            entity_columns["value"].append(values[valid])
+            if labels is not None:
+                entity_columns["label"].append(labels[valid])
+
+    result = {}
+    for entity in index.entities:
+        if entity["name"] in columns:
+            entity_columns = {name: np.concatenate(arrays) for name, arrays in columns[entity["name"]].items() if arrays}
+            if entity_columns.get("label") is not None:
+                entity_columns["labels"] = np.array(entity["labels"], dtype=str)
+            result[entity["name"]] = entity_columns
+
+    stats["entities"] = len(result)
+    return result, stats
+
+########## Output ##########
+
+def write_npz(output_path, decoded):
+    np.savez_compressed(output_path, **{
+        f"{name}/{column}": array
+        for name, entity_columns in decoded.items()
+        for column, array in entity_columns.items()
+    })
+
+def write_parquet(output_dir, decoded):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from exc
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, entity_columns in decoded.items():
+        table = {
+            "timestamp": pa.array(entity_columns["timestamp"]),
+            "value": pa.array(entity_columns["value"]),
+        }
+        if "label" in entity_columns:
+            codes = entity_columns["label"]
+            table["label"] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes == NO_LABEL),
+                pa.array(entity_columns["labels"].tolist(), type=pa.string())
+            )
+        pq.write_table(pa.table(table), os.path.join(output_dir, f"{name}.parquet"))
+
+def output_path(path, output_dir, output_format):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}.npz" if output_format == "npz" else stem)
+
+def decode_and_write(path, index, output_dir, output_format="npz", log_format=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    decoded, stats = decode_file(path, index, log_format, chunk_size)
+    stats["output"] = output_path(path, output_dir, output_format)
+    if output_format == "parquet":
+        write_parquet(stats["output"], decoded)
+    else:
+        write_npz(stats["output"], decoded)
+    return stats
+
+_worker_index = None
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+def _decode_and_write_in_worker(path, output_dir, output_format, log_format, chunk_size):
+    return decode_and_write(path, _worker_index, output_dir, output_format, log_format, chunk_size)
+
+def decode_files(paths, index, output_dir, output_format="npz", log_format=None, chunk_size=DEFAULT_CHUNK_SIZE, jobs=None):
+    """Decodes the given files in a process pool, the index is sent once per worker. Yields the statistics per file."""
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+
+    if jobs <= 1:
+        for path in paths:
+            yield decode_and_write(path, index, output_dir, output_format, log_format, chunk_size)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(index,)) as executor:
+        count = len(paths)
+        yield from executor.map(
+            _decode_and_write_in_worker, paths,
+            [output_dir] * count, [output_format] * count, [log_format] * count, [chunk_size] * count
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="candump or ESPHome log files")
+    parser.add_argument("--output", default=".", help="Output directory")
+    parser.add_argument("--format", choices=["npz", "parquet"], default="npz", help="Output format")
+    parser.add_argument("--log-format", choices=sorted(LOG_FORMATS), help="Log format, detected per file by default")
+    parser.add_argument("--language", choices=sorted(SUPPORTED_LANGUAGES), default="de", help="Language of the select and text sensor labels")
+    parser.add_argument("--entities", help="Comma separated entity names, all entities of sensor_configuration by default")
+    parser.add_argument("--jobs", type=int, help="Parallel processes, one file per process")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024), help="Chunk size in MiB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    set_language(args.language)
+    index = build_index(sensor_configuration, args.entities.split(",") if args.entities else None)
+
+    for stats in decode_files(args.logs, index, args.output, args.format, args.log_format, args.chunk_size * 1024 * 1024, args.jobs):
+        print(json.dumps(stats))
+
+if __name__ == "__main__":
+    main()
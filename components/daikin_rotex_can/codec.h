@@ -0,0 +1,86 @@
+#pragma once
+
+#include "esphome/components/daikin_rotex_can/types.h"
+#include "esphome/components/daikin_rotex_can/utils.h"
+#include <cstdint>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Conversion between the data bytes of a frame and the value of an entity. Generated from the "codec"
+// entries of sensor_configuration (codec.py), the same ops are used by the offline log decoder.
+struct TCodec {
+    enum Op : uint8_t {
+        NONE,       // raw value
+        SCALE,      // raw / factor
+        MASK,       // (raw & mask) >> shift
+        BIT_COUNT,  // popcount(raw & mask) * factor, encode() sets the upper bits of mask and always value
+        EQUALS,     // raw == value
+        INT16       // raw sign extended from data_size bytes to 16 bit
+    };
+
+    Op op;
+    uint16_t mask;
+    uint16_t factor;
+    uint8_t shift;
+    uint16_t value;
+
+    uint16_t decode(TMessage const& data, uint8_t offset, uint8_t size) const;
+    void encode(TMessage& data, uint16_t new_value, uint8_t offset, uint8_t size) const;
+
+    static uint16_t read(TMessage const& data, uint8_t offset, uint8_t size);
+};
+
+inline uint16_t TCodec::read(TMessage const& data, uint8_t offset, uint8_t size) {
+    return size == 2 ? ((data[offset] << 8) + data[offset + 1]) : data[offset];
+}
+
+inline uint16_t TCodec::decode(TMessage const& data, uint8_t offset, uint8_t size) const {
+    const uint16_t raw = read(data, offset, size);
+    switch (op) {
+    case SCALE:
+        return raw / factor;
+    case MASK:
+        return (raw & mask) >> shift;
+    case BIT_COUNT:
+        return __builtin_popcount(raw & mask) * factor;
+    case EQUALS:
+        return raw == value;
+    case INT16:
+        return size == 1 ? static_cast<uint16_t>(static_cast<int8_t>(raw)) : raw;
+    default:
+        return raw;
+    }
+}
+
+inline void TCodec::encode(TMessage& data, uint16_t new_value, uint8_t offset, uint8_t size) const {
+    uint16_t raw = new_value;
+    switch (op) {
+    case SCALE:
+        raw = new_value * factor;
+        break;
+    case MASK:
+        raw = (read(data, offset, size) & ~mask) | ((new_value << shift) & mask);
+        break;
+    case BIT_COUNT: {
+        raw = value;
+        uint16_t count = new_value / factor;
+        for (uint16_t bit = 0x8000; bit != 0 && count > 0; bit >>= 1) {
+            if (mask & bit) {
+                raw |= bit;
+                --count;
+            }
+        }
+        break;
+    }
+    case EQUALS:
+        raw = new_value ? value : 0;
+        break;
+    default:
+        break;
+    }
+    Utils::setBytes(data, raw, offset, size);
+}
+
+}
+}
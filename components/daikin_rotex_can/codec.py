@@ -0,0 +1,113 @@
+"""
+    Declarative decode/encode specs ("codec") of sensor_configuration entries, which convert between the
+    data bytes of a frame and the value of an entity:
+
+        {"op": "scale", "factor": 0x64}                                 raw / factor
+        {"op": "mask", "mask": 0xF0, "shift": 4}                        (raw & mask) >> shift
+        {"op": "bit_count", "mask": 0x0E, "weight": 3, "set_bits": 0x01} popcount(raw & mask) * weight
+        {"op": "equals", "value": 0x05}                                 raw == value
+        {"op": "int16"}                                                 raw sign extended to 16 bit
+
+    raw is the big endian value of the data_size bytes at data_offset. The specs are compiled to TCodec
+    rows of the descriptor table (codec.h) and evaluated by decode()/encode() in the offline tools.
+    decode() only uses operators, so it works on ints as well as on NumPy arrays.
+"""
+
+CODEC_OPS = {
+    "none": ("TCodec::NONE", {}),
+    "scale": ("TCodec::SCALE", {"factor": "factor"}),
+    "mask": ("TCodec::MASK", {"mask": "mask", "shift": "shift"}),
+    "bit_count": ("TCodec::BIT_COUNT", {"mask": "mask", "weight": "factor", "set_bits": "value"}),
+    "equals": ("TCodec::EQUALS", {"value": "value"}),
+    "int16": ("TCodec::INT16", {}),
+}
+
+REQUIRED_ARGUMENTS = {
+    "scale": ["factor"],
+    "mask": ["mask"],
+    "bit_count": ["mask"],
+    "equals": ["value"],
+}
+
+NO_CODEC = {"op": "none", "mask": 0, "factor": 1, "shift": 0, "value": 0}
+
+class InvalidCodecError(ValueError):
+    """Exception raised when a codec spec uses an unknown op or invalid arguments."""
+
+def parse_codec(spec) -> dict:
+    """Validates a codec spec and returns it as TCodec fields {op, mask, factor, shift, value}."""
+    if spec is None:
+        return dict(NO_CODEC)
+
+    op = spec.get("op")
+    if op not in CODEC_OPS:
+        raise InvalidCodecError(f"Unknown codec op '{op}', expected one of {', '.join(CODEC_OPS)}")
+
+    _, arguments = CODEC_OPS[op]
+    unknown = set(spec) - set(arguments) - {"op"}
+    if unknown:
+        raise InvalidCodecError(f"Codec op '{op}' does not support {', '.join(sorted(unknown))}")
+
+    missing = [name for name in REQUIRED_ARGUMENTS.get(op, []) if name not in spec]
+    if missing:
+        raise InvalidCodecError(f"Codec op '{op}' requires {', '.join(missing)}")
+
+    codec = dict(NO_CODEC, op=op)
+    for name, field in arguments.items():
+        if name in spec:
+            codec[field] = spec[name]
+
+    if not 0 <= codec["mask"] <= 0xFFFF or not 0 <= codec["value"] <= 0xFFFF:
+        raise InvalidCodecError(f"Codec '{spec}': mask and value must be 16 bit")
+    if not 1 <= codec["factor"] <= 0xFFFF:
+        raise InvalidCodecError(f"Codec '{spec}': factor/weight must be between 1 and 0xFFFF")
+    if not 0 <= codec["shift"] <= 15:
+        raise InvalidCodecError(f"Codec '{spec}': shift must be between 0 and 15")
+    if op in ["mask", "bit_count"] and codec["mask"] == 0:
+        raise InvalidCodecError(f"Codec '{spec}': mask must not be 0")
+
+    return codec
+
+def generate_cpp_codec(codec) -> str:
+    op_cpp, _ = CODEC_OPS[codec["op"]]
+    return f'{{{op_cpp}, 0x{codec["mask"]:04X}, {codec["factor"]}, {codec["shift"]}, 0x{codec["value"]:04X}}}'
+
+def _popcount16(raw):
+    count = 0
+    for bit in range(16):
+        count = count + ((raw >> bit) & 1)
+    return count
+
+def decode(codec, raw, size):
+    """Value of the raw data bytes like TCodec::decode()."""
+    match codec["op"]:
+        case "scale":
+            return raw // codec["factor"]
+        case "mask":
+            return (raw & codec["mask"]) >> codec["shift"]
+        case "bit_count":
+            return _popcount16(raw & codec["mask"]) * codec["factor"]
+        case "equals":
+            return (raw == codec["value"]) * 1
+        case "int16":
+            return (((raw ^ 0x80) - 0x80) & 0xFFFF) if size == 1 else raw
+    return raw
+
+def encode(codec, raw, value):
+    """New raw data bytes for value like TCodec::encode(), raw is the current content of the data bytes."""
+    match codec["op"]:
+        case "scale":
+            return (value * codec["factor"]) & 0xFFFF
+        case "mask":
+            return (raw & ~codec["mask"] & 0xFFFF) | ((value << codec["shift"]) & codec["mask"])
+        case "bit_count":
+            result = codec["value"]
+            count = value // codec["factor"]
+            for bit in reversed(range(16)):
+                if count > 0 and codec["mask"] & (1 << bit):
+                    result |= 1 << bit
+                    count -= 1
+            return result
+        case "equals":
+            return codec["value"] if value else 0
+    return value
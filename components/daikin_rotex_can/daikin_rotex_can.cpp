@@ -1,5 +1,5 @@
 #include "esphome/components/daikin_rotex_can/daikin_rotex_can.h"
-#include "esphome/components/daikin_rotex_can/translations.h"
+#include "daikin_rotex_can/translations.h"     // Generated into the build directory by to_code()
 #include "esphome/components/daikin_rotex_can/sensors.h"
 #include "esphome/components/daikin_rotex_can/entity.h"
 #include <iostream>
@@ -8,7 +8,7 @@
 #include <string>
 #include <vector>
 #include <limits>
-#include <regex>
+#include <cstring>
 
 namespace esphome {
 namespace daikin_rotex_can {
@@ -24,30 +24,11 @@ static const std::string FLOW_RATE = "flow_rate";
 static const std::string STATE_COMPRESSOR = "status_kompressor";
 static const std::string SUPPLY_SETPOINT_REGULATED = "supply_setpoint_regulated";
 static const std::string MAX_TARGET_FLOW_TEMP = "max_target_flow_temp";
-
-inline bool operator==(const Translation& lhs, const std::string& rhs) {
-    return static_cast<std::string>(lhs) == rhs;
-}
-
-inline bool operator==(const std::string& lhs, const Translation& rhs) {
-    return lhs == static_cast<std::string>(rhs);
-}
-
-inline bool operator!=(const Translation& lhs, const std::string& rhs) {
-    return static_cast<std::string>(lhs) != rhs;
-}
-
-inline bool operator!=(const std::string& lhs, const Translation& rhs) {
-    return lhs != static_cast<std::string>(rhs);
-}
-
-inline std::string operator+(const Translation& lhs, const std::string& rhs) {
-    return static_cast<std::string>(lhs) + rhs;
-}
-
-inline std::string operator+(const std::string& lhs, const Translation& rhs) {
-    return lhs + static_cast<std::string>(rhs);
-}
+static const std::string TEMPERATURE_OUTSIDE = "temperature_outside";
+static const std::string FLOW_TEMPERATURE_DAY = "flow_temperature_day";
+static const std::string FLOW_TEMPERATURE_NIGHT = "flow_temperature_night";
+static const uint32_t UNHANDLED_FRAMES_PUBLISH_INTERVAL = 60 * 1000;   // milliseconds
+static const std::size_t MAX_TEXT_SENSOR_LENGTH = 255;                // State length of Home Assistant
 
 DaikinRotexCanComponent::ErrorDetection::ErrorDetection(uint32_t detection_time_ms, bool stop_detection_in_good_case)
 : m_error_timestamp(0u)
@@ -78,12 +59,62 @@ void DaikinRotexCanComponent::ErrorDetection::reset_good_case() {
     m_good_case_detected = false;
 }
 
+DaikinRotexCanComponent::Entities::Entities()
+: tv("tv")
+, tvbh("tvbh")
+, tr("tr")
+, target_supply_temperature("target_supply_temperature")
+, flow_rate(FLOW_RATE.c_str())
+, dhw_mixer_position("dhw_mixer_position")
+, bypass_valve("bypass_valve")
+, temperature_outside(TEMPERATURE_OUTSIDE.c_str())
+, tdhw1("tdhw1")
+, error_code("error_code")
+, mode_of_operating(BETRIEBS_ART.c_str())
+, status_compressor(STATE_COMPRESSOR.c_str())
+, operating_mode(BETRIEBS_MODUS.c_str())
+, optimized_defrosting(OPTIMIZED_DEFROSTING.c_str())
+, temperature_antifreeze(TEMPERATURE_ANTIFREEZE.c_str())
+, max_target_flow_temp(MAX_TARGET_FLOW_TEMP.c_str())
+, flow_temperature_day(FLOW_TEMPERATURE_DAY.c_str())
+, flow_temperature_night(FLOW_TEMPERATURE_NIGHT.c_str())
+, target_hot_water_temperature_1(TARGET_HOT_WATER_TEMP_1.c_str())
+{
+}
+
+void DaikinRotexCanComponent::Entities::resolve(TEntityManager& manager) {
+    tv.resolve(manager);
+    tvbh.resolve(manager);
+    tr.resolve(manager);
+    target_supply_temperature.resolve(manager);
+    flow_rate.resolve(manager);
+    dhw_mixer_position.resolve(manager);
+    bypass_valve.resolve(manager);
+    temperature_outside.resolve(manager);
+    tdhw1.resolve(manager);
+    error_code.resolve(manager);
+    mode_of_operating.resolve(manager);
+    status_compressor.resolve(manager);
+    operating_mode.resolve(manager);
+    optimized_defrosting.resolve(manager);
+    temperature_antifreeze.resolve(manager);
+    max_target_flow_temp.resolve(manager);
+    flow_temperature_day.resolve(manager);
+    flow_temperature_night.resolve(manager);
+    target_hot_water_temperature_1.resolve(manager);
+}
+
 DaikinRotexCanComponent::DaikinRotexCanComponent()
 : m_entity_manager()
+, m_entities()
+, m_derived_sensors()
 , m_optimized_defrosting(false)
 , m_betriebsmodus_before_dhw_and_defrosting(Translation::T_STANDBY)
 , m_project_git_hash_sensor(nullptr)
 , m_project_git_hash()
+, m_unhandled_frames_sensor(nullptr)
+, m_unhandled_frames_published(0u)
+, m_unhandled_frames_publish_ts(0u)
 , m_thermal_power_sensor(new CanSensor("thermal_power")) // Create dummy sensors to avoid nullptr without HA api communicaction. Can be overwritten by the user.
 , m_thermal_power_raw_sensor(new CanSensor("thermal_power_raw"))
 , m_temperature_spread_sensor(new CanSensor("temperature_spread")) // Used to detect valve malfunctions, even if the sensor has not been defined by the user.
@@ -91,12 +122,19 @@ DaikinRotexCanComponent::DaikinRotexCanComponent()
 , m_tv_tvbh_delta_sensor(new CanSensor("tv_tvbh_delta"))
 , m_tvbh_tr_delta_sensor(new CanSensor("tvbh_tr_delta"))
 , m_vorlauf_soll_tv_delta(new CanSensor("vorlauf_soll_tv_delta"))
+, m_min_spread_offset(0.0f)
+, m_smoothing_pid(0.2, 0.05f, 0.05f, 0.2, 0.2, 0.1f)
 , m_mixer_error_detection(10 * 60, false)      // 10 minute
 , m_bpv_error_detection(10 * 60, false)      // 10 minutes
 , m_spread_error_detection(20 * 60, true)    // 20 minutes
 , m_dhw_error_detection(5 * 60, false)
 , m_supply_setpoint_regulated(nullptr)
 , m_last_supply_setpoint_regulated_ts(0u)
+, m_adaptive_heating_curve_sensor(nullptr)
+, m_adaptive_heating_curve_room_sensor(nullptr)
+, m_adaptive_heating_curve(24.0f, 35.0f, 2.9f, -15.0f, 21.0f, 0.0f)
+, m_adaptive_heating_curve_interval(60 * 60 * 1000)
+, m_adaptive_heating_curve_ts(0u)
 , m_dhw_set_back_temp_handle()
 {
     m_temperature_spread_sensor->set_smooth(true);
@@ -107,15 +145,15 @@ void DaikinRotexCanComponent::setup() {
 
     for (auto const& pEntity : m_entity_manager.get_entities()) {
         ESP_LOGI("setup", "name: %s, id: %s, can_id: %s, command: %s",
-            pEntity->getName().c_str(), pEntity->get_id().c_str(),
-            Utils::to_hex(pEntity->get_config().can_id).c_str(), Utils::to_hex(pEntity->get_config().command).c_str());
+            pEntity->getName().c_str(), pEntity->get_id(),
+            Utils::to_hex(pEntity->get_descriptor().can_id).c_str(), Utils::to_hex(pEntity->get_descriptor().command).c_str());
 
         pEntity->set_canbus(m_pCanbus);
-        if (CanTextSensor* pTextSensor = dynamic_cast<CanTextSensor*>(pEntity)) {
+        if (CanTextSensor* pTextSensor = entity_cast<CanTextSensor>(pEntity)) {
             pTextSensor->set_recalculate_state([this](EntityBase* pEntity, std::string const& state){
                 return recalculate_state(pEntity, state);
             });
-        } else if (CanSelect* pSelect = dynamic_cast<CanSelect*>(pEntity)) {
+        } else if (CanSelect* pSelect = entity_cast<CanSelect>(pEntity)) {
             pSelect->set_custom_select_lambda([this](std::string const& id, uint16_t key){
                 return on_custom_select(id, key);
             });
@@ -125,12 +163,22 @@ void DaikinRotexCanComponent::setup() {
         });
     }
 
+    // Smoothed by the PID of the config, also when the sensors were replaced by the user
+    m_thermal_power_sensor->set_pid(m_smoothing_pid);
+    m_temperature_spread_sensor->set_pid(m_smoothing_pid);
+
     m_entity_manager.removeInvalidRequests();
+    m_entity_manager.buildIndices();
+    m_entities.resolve(m_entity_manager);
+    m_derived_sensors.resize(g_entity_descriptors_size);
+    for (uint16_t index = 0; index < g_entity_descriptors_size; ++index) {
+        m_derived_sensors[index] = to_derived_sensor(g_entity_descriptors[index].id);
+    }
     const uint32_t size = m_entity_manager.size();
 
     ESP_LOGI(TAG, "entities.size: %d", size);
 
-    CanSelect* p_optimized_defrosting = m_entity_manager.get_select(OPTIMIZED_DEFROSTING);
+    CanSelect* p_optimized_defrosting = m_entities.optimized_defrosting.get();
     if (p_optimized_defrosting != nullptr) {
         m_optimized_defrosting.load(p_optimized_defrosting);
         p_optimized_defrosting->publish_select_key(m_optimized_defrosting.value());
@@ -140,32 +188,30 @@ void DaikinRotexCanComponent::setup() {
 }
 
 void DaikinRotexCanComponent::on_post_handle(TEntity* pEntity, TEntity::TVariant const& current, TEntity::TVariant const& previous) {
-    std::list<std::string> const& update_entities = pEntity->get_update_entities();
-    for (std::string const& update_entity : update_entities) {
-        if (!update_entity.empty()) {
-            Scheduler::getInstance().call_later([update_entity, this](){
-                updateState(update_entity);
-            });
-        }
+    TEntityDescriptor const& descriptor = pEntity->get_descriptor();
+    for (uint8_t index = 0; index < descriptor.update_entities_size; ++index) {
+        const uint16_t update_entity = descriptor.update_entities[index];
+        Scheduler::getInstance().call_later([update_entity, this](){
+            updateState(update_entity);
+        });
     }
 
-    const std::string id = pEntity->get_id();
-    if (id == TARGET_HOT_WATER_TEMP_1) {
+    if (pEntity == m_entities.target_hot_water_temperature_1.get()) {
         if (m_dhw_set_back_temp_handle.is_valid()) {
             ESP_LOGI(TAG, "dhw_run accelerate");
             m_dhw_set_back_temp_handle.accelerate();
         }
-    } else if (id == BETRIEBS_ART) {
+    } else if (pEntity == m_entities.mode_of_operating.get()) {
         Scheduler::getInstance().call_later([this, current, previous](){
             on_betriebsart(current, previous);
         });
-    } else if (id == BETRIEBS_MODUS) {
+    } else if (pEntity == m_entities.operating_mode.get()) {
         Scheduler::getInstance().call_later([this, current, previous](){
             on_betriebsmodus(current, previous);
         });
-    } else if (id == TEMPERATURE_ANTIFREEZE) {
-        CanSelect* p_optimized_defrosting = m_entity_manager.get_select(OPTIMIZED_DEFROSTING);
-        CanSelect* p_temperature_antifreeze = m_entity_manager.get_select(TEMPERATURE_ANTIFREEZE);
+    } else if (pEntity == m_entities.temperature_antifreeze.get()) {
+        CanSelect* p_optimized_defrosting = m_entities.optimized_defrosting.get();
+        CanSelect* p_temperature_antifreeze = m_entities.temperature_antifreeze.get();
         if (p_optimized_defrosting != nullptr && p_temperature_antifreeze != nullptr) {
             if (p_temperature_antifreeze->current_option().str() != Translation::T_OFF && m_optimized_defrosting.value() != 0x0) {
                 p_optimized_defrosting->publish_select_key(0x0);
@@ -173,76 +219,85 @@ void DaikinRotexCanComponent::on_post_handle(TEntity* pEntity, TEntity::TVariant
                 Utils::log(TAG, "set %s: %d", OPTIMIZED_DEFROSTING.c_str(), m_optimized_defrosting.value());
             }
         }
-    } else if (id == STATE_COMPRESSOR && current != previous) {
+    } else if (pEntity == m_entities.status_compressor.get() && current != previous) {
         m_spread_error_detection.reset_good_case();
     }
 }
 
-void DaikinRotexCanComponent::updateState(std::string const& id) {
-    TEntity* pEntity = m_entity_manager.get(id);
-    if (pEntity != nullptr) {
-        TEntity::TEntityArguments const& config = pEntity->get_config();
-        if (config.update_lambda_set) {
-            std::string value = config.update_lambda(*this);
+// The index is the row in g_entity_descriptors of an entity with update_lambda or of a derived sensor
+void DaikinRotexCanComponent::updateState(uint16_t descriptor_index) {
+    TEntity* pEntity = m_entity_manager.getByDescriptor(descriptor_index);
+    if (pEntity != nullptr && pEntity->has_update_lambda()) {
+        std::string value = pEntity->call_update_lambda(*this);
 
-            if (CanTextSensor* pTextSensor = dynamic_cast<CanTextSensor*>(pEntity)) {
-                pTextSensor->publish_state(value);
-            } else {
-                ESP_LOGE(TAG, "Unsupported entityy type: %s", id.c_str());
-            }
-            return;
+        if (CanTextSensor* pTextSensor = entity_cast<CanTextSensor>(pEntity)) {
+            pTextSensor->publish_state(value);
+        } else {
+            ESP_LOGE(TAG, "Unsupported entityy type: %s", pEntity->get_id());
         }
+        return;
     }
 
-    if (id == "thermal_power") {
+    const TDerivedSensor derived = descriptor_index < m_derived_sensors.size() ? m_derived_sensors[descriptor_index] : TDerivedSensor::NONE;
+    switch (derived) {
+    case TDerivedSensor::THERMAL_POWER:
         update_thermal_power();
-    } else if (id == "temperature_spread") {
+        break;
+    case TDerivedSensor::TEMPERATURE_SPREAD:
         update_temperature_spread();
-    } else if (id == "tv_tvbh_delta") {
-        CanSensor const* tv = m_entity_manager.get_sensor("tv");
-        CanSensor const* tvbh = m_entity_manager.get_sensor("tvbh");
-
-        if (tv == nullptr || tvbh == nullptr) {
-            return;
+        break;
+    case TDerivedSensor::TV_TVBH_DELTA: {
+        CanSensor const* tv = m_entities.tv.get();
+        CanSensor const* tvbh = m_entities.tvbh.get();
+        if (tv != nullptr && tvbh != nullptr) {
+            m_tv_tvbh_delta_sensor->publish_state(tv->state - tvbh->state);
         }
-
-        m_tv_tvbh_delta_sensor->publish_state(tv->state - tvbh->state);
-    } else if (id == "tvbh_tr_delta") {
-        CanSensor const* tvbh = m_entity_manager.get_sensor("tvbh");
-        CanSensor const* tr = m_entity_manager.get_sensor("tr");
-
-        if (tvbh == nullptr || tr == nullptr) {
-            return;
+        break;
+    }
+    case TDerivedSensor::TVBH_TR_DELTA: {
+        CanSensor const* tvbh = m_entities.tvbh.get();
+        CanSensor const* tr = m_entities.tr.get();
+        if (tvbh != nullptr && tr != nullptr) {
+            m_tvbh_tr_delta_sensor->publish_state(tvbh->state - tr->state);
         }
-
-        m_tvbh_tr_delta_sensor->publish_state(tvbh->state - tr->state);
-    } else if (id == "vorlauf_soll_tv_delta") {
-        CanSensor const* vorlauf_soll = m_entity_manager.get_sensor("target_supply_temperature");
-        CanSensor const* tv = m_entity_manager.get_sensor("tv");
-
-        if (vorlauf_soll == nullptr || tv == nullptr) {
-            return;
+        break;
+    }
+    case TDerivedSensor::VORLAUF_SOLL_TV_DELTA: {
+        CanSensor const* vorlauf_soll = m_entities.target_supply_temperature.get();
+        CanSensor const* tv = m_entities.tv.get();
+        if (vorlauf_soll != nullptr && tv != nullptr) {
+            m_vorlauf_soll_tv_delta->publish_state(vorlauf_soll->state - tv->state);
         }
+        break;
+    }
+    case TDerivedSensor::NONE:
+        break;
+    }
+}
 
-        m_vorlauf_soll_tv_delta->publish_state(vorlauf_soll->state - tv->state);
+// Only called by setup(), the rows are dispatched by their index afterwards
+DaikinRotexCanComponent::TDerivedSensor DaikinRotexCanComponent::to_derived_sensor(const char* id) {
+    if (std::strcmp(id, "thermal_power") == 0) {
+        return TDerivedSensor::THERMAL_POWER;
+    } else if (std::strcmp(id, "temperature_spread") == 0) {
+        return TDerivedSensor::TEMPERATURE_SPREAD;
+    } else if (std::strcmp(id, "tv_tvbh_delta") == 0) {
+        return TDerivedSensor::TV_TVBH_DELTA;
+    } else if (std::strcmp(id, "tvbh_tr_delta") == 0) {
+        return TDerivedSensor::TVBH_TR_DELTA;
+    } else if (std::strcmp(id, "vorlauf_soll_tv_delta") == 0) {
+        return TDerivedSensor::VORLAUF_SOLL_TV_DELTA;
     }
+    return TDerivedSensor::NONE;
 }
 
+// to_code() only triggers the derived sensors if all their sources are configured
 void DaikinRotexCanComponent::update_thermal_power() {
-    CanSensor const* flow_rate = m_entity_manager.get_sensor(FLOW_RATE);
-    CanSensor const* tv = m_entity_manager.get_sensor("tv");
-    CanSensor const* tr = m_entity_manager.get_sensor("tr");
+    CanSensor const* flow_rate = m_entities.flow_rate.get();
+    CanSensor const* tv = m_entities.tv.get();
+    CanSensor const* tr = m_entities.tr.get();
 
-    if (flow_rate == nullptr) {
-        ESP_LOGE(TAG, "flow_rate is not configured!");
-        return;
-    }
-    if (tv == nullptr) {
-        ESP_LOGE(TAG, "tv is not configured!");
-        return;
-    }
-    if (tr == nullptr) {
-        ESP_LOGE(TAG, "tr is not configured!");
+    if (flow_rate == nullptr || tv == nullptr || tr == nullptr) {
         return;
     }
 
@@ -255,8 +310,8 @@ void DaikinRotexCanComponent::update_thermal_power() {
 }
 
 void DaikinRotexCanComponent::update_temperature_spread() {
-    CanSensor const* tv = m_entity_manager.get_sensor("tv");
-    CanSensor const* tr = m_entity_manager.get_sensor("tr");
+    CanSensor const* tv = m_entities.tv.get();
+    CanSensor const* tr = m_entities.tr.get();
 
     if (tv != nullptr && tr != nullptr) {
         const float temperature_spread = tv->state - tr->state;
@@ -271,11 +326,11 @@ void DaikinRotexCanComponent::update_temperature_spread() {
 bool DaikinRotexCanComponent::on_custom_select(std::string const& id, uint8_t value) {
     if (id == OPTIMIZED_DEFROSTING) {
         Utils::log(TAG, "%s: %d", OPTIMIZED_DEFROSTING.c_str(), value);
-        CanSelect* p_temperature_antifreeze = m_entity_manager.get_select(TEMPERATURE_ANTIFREEZE);
+        CanSelect* p_temperature_antifreeze = m_entities.temperature_antifreeze.get();
 
         if (p_temperature_antifreeze != nullptr) {
             if (value != 0) {
-                m_entity_manager.sendSet(p_temperature_antifreeze->get_name(), p_temperature_antifreeze->getKey(Translation::T_OFF));
+                m_entity_manager.sendSet(p_temperature_antifreeze, p_temperature_antifreeze->getKey(Translation::T_OFF));
             }
         } else {
             ESP_LOGE(TAG, "on_custom_select(%s, %d) => temperature_antifreeze select is missing!", id.c_str(), value);
@@ -287,7 +342,7 @@ bool DaikinRotexCanComponent::on_custom_select(std::string const& id, uint8_t va
 }
 
 void DaikinRotexCanComponent::on_betriebsart(TEntity::TVariant const& current, TEntity::TVariant const& previous) {
-    CanSelect* p_betriebs_modus = m_entity_manager.get_select(BETRIEBS_MODUS);
+    CanSelect* p_betriebs_modus = m_entities.operating_mode.get();
     if (m_optimized_defrosting.value() && p_betriebs_modus != nullptr) {
         if (std::holds_alternative<std::string>(current)) {
             const auto art_current = std::get<std::string>(current);
@@ -320,9 +375,9 @@ void DaikinRotexCanComponent::on_betriebsart(TEntity::TVariant const& current, T
                     m_betriebsmodus_before_dhw_and_defrosting = modus;
                 }
 
-                const uint16_t ui_new_mode = p_betriebs_modus->getKey(new_mode);
+                const uint16_t ui_new_mode = p_betriebs_modus->getKey(new_mode.c_str());
                 if (ui_new_mode != 0x0) {
-                    m_entity_manager.sendSet(p_betriebs_modus->get_name(), ui_new_mode);
+                    m_entity_manager.sendSet(p_betriebs_modus, ui_new_mode);
                 }
             }
         } else {
@@ -336,7 +391,7 @@ void DaikinRotexCanComponent::on_betriebsart(TEntity::TVariant const& current, T
 }
 
 void DaikinRotexCanComponent::on_betriebsmodus(TEntity::TVariant const& current, TEntity::TVariant const& previous) {
-    CanTextSensor const* p_betriebs_art = m_entity_manager.get_text_sensor(BETRIEBS_ART);
+    CanTextSensor const* p_betriebs_art = m_entities.mode_of_operating.get();
 
     if (p_betriebs_art == nullptr) {
         return;
@@ -356,16 +411,13 @@ void DaikinRotexCanComponent::on_betriebsmodus(TEntity::TVariant const& current,
 
 ///////////////// Texts /////////////////
 void DaikinRotexCanComponent::custom_request(std::string const& value) {
-    std::regex pattern(R"(^((?:0x[0-9A-Fa-f]{2}|[0-9A-Fa-f]{2})(?:\s(?:0x[0-9A-Fa-f]{2}|[0-9A-Fa-f]{2})){0,6})$)");
-    std::smatch match;
-    if (std::regex_match(value, match, pattern)) {
+    TMessage message;
+    if (Utils::str_to_bytes(value, message)) {
         uint16_t can_id = 0x680;
         const bool use_extended_id = false;
 
-        const TMessage message = Utils::str_to_bytes(match[1].str());
-
         Utils::log(TAG, "custom_request() can_id<%s> data<%s> str<%s>",
-            Utils::to_hex(can_id).c_str(), Utils::to_hex(message).c_str(), match[1].str().c_str());
+            Utils::to_hex(can_id).c_str(), Utils::to_hex(message).c_str(), value.c_str());
 
         esphome::esp32_can::ESP32Can* pCanbus = m_entity_manager.getCanbus();
         pCanbus->send_data(can_id, use_extended_id, { message.begin(), message.end() });
@@ -376,7 +428,7 @@ void DaikinRotexCanComponent::custom_request(std::string const& value) {
 
 ///////////////// Buttons /////////////////
 void DaikinRotexCanComponent::dhw_run() {
-    TEntity const* pEntity = m_entity_manager.get(TARGET_HOT_WATER_TEMP_1);
+    TEntity* pEntity = m_entities.target_hot_water_temperature_1.get();
 
     ESP_LOGI(TAG, "dhw_run()");
 
@@ -384,23 +436,21 @@ void DaikinRotexCanComponent::dhw_run() {
         float temp1 {70};
         float temp2 {0};
 
-        if (CanNumber const* pNumber = dynamic_cast<CanNumber const*>(pEntity)) {
+        if (CanNumber const* pNumber = entity_cast<CanNumber>(pEntity)) {
             temp2 = pNumber->state;
-        } else if (CanSelect const* pSelect = dynamic_cast<CanSelect const*>(pEntity)) {
-            temp2 = pSelect->getKey(pSelect->current_option()) / pEntity->get_config().divider;
+        } else if (CanSelect const* pSelect = entity_cast<CanSelect>(pEntity)) {
+            temp2 = pSelect->getKey(pSelect->current_option().c_str()) / pEntity->get_descriptor().divider;
         }
 
         if (temp2 > 0) {
             ESP_LOGI(TAG, "dhw_run(), temp1: %f", temp1);
 
-            const std::string name = pEntity->getName();
-
-            m_entity_manager.sendSet(name,  temp1);
+            m_entity_manager.sendSet(pEntity, temp1);
 
-            m_dhw_set_back_temp_handle = Scheduler::getInstance().call_later([name, temp2, this](){
+            m_dhw_set_back_temp_handle = Scheduler::getInstance().call_later([pEntity, temp2, this](){
                 ESP_LOGI(TAG, "dhw_run(), temp2: %f", temp2);
 
-                m_entity_manager.sendSet(name, temp2);
+                m_entity_manager.sendSet(pEntity, temp2);
             }, 10*1000);
         } else {
             ESP_LOGE(TAG, "dhw_run: Request doesn't have a Number!");
@@ -418,21 +468,31 @@ void DaikinRotexCanComponent::dump() {
     for (auto index = 0; index < m_entity_manager.size(); ++index) {
         TEntity const* pEntity = m_entity_manager.get(index);
         if (pEntity != nullptr) {
-            if (CanSensor const* pSensor = dynamic_cast<CanSensor const*>(pEntity)) {
+            if (CanSensor const* pSensor = entity_cast<CanSensor>(pEntity)) {
                 ESP_LOGI(TAG, "%s: %f", pSensor->get_name().c_str(), pSensor->get_state());
-            } else if (CanBinarySensor const* pBinarySensor = dynamic_cast<CanBinarySensor const*>(pEntity)) {
+            } else if (CanBinarySensor const* pBinarySensor = entity_cast<CanBinarySensor>(pEntity)) {
                 ESP_LOGI(TAG, "%s: %d", pBinarySensor->get_name().c_str(), pBinarySensor->state);
-            } else if (CanNumber const* pNumber = dynamic_cast<CanNumber const*>(pEntity)) {
+            } else if (CanNumber const* pNumber = entity_cast<CanNumber>(pEntity)) {
                 ESP_LOGI(TAG, "%s: %f", pNumber->get_name().c_str(), pNumber->state);
-            } else if (CanTextSensor const* pTextSensor = dynamic_cast<CanTextSensor const*>(pEntity)) {
+            } else if (CanTextSensor const* pTextSensor = entity_cast<CanTextSensor>(pEntity)) {
                 ESP_LOGI(TAG, "%s: %s", pTextSensor->get_name().c_str(), pTextSensor->get_state().c_str());
-            } else if (CanSelect const* pSelect = dynamic_cast<CanSelect const*>(pEntity)) {
+            } else if (CanSelect const* pSelect = entity_cast<CanSelect>(pEntity)) {
                 ESP_LOGI(TAG, "%s: %s", pSelect->get_name().c_str(), pSelect->current_option());
             }
         } else {
             ESP_LOGE(TAG, "Entity with index<%d> not found!", index);
         }
     }
+
+    TUnhandledFrames const& unhandled_frames = m_entity_manager.get_unhandled_frames();
+    ESP_LOGI(TAG, "------------------------------------------");
+    ESP_LOGI(TAG, "--- Unhandled frames: %u, evicted: %u ---", unhandled_frames.getTotal(), unhandled_frames.getEvicted());
+    for (uint8_t index = 0; index < unhandled_frames.size(); ++index) {
+        TUnhandledFrames::TEntry const& entry = unhandled_frames.get(index);
+        ESP_LOGI(TAG, "can_id<%s> register<%s> count<%u> first_seen<%u> last_seen<%u> data<%s>",
+            Utils::to_hex(entry.can_id).c_str(), Utils::to_hex(entry.key).c_str(), entry.count,
+            entry.first_seen, entry.last_seen, Utils::to_hex(entry.data).c_str());
+    }
     ESP_LOGI(TAG, "------------------------------------------");
 }
 
@@ -455,16 +515,66 @@ void DaikinRotexCanComponent::loop() {
     m_temperature_spread_sensor->update(millis);
 
     update_supply_setpoint_regulated();
+    update_adaptive_heating_curve(millis);
+    update_unhandled_frames_sensor(millis);
+}
+
+void DaikinRotexCanComponent::update_adaptive_heating_curve(uint32_t millis) {
+    // Called by every loop(), to_code() adds the sources if adaptive_heating_curve is configured
+    if (m_adaptive_heating_curve_sensor == nullptr || (m_adaptive_heating_curve_ts != 0u && millis - m_adaptive_heating_curve_ts < m_adaptive_heating_curve_interval)) {
+        return;
+    }
+
+    CanSensor const* pOutside = m_entities.temperature_outside.get();
+    CanNumber* pFlowDay = m_entities.flow_temperature_day.get();
+    CanNumber* pFlowNight = m_entities.flow_temperature_night.get();
+
+    // Retried by the next loop() until the values were received
+    if (pOutside == nullptr || pFlowDay == nullptr || pFlowNight == nullptr ||
+        std::isnan(pOutside->state) || std::isnan(pFlowDay->state) || std::isnan(pFlowNight->state)) {
+        return;
+    }
+
+    const float room = m_adaptive_heating_curve_room_sensor != nullptr ? m_adaptive_heating_curve_room_sensor->state : NAN;
+    const float supply = m_adaptive_heating_curve.calculate(pOutside->state, room);
+    m_adaptive_heating_curve_ts = millis;
+    m_adaptive_heating_curve_sensor->publish_state(supply);
+
+    // Only changed setpoints are written, the number is rounded like the curve
+    for (CanNumber* pFlow : {pFlowDay, pFlowNight}) {
+        if (std::round(pFlow->state * 10.0f) != std::round(supply * 10.0f)) {
+            Utils::log(TAG, "adaptive heating curve: %s %f => %f, outside: %f, room: %f",
+                pFlow->get_name().c_str(), pFlow->state, supply, pOutside->state, room);
+            m_entity_manager.sendSet(pFlow, supply);
+        }
+    }
+}
+
+void DaikinRotexCanComponent::update_unhandled_frames_sensor(uint32_t millis) {
+    // Published at most once a minute and only if further frames were counted
+    TUnhandledFrames const& unhandled_frames = m_entity_manager.get_unhandled_frames();
+    if (m_unhandled_frames_sensor == nullptr || unhandled_frames.getTotal() == m_unhandled_frames_published ||
+        millis - m_unhandled_frames_publish_ts < UNHANDLED_FRAMES_PUBLISH_INTERVAL) {
+        return;
+    }
+    m_unhandled_frames_published = unhandled_frames.getTotal();
+    m_unhandled_frames_publish_ts = millis;
+    m_unhandled_frames_sensor->publish_state(unhandled_frames.format(MAX_TEXT_SENSOR_LENGTH));
 }
 
 void DaikinRotexCanComponent::update_supply_setpoint_regulated() {
-    CanTextSensor const* p_betriebs_art = m_entity_manager.get_text_sensor(BETRIEBS_ART);
-    CanBinarySensor const* state_compressor = m_entity_manager.get_binary_sensor(STATE_COMPRESSOR);
-    CanNumber const* pMaxTVorlauf = m_entity_manager.get_number(MAX_TARGET_FLOW_TEMP, false);
-    CanSensor const* pTv = m_entity_manager.get_sensor("tv");
-    CanSensor const* pVorlaufSoll = m_entity_manager.get_sensor("target_supply_temperature");
+    // Called by every loop(), to_code() adds the sources if supply_setpoint_regulated is configured
+    if (m_supply_setpoint_regulated == nullptr) {
+        return;
+    }
 
-    if (p_betriebs_art == nullptr || pMaxTVorlauf == nullptr || pTv == nullptr || pVorlaufSoll == nullptr || m_supply_setpoint_regulated == nullptr) {
+    CanTextSensor const* p_betriebs_art = m_entities.mode_of_operating.get();
+    CanBinarySensor const* state_compressor = m_entities.status_compressor.get();
+    CanNumber* pMaxTVorlauf = m_entities.max_target_flow_temp.get();
+    CanSensor const* pTv = m_entities.tv.get();
+    CanSensor const* pVorlaufSoll = m_entities.target_supply_temperature.get();
+
+    if (p_betriebs_art == nullptr || pMaxTVorlauf == nullptr || pTv == nullptr || pVorlaufSoll == nullptr) {
         return;
     }
 
@@ -501,7 +611,7 @@ void DaikinRotexCanComponent::update_supply_setpoint_regulated() {
                 Utils::log(TAG, "request vorlauf_soll_request: %f, tv: %f, max_t_vorlauf: %f, vorlauf_soll_reguliert: %f",
                     vorlauf_soll_request, tv, max_t_vorlauf, vorlauf_soll_reguliert);
 
-                m_entity_manager.sendSet(pMaxTVorlauf->get_name(), vorlauf_soll_request);
+                m_entity_manager.sendSet(pMaxTVorlauf, vorlauf_soll_request);
             }
         }
         m_last_supply_setpoint_regulated_ts = esphome::millis();
@@ -509,6 +619,9 @@ void DaikinRotexCanComponent::update_supply_setpoint_regulated() {
 }
 
 void DaikinRotexCanComponent::handle(uint32_t can_id, std::vector<uint8_t> const& data) {
+    if (!g_can_filter.isAccepted(can_id)) {
+        return; // Passed the CanbusTrigger code/mask, but is none of the listened can ids
+    }
     TMessage message;
     std::copy_n(data.begin(), message.size(), message.begin());
     m_entity_manager.handle(can_id, message);
@@ -516,6 +629,10 @@ void DaikinRotexCanComponent::handle(uint32_t can_id, std::vector<uint8_t> const
 
 void DaikinRotexCanComponent::dump_config() {
     ESP_LOGCONFIG(TAG, "DaikinRotexCanComponent");
+    ESP_LOGCONFIG(TAG, "  CAN filter: code<%s> mask<%s> %s TWAI acceptance_code<%s> acceptance_mask<%s>",
+        Utils::to_hex(g_can_filter.code).c_str(), Utils::to_hex(g_can_filter.mask).c_str(),
+        g_can_filter.can_ids == nullptr ? "exact" : "with software id check",
+        Utils::to_hex(g_can_filter.getTwaiAcceptanceCode()).c_str(), Utils::to_hex(g_can_filter.getTwaiAcceptanceMask()).c_str());
 }
 
 bool DaikinRotexCanComponent::is_command_set(TMessage const& message) {
@@ -532,17 +649,16 @@ bool DaikinRotexCanComponent::is_modus_heating(std::string const& modus) {
 }
 
 std::string DaikinRotexCanComponent::recalculate_state(EntityBase* pEntity, std::string const& new_state) {
-    CanSensor const* tv = m_entity_manager.get_sensor("tv");
-    CanSensor const* tvbh = m_entity_manager.get_sensor("tvbh");
-    CanSensor const* tr = m_entity_manager.get_sensor("tr");
-    CanSensor const* dhw_mixer_position = m_entity_manager.get_sensor("dhw_mixer_position");
-    CanSensor const* bpv = m_entity_manager.get_sensor("bypass_valve");
-    CanSensor const* flow_rate = m_entity_manager.get_sensor(FLOW_RATE);
-    CanSensor const* ta = m_entity_manager.get_sensor("temperature_outside");
-    CanSensor const* tdhw1 = m_entity_manager.get_sensor("tdhw1");
-    CanTextSensor const* error_code = m_entity_manager.get_text_sensor("error_code");
-    CanTextSensor const* p_betriebs_art = m_entity_manager.get_text_sensor(BETRIEBS_ART);
-    CanBinarySensor const* state_compressor = m_entity_manager.get_binary_sensor(STATE_COMPRESSOR);
+    CanSensor const* tv = m_entities.tv.get();
+    CanSensor const* tvbh = m_entities.tvbh.get();
+    CanSensor const* tr = m_entities.tr.get();
+    CanSensor const* dhw_mixer_position = m_entities.dhw_mixer_position.get();
+    CanSensor const* bpv = m_entities.bypass_valve.get();
+    CanSensor const* flow_rate = m_entities.flow_rate.get();
+    CanSensor const* tdhw1 = m_entities.tdhw1.get();
+    CanTextSensor const* error_code = m_entities.error_code.get();
+    CanTextSensor const* p_betriebs_art = m_entities.mode_of_operating.get();
+    CanBinarySensor const* state_compressor = m_entities.status_compressor.get();
 
     if (error_code != nullptr && pEntity == error_code && tv != nullptr && tvbh != nullptr && tr != nullptr) {
         const float tv_state = tv->state + m_tv_tvbh_tr_offset.tv;
@@ -595,7 +711,8 @@ std::string DaikinRotexCanComponent::recalculate_state(EntityBase* pEntity, std:
                     + 0.006683 * std::pow(tv->state, 3)
                     - 0.4152 * std::pow(tv->state, 2)
                     + 11.5006 * tv->state
-                    - 117.7908;
+                    - 117.7908
+                    + m_min_spread_offset;
 
                 const bool is_error_state = state_compressor->state && m_temperature_spread_sensor->state < min_spread;
 
@@ -621,21 +738,22 @@ std::string DaikinRotexCanComponent::recalculate_state(EntityBase* pEntity, std:
     return new_state;
 }
 
-float DaikinRotexCanComponent::get_sensor_value(std::string const& id) const {
-    CanSensor const* pSensor = m_entity_manager.get_sensor(id);
+// The index is the row in g_entity_descriptors, the manager maps it to the entity since it filters and orders its entities
+float DaikinRotexCanComponent::get_sensor_value(uint16_t index) const {
+    CanSensor const* pSensor = entity_cast<CanSensor>(m_entity_manager.getByDescriptor(index));
     if (pSensor != nullptr) {
         return pSensor->state;
     }
-    ESP_LOGE(TAG, "Entity <%s> doesn't exists!", id.c_str());
+    ESP_LOGE(TAG, "get_sensor_value() => No sensor at descriptor index: %d", index);
     return std::numeric_limits<float>::quiet_NaN();
 }
 
-float DaikinRotexCanComponent::get_number_value(std::string const& id) const {
-    CanNumber const* pNumber = m_entity_manager.get_number(id);
+float DaikinRotexCanComponent::get_number_value(uint16_t index) const {
+    CanNumber const* pNumber = entity_cast<CanNumber>(m_entity_manager.getByDescriptor(index));
     if (pNumber != nullptr) {
         return pNumber->state;
     }
-    ESP_LOGE(TAG, "Entity <%s> doesn't exists!", id.c_str());
+    ESP_LOGE(TAG, "get_number_value() => No number at descriptor index: %d", index);
     return std::numeric_limits<float>::quiet_NaN();
 }
 
@@ -1,7 +1,9 @@
 #pragma once
 
 #include "esphome/components/daikin_rotex_can/persistent_value.h"
+#include "esphome/components/daikin_rotex_can/can_filter.h"
 #include "esphome/components/daikin_rotex_can/entity_manager.h"
+#include "esphome/components/daikin_rotex_can/heating_curve.h"
 #include "esphome/components/daikin_rotex_can/sensors.h"
 #include "esphome/components/daikin_rotex_can/scheduler.h"
 #include "esphome/components/daikin_rotex_can/pid.h"
@@ -30,6 +32,7 @@ class DaikinRotexCanComponent: public Component, public SensorAccessor, public I
         bool handle_error_detection(bool is_error_state);
         bool is_good_case_detected() const { return m_good_case_detected; }
         uint32_t get_error_detection_timestamp() const { return m_error_timestamp; }
+        void set_detection_time_ms(uint32_t detection_time_ms) { m_detection_time_ms = detection_time_ms; }
         void reset_good_case();
 
     private:
@@ -38,6 +41,42 @@ class DaikinRotexCanComponent: public Component, public SensorAccessor, public I
         bool m_good_case_detected;
         bool m_stop_detection_in_good_case;
     };
+
+    // Sensors calculated by the component, triggered by the update_entities of their sources
+    enum class TDerivedSensor : uint8_t {
+        NONE,
+        THERMAL_POWER,
+        TEMPERATURE_SPREAD,
+        TV_TVBH_DELTA,
+        TVBH_TR_DELTA,
+        VORLAUF_SOLL_TV_DELTA
+    };
+
+    // Entities used by the component logic, resolved once in setup()
+    struct Entities {
+        Entities();
+        void resolve(TEntityManager& manager);
+
+        TEntityHandle<CanSensor> tv;
+        TEntityHandle<CanSensor> tvbh;
+        TEntityHandle<CanSensor> tr;
+        TEntityHandle<CanSensor> target_supply_temperature;
+        TEntityHandle<CanSensor> flow_rate;
+        TEntityHandle<CanSensor> dhw_mixer_position;
+        TEntityHandle<CanSensor> bypass_valve;
+        TEntityHandle<CanSensor> temperature_outside;
+        TEntityHandle<CanSensor> tdhw1;
+        TEntityHandle<CanTextSensor> error_code;
+        TEntityHandle<CanTextSensor> mode_of_operating;
+        TEntityHandle<CanBinarySensor> status_compressor;
+        TEntityHandle<CanSelect> operating_mode;
+        TEntityHandle<CanSelect> optimized_defrosting;
+        TEntityHandle<CanSelect> temperature_antifreeze;
+        TEntityHandle<CanNumber> max_target_flow_temp;
+        TEntityHandle<CanNumber> flow_temperature_day;
+        TEntityHandle<CanNumber> flow_temperature_night;
+        TEntityHandle<TEntity> target_hot_water_temperature_1;     // Number or select
+    };
 public:
     DaikinRotexCanComponent();
     void setup() override;
@@ -47,6 +86,8 @@ public:
     void set_canbus(esphome::esp32_can::ESP32Can* pCanbus);
     void set_update_interval(uint16_t seconds) {} // dummy
     void set_project_git_hash(text_sensor::TextSensor* pSensor, std::string const& hash);
+    void set_unhandled_frames_sensor(text_sensor::TextSensor* pSensor) { m_unhandled_frames_sensor = pSensor; }
+    void set_log_unhandled_frames(bool log_unhandled_frames) { m_entity_manager.set_log_unhandled_frames(log_unhandled_frames); }
     void set_thermal_power_sensor(CanSensor* pSensor);
     void set_thermal_power_sensor_raw(CanSensor* pSensor);
     void set_temperature_spread(CanSensor* pSensor);
@@ -56,9 +97,16 @@ public:
     void set_vorlauf_soll_tv_delta(CanSensor* pSensor);
     void set_max_spread(float tvbh_tv, float tvbh_tr);
     void set_tv_tvbh_tr_offset(float tv_offset, float tvbh_offset, float tr_offset);
+    void set_min_spread_offset(float min_spread_offset) { m_min_spread_offset = min_spread_offset; }
+    void set_error_detection_times(uint32_t mixer_ms, uint32_t bpv_ms, uint32_t spread_ms, uint32_t dhw_ms);
+    void set_smoothing_pid(float p, float i, float d, float max_integral, float alpha_p, float alpha_d);
     void add_entity(TEntity* pEntity);
     void set_supply_setpoint_regulated(number::Number* pNumber);
+    void set_adaptive_heating_curve(CanSensor* pSensor, float min_supply, float max_supply, float log_factor, float min_outside,
+        float target_room, float room_factor, uint32_t update_interval_ms);
+    void set_adaptive_heating_curve_room_temperature(sensor::Sensor* pSensor) { m_adaptive_heating_curve_room_sensor = pSensor; }
     void set_delay_between_requests(uint16_t milliseconds);
+    void set_request_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second);
 
     void on_post_handle(TEntity* pRequest, TEntity::TVariant const& current, TEntity::TVariant const& previous);
 
@@ -73,8 +121,8 @@ public:
     void on_custom_number(number::Number& number, float value);
 
     // IAccessor
-    virtual float get_sensor_value(std::string const& sensor_id) const override;
-    virtual float get_number_value(std::string const& sensor_id) const override;
+    virtual float get_sensor_value(uint16_t index) const override;
+    virtual float get_number_value(uint16_t index) const override;
 
     void handle(uint32_t can_id, std::vector<uint8_t> const& data);
 
@@ -97,7 +145,8 @@ private:
         DaikinRotexCanComponent* m_pParent;
     };
 
-    void updateState(std::string const& id);
+    void updateState(uint16_t descriptor_index);
+    static TDerivedSensor to_derived_sensor(const char* id);
     bool on_custom_select(std::string const& id, uint8_t value);
     void on_betriebsart(TEntity::TVariant const& current, TEntity::TVariant const& previous);
     void on_betriebsmodus(TEntity::TVariant const& current, TEntity::TVariant const& previous);
@@ -106,8 +155,12 @@ private:
     static bool is_modus_heating(std::string const& modus);
     std::string recalculate_state(EntityBase* pEntity, std::string const& new_state);
     void update_supply_setpoint_regulated();
+    void update_adaptive_heating_curve(uint32_t millis);
+    void update_unhandled_frames_sensor(uint32_t millis);
 
     esphome::daikin_rotex_can::TEntityManager m_entity_manager;
+    Entities m_entities;
+    std::vector<TDerivedSensor> m_derived_sensors;      // Per row of g_entity_descriptors
     std::shared_ptr<esphome::canbus::CanbusTrigger> m_canbus_trigger;
     std::shared_ptr<TCanbusAutomation> m_canbus_automation;
     std::shared_ptr<MyAction> m_canbus_action;
@@ -116,6 +169,9 @@ private:
     std::string m_betriebsmodus_before_dhw_and_defrosting;
     text_sensor::TextSensor* m_project_git_hash_sensor;
     std::string m_project_git_hash;
+    text_sensor::TextSensor* m_unhandled_frames_sensor;
+    uint32_t m_unhandled_frames_published;
+    uint32_t m_unhandled_frames_publish_ts;
     esphome::esp32_can::ESP32Can* m_pCanbus;
 
     CanSensor* m_thermal_power_sensor;
@@ -127,12 +183,19 @@ private:
     CanSensor* m_vorlauf_soll_tv_delta;
     MaxSpread m_max_spread;
     TvTvBHTrOffset m_tv_tvbh_tr_offset;
+    float m_min_spread_offset;
+    PID m_smoothing_pid;
     ErrorDetection m_mixer_error_detection;
     ErrorDetection m_bpv_error_detection;
     ErrorDetection m_spread_error_detection;
     ErrorDetection m_dhw_error_detection;
     number::Number* m_supply_setpoint_regulated;
     uint32_t m_last_supply_setpoint_regulated_ts;
+    CanSensor* m_adaptive_heating_curve_sensor;
+    sensor::Sensor* m_adaptive_heating_curve_room_sensor;
+    THeatingCurve m_adaptive_heating_curve;
+    uint32_t m_adaptive_heating_curve_interval;
+    uint32_t m_adaptive_heating_curve_ts;
     CallHandle m_dhw_set_back_temp_handle;
 };
 
@@ -140,7 +203,8 @@ inline void DaikinRotexCanComponent::set_canbus(esphome::esp32_can::ESP32Can* pC
     m_entity_manager.setCanbus(pCanbus);
     m_pCanbus = pCanbus;
 
-    m_canbus_trigger = std::make_shared<esphome::canbus::CanbusTrigger>(pCanbus, 0, 0, false); // Listen to all can messages
+    // Only frames on the can ids of the configured entities and of the RoCon control panel reach handle()
+    m_canbus_trigger = std::make_shared<esphome::canbus::CanbusTrigger>(pCanbus, g_can_filter.code, g_can_filter.mask, false);
     m_canbus_automation = std::make_shared<TCanbusAutomation>(m_canbus_trigger.get());
     m_canbus_action = std::make_shared<MyAction>(this);
     m_canbus_automation->add_action(m_canbus_action.get());
@@ -191,6 +255,17 @@ inline void DaikinRotexCanComponent::set_tv_tvbh_tr_offset(float tv_offset, floa
     m_tv_tvbh_tr_offset = { tv_offset, tvbh_offset, tr_offset };
 }
 
+inline void DaikinRotexCanComponent::set_error_detection_times(uint32_t mixer_ms, uint32_t bpv_ms, uint32_t spread_ms, uint32_t dhw_ms) {
+    m_mixer_error_detection.set_detection_time_ms(mixer_ms);
+    m_bpv_error_detection.set_detection_time_ms(bpv_ms);
+    m_spread_error_detection.set_detection_time_ms(spread_ms);
+    m_dhw_error_detection.set_detection_time_ms(dhw_ms);
+}
+
+inline void DaikinRotexCanComponent::set_smoothing_pid(float p, float i, float d, float max_integral, float alpha_p, float alpha_d) {
+    m_smoothing_pid = PID(p, i, d, max_integral, alpha_p, alpha_d);
+}
+
 inline void DaikinRotexCanComponent::add_entity(TEntity* pEntity) {
     m_entity_manager.add(pEntity);
 }
@@ -199,9 +274,20 @@ inline void DaikinRotexCanComponent::set_supply_setpoint_regulated(number::Numbe
     m_supply_setpoint_regulated = pNumber;
 }
 
+inline void DaikinRotexCanComponent::set_adaptive_heating_curve(CanSensor* pSensor, float min_supply, float max_supply, float log_factor,
+    float min_outside, float target_room, float room_factor, uint32_t update_interval_ms) {
+    m_adaptive_heating_curve_sensor = pSensor;
+    m_adaptive_heating_curve = THeatingCurve(min_supply, max_supply, log_factor, min_outside, target_room, room_factor);
+    m_adaptive_heating_curve_interval = update_interval_ms;
+}
+
 inline void DaikinRotexCanComponent::set_delay_between_requests(uint16_t milliseconds) {
     m_entity_manager.set_delay_between_requests(milliseconds);
 }
+
+inline void DaikinRotexCanComponent::set_request_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second) {
+    m_entity_manager.set_request_pipeline(max_requests_in_flight, request_timeout_ms, max_frames_per_second);
+}
     
 
 } // namespace daikin_rotex_can
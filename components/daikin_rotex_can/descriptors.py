@@ -0,0 +1,185 @@
+"""
+    This module generates the flash resident entity descriptor and value map tables and the CAN
+    acceptance filter (entity_descriptors.cpp) for the Daikin Rotex CAN component.
+"""
+
+import logging
+import os
+import re
+
+from .can_filter import build_can_filter, format_can_filter, generate_cpp_can_filter, listened_can_ids
+from .codec import NO_CODEC, generate_cpp_codec, parse_codec
+from .translations.translate import write_file_if_changed
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CAN_ID = 0x180
+DEFAULT_DATA_OFFSET = 5
+DEFAULT_DATA_SIZE = 1
+COMMAND_SIZE = 7
+MAX_VALUE_MAP_SIZE = 0xFF
+
+COMMAND_BYTE_PATTERN = re.compile(r"^[0-9A-Fa-f]{2}$")
+
+class InvalidCommandError(ValueError):
+    """Exception raised when a command string is not a sequence of up to 7 hex bytes."""
+
+def parse_command(command: str) -> list:
+    """
+    Converts a command string like "31 00 FA 06 91 00 00" into a list of 7 bytes.
+    Missing trailing bytes are filled with 0x00, an empty command results in 7 zero bytes.
+    """
+    byte_strs = command.split()
+    if len(byte_strs) > COMMAND_SIZE:
+        raise InvalidCommandError(f"Command '{command}' has more than {COMMAND_SIZE} bytes")
+
+    for byte_str in byte_strs:
+        if not COMMAND_BYTE_PATTERN.match(byte_str):
+            raise InvalidCommandError(f"Command '{command}' contains the invalid byte '{byte_str}'")
+
+    command_bytes = [int(byte_str, 16) for byte_str in byte_strs]
+    return command_bytes + [0x00] * (COMMAND_SIZE - len(command_bytes))
+
+def build_descriptors(entity_confs, derived_ids=()):
+    """
+    Creates the descriptor rows for the given entity configurations, which are tuples of
+    (sensor_configuration entry, update_interval in milliseconds).
+
+    update_entities are resolved to row indices. Targets which are no CAN entities (e.g. thermal_power)
+    are appended as rows without command, as long as they are listed in derived_ids.
+    """
+    rows = []
+    for sens_conf, update_interval in entity_confs:
+        rows.append({
+            "id": sens_conf.get("name"),
+            "can_id": sens_conf.get("can_id", DEFAULT_CAN_ID),
+            "command": parse_command(sens_conf.get("command", "")),
+            "data_offset": sens_conf.get("data_offset", DEFAULT_DATA_OFFSET),
+            "data_size": sens_conf.get("data_size", DEFAULT_DATA_SIZE),
+            "codec": parse_codec(sens_conf.get("codec")),
+            "divider": sens_conf.get("divider", 1.0),
+            "signed": sens_conf.get("signed", False),
+            "update_interval": update_interval,
+            "update_entities": list(sens_conf.get("update_entities", [])),
+        })
+
+    index_by_id = {row["id"]: index for index, row in enumerate(rows)}
+
+    for row in list(rows):
+        for update_entity in row["update_entities"]:
+            if update_entity not in index_by_id and update_entity in derived_ids:
+                index_by_id[update_entity] = len(rows)
+                rows.append({
+                    "id": update_entity,
+                    "can_id": 0x0,
+                    "command": [0x00] * COMMAND_SIZE,
+                    "data_offset": 0,
+                    "data_size": 0,
+                    "codec": dict(NO_CODEC),
+                    "divider": 1.0,
+                    "signed": False,
+                    "update_interval": 0,
+                    "update_entities": [],
+                })
+
+    for row in rows:
+        row["update_entities"] = [index_by_id[update_entity] for update_entity in row["update_entities"] if update_entity in index_by_id]
+
+    return rows, index_by_id
+
+def build_value_maps(mappings):
+    """
+    Creates the value map tables for the given {entity name: {key: label}} mappings of selects and text sensors.
+    Every table is sorted by key, identical maps (e.g. the dhw maps or on/off) are emitted only once.
+
+    Returns the list of tables, each a tuple of (key, label) pairs, and the table index per entity name.
+    """
+    value_maps = []
+    index_by_items = {}
+    index_by_name = {}
+    for name, mapping in mappings.items():
+        items = tuple(sorted(mapping.items()))
+        if len(items) > MAX_VALUE_MAP_SIZE:
+            raise ValueError(f"Map of '{name}' has more than {MAX_VALUE_MAP_SIZE} entries")
+
+        if items not in index_by_items:
+            index_by_items[items] = len(value_maps)
+            value_maps.append(items)
+        index_by_name[name] = index_by_items[items]
+
+    return value_maps, index_by_name
+
+def value_map_label_refs(value_maps, value_map_index, labels):
+    """
+    Returns C++ expressions which reference the given labels inside the generated table,
+    so select options do not need their own copy of the strings.
+    """
+    table_labels = [label for _, label in value_maps[value_map_index]]
+    return [
+        f"esphome::daikin_rotex_can::g_value_maps[{value_map_index}].labels[{table_labels.index(label)}]"
+        for label in labels
+    ]
+
+def _cpp_float(value) -> str:
+    return f"{float(value)!r}f"
+
+def _cpp_string(value) -> str:
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def generate_cpp_value_maps(value_maps) -> str:
+    cpp_code = ''
+    for index, items in enumerate(value_maps):
+        labels = [label for _, label in items]
+        label_order = sorted(range(len(labels)), key=lambda i: (labels[i].encode("utf-8"), i))
+
+        cpp_code += f'static constexpr uint16_t VALUE_MAP_KEYS_{index}[] = {{{", ".join(f"0x{key:02X}" for key, _ in items)}}};\n'
+        cpp_code += f'static constexpr const char* VALUE_MAP_LABELS_{index}[] = {{{", ".join(_cpp_string(label) for label in labels)}}};\n'
+        cpp_code += f'static constexpr uint8_t VALUE_MAP_LABEL_ORDER_{index}[] = {{{", ".join(str(i) for i in label_order)}}};\n'
+
+    cpp_code += '\n'
+    cpp_code += f'constexpr TValueMap g_value_maps[{max(len(value_maps), 1)}] = {{\n'
+    for index, items in enumerate(value_maps):
+        cpp_code += f'    {{VALUE_MAP_KEYS_{index}, VALUE_MAP_LABELS_{index}, VALUE_MAP_LABEL_ORDER_{index}, {len(items)}}},\n'
+    cpp_code += '};\n\n'
+    cpp_code += f'constexpr uint16_t g_value_maps_size = {len(value_maps)};\n\n'
+    return cpp_code
+
+def generate_cpp_descriptors(rows, value_maps=()) -> str:
+    cpp_code = '#include "esphome/components/daikin_rotex_can/entity_descriptor.h"\n'
+    cpp_code += '#include "esphome/components/daikin_rotex_can/value_map.h"\n'
+    cpp_code += '#include "esphome/components/daikin_rotex_can/can_filter.h"\n\n'
+    cpp_code += 'namespace esphome {\nnamespace daikin_rotex_can {\n\n'
+
+    for index, row in enumerate(rows):
+        if row["update_entities"]:
+            indices = ", ".join(str(update_index) for update_index in row["update_entities"])
+            cpp_code += f'static constexpr uint16_t UPDATE_ENTITIES_{index}[] = {{{indices}}};\n'
+
+    cpp_code += '\n'
+    cpp_code += f'constexpr TEntityDescriptor g_entity_descriptors[{max(len(rows), 1)}] = {{\n'
+    for index, row in enumerate(rows):
+        command = ", ".join(f"0x{byte:02X}" for byte in row["command"])
+        update_entities = f'UPDATE_ENTITIES_{index}' if row["update_entities"] else 'nullptr'
+        cpp_code += (
+            f'    {{"{row["id"]}", 0x{row["can_id"]:03X}, {{{command}}}, '
+            f'{row["data_offset"]}, {row["data_size"]}, {generate_cpp_codec(row["codec"])}, {_cpp_float(row["divider"])}, '
+            f'{"true" if row["signed"] else "false"}, {row["update_interval"]}, '
+            f'{update_entities}, {len(row["update_entities"])}}},\n'
+        )
+    cpp_code += '};\n\n'
+    cpp_code += f'constexpr uint16_t g_entity_descriptors_size = {len(rows)};\n\n'
+
+    cpp_code += generate_cpp_value_maps(value_maps)
+    cpp_code += generate_cpp_can_filter(build_can_filter(listened_can_ids(rows)))
+
+    cpp_code += '}  // namespace daikin_rotex_can\n'
+    cpp_code += '}  // namespace esphome\n'
+    return cpp_code
+
+# Write entity_descriptors.cpp file
+def write_descriptors_file(output_dir, rows, value_maps=()):
+    output_path = os.path.join(output_dir, "entity_descriptors.cpp")
+    write_file_if_changed(output_path, generate_cpp_descriptors(rows, value_maps))
+
+    _LOGGER.info(f"{output_path}: {len(rows)} entity descriptors and {len(value_maps)} value maps")
+    _LOGGER.info(format_can_filter(build_can_filter(listened_can_ids(rows))))
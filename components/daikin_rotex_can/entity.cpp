@@ -1,24 +1,63 @@
 #include "esphome/components/daikin_rotex_can/entity.h"
 #include "esphome/components/esp32_can/esp32_can.h"
 #include "esphome/core/log.h"
+#include <algorithm>
+#include <functional>
 
 namespace esphome {
 namespace daikin_rotex_can {
 
 static const char* TAG = "TEntity";
 
-TEntity::TEntity()
-: m_config()
+// Used by entities which are not backed by a row of g_entity_descriptors, e.g. the calculated sensors
+static const TEntityDescriptor EMPTY_DESCRIPTOR = {"", 0x0, {}, 0, 0, {TCodec::NONE, 0, 1, 0, 0}, 1.0f, false, 1000, nullptr, 0};
+
+TEntity::TEntity(TType type)
+: m_pDescriptor(&EMPTY_DESCRIPTOR)
+, m_pEntity(nullptr)
 , m_pCanbus(nullptr)
+, m_type(type)
+, m_command_configured(false)
+, m_index(0xFFFF)
+, m_id("")
+, m_update_lambda(nullptr)
 , m_pAccessor(nullptr)
 , m_expected_reponse()
 , m_last_handle_timestamp(0u)
-, m_last_get_timestamp(0u)
 , m_last_value_change_timestamp(0u)
 , m_post_handle_lambda()
+, m_pRequestObserver(nullptr)
 {
 }
 
+void TEntity::set_entity(
+    uint16_t descriptor_index,
+    EntityBase* pEntity,
+    TUpdateFunc update_lambda,
+    IAccessor const* accessor
+) {
+    if (descriptor_index >= g_entity_descriptors_size) {
+        ESP_LOGE(TAG, "set_entity() => Invalid descriptor index: %d", descriptor_index);
+        return;
+    }
+
+    m_pDescriptor = &g_entity_descriptors[descriptor_index];
+    m_pEntity = pEntity;
+    m_id = m_pDescriptor->id;
+    m_update_lambda = update_lambda;
+    m_expected_reponse = TEntity::calculate_reponse(m_pDescriptor->command);
+    m_command_configured = std::any_of(m_pDescriptor->command.begin(), m_pDescriptor->command.end(), [](uint8_t b) { return b != 0x00; });
+    m_pAccessor = accessor;
+}
+
+uint16_t TEntity::get_descriptor_index() const {
+    const std::less<TEntityDescriptor const*> before;
+    if (before(m_pDescriptor, g_entity_descriptors) || !before(m_pDescriptor, g_entity_descriptors + g_entity_descriptors_size)) {
+        return g_entity_descriptors_size;
+    }
+    return m_pDescriptor - g_entity_descriptors;
+}
+
 std::array<uint16_t, 7> TEntity::calculate_reponse(TMessage const& message) {
     const uint16_t DC = 0xFFFF;
     std::array<uint16_t, 7> response = {DC, DC, DC, DC, DC, DC, DC};
@@ -32,15 +71,11 @@ std::array<uint16_t, 7> TEntity::calculate_reponse(TMessage const& message) {
     return response;
 }
 
-bool TEntity::isGetInProgress() const {
-    return is_command_configured() && m_last_get_timestamp > m_last_handle_timestamp && ((esphome::millis() - m_last_get_timestamp) < 3*1000); // Consider 3 sek => package is lost
-}
-
 bool TEntity::isMatch(uint32_t can_id, TMessage const& responseData) const {
     const bool is_set = (responseData[0] & 0x0F) == 0x00;
     const bool is_response = (responseData[0] & 0x0F) == 0x02;
 
-    const bool is_our_response = can_id == m_config.can_id;                             // Listen for responses caused by our sendGet
+    const bool is_our_response = can_id == m_pDescriptor->can_id;                             // Listen for responses caused by our sendGet
     const bool is_rocon_panel_response = can_id == 0x10A && (is_response || is_set);    // Listen for responses and sets caused by RoCon control panel (0x10A)
 
     const bool is_valid = is_our_response || is_rocon_panel_response;
@@ -62,20 +97,18 @@ bool TEntity::handle(uint32_t can_id, TMessage const& responseData) {
         TEntity::TVariant current, previous;
         bool valid = false;
 
-        if (m_config.data_offset > 0 && (m_config.data_offset + m_config.data_size) <= 7) {
-            if (m_config.data_size >= 1 && m_config.data_size <= 2) {
-                const uint16_t value = m_config.handle_lambda_set ? m_config.handle_lambda(responseData) :
-                    (
-                        m_config.data_size == 2 ?
-                        (((responseData[m_config.data_offset] << 8) + responseData[m_config.data_offset + 1])) :
-                        (responseData[m_config.data_offset])
-                    );
+        const uint8_t data_offset = m_pDescriptor->data_offset;
+        const uint8_t data_size = m_pDescriptor->data_size;
+
+        if (data_offset > 0 && (data_offset + data_size) <= 7) {
+            if (data_size >= 1 && data_size <= 2) {
+                const uint16_t value = m_pDescriptor->codec.decode(responseData, data_offset, data_size);
                 valid = handleValue(value, current, previous);
             } else {
-                ESP_LOGE(TAG, "handle() => Invalid data size: %d", m_config.data_size);
+                ESP_LOGE(TAG, "handle() => Invalid data size: %d", data_size);
             }
         } else {
-            ESP_LOGE(TAG, "handle() => Invalid data_offset: %d", m_config.data_offset);
+            ESP_LOGE(TAG, "handle() => Invalid data_offset: %d", data_offset);
         }
 
         if (valid) {
@@ -118,12 +151,15 @@ bool TEntity::sendGet(esphome::esp32_can::ESP32Can* pCanBus) {
     const uint32_t can_id = 0x680;
     const bool use_extended_id = false;
 
-    pCanBus->send_data(can_id, use_extended_id, { m_config.command.begin(), m_config.command.end() });
+    TMessage const& command = m_pDescriptor->command;
+    pCanBus->send_data(can_id, use_extended_id, { command.begin(), command.end() });
 
     Utils::log("sendGet", "%s can_id<%s> command<%s>",
-        getName().c_str(), Utils::to_hex(can_id).c_str(), Utils::to_hex(m_config.command).c_str());
+        getName().c_str(), Utils::to_hex(can_id).c_str(), Utils::to_hex(command).c_str());
 
-    m_last_get_timestamp = esphome::millis();
+    if (m_pRequestObserver != nullptr) {
+        m_pRequestObserver->on_get_sent(this);
+    }
     return true;
 }
 
@@ -136,14 +172,10 @@ bool TEntity::sendSet(esphome::esp32_can::ESP32Can* pCanBus, float value) {
     const uint32_t can_id = 0x680;
     const bool use_extended_id = false;
 
-    TMessage command = TMessage(m_config.command);
+    TMessage command = TMessage(m_pDescriptor->command);
     command[0] = 0x30;
     command[1] = 0x00;
-    if (m_config.set_lambda_set) {
-        m_config.set_lambda(command, value);
-    } else {
-        Utils::setBytes(command, value, m_config.data_offset, m_config.data_size);
-    }
+    m_pDescriptor->codec.encode(command, value, m_pDescriptor->data_offset, m_pDescriptor->data_size);
 
     pCanBus->send_data(can_id, use_extended_id, { command.begin(), command.end() });
     Utils::log("sendSet", "name<%s> value<%f> can_id<%s> command<%s>",
@@ -154,11 +186,5 @@ bool TEntity::sendSet(esphome::esp32_can::ESP32Can* pCanBus, float value) {
     return true;
 }
 
-void TEntity::update(uint32_t millis) {
-    if (isGetInProgress() && millis > (m_last_get_timestamp + 5 * 1000)) {
-        ESP_LOGE(TAG, "update() sedGet timeout! id: %s", m_config.id.c_str());
-    }
-}
-
 }
 }
\ No newline at end of file
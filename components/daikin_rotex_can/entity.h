@@ -1,6 +1,7 @@
 #pragma once
 
 #include "esphome/components/daikin_rotex_can/accessor.h"
+#include "esphome/components/daikin_rotex_can/entity_descriptor.h"
 #include "esphome/components/daikin_rotex_can/types.h"
 #include "esphome/components/daikin_rotex_can/utils.h"
 #include "esphome/components/esp32_can/esp32_can.h"
@@ -8,109 +9,59 @@
 #include "esphome/core/hal.h"
 #include <functional>
 #include <stdint.h>
+#include <type_traits>
 #include <variant>
-#include <list>
 
 namespace esphome {
 namespace daikin_rotex_can {
 
+class TEntity;
+
+// Notified of every GET an entity sends, also of the GETs which follow a SET from the UI
+class IRequestObserver {
+public:
+    virtual void on_get_sent(TEntity* pEntity) = 0;
+};
+
 class TEntity {
     static const uint16_t DC = 0xFFFF; // Don't care
 
 public:
-    using THandleFunc = std::function<uint16_t(TMessage const&)>;
-    using TUpdateFunc = std::function<std::string(IAccessor const&)>;
-    using TSetFunc = std::function<void(TMessage&, uint16_t)>;
+    using TUpdateFunc = std::string (*)(IAccessor const&);
     using TVariant = std::variant<uint32_t, uint8_t, float, bool, std::string>;
     using TPostHandleLabda = std::function<void(TEntity*, TEntity::TVariant const&, TEntity::TVariant const&)>;
 
-    struct TEntityArguments {
-        EntityBase* pEntity;
-        std::string id;
-        uint16_t can_id;
-        TMessage command;
-        uint8_t data_offset;
-        uint8_t data_size;
-        float divider;
-        bool isSigned;
-        std::list<std::string> update_entities;
-        uint32_t update_interval;
-        THandleFunc handle_lambda;
-        TUpdateFunc update_lambda;
-        TSetFunc set_lambda;
-        bool handle_lambda_set;
-        bool update_lambda_set;
-        bool set_lambda_set;
-
-        TEntityArguments()
-        : pEntity(nullptr)
-        , id("")
-        , can_id(0x0)
-        , command({})
-        , data_offset(0)
-        , data_size(0)
-        , divider(1)
-        , isSigned(false)
-        , update_entities({})
-        , update_interval(1000)
-        , handle_lambda([](TMessage const&){ return 0; })
-        , update_lambda([](IAccessor const&){ return ""; })
-        , set_lambda([](TMessage&, uint16_t){})
-        , handle_lambda_set(false)
-        , update_lambda_set(false)
-        , set_lambda_set(false)
-        {
-        }
-
-        TEntityArguments(
-            EntityBase* _pEntity,
-            std::string const& _id,
-            uint16_t _can_id,
-            std::string const& _command,
-            uint8_t _data_offset,
-            uint8_t _data_size,
-            float _divider,
-            bool _isSigned,
-            std::list<std::string> const& _update_entities,
-            uint32_t _update_interval,
-            THandleFunc _handle_lambda,
-            TUpdateFunc _update_lambda,
-            TSetFunc _set_lambda,
-            bool _handle_lambda_set,
-            bool _update_lambda_set,
-            bool _set_lambda_set
-        )
-        : pEntity(_pEntity)
-        , id(_id)
-        , can_id(_can_id)
-        , command(Utils::str_to_bytes_array8(_command))
-        , data_offset(_data_offset)
-        , data_size(_data_size)
-        , divider(_divider)
-        , isSigned(_isSigned)
-        , update_entities(_update_entities)
-        , update_interval(_update_interval)
-        , handle_lambda(_handle_lambda)
-        , update_lambda(_update_lambda)
-        , set_lambda(_set_lambda)
-        , handle_lambda_set(_handle_lambda_set)
-        , update_lambda_set(_update_lambda_set)
-        , set_lambda_set(_set_lambda_set)
-        {}
+    // Kind of the entity, the firmware is built without RTTI
+    enum class TType : uint8_t {
+        SENSOR,
+        TEXT_SENSOR,
+        BINARY_SENSOR,
+        NUMBER,
+        SELECT,
+        SWITCH
     };
 
 public:
-    TEntity();
+    explicit TEntity(TType type);
 
-    std::string const& get_id() const { return m_config.id; }
-    void set_id(std::string const& id) { m_config.id = id; }
+    TType get_type() const { return m_type; }
+
+    // Position in the entity manager, assigned by TEntityManager::buildIndices()
+    uint16_t get_index() const { return m_index; }
+    void set_index(uint16_t index) { m_index = index; }
+
+    // Row in g_entity_descriptors, g_entity_descriptors_size for the entities without one
+    uint16_t get_descriptor_index() const;
+
+    const char* get_id() const { return m_id; }
+    void set_id(const char* id) { m_id = id; }
 
     std::string getName() const {
-        return m_config.pEntity != nullptr ? m_config.pEntity->get_name().str() : "<INVALID>";
+        return m_pEntity != nullptr ? m_pEntity->get_name().str() : "<INVALID>";
     }
 
     bool isGetSupported() const {
-        return m_config.pEntity != nullptr;
+        return m_pEntity != nullptr;
     }
 
     uint32_t getLastUpdate() const {
@@ -129,25 +80,30 @@ public:
         m_pCanbus = pCanbus;
     }
 
-    void set_entity(std::string const& name, TEntityArguments&& arg, IAccessor const* accessor) {
-        m_config = std::move(arg);
-        m_expected_reponse = TEntity::calculate_reponse(m_config.command);
-        m_pAccessor = accessor;
-    }
+    void set_entity(
+        uint16_t descriptor_index,
+        EntityBase* pEntity,
+        TUpdateFunc update_lambda,
+        IAccessor const* accessor
+    );
 
     void set_post_handle(TPostHandleLabda&& func) {
         m_post_handle_lambda = std::move(func);
     }
 
-    std::list<std::string> const& get_update_entities() {
-        return m_config.update_entities;
+    void set_request_observer(IRequestObserver* pObserver) {
+        m_pRequestObserver = pObserver;
     }
 
-    TEntityArguments const& get_config() const {
-        return m_config;
+    TEntityDescriptor const& get_descriptor() const {
+        return *m_pDescriptor;
     }
 
-    virtual void update(uint32_t millis);
+    bool has_update_lambda() const { return m_update_lambda != nullptr; }
+    std::string call_update_lambda(IAccessor const& accessor) const { return m_update_lambda(accessor); }
+
+    // GETs without response are expired by TEntityManager with its request_timeout
+    virtual void update(uint32_t millis) {}
 
     bool isMatch(uint32_t can_id, TMessage const& responseData) const;
     bool handle(uint32_t can_id, TMessage const& responseData);
@@ -155,12 +111,9 @@ public:
     bool sendGet(esphome::esp32_can::ESP32Can* pCanBus);
     bool sendSet(esphome::esp32_can::ESP32Can* pCanBus, float value);
 
-    bool isGetNeeded() const;
-    uint32_t getOverdueTime() const;
     bool is_command_configured() const;
 
-    bool isGetInProgress() const;
-    uint32_t get_update_interval() const { return m_config.update_interval; }
+    uint32_t get_update_interval() const { return m_pDescriptor->update_interval; }
 
     static std::array<uint16_t, 7> calculate_reponse(TMessage const& message);
 
@@ -168,7 +121,7 @@ public:
         return Utils::format(
             "TEntity<name: %s, command: %s>",
             getName().c_str(),
-            Utils::to_hex(m_config.command).c_str()
+            Utils::to_hex(m_pDescriptor->command).c_str()
         );
     }
 
@@ -176,49 +129,46 @@ protected:
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) = 0;
 
 protected:
-    TEntityArguments m_config;
+    TEntityDescriptor const* m_pDescriptor;
+    EntityBase* m_pEntity;
     esphome::esp32_can::ESP32Can* m_pCanbus;
 
 private:
+    const TType m_type;
+    bool m_command_configured;
+    uint16_t m_index;
+    const char* m_id;
+    TUpdateFunc m_update_lambda;
     IAccessor const* m_pAccessor;
     std::array<uint16_t, 7> m_expected_reponse;
     uint32_t m_last_handle_timestamp;
-    uint32_t m_last_get_timestamp;
     uint32_t m_last_value_change_timestamp;
     TPostHandleLabda m_post_handle_lambda;
+    IRequestObserver* m_pRequestObserver;
 };
 
-inline bool TEntity::isGetNeeded() const {
-    if (!is_command_configured()) {
-        return false;
+// Size of a 32 bit build as estimated by footprint.py
+#if UINTPTR_MAX == 0xFFFFFFFFu
+static_assert(sizeof(TEntity) == 76, "footprint.py TENTITY_SIZE");
+#endif
+
+// Replaces dynamic_cast, nullptr if the entity is of another type. T is TEntity or a class with a static TYPE.
+template <typename T>
+T* entity_cast(TEntity* pEntity) {
+    if constexpr (std::is_same_v<T, TEntity>) {
+        return pEntity;
+    } else {
+        return (pEntity != nullptr && pEntity->get_type() == T::TYPE) ? static_cast<T*>(pEntity) : nullptr;
     }
-
-    const uint32_t update_interval = get_update_interval();
-    return getLastUpdate() == 0 || (esphome::millis() > (getLastUpdate() + update_interval));
 }
 
-inline uint32_t TEntity::getOverdueTime() const {
-    if (!is_command_configured()) {
-        return 0u;
-    }
-
-    const uint32_t update_interval = get_update_interval();
-    const uint32_t due_time = getLastUpdate() + update_interval;
-    const uint32_t now = esphome::millis();
-
-    if (now > due_time) {
-        return now - due_time;
-    }
-    return 0u;
+template <typename T>
+T const* entity_cast(TEntity const* pEntity) {
+    return entity_cast<T>(const_cast<TEntity*>(pEntity));
 }
 
 inline bool TEntity::is_command_configured() const {
-    for (auto& b : m_config.command) {
-        if (b != 0x00) {
-            return true;
-        }
-    }
-    return false;
+    return m_command_configured;
 }
 
 }
@@ -0,0 +1,35 @@
+#pragma once
+
+#include "esphome/components/daikin_rotex_can/codec.h"
+#include "esphome/components/daikin_rotex_can/types.h"
+#include <cstdint>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Static description of a CAN entity. The table is generated by to_code() into entity_descriptors.cpp
+// and lives in flash, the entities only keep a pointer to their row.
+struct TEntityDescriptor {
+    const char* id;
+    uint16_t can_id;
+    TMessage command;
+    uint8_t data_offset;
+    uint8_t data_size;
+    TCodec codec;
+    float divider;
+    bool isSigned;
+    uint32_t update_interval;
+    uint16_t const* update_entities;    // Indices into g_entity_descriptors
+    uint8_t update_entities_size;
+};
+
+// Sizes of a 32 bit build as estimated by footprint.py
+#if UINTPTR_MAX == 0xFFFFFFFFu
+static_assert(sizeof(TEntityDescriptor) == 48, "footprint.py DESCRIPTOR_SIZE");
+#endif
+
+extern const TEntityDescriptor g_entity_descriptors[];
+extern const uint16_t g_entity_descriptors_size;
+
+}
+}
@@ -1,5 +1,6 @@
 #include "esphome/components/daikin_rotex_can/entity_manager.h"
 #include "esphome/core/hal.h"
+#include <algorithm>
 
 namespace esphome {
 namespace daikin_rotex_can {
@@ -8,14 +9,21 @@ static const char* TAG = "daikin_rotex_can";
 
 TEntityManager::TEntityManager()
 : m_entities()
+, m_frame_index()
+, m_id_index()
+, m_descriptor_index()
+, m_poll_scheduler()
+, m_request_window()
 , m_pCanbus(nullptr)
 , m_last_handle(0u)
-, m_delay_between_requests(250)
+, m_unhandled_frames()
+, m_log_unhandled_frames(false)
 {
 }
 
 void TEntityManager::add(TEntity* pEntity) {
     m_entities.push_back(pEntity);
+    pEntity->set_request_observer(this);
 }
 
 void TEntityManager::removeInvalidRequests() {
@@ -29,102 +37,35 @@ void TEntityManager::removeInvalidRequests() {
     );
 }
 
-CanSensor* TEntityManager::get_sensor(std::string const& id) {
-    TEntity* pEntity = get(id);
-    if (CanSensor* pSensor = dynamic_cast<CanSensor*>(pEntity)) {
-        return pSensor;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a sensor: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "Entity not found: %s", id.c_str());
-    }
-    return nullptr;
-}
-
-CanSensor const* TEntityManager::get_sensor(std::string const& id) const {
-    TEntity const* pEntity = get(id);
-    if (CanSensor const* pSensor = dynamic_cast<CanSensor const*>(pEntity)) {
-        return pSensor;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Const Entity is not a sensor: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "Const Entity not found: %s", id.c_str());
-    }
-    return nullptr;
-}
-
-CanTextSensor* TEntityManager::get_text_sensor(std::string const& id) {
-    TEntity* pEntity = get(id);
-    if (CanTextSensor* pTextSensor = dynamic_cast<CanTextSensor*>(pEntity)) {
-        return pTextSensor;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a text sensor: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "get_text_sensor() => Entity not found: %s", id.c_str());
-    }
-    return nullptr;
-}
-
-CanTextSensor const* TEntityManager::get_text_sensor(std::string const& id) const {
-    TEntity const* pEntity = get(id);
-    if (CanTextSensor const* pTextSensor = dynamic_cast<CanTextSensor const*>(pEntity)) {
-        return pTextSensor;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a text sensor: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "const get_text_sensor() => Entity not found: %s", id.c_str());
-    }
-    return nullptr;
-}
-
-CanBinarySensor const* TEntityManager::get_binary_sensor(std::string const& id) const {
-    TEntity const* pEntity = get(id);
-    if (CanBinarySensor const* pBinarySensor = dynamic_cast<CanBinarySensor const*>(pEntity)) {
-        return pBinarySensor;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a binary sensor: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "const get_binary_sensor() => Entity not found: %s", id.c_str());
-    }
-    return nullptr;
-}
-
-CanNumber const* TEntityManager::get_number(std::string const& id, bool log_missing) const {
-    TEntity const *pEntity = get(id);
-    if (CanNumber const* pNumber = dynamic_cast<CanNumber const*>(pEntity)) {
-        return pNumber;
-    } else if (log_missing) {
-        if (pEntity) {
-            ESP_LOGE(TAG, "Entity is not a number: %s", pEntity->getName().c_str());
-        } else {
-            ESP_LOGE(TAG, "const get_number() => Entity not found: %s", id.c_str());
+// Entities without command are never requested and are left out of the frame index and the poll scheduler
+void TEntityManager::buildIndices() {
+    m_frame_index.clear();
+    m_poll_scheduler.clear();
+    m_id_index.clear();
+    m_id_index.reserve(m_entities.size());
+    m_descriptor_index.assign(g_entity_descriptors_size, nullptr);
+    m_request_window.clear();
+    for (uint32_t index = 0; index < m_entities.size(); ++index) {
+        TEntity* pEntity = m_entities[index];
+        pEntity->set_index(index);
+        m_id_index.emplace(pEntity->get_id(), pEntity);
+        const uint16_t descriptor_index = pEntity->get_descriptor_index();
+        if (descriptor_index < g_entity_descriptors_size) {
+            m_descriptor_index[descriptor_index] = pEntity;
+        }
+        if (pEntity->is_command_configured()) {
+            m_frame_index.add(pEntity->get_descriptor().can_id, pEntity->get_descriptor().command, index);
+            m_poll_scheduler.add(index, pEntity->get_update_interval(), pEntity->getLastUpdate());
         }
     }
-    return nullptr;
-}
-
-CanSelect* TEntityManager::get_select(std::string const& id) {
-    TEntity *pEntity = get(id);
-    if (CanSelect* pSelect = dynamic_cast<CanSelect*>(pEntity)) {
-        return pSelect;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a select: %s", pEntity->getName().c_str());
-    } else {
-        ESP_LOGE(TAG, "toSelect() => Entity not found: %s", id.c_str());
-    }
-    return nullptr;
 }
 
-CanSelect const* TEntityManager::get_select(std::string const& id) const {
-    TEntity const *pEntity = get(id);
-    if (CanSelect const* pSelect = dynamic_cast<CanSelect const*>(pEntity)) {
-        return pSelect;
-    } else if (pEntity) {
-        ESP_LOGE(TAG, "Entity is not a select: %s", pEntity->getName().c_str());
+void TEntityManager::logInvalidEntity(std::string_view id, TEntity const* pEntity) const {
+    if (pEntity != nullptr) {
+        ESP_LOGE(TAG, "Entity has an unexpected type: %s", pEntity->getName().c_str());
     } else {
-        ESP_LOGE(TAG, "const get_select() => Entity not found: %s", id.c_str());
+        ESP_LOGE(TAG, "Entity not found: %.*s", static_cast<int>(id.size()), id.data());
     }
-    return nullptr;
 }
 
 bool TEntityManager::sendNextPendingGet() {
@@ -135,73 +76,65 @@ bool TEntityManager::sendNextPendingGet() {
     return false;
 }
 
-void TEntityManager::sendSet(std::string const& request_name, float value) {
-    const auto it = std::find_if(m_entities.begin(), m_entities.end(),
-        [&request_name](auto pEntity) { return pEntity->getName() == request_name; }
-    );
-    if (it != m_entities.end()) {
-        (*it)->sendSet(m_pCanbus, value * (*it)->get_config().divider);
+void TEntityManager::sendSet(TEntity* pEntity, float value) {
+    if (pEntity != nullptr) {
+        pEntity->sendSet(m_pCanbus, value * pEntity->get_descriptor().divider);
     } else {
-        ESP_LOGE(TAG, "sendSet: Unknown request: %s", request_name.c_str());
+        ESP_LOGE(TAG, "sendSet: Entity is null!");
     }
 }
 
 void TEntityManager::handle(uint32_t can_id, TMessage const& responseData) {
-    bool bHandled = false;
-    for (auto pEntity : m_entities) {
-        if (pEntity->handle(can_id, responseData)) {
-            bHandled = true;
-            break;
-        }
-    }
+    const uint16_t index = m_frame_index.find(can_id, responseData);
+    const bool bHandled = index != TFrameIndex::NOT_FOUND && m_entities[index]->handle(can_id, responseData);
     m_last_handle = esphome::millis();
-    if (!bHandled) {
-        Utils::log("unhandled", "can_id<%s> data<%s>", Utils::to_hex(can_id).c_str(), Utils::to_hex(responseData).c_str());
+    m_request_window.received(m_last_handle);
+    if (bHandled) {
+        m_request_window.answered(index);
+        m_poll_scheduler.update(index, m_entities[index]->getLastUpdate());
+    } else {
+        m_unhandled_frames.add(can_id, responseData, m_last_handle);
+        if (m_log_unhandled_frames) {
+            Utils::log("unhandled", "can_id<%s> data<%s>", Utils::to_hex(can_id).c_str(), Utils::to_hex(responseData).c_str());
+        }
     }
 }
 
-TEntity* TEntityManager::get(std::string const& id) {
-    for (auto pEntity: m_entities) {
-        if (pEntity->get_id() == id) {
-            return pEntity;
-        }
-    }
-    return nullptr;
+TEntity* TEntityManager::get(std::string_view id) {
+    const auto it = m_id_index.find(id);
+    return it != m_id_index.end() ? it->second : nullptr;
 }
 
-TEntity const* TEntityManager::get(std::string const& id) const {
-    for (auto pEntity: m_entities) {
-        if (pEntity->get_id() == id) {
-            return pEntity;
-        }
+TEntity const* TEntityManager::get(std::string_view id) const {
+    const auto it = m_id_index.find(id);
+    return it != m_id_index.end() ? it->second : nullptr;
+}
+
+void TEntityManager::on_get_sent(TEntity* pEntity) {
+    const uint16_t index = pEntity->get_index();
+    if (index < m_entities.size() && m_entities[index] == pEntity) {
+        m_request_window.sent(index, esphome::millis());
+        m_poll_scheduler.suspend(index);
     }
-    return nullptr;
 }
 
+// A GET without response within the request timeout is lost, its entity is due again at its former due time
 TEntity* TEntityManager::getNextRequestToSend() {
     const uint32_t now = esphome::millis();
 
-    if (now < (m_last_handle + m_delay_between_requests)) {
-        return nullptr;
+    uint16_t expired;
+    while ((expired = m_request_window.expire(now)) != TRequestWindow::NONE) {
+        ESP_LOGW(TAG, "GET timeout: %s", m_entities[expired]->getName().c_str());
+        m_poll_scheduler.resume(expired);
     }
 
-    for (auto pEntity : m_entities) {
-        if (pEntity->isGetInProgress()) {
-            return nullptr;
-        }
+    if (!m_request_window.canSend(now)) {
+        return nullptr;
     }
 
-    TEntity* pNext = nullptr;
-    for (auto pEntity : m_entities) {
-        if (pEntity->isGetNeeded()) {
-            if (pNext == nullptr || pEntity->getOverdueTime() > pNext->getOverdueTime()) {
-                pNext = pEntity;
-            }
-        }
-    }
-    return pNext;
+    const uint16_t index = m_poll_scheduler.next(now);
+    return index != TPollScheduler::NONE ? m_entities[index] : nullptr;
 }
 
-
 }
 }
\ No newline at end of file
@@ -2,52 +2,66 @@
 
 #include "esphome/components/daikin_rotex_can/sensors.h"
 #include "esphome/components/daikin_rotex_can/entity.h"
+#include "esphome/components/daikin_rotex_can/frame_index.h"
+#include "esphome/components/daikin_rotex_can/poll_scheduler.h"
+#include "esphome/components/daikin_rotex_can/request_window.h"
+#include "esphome/components/daikin_rotex_can/unhandled_frames.h"
+#include <string_view>
+#include <unordered_map>
 
 namespace esphome {
 namespace daikin_rotex_can {
 
-class TEntityManager {
+class TEntityManager : public IRequestObserver {
 public:
     TEntityManager();
     void add(TEntity* pRequest);
 
     void removeInvalidRequests();
+    void buildIndices();
 
     void setCanbus(esphome::esp32_can::ESP32Can* pCanbus);
     esphome::esp32_can::ESP32Can* getCanbus() const;
 
     uint32_t size() const;
     TEntity const* get(uint32_t index) const;
-    TEntity* get(std::string const& id);
-    TEntity const* get(std::string const& id) const;
+    TEntity* get(std::string_view id);
+    TEntity const* get(std::string_view id) const;
 
-    const std::vector<TEntity*>& get_entities() const { return m_entities; }
-    void set_delay_between_requests(uint16_t milliseconds);
-
-    CanSensor* get_sensor(std::string const& id);
-    CanSensor const* get_sensor(std::string const& id) const;
-
-    CanTextSensor* get_text_sensor(std::string const& id);
-    CanTextSensor const* get_text_sensor(std::string const& id) const;
-
-    CanBinarySensor const* get_binary_sensor(std::string const& id) const;
+    // Entity of a row in g_entity_descriptors, nullptr if the row has none in the manager
+    TEntity* getByDescriptor(uint16_t descriptor_index) const;
 
-    CanNumber const* get_number(std::string const& id, bool log_missing = true) const;
+    // Typed lookup, nullptr if the entity is missing or of another type. A wrong type is always logged.
+    template <typename T>
+    T* get_as(std::string_view id, bool log_missing = true);
 
-    CanSelect* get_select(std::string const& id);
-    CanSelect const* get_select(std::string const& id) const;
+    const std::vector<TEntity*>& get_entities() const { return m_entities; }
+    void set_delay_between_requests(uint16_t milliseconds);
+    void set_request_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second);
+    void set_log_unhandled_frames(bool log_unhandled_frames) { m_log_unhandled_frames = log_unhandled_frames; }
+    TUnhandledFrames const& get_unhandled_frames() const { return m_unhandled_frames; }
 
     bool sendNextPendingGet();
-    void sendSet(std::string const& request_name, float value);
+    void sendSet(TEntity* pEntity, float value);
     void handle(uint32_t can_id, TMessage const& responseData);
 
+    // IRequestObserver
+    virtual void on_get_sent(TEntity* pEntity) override;
+
 private:
     TEntity* getNextRequestToSend();
+    void logInvalidEntity(std::string_view id, TEntity const* pEntity) const;
 
     std::vector<TEntity*> m_entities;
+    TFrameIndex m_frame_index;
+    std::unordered_map<std::string_view, TEntity*> m_id_index;     // The ids point to g_entity_descriptors
+    std::vector<TEntity*> m_descriptor_index;                       // Per row of g_entity_descriptors
+    TPollScheduler m_poll_scheduler;
+    TRequestWindow m_request_window;
     esphome::esp32_can::ESP32Can* m_pCanbus;
     uint32_t m_last_handle;
-    uint16_t m_delay_between_requests;
+    TUnhandledFrames m_unhandled_frames;
+    bool m_log_unhandled_frames;
 };
 
 inline void TEntityManager::setCanbus(esphome::esp32_can::ESP32Can* pCanbus) {
@@ -66,9 +80,53 @@ inline TEntity const* TEntityManager::get(uint32_t index) const {
     return (index < m_entities.size()) ? m_entities[index] : nullptr;
 }
 
+inline TEntity* TEntityManager::getByDescriptor(uint16_t descriptor_index) const {
+    return (descriptor_index < m_descriptor_index.size()) ? m_descriptor_index[descriptor_index] : nullptr;
+}
+
+template <typename T>
+T* TEntityManager::get_as(std::string_view id, bool log_missing) {
+    TEntity* pEntity = get(id);
+    T* pTyped = entity_cast<T>(pEntity);
+    if (pTyped == nullptr && (pEntity != nullptr || log_missing)) {
+        logInvalidEntity(id, pEntity);
+    }
+    return pTyped;
+}
+
 inline void TEntityManager::set_delay_between_requests(uint16_t milliseconds) {
-    m_delay_between_requests = milliseconds;
+    m_request_window.set_delay_between_requests(milliseconds);
 }
 
+inline void TEntityManager::set_request_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second) {
+    m_request_window.set_pipeline(max_requests_in_flight, request_timeout_ms, max_frames_per_second);
+}
+
+// Entity of the manager resolved once, e.g. in setup(), instead of looking it up by id on every use
+template <typename T>
+class TEntityHandle {
+public:
+    explicit TEntityHandle(const char* id)
+    : m_id(id)
+    , m_pEntity(nullptr)
+    {
+    }
+
+    // Optional entities are not configured by every user, only a wrong type is logged by default
+    T* resolve(TEntityManager& manager, bool log_missing = false) {
+        m_pEntity = manager.get_as<T>(m_id, log_missing);
+        return m_pEntity;
+    }
+
+    const char* get_id() const { return m_id; }
+    T* get() const { return m_pEntity; }
+    T* operator->() const { return m_pEntity; }
+    explicit operator bool() const { return m_pEntity != nullptr; }
+
+private:
+    const char* m_id;
+    T* m_pEntity;
+};
+
 }
 }
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+    Config time estimate of the heap and flash needed by the selected entities on an ESP32.
+
+    The object sizes are sizeof() of a 32 bit build (g++ -m32, libstdc++) against the ESPHome 2026.6.5
+    headers: 32 bit pointers, a 24 byte std::string with 15 chars of small string buffer and a 16 byte
+    std::function. The daikin_rotex_can parts are pinned by static_asserts in 32 bit builds, the ESPHome
+    base classes change with the ESPHome version. The 8 byte header per heap allocation and the code
+    sizes of the generated setup() statements and update_lambdas are assumed, not measured.
+"""
+
+POINTER_SIZE = 4
+STRING_SSO_CAPACITY = 15
+ALLOCATION_HEADER = 8
+
+TENTITY_SIZE = 76       # vtable, 7 pointers, type tag and index, expected response, 2 timestamps, post handle std::function
+PARENTED_SIZE = POINTER_SIZE
+
+# Heap of one object created by new_Pvariable(): ESPHome base class + TEntity + own members
+HEAP_PER_OBJECT = {
+    "CanSensor": 44 + TENTITY_SIZE + PARENTED_SIZE + 68,                # state, range, PID, smoothing
+    "CanTextSensor": 80 + TENTITY_SIZE + PARENTED_SIZE + 20,            # value map, recalculate std::function
+    "CanBinarySensor": 40 + TENTITY_SIZE + PARENTED_SIZE,
+    "CanNumber": 48 + TENTITY_SIZE + PARENTED_SIZE,
+    "CanSelect": 68 + TENTITY_SIZE + PARENTED_SIZE + 20,                # value map, custom select std::function
+    "CanSwitch": 40 + TENTITY_SIZE + PARENTED_SIZE,
+    "DHWRunButton": 28 + PARENTED_SIZE,
+    "CustomNumber": 48 + PARENTED_SIZE,
+}
+
+REGISTRATION_SIZE = 2 * POINTER_SIZE    # App and TEntityManager keep a pointer to every entity
+ID_INDEX_SIZE = ALLOCATION_HEADER + 20 + POINTER_SIZE    # Node of the id std::unordered_map with its cached hash, and its bucket
+DESCRIPTOR_INDEX_SIZE = POINTER_SIZE    # Entity of the descriptor row in TEntityManager
+FRAME_INDEX_SIZE = 2 * 2 * 8            # Two 8 byte TFrameIndex slots per polled entity at a load factor of 0.5
+POLL_SCHEDULER_SIZE = 12 + 2            # TPollScheduler slot and heap entry per polled entity
+
+DESCRIPTOR_SIZE = 48                    # sizeof(TEntityDescriptor)
+VALUE_MAP_SIZE = 16                     # sizeof(TValueMap)
+VALUE_MAP_ENTRY_SIZE = 2 + POINTER_SIZE + 1
+SETUP_CODE_SIZE = 160                   # Generated setup() statements of one entity
+UPDATE_FUNCTION_SIZE = 800              # Generated update_lambda function with its std::string operations
+
+def _string_heap(text) -> int:
+    """Heap of a std::string holding text, beyond the std::string object itself."""
+    length = len(str(text).encode("utf-8"))
+    if length <= STRING_SSO_CAPACITY:
+        return 0
+    return ALLOCATION_HEADER + (length + 1 + 3) // 4 * 4
+
+def _cstring(text) -> int:
+    return len(str(text).encode("utf-8")) + 1
+
+def estimate_footprint(entities) -> dict:
+    """
+    entities is a list of dicts describing the generated objects:
+        name, cpp_class, display_name, descriptor (bool), command (bool), update_entities (count),
+        value_map (tuple of (key, label) or None), options (select labels), update_function (body or None)
+
+    Value maps, labels and update functions which are shared by several entities are counted once,
+    at the first entity using them. Returns the per entity rows (name, cpp_class, heap, flash) and the totals.
+    """
+    value_maps = set()
+    labels = set()
+    update_functions = set()
+
+    rows = []
+    for entity in entities:
+        heap = ALLOCATION_HEADER + HEAP_PER_OBJECT[entity["cpp_class"]] + REGISTRATION_SIZE
+        flash = SETUP_CODE_SIZE + 2 * _cstring(entity["display_name"])     # name and object id
+
+        if entity.get("descriptor"):
+            flash += DESCRIPTOR_SIZE + _cstring(entity["name"]) + 2 * entity.get("update_entities", 0)
+            heap += ID_INDEX_SIZE + DESCRIPTOR_INDEX_SIZE
+
+        if entity.get("command"):
+            heap += FRAME_INDEX_SIZE + POLL_SCHEDULER_SIZE
+
+        if (value_map := entity.get("value_map")) and value_map not in value_maps:
+            value_maps.add(value_map)
+            flash += VALUE_MAP_SIZE + VALUE_MAP_ENTRY_SIZE * len(value_map)
+            for _, label in value_map:
+                if label not in labels:
+                    labels.add(label)
+                    flash += _cstring(label)
+
+        # Select options point into g_value_maps, SelectTraits keeps a vector of the pointers. Text sensors keep state and raw state
+        options = entity.get("options", [])
+        if options:
+            heap += ALLOCATION_HEADER + len(options) * POINTER_SIZE
+        elif entity["cpp_class"] == "CanTextSensor" and value_map:
+            heap += 2 * max(_string_heap(label) for _, label in value_map)
+
+        if (body := entity.get("update_function")) and body not in update_functions:
+            update_functions.add(body)
+            flash += UPDATE_FUNCTION_SIZE
+
+        rows.append((entity["name"], entity["cpp_class"], heap, flash))
+
+    return {
+        "rows": rows,
+        "heap": sum(row[2] for row in rows),
+        "flash": sum(row[3] for row in rows),
+    }
+
+def format_footprint(report) -> str:
+    """Summary table of an estimate_footprint() result."""
+    lines = [f"{'Entity':<40} {'Class':<16} {'Heap':>7} {'Flash':>7}"]
+    for name, cpp_class, heap, flash in report["rows"]:
+        lines.append(f"{name:<40} {cpp_class:<16} {heap:>7} {flash:>7}")
+    lines.append(f"{'Total':<40} {len(report['rows']):<16} {report['heap']:>7} {report['flash']:>7}")
+    lines.append("Rough estimate: the code sizes and the heap allocation header are not calibrated against a firmware build")
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+#include "esphome/components/daikin_rotex_can/frame_index.h"
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+static constexpr uint32_t MIN_CAPACITY = 16;
+
+TFrameIndex::TFrameIndex()
+: m_slots()
+, m_size(0)
+{
+}
+
+uint32_t TFrameIndex::getKey(TMessage const& data) {
+    if (data[2] == 0xFA) {
+        return (data[2] << 16) | (data[3] << 8) | data[4];
+    }
+    return data[2];
+}
+
+void TFrameIndex::add(uint16_t can_id, TMessage const& command, uint16_t entity_index) {
+    const uint32_t key = getKey(command);
+    insert(can_id, key, entity_index);
+    insert(ANY_CAN_ID, key, entity_index);
+}
+
+void TFrameIndex::clear() {
+    m_slots.clear();
+    m_size = 0;
+}
+
+uint16_t TFrameIndex::find(uint32_t can_id, TMessage const& data) const {
+    if (m_size == 0 || can_id >= ANY_CAN_ID) {
+        return NOT_FOUND;
+    }
+
+    const uint8_t mode = data[0] & 0x0F;
+    const bool is_rocon_panel_frame = can_id == ROCON_CAN_ID && (mode == 0x00 || mode == 0x02);
+    return lookup(is_rocon_panel_frame ? ANY_CAN_ID : can_id, getKey(data));
+}
+
+void TFrameIndex::insert(uint16_t can_id, uint32_t key, uint16_t entity_index) {
+    if ((m_size + 1) * 2 > m_slots.size()) {
+        grow();
+    }
+
+    const uint32_t mask = m_slots.size() - 1;
+    for (uint32_t slot = getSlot(can_id, key); ; slot = (slot + 1) & mask) {
+        TSlot& entry = m_slots[slot];
+        if (entry.entity_index == NOT_FOUND) {
+            entry = {key, can_id, entity_index};
+            ++m_size;
+            return;
+        }
+        if (entry.key == key && entry.can_id == can_id) {
+            return;     // First added entity wins
+        }
+    }
+}
+
+uint16_t TFrameIndex::lookup(uint16_t can_id, uint32_t key) const {
+    const uint32_t mask = m_slots.size() - 1;
+    for (uint32_t slot = getSlot(can_id, key); ; slot = (slot + 1) & mask) {
+        TSlot const& entry = m_slots[slot];
+        if (entry.entity_index == NOT_FOUND || (entry.key == key && entry.can_id == can_id)) {
+            return entry.entity_index;
+        }
+    }
+}
+
+uint32_t TFrameIndex::getSlot(uint16_t can_id, uint32_t key) const {
+    const uint32_t hash = (key ^ (static_cast<uint32_t>(can_id) << 20)) * 2654435761u;   // Knuth's multiplicative hash
+    return (hash ^ (hash >> 16)) & (m_slots.size() - 1);
+}
+
+void TFrameIndex::grow() {
+    std::vector<TSlot> slots = std::move(m_slots);
+    m_slots.assign(slots.empty() ? MIN_CAPACITY : slots.size() * 2, {0, 0, NOT_FOUND});
+    m_size = 0;
+    for (TSlot const& entry : slots) {
+        if (entry.entity_index != NOT_FOUND) {
+            insert(entry.can_id, entry.key, entry.entity_index);
+        }
+    }
+}
+
+}
+}
@@ -0,0 +1,51 @@
+#pragma once
+
+#include "esphome/components/daikin_rotex_can/types.h"
+#include <cstdint>
+#include <vector>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Routes a received frame to the entity which handles it, built once at setup from the entity commands.
+// A frame matches by its can id and register (bytes 2-4 of 0xFA frames, otherwise byte 2), responses and
+// sets of the RoCon control panel (0x10A) match by the register only. Like the former walk over all
+// entities, the first added entity wins. Open addressing with linear probing, the load factor stays <= 0.5.
+class TFrameIndex {
+public:
+    static constexpr uint16_t NOT_FOUND = 0xFFFF;
+    static constexpr uint32_t ROCON_CAN_ID = 0x10A;
+
+    TFrameIndex();
+
+    void add(uint16_t can_id, TMessage const& command, uint16_t entity_index);
+    void clear();
+
+    // Index of the entity or NOT_FOUND
+    uint16_t find(uint32_t can_id, TMessage const& data) const;
+
+    uint32_t size() const { return m_size; }
+    uint32_t capacity() const { return m_slots.size(); }
+
+    static uint32_t getKey(TMessage const& data);
+
+private:
+    static constexpr uint16_t ANY_CAN_ID = 0xFFFF;
+
+    struct TSlot {
+        uint32_t key;
+        uint16_t can_id;
+        uint16_t entity_index;  // NOT_FOUND for empty slots
+    };
+
+    void insert(uint16_t can_id, uint32_t key, uint16_t entity_index);
+    uint16_t lookup(uint16_t can_id, uint32_t key) const;
+    uint32_t getSlot(uint16_t can_id, uint32_t key) const;
+    void grow();
+
+    std::vector<TSlot> m_slots;     // Size is a power of two
+    uint32_t m_size;
+};
+
+}
+}
@@ -0,0 +1,22 @@
+#include "esphome/components/daikin_rotex_can/heating_curve.h"
+
+#include <algorithm>
+#include <cmath>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+float THeatingCurve::calculate(float outside, float room) const {
+    if (std::isnan(outside)) {
+        return NAN;
+    }
+
+    float supply = m_max_supply - m_log_factor * std::log(std::max(outside, m_min_outside) - m_min_outside + 1.0f);
+    if (!std::isnan(room) && m_room_factor != 0.0f) {
+        supply += m_room_factor * (m_target_room - room);
+    }
+    return std::clamp(std::round(supply * 10.0f) / 10.0f, m_min_supply, m_max_supply);
+}
+
+}
+}
@@ -0,0 +1,36 @@
+#pragma once
+
+#include <cstdint>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Logarithmic heating curve of templates/Adaptive_Heizkurve.yaml:
+//   supply = max_supply - log_factor * ln(outside - min_outside + 1) + room_factor * (target_room - room)
+// The outside temperature is limited to min_outside, the result is rounded to 0.1 and limited to [min_supply, max_supply].
+class THeatingCurve {
+public:
+    THeatingCurve(float min_supply, float max_supply, float log_factor, float min_outside, float target_room, float room_factor)
+    : m_min_supply(min_supply)
+    , m_max_supply(max_supply)
+    , m_log_factor(log_factor)
+    , m_min_outside(min_outside)
+    , m_target_room(target_room)
+    , m_room_factor(room_factor)
+    {
+    }
+
+    // Supply setpoint, room is NAN without room temperature. NAN if outside is NAN.
+    float calculate(float outside, float room) const;
+
+private:
+    float m_min_supply;
+    float m_max_supply;
+    float m_log_factor;
+    float m_min_outside;
+    float m_target_room;
+    float m_room_factor;
+};
+
+}
+}
@@ -0,0 +1,413 @@
+"""
+    Virtual Rotex / Daikin HPSU for load tests of the CAN protocol path without a heat pump.
+
+    Every register of sensor_configuration is served on a python-can bus (the virtual interface or a
+    SocketCAN vcan device): GETs on 0x680 are answered on the can id of the addressed device (high
+    nibble of byte 0 times 0x80, e.g. 0x31 -> 0x180) after a configurable latency, or lost with a
+    configurable probability. SETs overwrite the data bytes of the register. The RoCon control panel
+    is simulated by unsolicited responses and sets on 0x10A at a configurable rate.
+
+    Entities which share a register (same device and match key) share its data bytes, so values are
+    encoded and decoded like by the entities of the component (codec, divider, signed). Sensors
+    follow a random walk by default, other dynamics are passed per entity name:
+
+        simulator = HpsuSimulator(bus, sensor_configuration, dynamics={"tv": sine(35.0, 5.0, 3600.0)})
+        task = asyncio.create_task(simulator.run())
+
+    All frames share one transmit queue which is sent no faster than the bitrate of the bus allows
+    (20 kbps like the HPSU, None for an unlimited bus), received frames occupy the bus as well. So a
+    poller can be driven at the full bus rate. stats counts the frames, staleness() tells how long ago each entity was served.
+
+    Usage (from the components directory, requires esphome, numpy and python-can):
+        python3 -m daikin_rotex_can.hpsu_simulator [--interface socketcan] [--channel vcan0] [--latency 0.02] [--loss 0.01] [--rocon-rate 2]
+"""
+
+import argparse
+import asyncio
+import heapq
+import logging
+import math
+import random
+import time
+
+import can
+
+from . import codec, sensor_configuration
+from .can_gateway import REQUEST_CAN_ID, decode_frame
+from .can_log_decoder import FRAME_SIZE, ROCON_CAN_ID, compile_entity
+from .descriptors import parse_command
+from .translations.translate import SUPPORTED_LANGUAGES, set_language
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BITRATE = 20000         # bits per second, HPSU heat pumps require 20 kbps
+FRAME_BITS = 111                # standard frame with 7 data bytes: 103 bits plus the average bit stuffing
+DEFAULT_LATENCY = 0.02          # seconds between a GET and its response
+MAX_PENDING_FRAMES = 256        # transmit queue, further frames are dropped like by a full controller
+RESPONSE_HEADER = (0xD2, 0x00)  # response (mode 0x02) to 0x680
+PANEL_DEVICE_CAN_ID = 0x180     # the RoCon control panel reads and writes the registers of this device
+ROCON_RESPONSE_HEADER = (0x32, 0x10)
+ROCON_SET_HEADER = (0x30, 0x10)
+MODE_SET = 0x00
+MODE_GET = 0x01
+STATS = ["requests", "sets", "responses", "lost", "unknown", "overflow", "rocon_frames"]
+
+def device_can_id(data) -> int:
+    """Can id of the device addressed by a request on 0x680."""
+    return (data[0] >> 4) * 0x80
+
+def data_start(data) -> int:
+    """First data byte behind the register address: 0xFA commands are addressed by bytes 2-4, the others by byte 2."""
+    return 5 if data[2] == 0xFA else 3
+
+def random_walk(step, low=None, high=None, rng=random):
+    """Dynamics which moves the value by a normally distributed step per second, limited to [low, high]."""
+    def dynamics(t, value, dt):
+        value += rng.gauss(0.0, step * math.sqrt(dt))
+        if low is not None:
+            value = max(value, low)
+        if high is not None:
+            value = min(value, high)
+        return value
+    return dynamics
+
+def sine(mean, amplitude, period):
+    """Dynamics which follows mean + amplitude * sin(2 pi t / period), t in seconds since the start."""
+    return lambda t, value, dt: mean + amplitude * math.sin(2.0 * math.pi * t / period)
+
+class SimulatedEntity:
+    def __init__(self, sens_conf, register):
+        self.entity = compile_entity(sens_conf)
+        self.name = self.entity["name"]
+        self.register = register
+        self.dynamics = None
+        self.last_update = None
+        self.last_served = None
+
+    def is_valid(self) -> bool:
+        offset = self.entity["data_offset"]
+        return offset > 0 and offset + self.entity["data_size"] <= FRAME_SIZE and 1 <= self.entity["data_size"] <= 2
+
+    def is_writable(self) -> bool:
+        return self.entity["type"] in ["number", "select", "switch"]
+
+    def value(self):
+        decoded = decode_frame(self.entity, self.register)
+        return None if decoded is None else decoded[0]
+
+    def set_value(self, value):
+        """Encodes the value into the data bytes of the register like TEntity::sendSet()."""
+        offset = self.entity["data_offset"]
+        size = self.entity["data_size"]
+        match self.entity["type"]:
+            case "sensor" | "number":
+                raw = round(value * self.entity["divider"])
+            case _:
+                raw = int(value)
+        current = (self.register[offset] << 8) + self.register[offset + 1] if size == 2 else self.register[offset]
+        raw = codec.encode(self.entity["codec"], current, raw & 0xFFFF) & (0xFFFF if size == 2 else 0xFF)
+        if size == 2:
+            self.register[offset:offset + 2] = bytes([raw >> 8, raw & 0xFF])
+        else:
+            self.register[offset] = raw
+
+    def initial_value(self):
+        """The middle of the range of sensors and numbers, the first option of selects, otherwise 0."""
+        range_min, range_max = self.entity["range"]
+        if self.entity["type"] in ["sensor", "number"] and (range_min != 0 or range_max != 0):
+            return (range_min + range_max) / 2.0
+        if self.entity["type"] == "select" and self.entity["keys"]:
+            return self.entity["keys"][0]
+        return 0
+
+    def default_dynamics(self, rng):
+        """Sensors walk by one resolution step per minute, within their range if they have one."""
+        if self.entity["type"] != "sensor":
+            return None
+        range_min, range_max = self.entity["range"]
+        has_range = range_min != 0 or range_max != 0
+        return random_walk(
+            1.0 / self.entity["divider"] / math.sqrt(60.0),
+            range_min if has_range else None,
+            range_max if has_range else None,
+            rng
+        )
+
+    def random_value(self, rng):
+        """New value of a RoCon panel set."""
+        match self.entity["type"]:
+            case "select":
+                return rng.choice(self.entity["keys"]) if self.entity["keys"] else 0
+            case "switch":
+                return not self.value()
+        value = self.value() or 0.0
+        return value + rng.choice([-1.0, 1.0]) / self.entity["divider"]
+
+class BusTransmitter:
+    """Transmit queue which sends the frames in order of their due time, one frame time apart."""
+
+    def __init__(self, bitrate=DEFAULT_BITRATE, max_pending=MAX_PENDING_FRAMES):
+        self.frame_time = 0.0 if bitrate is None else FRAME_BITS / bitrate
+        self.max_pending = max_pending
+        self.bus_free = -math.inf
+        self._pending = []
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, due, can_id, data) -> bool:
+        """Queues a frame, False if the queue is full."""
+        if len(self._pending) >= self.max_pending:
+            return False
+        heapq.heappush(self._pending, (due, self._sequence, can_id, bytes(data)))
+        self._sequence += 1
+        return True
+
+    def next_time(self):
+        """Time at which the next frame can be sent, None if the queue is empty."""
+        if not self._pending:
+            return None
+        return max(self._pending[0][0], self.bus_free)
+
+    def occupy(self, now):
+        """Reserves the bus for one frame time for a frame of another node."""
+        self.bus_free = max(now, self.bus_free) + self.frame_time
+
+    def pop(self, now):
+        """(can_id, data) of the frame to send now, None if none is due or the bus is still busy."""
+        next_time = self.next_time()
+        if next_time is None or now < next_time:
+            return None
+        _, _, can_id, data = heapq.heappop(self._pending)
+        self.bus_free = max(now, self.bus_free) + self.frame_time
+        return can_id, data
+
+class HpsuSimulator:
+    """Serves the registers of the given sensor_configuration entries on a python-can bus."""
+
+    def __init__(self, bus, sens_confs, latency=DEFAULT_LATENCY, jitter=0.0, loss=0.0, dynamics=None,
+                 initial_values=None, rocon_rate=0.0, rocon_set_ratio=0.0, bitrate=DEFAULT_BITRATE,
+                 seed=None, clock=time.monotonic):
+        self.bus = bus
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rocon_rate = rocon_rate
+        self.rocon_set_ratio = rocon_set_ratio
+        self.transmitter = BusTransmitter(bitrate)
+        self.stats = {name: 0 for name in STATS}
+        self._rng = random.Random(seed)
+        self._clock = clock
+        self._start = clock()
+        self._wakeup = None
+
+        # Entities sharing device and match key share the data bytes, the command without data is the initial content
+        self.registers = {}
+        self.entities = []
+        self._register_entities = {}
+        for sens_conf in sens_confs:
+            command = parse_command(sens_conf.get("command", ""))
+            if not any(command):
+                continue
+            entity = SimulatedEntity(sens_conf, None)
+            if not entity.is_valid():
+                continue
+            key = self._register_key(entity.entity["can_id"], command)
+            if key not in self.registers:
+                register = bytearray(command)
+                register[data_start(command):] = bytes(FRAME_SIZE - data_start(command))
+                self.registers[key] = register
+                self._register_entities[key] = []
+            entity.register = self.registers[key]
+            self._register_entities[key].append(entity)
+            self.entities.append(entity)
+
+        dynamics = dynamics or {}
+        initial_values = initial_values or {}
+        self._by_name = {}
+        for entity in self.entities:
+            self._by_name.setdefault(entity.name, entity)
+            entity.dynamics = dynamics.get(entity.name, entity.default_dynamics(self._rng))
+        # Reverse order, so the first entity of a shared register, which decodes it in the component, wins
+        for entity in reversed(self.entities):
+            entity.set_value(initial_values.get(entity.name, entity.initial_value()))
+        self._panel_entities = [entity for entity in self.entities if entity.entity["can_id"] == PANEL_DEVICE_CAN_ID]
+
+    def value(self, name):
+        """Current value of an entity as decoded by the component."""
+        return self._by_name[name].value()
+
+    def set_value(self, name, value):
+        self._by_name[name].set_value(value)
+
+    def staleness(self, now=None) -> dict:
+        """Seconds since the value of every entity was last sent, None if it was never sent."""
+        now = self._clock() if now is None else now
+        return {
+            entity.name: None if entity.last_served is None else now - entity.last_served
+            for entity in self.entities
+        }
+
+    def _register_key(self, can_id, data):
+        return can_id, bytes(data[2:data_start(data)])
+
+    def _update_values(self, key, now):
+        """Applies the dynamics of all entities of the register up to now."""
+        for entity in self._register_entities[key]:
+            if entity.dynamics is not None:
+                dt = 0.0 if entity.last_update is None else now - entity.last_update
+                entity.set_value(entity.dynamics(now - self._start, entity.value() or 0.0, dt))
+            entity.last_update = now
+            entity.last_served = now
+
+    def handle_request(self, data, now):
+        """Handles a frame on 0x680, returns the response as (can_id, data) or None."""
+        if len(data) < FRAME_SIZE:
+            return None
+        data = bytes(data[:FRAME_SIZE])
+        can_id = device_can_id(data)
+        key = self._register_key(can_id, data)
+        register = self.registers.get(key)
+        mode = data[0] & 0x0F
+
+        if mode == MODE_SET:
+            self.stats["sets"] += 1
+            if register is not None:
+                register[data_start(data):] = data[data_start(data):]
+            return None
+        if mode != MODE_GET:
+            return None
+
+        self.stats["requests"] += 1
+        if register is None:
+            self.stats["unknown"] += 1
+            _LOGGER.debug("unknown register can_id<0x%X> data<%s>", can_id, data.hex(" ").upper())
+            return None
+        if self._rng.random() < self.loss:
+            self.stats["lost"] += 1
+            return None
+
+        self._update_values(key, now)
+        response = bytearray(register)
+        response[0:2] = RESPONSE_HEADER
+        return can_id, bytes(response)
+
+    def rocon_frame(self, now):
+        """Unsolicited frame of the RoCon control panel on 0x10A: a response or, with rocon_set_ratio, a set of a random register."""
+        if not self._panel_entities:
+            return None
+        entity = self._rng.choice(self._panel_entities)
+        header = ROCON_RESPONSE_HEADER
+        if entity.is_writable() and self._rng.random() < self.rocon_set_ratio:
+            entity.set_value(entity.random_value(self._rng))
+            header = ROCON_SET_HEADER
+        self._update_values(self._register_key(entity.entity["can_id"], entity.register), now)
+        frame = bytearray(entity.register)
+        frame[0:2] = header
+        return ROCON_CAN_ID, bytes(frame)
+
+    def _queue(self, due, frame):
+        if frame is None:
+            return
+        if not self.transmitter.push(due, *frame):
+            self.stats["overflow"] += 1
+            return
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def response_delay(self):
+        return self.latency + self._rng.uniform(0.0, self.jitter)
+
+    async def run(self):
+        """Serves requests until cancelled."""
+        loop = asyncio.get_running_loop()
+        reader = can.AsyncBufferedReader()
+        notifier = can.Notifier(self.bus, [reader], loop=loop)
+        self._wakeup = asyncio.Event()
+        try:
+            await asyncio.gather(self._receive(reader), self._transmit(), self._rocon_panel())
+        finally:
+            notifier.stop()
+            self._wakeup = None
+
+    async def _receive(self, reader):
+        while True:
+            message = await reader.get_message()
+            now = self._clock()
+            self.transmitter.occupy(now)
+            if message.arbitration_id == REQUEST_CAN_ID and not message.is_error_frame:
+                self._queue(now + self.response_delay(), self.handle_request(message.data, now))
+
+    async def _rocon_panel(self):
+        if self.rocon_rate <= 0.0:
+            return
+        while True:
+            await asyncio.sleep(self._rng.expovariate(self.rocon_rate))
+            now = self._clock()
+            self._queue(now, self.rocon_frame(now))
+            self.stats["rocon_frames"] += 1
+
+    async def _transmit(self):
+        while True:
+            now = self._clock()
+            frame = self.transmitter.pop(now)
+            if frame is not None:
+                can_id, data = frame
+                self.bus.send(can.Message(arbitration_id=can_id, data=data, is_extended_id=False))
+                if can_id != ROCON_CAN_ID:
+                    self.stats["responses"] += 1
+                continue
+
+            self._wakeup.clear()
+            next_time = self.transmitter.next_time()
+            timeout = None if next_time is None else max(next_time - now, 0.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interface", default="socketcan", help="python-can interface")
+    parser.add_argument("--channel", default="vcan0", help="python-can channel")
+    parser.add_argument("--language", choices=sorted(SUPPORTED_LANGUAGES), default="de", help="Language of the select and text sensor labels")
+    parser.add_argument("--entities", help="Comma separated entity names, all entities of sensor_configuration by default")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximal additional response time in seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="Probability of a GET without response")
+    parser.add_argument("--rocon-rate", type=float, default=0.0, help="RoCon control panel frames per second")
+    parser.add_argument("--rocon-set-ratio", type=float, default=0.0, help="Share of sets in the RoCon control panel frames")
+    parser.add_argument("--bitrate", type=int, default=DEFAULT_BITRATE, help="Bitrate of the bus, 0 for unlimited")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between the printed statistics")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    set_language(args.language)
+    names = args.entities.split(",") if args.entities else None
+    sens_confs = [sens_conf for sens_conf in sensor_configuration if names is None or sens_conf.get("name") in names]
+
+    async def simulate():
+        with can.Bus(interface=args.interface, channel=args.channel) as bus:
+            simulator = HpsuSimulator(bus, sens_confs, latency=args.latency, jitter=args.jitter, loss=args.loss,
+                                      rocon_rate=args.rocon_rate, rocon_set_ratio=args.rocon_set_ratio,
+                                      bitrate=args.bitrate or None)
+            task = asyncio.create_task(simulator.run())
+            try:
+                while True:
+                    await asyncio.sleep(args.stats_interval)
+                    served = [age for age in simulator.staleness().values() if age is not None]
+                    print(" ".join(f"{name}={count}" for name, count in simulator.stats.items()),
+                          f"served={len(served)}/{len(simulator.entities)}",
+                          f"max_staleness={max(served, default=0.0):.1f}s", flush=True)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    try:
+        asyncio.run(simulate())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
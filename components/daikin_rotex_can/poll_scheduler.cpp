@@ -0,0 +1,165 @@
+#include "esphome/components/daikin_rotex_can/poll_scheduler.h"
+
+#include <utility>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+TPollScheduler::TPollScheduler()
+: m_slots()
+, m_heap()
+, m_first_never_updated(NONE)
+{
+}
+
+void TPollScheduler::clear() {
+    m_slots.clear();
+    m_heap.clear();
+    m_first_never_updated = NONE;
+}
+
+void TPollScheduler::add(uint16_t index, uint32_t update_interval, uint32_t last_update) {
+    if (index >= m_slots.size()) {
+        m_slots.resize(index + 1, {0, 0, NONE, false, false});
+    }
+    m_slots[index] = {last_update + update_interval, update_interval, NONE, last_update == 0, false};
+    insert(index);
+}
+
+void TPollScheduler::update(uint16_t index, uint32_t last_update) {
+    if (index >= m_slots.size()) {
+        return;
+    }
+    TSlot& slot = m_slots[index];
+    if (slot.suspended) {
+        slot.due = last_update + slot.update_interval;
+        slot.never_updated = last_update == 0;
+        slot.suspended = false;
+        insert(index);
+        return;
+    }
+    if (slot.heap_position == NONE) {
+        return;
+    }
+    const uint32_t previous_due = slot.due;
+    slot.due = last_update + slot.update_interval;
+    slot.never_updated = last_update == 0;
+
+    if (slot.due < previous_due) {
+        siftUp(slot.heap_position);
+    } else {
+        siftDown(slot.heap_position);
+    }
+
+    if (slot.never_updated && index < m_first_never_updated) {
+        m_first_never_updated = index;
+    } else if (index == m_first_never_updated && !slot.never_updated) {
+        findFirstNeverUpdated(index + 1);
+    }
+}
+
+void TPollScheduler::suspend(uint16_t index) {
+    if (index >= m_slots.size() || m_slots[index].heap_position == NONE) {
+        return;
+    }
+    const uint32_t position = m_slots[index].heap_position;
+    const uint32_t last = m_heap.size() - 1;
+    if (position != last) {
+        swap(position, last);
+    }
+    m_heap.pop_back();
+    m_slots[index].heap_position = NONE;
+    m_slots[index].suspended = true;
+    if (position != last) {
+        siftUp(position);
+        siftDown(m_slots[m_heap[position]].heap_position);
+    }
+
+    if (index == m_first_never_updated) {
+        findFirstNeverUpdated(index + 1);
+    }
+}
+
+// Reschedules a suspended entity with its former due time, e.g. after its GET timed out
+void TPollScheduler::resume(uint16_t index) {
+    if (index >= m_slots.size() || !m_slots[index].suspended) {
+        return;
+    }
+    m_slots[index].suspended = false;
+    insert(index);
+}
+
+void TPollScheduler::insert(uint16_t index) {
+    TSlot& slot = m_slots[index];
+    slot.heap_position = m_heap.size();
+    m_heap.push_back(index);
+    siftUp(slot.heap_position);
+
+    if (slot.never_updated && index < m_first_never_updated) {
+        m_first_never_updated = index;
+    }
+}
+
+void TPollScheduler::findFirstNeverUpdated(uint16_t from) {
+    for (m_first_never_updated = from; m_first_never_updated < m_slots.size(); ++m_first_never_updated) {
+        TSlot const& candidate = m_slots[m_first_never_updated];
+        if (candidate.heap_position != NONE && candidate.never_updated) {
+            return;
+        }
+    }
+    m_first_never_updated = NONE;
+}
+
+uint16_t TPollScheduler::next(uint32_t now) const {
+    if (m_heap.empty()) {
+        return NONE;
+    }
+    const uint16_t first = m_heap.front();
+    if (now > m_slots[first].due) {
+        return first;
+    }
+    return m_first_never_updated;
+}
+
+bool TPollScheduler::isBefore(uint16_t lhs, uint16_t rhs) const {
+    const uint32_t lhs_due = m_slots[lhs].due;
+    const uint32_t rhs_due = m_slots[rhs].due;
+    return lhs_due < rhs_due || (lhs_due == rhs_due && lhs < rhs);
+}
+
+void TPollScheduler::swap(uint32_t lhs, uint32_t rhs) {
+    std::swap(m_heap[lhs], m_heap[rhs]);
+    m_slots[m_heap[lhs]].heap_position = lhs;
+    m_slots[m_heap[rhs]].heap_position = rhs;
+}
+
+void TPollScheduler::siftUp(uint32_t position) {
+    while (position > 0) {
+        const uint32_t parent = (position - 1) / 2;
+        if (!isBefore(m_heap[position], m_heap[parent])) {
+            return;
+        }
+        swap(position, parent);
+        position = parent;
+    }
+}
+
+void TPollScheduler::siftDown(uint32_t position) {
+    const uint32_t size = m_heap.size();
+    while (true) {
+        uint32_t first = position;
+        for (uint32_t child = 2 * position + 1; child <= 2 * position + 2 && child < size; ++child) {
+            if (isBefore(m_heap[child], m_heap[first])) {
+                first = child;
+            }
+        }
+        if (first == position) {
+            return;
+        }
+        swap(position, first);
+        position = first;
+    }
+}
+
+}
+}
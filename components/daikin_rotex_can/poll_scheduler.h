@@ -0,0 +1,56 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Orders the polled entities by due time (last update + update interval) in a binary min-heap.
+// next() keeps the overdue-first rule of the former scan over all entities: the entity which is overdue the
+// longest, the lower index on ties. If none is overdue, the first entity which was never updated is due.
+// Entities are rescheduled by update() whenever a response or a passive update was handled. An entity with a GET
+// in flight is suspended until its response is handled by update() or its GET timed out and it is resumed.
+class TPollScheduler {
+public:
+    static constexpr uint16_t NONE = 0xFFFF;
+
+    TPollScheduler();
+
+    void clear();
+
+    // index is the position of the entity in the entity manager, each index is added once
+    void add(uint16_t index, uint32_t update_interval, uint32_t last_update);
+    void update(uint16_t index, uint32_t last_update);
+    void suspend(uint16_t index);
+    void resume(uint16_t index);
+
+    uint16_t next(uint32_t now) const;
+    uint32_t getDueTime(uint16_t index) const { return m_slots[index].due; }
+    bool isSuspended(uint16_t index) const { return index < m_slots.size() && m_slots[index].suspended; }
+    uint32_t size() const { return m_heap.size(); }     // Without the suspended entities
+
+private:
+    struct TSlot {
+        uint32_t due;
+        uint32_t update_interval;
+        uint16_t heap_position;     // NONE if not added or suspended
+        bool never_updated;
+        bool suspended;
+    };
+
+    void insert(uint16_t index);
+    void findFirstNeverUpdated(uint16_t from);
+
+    bool isBefore(uint16_t lhs, uint16_t rhs) const;
+    void swap(uint32_t lhs, uint32_t rhs);
+    void siftUp(uint32_t position);
+    void siftDown(uint32_t position);
+
+    std::vector<TSlot> m_slots;
+    std::vector<uint16_t> m_heap;
+    uint16_t m_first_never_updated;     // Lowest index which was never updated or NONE
+};
+
+}
+}
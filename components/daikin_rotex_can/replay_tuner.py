@@ -0,0 +1,543 @@
+"""
+    Offline replay tuner for the smoothing of thermal_power / temperature_spread and the fault detection
+    thresholds of error_code.
+
+    Recorded sensor series (NPZ files of can_log_decoder.py) are replayed through vectorized ports of
+    PID::compute(), CanSensor::update() and ErrorDetection::handle_error_detection(). Every parameter
+    combination is one row of the state arrays, so thousands of combinations are replayed in one pass
+    over a recording, chunks of combinations are replayed in parallel processes.
+
+    Smoothing is scored by its lag behind a centered moving average of the raw series and by the noise
+    it lets through, relative to the noise of the raw series. The fault detections are scored by their
+    false alarms, and with --fault windows of known faults by missed faults and detection delay. The
+    best settings are printed as YAML for the daikin_rotex_can component.
+
+    Usage (from the components directory, requires esphome and numpy):
+        python3 -m daikin_rotex_can.replay_tuner [--language de] [--fault START:END] [--jobs N] NPZ [NPZ ...]
+"""
+
+import argparse
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import (
+    CONF_BPV_ERROR_DETECTION_TIME, CONF_DHW_ERROR_DETECTION_TIME, CONF_MAX_SPREAD_TVBH_TR, CONF_MAX_SPREAD_TVBH_TV,
+    CONF_MIN_SPREAD_OFFSET, CONF_MIXER_ERROR_DETECTION_TIME, CONF_SMOOTHING_PID, CONF_SPREAD_ERROR_DETECTION_TIME,
+    DEFAULT_SMOOTHING_PID
+)
+from .translations.translate import SUPPORTED_LANGUAGES, set_language, translate
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_INTERVAL_MS = 16               # DaikinRotexCanComponent::loop()
+SMOOTHING_INTERVAL_MS = 10000       # CanSensor::update() runs the PID when more than 10 s passed
+DEFAULT_EVALUATION_INTERVAL = 30.0  # seconds between two error_code updates, if error_code is not recorded
+DEFAULT_REFERENCE_WINDOW = 300.0    # seconds
+DEFAULT_LAG_TOLERANCE = 120.0       # seconds, scored like the noise of the raw series
+DEFAULT_MARGIN = 0.5
+CHUNK_SIZE = 256                    # Parameter combinations per replay
+
+MIN_FLOW_RATE = 600.0
+DHW_MIN_TEMPERATURE = 48.0
+MIN_SPREAD_COEFFICIENTS = (-0.00004012, 0.006683, -0.4152, 11.5006, -117.7908)
+
+MINUTES = [1, 2, 3, 5, 7, 10, 15, 20, 30, 45, 60]
+
+SMOOTHING_GRID = {
+    "p": [0.05, 0.1, 0.2, 0.3, 0.5],
+    "i": [0.0, 0.01, 0.02, 0.05, 0.1],
+    "d": [0.0, 0.02, 0.05, 0.1],
+    "max_integral": [0.1, 0.2, 0.5, 1.0],
+    "alpha_p": [0.1, 0.2, 0.3, 0.5],
+    "alpha_d": [0.05, 0.1, 0.2],
+}
+
+########## Recordings ##########
+
+def load_recording(path) -> dict:
+    """
+    Reads a NPZ file of can_log_decoder.py. Returns {entity name: (timestamps, values, labels)},
+    labels are the label strings of selects and text sensors ("" if unknown) or None.
+    """
+    columns = {}
+    with np.load(path) as npz:
+        for key in npz.files:
+            name, column = key.rsplit("/", 1)
+            columns.setdefault(name, {})[column] = npz[key]
+
+    recording = {}
+    for name, entity_columns in columns.items():
+        labels = None
+        if "label" in entity_columns:
+            table = np.append(entity_columns["labels"].astype(str), "")
+            labels = table[entity_columns["label"]]     # -1 selects the appended ""
+        order = np.argsort(entity_columns["timestamp"], kind="stable")
+        recording[name] = (
+            entity_columns["timestamp"][order].astype(np.float64),
+            entity_columns["value"][order].astype(np.float64),
+            None if labels is None else labels[order]
+        )
+    return recording
+
+def hold(times, values, at, fill=np.nan):
+    """Last value at or before every time of at, like the state of an entity."""
+    positions = np.searchsorted(times, at, side="right") - 1
+    held = np.asarray(values)[np.maximum(positions, 0)]
+    if held.dtype.kind == "f":
+        return np.where(positions >= 0, held, fill)
+    return np.where(positions >= 0, held, np.asarray(fill, dtype=held.dtype))
+
+def derived_series(recording, name):
+    """
+    Raw values of temperature_spread or thermal_power, recalculated on every frame of their sources
+    like update_temperature_spread() and update_thermal_power(). Returns (timestamps, values) or None.
+    """
+    sources = ["tv", "tr"] if name == "temperature_spread" else ["tv", "tr", "flow_rate"]
+    if any(source not in recording for source in sources):
+        return None
+
+    times = np.unique(np.concatenate([recording[source][0] for source in sources]))
+    tv, tr = (hold(*recording[source][:2], times).astype(np.float32) for source in ["tv", "tr"])
+    if name == "temperature_spread":
+        return times, tv - tr
+    flow_rate = hold(*recording["flow_rate"][:2], times).astype(np.float32)
+    return times, ((tv - tr).astype(np.float64) * (4.19 * flow_rate.astype(np.float64)) / 3600.0).astype(np.float32)
+
+########## Smoothing ##########
+
+def parameter_grid(grid) -> dict:
+    """All combinations of {name: values} as {name: array}, one combination per index."""
+    combinations = list(itertools.product(*grid.values()))
+    return {name: np.array([combination[index] for combination in combinations]) for index, name in enumerate(grid)}
+
+def grid_size(params) -> int:
+    return len(next(iter(params.values())))
+
+def select_params(params, selection) -> dict:
+    return {name: values[selection] for name, values in params.items()}
+
+class PidBank:
+    """PID::compute() for one parameter set per row, in float32 like on the ESP32."""
+
+    def __init__(self, params):
+        self.p, self.i, self.d, self.max_integral, self.alpha_p, self.alpha_d = (
+            np.asarray(params[name], dtype=np.float32) for name in DEFAULT_SMOOTHING_PID
+        )
+        size = len(self.p)
+        self.previous_error = np.zeros(size, dtype=np.float32)
+        self.integral = np.zeros(size, dtype=np.float32)
+        self.filtered_p = np.zeros(size, dtype=np.float32)
+        self.filtered_d = np.zeros(size, dtype=np.float32)
+
+    def compute(self, setpoint, current_value, dt):
+        """Returns the outputs, 0 for the rows which return early (nan / inf inputs or dt of 0)."""
+        setpoint = np.float32(setpoint)
+        dt = np.float32(dt)
+        valid = np.isfinite(current_value) & bool(np.isfinite(setpoint) and np.isfinite(dt) and abs(dt) > np.float32(0.1))
+
+        error = setpoint - current_value
+        filtered_p = self.alpha_p * error + (np.float32(1) - self.alpha_p) * self.filtered_p
+        integral = np.maximum(np.minimum(self.integral + error * dt, self.max_integral), -self.max_integral)
+        derivative = (error - self.previous_error) / dt
+        filtered_d = self.alpha_d * derivative + (np.float32(1) - self.alpha_d) * self.filtered_d
+        output = self.p * filtered_p + self.i * integral + self.d * filtered_d
+
+        self.filtered_p = np.where(valid, filtered_p, self.filtered_p)
+        self.integral = np.where(valid, integral, self.integral)
+        self.filtered_d = np.where(valid, filtered_d, self.filtered_d)
+        self.previous_error = np.where(valid, error, self.previous_error)
+        return np.where(valid, output, np.float32(0))
+
+def smoothing_step(pid, smooth_state, state, dt):
+    """One smoothing step of CanSensor::update(), returns the published states."""
+    smooth_state = np.where(np.isnan(smooth_state), np.float32(state), smooth_state).astype(np.float32)
+    smooth_state = smooth_state + pid.compute(state, smooth_state, dt)
+    return (np.ceil(smooth_state.astype(np.float64) * 100.0) / 100.0).astype(np.float32)
+
+def smoothing_ticks(times, values):
+    """
+    Milliseconds since the first frame of the CanSensor::update() calls which run the PID, assuming the
+    ESP32 booted with the recording. The PID starts with the first valid raw value.
+    """
+    valid_times = times[np.isfinite(values)]
+    if len(valid_times) == 0:
+        return np.zeros(0, dtype=np.int64)
+    period = SMOOTHING_INTERVAL_MS + LOOP_INTERVAL_MS
+    end = int(round((times[-1] - times[0]) * 1000))
+    first = int(np.ceil((valid_times[0] - times[0]) * 1000 / LOOP_INTERVAL_MS)) * LOOP_INTERVAL_MS
+    return np.arange(max(first, period), end + 1, period, dtype=np.int64)
+
+def replay_smoothing(times, values, params):
+    """Published smoothed states (combinations, ticks) and the tick times in seconds."""
+    ticks = smoothing_ticks(times, values)
+    states = hold(times, values.astype(np.float32), times[0] + ticks / 1000.0).astype(np.float32)
+
+    pid = PidBank(params)
+    smooth_state = np.full(grid_size(params), np.nan, dtype=np.float32)
+    outputs = np.empty((grid_size(params), len(ticks)), dtype=np.float32)
+    last_update = np.float32(0)
+    with np.errstate(all="ignore"):
+        for index, (tick, state) in enumerate(zip(ticks, states)):
+            dt = (np.float32(tick) - last_update) / np.float32(1000)
+            smooth_state = smoothing_step(pid, smooth_state, state, dt)
+            outputs[:, index] = smooth_state
+            last_update = np.float32(tick)
+    return times[0] + ticks / 1000.0, states, outputs
+
+def moving_average(values, window):
+    """Centered moving average over window samples, shorter at the edges."""
+    kernel = np.ones(max(int(window), 1))
+    valid = np.isfinite(values)
+    sums = np.convolve(np.where(valid, values, 0.0), kernel, mode="same")
+    counts = np.convolve(valid.astype(np.float64), kernel, mode="same")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+def score_smoothing(tick_times, states, outputs, reference_window=DEFAULT_REFERENCE_WINDOW):
+    """
+    Returns the lag in seconds and the noise of every combination. The lag L fits outputs to the
+    reference delayed by L, reference(t - L) + offset ~ reference(t) - L * reference'(t) + offset. The noise is the RMS of
+    the output steps beyond the reference steps, relative to the same RMS of the raw states.
+    """
+    if len(tick_times) < 3:
+        size = outputs.shape[0]
+        return np.zeros(size), np.zeros(size)
+
+    samples = reference_window / np.median(np.diff(tick_times))
+    reference = moving_average(states.astype(np.float64), samples)
+    slope = np.gradient(reference, tick_times)
+
+    edge = min(int(samples) // 2, len(tick_times) // 4)
+    inner = slice(edge, len(tick_times) - edge)
+    mask = np.isfinite(reference[inner]) & np.isfinite(slope[inner])
+    reference, slope, raw = reference[inner][mask], slope[inner][mask], states[inner].astype(np.float64)[mask]
+    outputs = outputs[:, inner][:, mask].astype(np.float64)
+
+    with np.errstate(all="ignore"):
+        # Centered, so the offset of the ceiled outputs is not taken for lag
+        slope = slope - np.mean(slope)
+        slope_energy = np.sum(slope * slope)
+        lag = (reference - outputs) @ slope / slope_energy if slope_energy > 0 else np.zeros(outputs.shape[0])
+        raw_noise = np.sqrt(np.mean((np.diff(raw) - np.diff(reference)) ** 2))
+        noise = np.sqrt(np.mean((np.diff(outputs, axis=1) - np.diff(reference)) ** 2, axis=1))
+        noise = noise / raw_noise if raw_noise > 0 else noise
+    return np.where(np.isfinite(lag), lag, np.inf), np.where(np.isfinite(noise), noise, np.inf)
+
+def _score_smoothing_chunk(series, params, reference_window):
+    lag = np.zeros(grid_size(params))
+    noise = np.zeros(grid_size(params))
+    weight = 0
+    for times, values in series:
+        tick_times, states, outputs = replay_smoothing(times, values, params)
+        chunk_lag, chunk_noise = score_smoothing(tick_times, states, outputs, reference_window)
+        lag += np.abs(chunk_lag) * len(tick_times)
+        noise += chunk_noise * len(tick_times)
+        weight += len(tick_times)
+    return lag / max(weight, 1), noise / max(weight, 1)
+
+def _chunks(params, chunk_size=CHUNK_SIZE):
+    size = grid_size(params)
+    return [select_params(params, slice(start, start + chunk_size)) for start in range(0, size, chunk_size)]
+
+def _map(function, arguments, jobs):
+    jobs = min(jobs or os.cpu_count() or 1, len(arguments))
+    if jobs <= 1:
+        return [function(*argument) for argument in arguments]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(function, *zip(*arguments)))
+
+def tune_smoothing(series, grid=SMOOTHING_GRID, lag_tolerance=DEFAULT_LAG_TOLERANCE,
+                   reference_window=DEFAULT_REFERENCE_WINDOW, jobs=None):
+    """
+    series is a list of raw (timestamps, values) of the smoothed sensors. Returns the combinations
+    with their mean lag, noise and score = lag / lag_tolerance + noise, sorted by score.
+    """
+    params = parameter_grid(grid)
+    results = _map(_score_smoothing_chunk, [(series, chunk, reference_window) for chunk in _chunks(params)], jobs)
+    lag = np.concatenate([result[0] for result in results])
+    noise = np.concatenate([result[1] for result in results])
+    score = lag / lag_tolerance + noise
+    order = np.argsort(score, kind="stable")
+    return {"params": select_params(params, order), "lag": lag[order], "noise": noise[order], "score": score[order]}
+
+########## Fault detection ##########
+
+def replay_error_detection(is_error, times_ms, detection_time_ms, stop_detection_in_good_case=False, active=None, reset=None, healthy=None):
+    """
+    ErrorDetection::handle_error_detection() for one detection time per row of is_error (combinations,
+    evaluations). Evaluations which are not active skip the call, reset calls reset_good_case() before it.
+    Returns the results and the longest error run (ms) per row, counting only healthy evaluations.
+    """
+    size, count = is_error.shape
+    detection_time_ms = np.broadcast_to(np.asarray(detection_time_ms, dtype=np.int64), (size,))
+    error_timestamp = np.zeros(size, dtype=np.int64)
+    good_case_detected = np.zeros(size, dtype=bool)
+    run_start = np.full(size, -1, dtype=np.int64)
+    longest_run = np.zeros(size, dtype=np.int64)
+    alarms = np.zeros((size, count), dtype=bool)
+
+    for index in range(count):
+        now = int(times_ms[index])
+        if reset is not None and reset[index]:
+            error_timestamp[:] = 0
+            good_case_detected[:] = False
+        if active is not None and not active[index]:
+            continue
+
+        error = is_error[:, index]
+        start = error & (error_timestamp == 0) & ~good_case_detected
+        error_timestamp[start] = now
+        alarms[:, index] = error & (error_timestamp != 0) & (now > error_timestamp + detection_time_ms)
+        error_timestamp[~error] = 0
+        good_case_detected[~error] = stop_detection_in_good_case
+
+        run_error = error if healthy is None else error & healthy[index]
+        run_start[run_error & (run_start < 0)] = now
+        run_start[~run_error] = -1
+        longest_run = np.where(run_start >= 0, np.maximum(longest_run, now - run_start), longest_run)
+    return alarms, longest_run
+
+def min_spread(tv):
+    """Minimal temperature spread of recalculate_state() at the supply temperature tv."""
+    return sum(coefficient * tv ** power for power, coefficient in zip(range(4, -1, -1), MIN_SPREAD_COEFFICIENTS))
+
+class Detector:
+    """One fault detection of recalculate_state() with its swept threshold and detection time."""
+
+    def __init__(self, name, sources, threshold, thresholds, time_key, stop_detection_in_good_case=False, sensitive_first=1):
+        self.name = name
+        self.sources = sources
+        self.threshold = threshold
+        self.thresholds = thresholds
+        self.time_key = time_key
+        self.stop_detection_in_good_case = stop_detection_in_good_case
+        self.sensitive_first = sensitive_first  # 1: lower thresholds detect more, -1: higher thresholds detect more
+
+    def grid(self):
+        grid = {self.time_key: [minutes * 60000 for minutes in MINUTES]}
+        if self.threshold is not None:
+            grid[self.threshold] = list(self.thresholds)
+        return parameter_grid(grid)
+
+def detectors():
+    return [
+        Detector("mixer", ["tv", "tvbh", "flow_rate", "dhw_mixer_position"],
+                 CONF_MAX_SPREAD_TVBH_TV, np.round(np.arange(0.0, 3.01, 0.1), 1), CONF_MIXER_ERROR_DETECTION_TIME),
+        Detector("bpv", ["tvbh", "tr", "flow_rate", "bypass_valve"],
+                 CONF_MAX_SPREAD_TVBH_TR, np.round(np.arange(0.0, 3.01, 0.1), 1), CONF_BPV_ERROR_DETECTION_TIME),
+        Detector("spread", ["tv", "tr", "mode_of_operating", "status_kompressor"],
+                 CONF_MIN_SPREAD_OFFSET, np.round(np.arange(-3.0, 1.01, 0.1), 1), CONF_SPREAD_ERROR_DETECTION_TIME,
+                 stop_detection_in_good_case=True, sensitive_first=-1),
+        Detector("dhw", ["tdhw1", "flow_rate", "dhw_mixer_position", "mode_of_operating", "status_kompressor"],
+                 None, None, CONF_DHW_ERROR_DETECTION_TIME),
+    ]
+
+def evaluation_times(recording, evaluation_interval=DEFAULT_EVALUATION_INTERVAL):
+    """recalculate_state() runs on every error_code frame, otherwise every evaluation_interval."""
+    if "error_code" in recording:
+        return recording["error_code"][0]
+    start = min(series[0][0] for series in recording.values() if len(series[0]))
+    end = max(series[0][-1] for series in recording.values() if len(series[0]))
+    return np.arange(start, end, evaluation_interval)
+
+def detector_conditions(detector, recording, times, params, offsets=(0.0, 0.0, 0.0), smoothing=None):
+    """
+    Error states (combinations, evaluations) of the detector, the evaluations which call the detection
+    and the ones which reset it before. smoothing are the PID parameters of temperature_spread.
+    """
+    offsets = dict(zip(["tv", "tvbh", "tr"], offsets))
+    held = {
+        source: hold(*recording[source][:2], times) + offsets.get(source, 0.0)
+        for source in detector.sources if recording[source][2] is None
+    }
+    labels = {
+        source: hold(recording[source][0], recording[source][2], times, "")
+        for source in detector.sources if recording[source][2] is not None
+    }
+    threshold = params.get(detector.threshold, np.zeros(grid_size(params)))[:, np.newaxis]
+    active = None
+    reset = None
+
+    match detector.name:
+        case "mixer":
+            is_error = (held["flow_rate"] > MIN_FLOW_RATE) & (held["dhw_mixer_position"] == 0.0) & (held["tvbh"] > held["tv"] + threshold)
+        case "bpv":
+            is_error = (held["flow_rate"] > MIN_FLOW_RATE) & (held["bypass_valve"] == 100.0) & (held["tvbh"] > held["tr"] + threshold)
+        case "spread":
+            spread_times, spread_values = derived_series(recording, "temperature_spread")
+            tick_times, _, outputs = replay_smoothing(spread_times, spread_values, {name: [value] for name, value in (smoothing or DEFAULT_SMOOTHING_PID).items()})
+            spread = hold(tick_times, outputs[0].astype(np.float64), times)
+            tv = held["tv"] - offsets["tv"]     # The polynomial uses the state without offset
+            compressor = held["status_kompressor"] > 0
+            active = np.isin(labels["mode_of_operating"], [translate("hot_water_production"), translate("heating")]) & compressor
+            is_error = compressor & (spread < min_spread(tv) + threshold)
+
+            # reset_good_case() on every change of the compressor state and of mode_of_operating
+            changes = []
+            for source in ["status_kompressor", "mode_of_operating"]:
+                source_times, source_values, source_labels = recording[source]
+                states = source_values if source_labels is None else source_labels
+                changes.append(source_times[1:][states[1:] != states[:-1]])
+            changes = np.sort(np.concatenate(changes))
+            counts = np.searchsorted(changes, times, side="right")
+            reset = np.diff(counts, prepend=0) > 0
+        case "dhw":
+            is_error = (
+                (labels["mode_of_operating"] == translate("hot_water_production")) & (held["tdhw1"] < DHW_MIN_TEMPERATURE)
+                & ((held["flow_rate"] == 0.0) | (held["dhw_mixer_position"] == 0.0) | (held["status_kompressor"] == 0))
+            )
+        case _:
+            raise ValueError(f"Unknown detector: {detector.name}")
+
+    return np.broadcast_to(is_error, (grid_size(params), len(times))), active, reset
+
+def in_windows(times, windows):
+    inside = np.zeros(len(times), dtype=bool)
+    for start, end in windows:
+        inside |= (times >= start) & (times <= end)
+    return inside
+
+def score_alarms(alarms, times, faults=()):
+    """
+    False alarms (alarm episodes starting outside the fault windows), missed faults and the summed
+    detection delay of the detected faults, for the fault windows within times.
+    """
+    onsets = alarms & ~np.pad(alarms, ((0, 0), (1, 0)))[:, :-1]
+    false_alarms = np.count_nonzero(onsets & ~in_windows(times, faults), axis=1)
+    missed = np.zeros(alarms.shape[0], dtype=np.int64)
+    delay = np.zeros(alarms.shape[0])
+    for start, end in faults:
+        if end < times[0] or start > times[-1]:
+            continue
+        window = alarms & in_windows(times, [(start, end)])
+        detected = window.any(axis=1)
+        missed += ~detected
+        delay += np.where(detected, times[np.argmax(window, axis=1)] - start, 0.0)
+    return false_alarms, missed, delay
+
+def _score_detector_chunk(detector, recordings, params, faults, offsets, smoothing, evaluation_interval):
+    size = grid_size(params)
+    false_alarms, missed, longest_run = (np.zeros(size, dtype=np.int64) for _ in range(3))
+    delay = np.zeros(size)
+    faults_count = 0
+    for recording in recordings:
+        times = evaluation_times(recording, evaluation_interval)
+        if len(times) == 0:
+            continue
+        is_error, active, reset = detector_conditions(detector, recording, times, params, offsets, smoothing)
+        times_ms = np.round((times - times[0]) * 1000).astype(np.int64) + 1
+        alarms, runs = replay_error_detection(
+            is_error, times_ms, params[detector.time_key], detector.stop_detection_in_good_case,
+            active, reset, ~in_windows(times, faults)
+        )
+        result = score_alarms(alarms, times, faults)
+        false_alarms += result[0]
+        missed += result[1]
+        delay += result[2]
+        longest_run = np.maximum(longest_run, runs)
+        faults_count += sum(1 for start, end in faults if end >= times[0] and start <= times[-1])
+    detected = faults_count - missed
+    delay = np.divide(delay, detected, out=np.zeros(size), where=detected > 0)
+    return false_alarms, missed, delay, longest_run
+
+def tune_detector(detector, recordings, faults=(), offsets=(0.0, 0.0, 0.0), smoothing=None,
+                  evaluation_interval=DEFAULT_EVALUATION_INTERVAL, margin=DEFAULT_MARGIN, jobs=None):
+    """
+    Replays the detector for all combinations of its grid. Returns the combinations sorted by
+    (false alarms, missed faults, detection delay, sensitivity), preferring the ones whose longest
+    error run without fault stays below (1 - margin) of their detection time. None if a source is missing.
+    """
+    if any(source not in recording for recording in recordings for source in detector.sources):
+        return None
+
+    params = detector.grid()
+    arguments = [(detector, recordings, chunk, tuple(faults), offsets, smoothing, evaluation_interval) for chunk in _chunks(params)]
+    results = [np.concatenate(column) for column in zip(*_map(_score_detector_chunk, arguments, jobs))]
+    false_alarms, missed, delay, longest_run = results
+
+    detection_time = params[detector.time_key]
+    threshold = params.get(detector.threshold, np.zeros(grid_size(params)))
+    risky = longest_run > (1.0 - margin) * detection_time
+    order = np.lexsort((detection_time, detector.sensitive_first * threshold, delay, missed, false_alarms, risky))
+    return {
+        "params": select_params(params, order),
+        "false_alarms": false_alarms[order],
+        "missed": missed[order],
+        "delay": delay[order],
+        "longest_run": longest_run[order],
+    }
+
+########## Output ##########
+
+def _format_value(value):
+    return f"{float(value):g}"
+
+def format_yaml(smoothing=None, detections=()) -> str:
+    """YAML of the daikin_rotex_can component for the best smoothing parameters and detector settings."""
+    lines = ["daikin_rotex_can:"]
+    if smoothing is not None:
+        lines.append(f"  {CONF_SMOOTHING_PID}:")
+        lines.extend(f"    {name}: {_format_value(value)}" for name, value in smoothing.items())
+    for detector, settings in detections:
+        if detector.threshold is not None:
+            lines.append(f"  {detector.threshold}: {_format_value(settings[detector.threshold])}")
+        lines.append(f"  {detector.time_key}: {int(settings[detector.time_key]) // 1000}s")
+    return "\n".join(lines)
+
+def best(result):
+    return {name: values[0].item() for name, values in result["params"].items()}
+
+def parse_fault(text):
+    start, end = text.split(":")
+    return float(start), float(end)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+", help="NPZ files of can_log_decoder.py")
+    parser.add_argument("--language", choices=sorted(SUPPORTED_LANGUAGES), default="de", help="Language of the recorded labels")
+    parser.add_argument("--fault", type=parse_fault, action="append", default=[], help="START:END timestamps of a known fault, repeatable")
+    parser.add_argument("--tv-offset", type=float, default=0.0)
+    parser.add_argument("--tvbh-offset", type=float, default=0.0)
+    parser.add_argument("--tr-offset", type=float, default=0.0)
+    parser.add_argument("--lag-tolerance", type=float, default=DEFAULT_LAG_TOLERANCE, help="Lag in seconds which scores like the raw noise")
+    parser.add_argument("--reference-window", type=float, default=DEFAULT_REFERENCE_WINDOW, help="Moving average window of the reference in seconds")
+    parser.add_argument("--evaluation-interval", type=float, default=DEFAULT_EVALUATION_INTERVAL, help="Seconds between the evaluations without recorded error_code")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="Share of the detection time which error runs without fault must stay below")
+    parser.add_argument("--jobs", type=int, help="Parallel processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    set_language(args.language)
+    recordings = [load_recording(path) for path in args.recordings]
+    offsets = (args.tv_offset, args.tvbh_offset, args.tr_offset)
+
+    series = [
+        derived for recording in recordings for name in ["temperature_spread", "thermal_power"]
+        if (derived := derived_series(recording, name)) is not None
+    ]
+    smoothing = None
+    if series:
+        result = tune_smoothing(series, lag_tolerance=args.lag_tolerance, reference_window=args.reference_window, jobs=args.jobs)
+        smoothing = best(result)
+        print(f"# smoothing: lag {result['lag'][0]:.0f}s, noise {result['noise'][0]:.0%} of the raw noise")
+
+    detections = []
+    for detector in detectors():
+        result = tune_detector(detector, recordings, args.fault, offsets, smoothing, args.evaluation_interval, args.margin, args.jobs)
+        if result is None:
+            print(f"# {detector.name}: sources {', '.join(detector.sources)} are not recorded")
+            continue
+        detections.append((detector, best(result)))
+        print(
+            f"# {detector.name}: {result['false_alarms'][0]} false alarms, {result['missed'][0]} missed faults, "
+            f"delay {result['delay'][0]:.0f}s, longest error run without fault {result['longest_run'][0] / 1000:.0f}s"
+        )
+
+    print(format_yaml(smoothing, detections))
+
+if __name__ == "__main__":
+    main()
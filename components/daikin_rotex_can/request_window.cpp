@@ -0,0 +1,84 @@
+#include "esphome/components/daikin_rotex_can/request_window.h"
+
+#include <algorithm>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+TRequestWindow::TRequestWindow()
+: m_in_flight()
+, m_last_received(0u)
+, m_last_sent(0u)
+, m_request_timeout(3000)
+, m_delay_between_requests(250)
+, m_min_spacing(100)
+, m_max_requests_in_flight(1)
+{
+}
+
+void TRequestWindow::clear() {
+    m_in_flight.clear();
+}
+
+void TRequestWindow::set_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second) {
+    m_max_requests_in_flight = std::max<uint8_t>(max_requests_in_flight, 1);
+    m_request_timeout = request_timeout_ms;
+    max_frames_per_second = std::max<uint16_t>(max_frames_per_second, 1);
+    m_min_spacing = (2 * 1000 + max_frames_per_second - 1) / max_frames_per_second;
+    m_in_flight.reserve(m_max_requests_in_flight);
+}
+
+bool TRequestWindow::canSend(uint32_t now) const {
+    if (m_in_flight.size() >= m_max_requests_in_flight) {
+        return false;
+    }
+    if (m_max_requests_in_flight == 1 && (now - m_last_received) < m_delay_between_requests) {
+        return false;
+    }
+    return m_last_sent == 0 || (now - m_last_sent) >= m_min_spacing;
+}
+
+// Also called for the GETs which follow a SET, they take a slot of the window
+void TRequestWindow::sent(uint16_t index, uint32_t now) {
+    const auto it = std::find_if(
+        m_in_flight.begin(),
+        m_in_flight.end(),
+        [index](TGetInFlight const& get) { return get.index == index; }
+    );
+    if (it != m_in_flight.end()) {
+        it->sent = now;
+    } else {
+        m_in_flight.push_back({index, now});
+    }
+    m_last_sent = now;
+}
+
+bool TRequestWindow::answered(uint16_t index) {
+    const auto it = std::find_if(
+        m_in_flight.begin(),
+        m_in_flight.end(),
+        [index](TGetInFlight const& get) { return get.index == index; }
+    );
+    if (it == m_in_flight.end()) {
+        return false;
+    }
+    m_in_flight.erase(it);
+    return true;
+}
+
+uint16_t TRequestWindow::expire(uint32_t now) {
+    const auto it = std::find_if(
+        m_in_flight.begin(),
+        m_in_flight.end(),
+        [this, now](TGetInFlight const& get) { return (now - get.sent) >= m_request_timeout; }
+    );
+    if (it == m_in_flight.end()) {
+        return NONE;
+    }
+    const uint16_t index = it->index;
+    m_in_flight.erase(it);
+    return index;
+}
+
+}
+}
@@ -0,0 +1,51 @@
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Paces the GETs of TEntityManager in a sliding window of max_requests_in_flight GETs. A slot is free again as soon
+// as its GET is answered or timed out, so a lost response only holds its own slot for the request timeout. Sends are
+// spaced by the frames per second cap of the bus (every GET is a request and a response frame). With one request in
+// flight every GET waits for its response and delay_between_requests after the last received frame, with more the
+// delay does not apply.
+class TRequestWindow {
+public:
+    static constexpr uint16_t NONE = 0xFFFF;
+
+    TRequestWindow();
+
+    void clear();
+    void set_delay_between_requests(uint16_t milliseconds) { m_delay_between_requests = milliseconds; }
+    void set_pipeline(uint8_t max_requests_in_flight, uint32_t request_timeout_ms, uint16_t max_frames_per_second);
+
+    bool canSend(uint32_t now) const;
+    void sent(uint16_t index, uint32_t now);
+    void received(uint32_t now) { m_last_received = now; }
+    bool answered(uint16_t index);
+
+    // Removes one GET which timed out and returns its index, NONE if no GET timed out
+    uint16_t expire(uint32_t now);
+
+    uint32_t size() const { return m_in_flight.size(); }
+    uint16_t getMinSpacing() const { return m_min_spacing; }
+
+private:
+    struct TGetInFlight {
+        uint16_t index;
+        uint32_t sent;
+    };
+
+    std::vector<TGetInFlight> m_in_flight;
+    uint32_t m_last_received;
+    uint32_t m_last_sent;
+    uint32_t m_request_timeout;
+    uint16_t m_delay_between_requests;
+    uint16_t m_min_spacing;
+    uint8_t m_max_requests_in_flight;
+};
+
+}
+}
@@ -5,12 +5,17 @@ namespace esphome {
 namespace daikin_rotex_can {
 
 static const char* CAN_SENSOR_TAG = "CanSensor";
+static const char* CAN_TEXT_SENSOR_TAG = "CanTextSensor";
 static const char* CAN_SELECT_TAG = "CanSelect";
 
+// Used by selects and text sensors without a map, e.g. the ones filled by an update_lambda
+static const TValueMap EMPTY_VALUE_MAP = {nullptr, nullptr, nullptr, 0};
+
 /////////////////////// CanSensor ///////////////////////
 
 CanSensor::CanSensor()
-: m_state(std::numeric_limits<float>::quiet_NaN())
+: TEntity(TYPE)
+, m_state(std::numeric_limits<float>::quiet_NaN())
 , m_range()
 , m_pid(0.2, 0.05f, 0.05f, 0.2, 0.2, 0.1f)
 , m_smooth(false)
@@ -19,18 +24,18 @@ CanSensor::CanSensor()
 {
 }
 
-CanSensor::CanSensor(std::string const& id)
+CanSensor::CanSensor(const char* id)
 : CanSensor()
 {
-    m_config.id = id;
+    set_id(id);
 }
 
 bool CanSensor::handleValue(uint16_t value, TEntity::TVariant& current, TVariant& previous) {
     previous = state;
-    if (m_config.isSigned) {
-        current = static_cast<int16_t>(value) / m_config.divider;
+    if (m_pDescriptor->isSigned) {
+        current = static_cast<int16_t>(value) / m_pDescriptor->divider;
     } else {
-        current = value / m_config.divider;
+        current = value / m_pDescriptor->divider;
     }
 
     const float float_value = std::get<float>(current);
@@ -40,15 +45,13 @@ bool CanSensor::handleValue(uint16_t value, TEntity::TVariant& current, TVariant
         publish_state(float_value);
     } else {
         ESP_LOGE(CAN_SENSOR_TAG, "handleValue() => Sensor<%s> hex<%s> uint16<%d> float<%f> out of range[%f, %f]",
-            get_id().c_str(), Utils::to_hex(value).c_str(), value, float_value, m_range.min, m_range.max);
+            get_id(), Utils::to_hex(value).c_str(), value, float_value, m_range.min, m_range.max);
     }
 
     return valid;
 }
 
 void CanSensor::update(uint32_t millis) {
-    TEntity::update(millis);
-
     if (m_smooth) {
         const float dt = (static_cast<float>(esphome::millis()) - m_pid.get_last_update()) / 1000.0f; // seconds
         if (dt > 10.0f) {
@@ -58,7 +61,7 @@ void CanSensor::update(uint32_t millis) {
 
             std::string logstr;
             m_smooth_state += m_pid.compute(m_state, m_smooth_state, dt, logstr);
-            Utils::log("PID", "%s: %s, val: %f", get_id().c_str(), logstr.c_str(), m_smooth_state);
+            Utils::log("PID", "%s: %s, val: %f", get_id(), logstr.c_str(), m_smooth_state);
 
             m_smooth_state = std::ceil(m_smooth_state * 100.0) / 100.0;
 
@@ -76,10 +79,25 @@ void CanSensor::publish(float state) {
 
 /////////////////////// CanTextSensor ///////////////////////
 
+CanTextSensor::CanTextSensor()
+: TEntity(TYPE)
+, m_pValueMap(&EMPTY_VALUE_MAP)
+, m_recalculate_state()
+{
+}
+
+void CanTextSensor::set_value_map(uint16_t value_map_index) {
+    if (value_map_index >= g_value_maps_size) {
+        ESP_LOGE(CAN_TEXT_SENSOR_TAG, "set_value_map() => Invalid value map index: %d", value_map_index);
+        return;
+    }
+    m_pValueMap = &g_value_maps[value_map_index];
+}
+
 bool CanTextSensor::handleValue(uint16_t value, TEntity::TVariant& current, TVariant& previous) {
     previous = state;
-    auto it = m_map.findByKey(value);
-    current = m_recalculate_state(m_config.pEntity, it != m_map.end() ? it->second : Utils::format("INVALID<%f>", value));
+    const char* label = m_pValueMap->findByKey(value);
+    current = m_recalculate_state(m_pEntity, label != nullptr ? label : Utils::format("INVALID<%f>", value));
     publish_state(std::get<std::string>(current));
     return true;
 }
@@ -97,15 +115,15 @@ bool CanBinarySensor::handleValue(uint16_t value, TEntity::TVariant& current, TV
 
 void CanNumber::control(float value) {
     this->publish_state(value);
-    sendSet(m_pCanbus, value * get_config().divider);
+    sendSet(m_pCanbus, value * get_descriptor().divider);
 }
 
 bool CanNumber::handleValue(uint16_t value, TEntity::TVariant& current, TVariant& previous) {
     previous = state;
-    if (m_config.isSigned) {
-        current = static_cast<int16_t>(value) / m_config.divider;
+    if (m_pDescriptor->isSigned) {
+        current = static_cast<int16_t>(value) / m_pDescriptor->divider;
     } else {
-        current = value / m_config.divider;
+        current = value / m_pDescriptor->divider;
     }
 
     publish_state(std::get<float>(current));
@@ -114,23 +132,42 @@ bool CanNumber::handleValue(uint16_t value, TEntity::TVariant& current, TVariant
 
 /////////////////////// CanSelect ///////////////////////
 
+CanSelect::CanSelect()
+: TEntity(TYPE)
+, m_pValueMap(&EMPTY_VALUE_MAP)
+, m_custom_select_lambda()
+{
+}
+
+void CanSelect::set_value_map(uint16_t value_map_index) {
+    if (value_map_index >= g_value_maps_size) {
+        ESP_LOGE(CAN_SELECT_TAG, "set_value_map() => Invalid value map index: %d", value_map_index);
+        return;
+    }
+    m_pValueMap = &g_value_maps[value_map_index];
+}
+
 void CanSelect::control(const std::string &value) {
     this->publish_state(value);
-    const uint16_t key = getKey(current_option());
+    const uint16_t key = getKey(current_option().c_str());
     const bool handled = m_custom_select_lambda(get_id(), key);
     if (!handled) {
         sendSet(m_pCanbus, key);
     }
 }
 
-uint16_t CanSelect::getKey(std::string const& value) const {
-    return m_map.getKey(value);
+uint16_t CanSelect::getKey(const char* value) const {
+    uint16_t key = 0;
+    if (!m_pValueMap->findByValue(value, key)) {
+        ESP_LOGE(CAN_SELECT_TAG, "getKey(%s) => Value not found!", value);
+    }
+    return key;
 }
 
 void CanSelect::publish_select_key(uint16_t key) {
-    auto it = m_map.findByKey(key);
-    if (it != m_map.end()) {
-        publish_state(it->second);
+    const char* label = m_pValueMap->findByKey(key);
+    if (label != nullptr) {
+        publish_state(label);
     } else {
         ESP_LOGE(CAN_SELECT_TAG, "publish_select_key(%s) => Key not found!", key);
     }
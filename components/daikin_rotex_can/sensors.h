@@ -1,7 +1,7 @@
 #pragma once
 
 #include "esphome/components/daikin_rotex_can/sensor_accessor.h"
-#include "esphome/components/daikin_rotex_can/bidi_map.h"
+#include "esphome/components/daikin_rotex_can/value_map.h"
 #include "esphome/components/daikin_rotex_can/entity.h"
 #include "esphome/components/daikin_rotex_can/pid.h"
 #include "esphome/components/binary_sensor/binary_sensor.h"
@@ -25,10 +25,13 @@ class CanSensor : public sensor::Sensor, public TEntity, public Parented<SensorA
     };
 
 public:
+    static constexpr TType TYPE = TType::SENSOR;
+
     CanSensor();
-    CanSensor(std::string const& id);
+    CanSensor(const char* id);
     void set_range(Range const& range) { m_range = range; }
     void set_smooth(bool smooth) { m_smooth = smooth; }
+    void set_pid(PID const& pid) { m_pid = pid; m_pid.set_logging(m_logging); }
     void set_logging(bool logging) { m_logging = logging; m_pid.set_logging(logging); }
     virtual void update(uint32_t millis) override;
     void publish(float state);
@@ -48,14 +51,15 @@ private:
 class CanTextSensor : public text_sensor::TextSensor, public TEntity, public Parented<SensorAccessor> {
 public:
     using TRecalculateState = std::function<std::string(EntityBase*, std::string const&)>;
+    static constexpr TType TYPE = TType::TEXT_SENSOR;
 
-    CanTextSensor() = default;
-    void set_map(std::string const& str_map) { m_map = Utils::str_to_map(str_map); }
+    CanTextSensor();
+    void set_value_map(uint16_t value_map_index);
     void set_recalculate_state(TRecalculateState&& lambda) { m_recalculate_state = std::move(lambda); }
 protected:
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) override;
 private:
-    BidiMap m_map;
+    TValueMap const* m_pValueMap;
     TRecalculateState m_recalculate_state;
 };
 
@@ -63,7 +67,9 @@ private:
 
 class CanBinarySensor : public binary_sensor::BinarySensor, public TEntity, public Parented<SensorAccessor> {
 public:
-    CanBinarySensor() = default;
+    static constexpr TType TYPE = TType::BINARY_SENSOR;
+
+    CanBinarySensor(): TEntity(TYPE) {}
 
 protected:
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) override;
@@ -73,7 +79,9 @@ protected:
 
 class CanNumber : public number::Number, public TEntity, public Parented<SensorAccessor> {
 public:
-    CanNumber() = default;
+    static constexpr TType TYPE = TType::NUMBER;
+
+    CanNumber(): TEntity(TYPE) {}
 protected:
     void control(float value) override;
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) override;
@@ -84,12 +92,14 @@ protected:
 class CanSelect : public select::Select, public TEntity, public Parented<SensorAccessor> {
     using TCustomSelectLambda = std::function<bool(std::string const& id, uint16_t key)>;
 public:
-    CanSelect() = default;
-    void set_map(std::string const& str_map) { m_map = Utils::str_to_map(str_map); }
+    static constexpr TType TYPE = TType::SELECT;
+
+    CanSelect();
+    void set_value_map(uint16_t value_map_index);
     void set_custom_select_lambda(TCustomSelectLambda&& lambda) { m_custom_select_lambda = std::move(lambda); }
 
     std::string findNextByKey(uint16_t value, std::string const& fallback) const;
-    uint16_t getKey(std::string const& value) const;
+    uint16_t getKey(const char* value) const;
 
     void publish_select_key(uint16_t key);
 protected:
@@ -97,13 +107,13 @@ protected:
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) override;
 
 private:
-    BidiMap m_map;
+    TValueMap const* m_pValueMap;
     TCustomSelectLambda m_custom_select_lambda;
 };
 
-inline std::string CanSelect::findNextByKey(uint16_t value, std::string const& fallback) const { 
-    auto it = m_map.findNextByKey(value);
-    return it != m_map.end() ? it->second : Utils::format("INVALID<%f>", value);
+inline std::string CanSelect::findNextByKey(uint16_t value, std::string const& fallback) const {
+    const char* label = m_pValueMap->findNextByKey(value);
+    return label != nullptr ? label : fallback;
 };
 
 /////////////////////// CanSwitch ///////////////////////
@@ -111,11 +121,23 @@ inline std::string CanSelect::findNextByKey(uint16_t value, std::string const& f
 class CanSwitch : public switch_::Switch, public TEntity, public Parented<SensorAccessor> {
     using TCustomSelectLambda = std::function<bool(std::string const& id, uint16_t key)>;
 public:
-    CanSwitch() = default;
+    static constexpr TType TYPE = TType::SWITCH;
+
+    CanSwitch(): TEntity(TYPE) {}
 protected:
     virtual void write_state(bool state) override;
     virtual bool handleValue(uint16_t value, TVariant& current, TVariant& previous) override;
 };
 
+// Own members on top of the ESPHome base class, TEntity and Parented as estimated by HEAP_PER_OBJECT of footprint.py
+#if UINTPTR_MAX == 0xFFFFFFFFu
+static_assert(sizeof(CanSensor) == sizeof(sensor::Sensor) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>) + 68, "footprint.py HEAP_PER_OBJECT");
+static_assert(sizeof(CanTextSensor) == sizeof(text_sensor::TextSensor) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>) + 20, "footprint.py HEAP_PER_OBJECT");
+static_assert(sizeof(CanBinarySensor) == sizeof(binary_sensor::BinarySensor) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>), "footprint.py HEAP_PER_OBJECT");
+static_assert(sizeof(CanNumber) == sizeof(number::Number) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>), "footprint.py HEAP_PER_OBJECT");
+static_assert(sizeof(CanSelect) == sizeof(select::Select) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>) + 20, "footprint.py HEAP_PER_OBJECT");
+static_assert(sizeof(CanSwitch) == sizeof(switch_::Switch) + sizeof(TEntity) + sizeof(Parented<SensorAccessor>), "footprint.py HEAP_PER_OBJECT");
+#endif
+
 }  // namespace ld2410
 }  // namespace esphome
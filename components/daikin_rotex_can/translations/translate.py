@@ -7,8 +7,10 @@ from .en import translations_en
 from .it import translations_it
 from .fr import translations_fr
 
+import hashlib
 import logging
 import os
+import re
 
 CONF_LANGUAGE = 'language'
 
@@ -38,6 +40,8 @@ _LOGGER = logging.getLogger(__name__)
 current_language = "de"
 delayed_translate_tag = "DELAYED_TRANSLATE:"
 
+TRANSLATION_REFERENCE_PATTERN = re.compile(r"\bTranslation::T_([A-Z0-9_]+)\b")
+
 def check_translations_integrity():
     """
     Checks that all translations have the same keys based on a unified abstract dictionary.
@@ -104,82 +108,131 @@ def apply_delayed_translate(key: str) -> str:
 def apply_translation_to_mapping(mapping: dict) -> dict:
     return {key: apply_delayed_translate(value) for key, value in mapping.items()}
 
-def generate_header_translations_for_language(translations, selected_language, keys_to_include=None):
-    cpp_code = '#include <string>\n'
-    cpp_code += 'namespace esphome {\nnamespace daikin_rotex_can {\n\n'
+def collect_translation_keys(sources, selected_language=None) -> list:
+    """
+    Returns the translation keys referenced as Translation::T_<KEY> in the given C++ sources and lambdas,
+    in dictionary order. Labels of selects and text sensors are translated at code generation and need no key.
+    """
+    referenced = set()
+    for source in sources:
+        referenced.update(TRANSLATION_REFERENCE_PATTERN.findall(str(source)))
 
+    lang_translations = translations[selected_language or current_language]
+    keys = [key for key in lang_translations if key.upper() in referenced]
+
+    unknown = referenced - {key.upper() for key in keys}
+    if unknown:
+        _LOGGER.warning(f"[Translate] Unknown translation keys referenced: {', '.join(sorted(unknown))}")
+
+    return keys
+
+def _selected_translations(translations, selected_language, keys_to_include):
     # Check selected language
     if selected_language not in translations:
         raise ValueError(f"Selected language '{selected_language}' not found in translations dictionary.")
 
-    _LOGGER.info(f"Building cpp translate dictionary for language: {selected_language}")
-
     selected_translations = translations[selected_language]
-    if keys_to_include:
+    if keys_to_include is not None:
         selected_translations = {key: value for key, value in selected_translations.items() if key in keys_to_include}
+    return selected_translations
+
+def _cpp_string(value) -> str:
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+# Generate translations.h. It only contains the ids, so it is the same for all languages.
+def generate_header_translations_for_language(translations, selected_language, keys_to_include=None):
+    selected_translations = _selected_translations(translations, selected_language, keys_to_include)
 
+    cpp_code = '#pragma once\n\n'
+    cpp_code += '#include <cstdint>\n'
+    cpp_code += '#include <string>\n\n'
+    cpp_code += 'namespace esphome {\nnamespace daikin_rotex_can {\n\n'
+
+    cpp_code += '// A translated text, identified by an integer id. The texts live in flash (translations.cpp).\n'
     cpp_code += 'class Translation {\n'
     cpp_code += 'public:\n'
+    cpp_code += '    enum Id : uint16_t {\n'
+    for key in selected_translations:
+        cpp_code += f'        ID_{key.upper()},\n'
+    cpp_code += '    };\n\n'
 
-    for key, value in selected_translations.items():
+    for key in selected_translations:
         cpp_code += f'    static const Translation T_{key.upper()};\n'
 
     cpp_code += '\n'
-    cpp_code += '    Translation(const std::string& value): m_value(value) {}\n'
+    cpp_code += '    constexpr Translation(Id id): m_id(id) {}\n\n'
+    cpp_code += '    Id id() const { return m_id; }\n'
+    cpp_code += '    const char* c_str() const;\n'
+    cpp_code += '    operator const char*() const { return c_str(); }\n\n'
 
-    cpp_code += '\n'
-    cpp_code += '    bool operator<(const Translation& other) const {\n'
-    cpp_code += '        return m_value < other.m_value;\n'
-    cpp_code += '    }\n\n'
+    cpp_code += 'private:\n'
+    cpp_code += '    Id m_id;\n'
+    cpp_code += '};\n\n'
 
-    cpp_code += '    operator std::string() const {\n'
-    cpp_code += '        return m_value;\n'
-    cpp_code += '    }\n\n'
+    for key in selected_translations:
+        cpp_code += f'inline constexpr Translation Translation::T_{key.upper()}{{Translation::ID_{key.upper()}}};\n'
+    cpp_code += '\n'
 
-    cpp_code += 'private:\n'
-    cpp_code += '    std::string m_value;\n'
-    cpp_code += '};\n'
+    # Comparisons work on the flash strings and do not allocate
+    cpp_code += 'inline bool operator==(std::string const& lhs, Translation rhs) { return lhs == rhs.c_str(); }\n'
+    cpp_code += 'inline bool operator==(Translation lhs, std::string const& rhs) { return rhs == lhs.c_str(); }\n'
+    cpp_code += 'inline bool operator!=(std::string const& lhs, Translation rhs) { return lhs != rhs.c_str(); }\n'
+    cpp_code += 'inline bool operator!=(Translation lhs, std::string const& rhs) { return rhs != lhs.c_str(); }\n'
+    cpp_code += 'inline std::string operator+(std::string const& lhs, Translation rhs) { return lhs + rhs.c_str(); }\n'
+    cpp_code += 'inline std::string operator+(Translation lhs, std::string const& rhs) { return lhs.c_str() + rhs; }\n\n'
 
     cpp_code += '}  // namespace daikin_rotex_can\n'
     cpp_code += '}  // namespace esphome\n'
     return cpp_code
 
-# Generate translation.cpp, creating translation dictionary from python one
+# Generate translations.cpp, creating the flash resident text table from the python dictionary
 def generate_cpp_translations_for_language(translations, selected_language, keys_to_include=None):
-    cpp_code = '#include "esphome/components/daikin_rotex_can/translations.h"\n\n'
-    cpp_code += 'namespace esphome {\nnamespace daikin_rotex_can {\n\n'
-
-    # Check selected language
-    if selected_language not in translations:
-        raise ValueError(f"Selected language '{selected_language}' not found in translations dictionary.")
+    selected_translations = _selected_translations(translations, selected_language, keys_to_include)
 
     _LOGGER.info(f"Building cpp translate dictionary for language: {selected_language}")
 
-    selected_translations = translations[selected_language]
-    if keys_to_include:
-        selected_translations = {key: value for key, value in selected_translations.items() if key in keys_to_include}
+    cpp_code = '#include "daikin_rotex_can/translations.h"\n\n'
+    cpp_code += 'namespace esphome {\nnamespace daikin_rotex_can {\n\n'
 
+    cpp_code += f'static const char* const TRANSLATIONS[{max(len(selected_translations), 1)}] = {{\n'
     for key, value in selected_translations.items():
-        cpp_code += f'const Translation Translation::T_{key.upper()}("{value}");\n'
+        cpp_code += f'    {_cpp_string(value)},    // T_{key.upper()}\n'
+    cpp_code += '};\n\n'
+
+    cpp_code += 'const char* Translation::c_str() const {\n'
+    cpp_code += '    return TRANSLATIONS[m_id];\n'
+    cpp_code += '}\n\n'
 
-    cpp_code += '\n'
     cpp_code += '}  // namespace daikin_rotex_can\n'
     cpp_code += '}  // namespace esphome\n'
     return cpp_code
 
-# Write translations.cpp file
-def write_cpp_file(output_dir):
+def write_file_if_changed(output_path, content) -> bool:
+    """
+    Writes content to output_path, unless the file already has the same content hash.
+    Unchanged files keep their timestamp, so PlatformIO does not recompile the units which include them.
+    """
+    data = content.encode("utf-8")
+    if os.path.isfile(output_path):
+        with open(output_path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                _LOGGER.debug(f"{output_path} is up to date")
+                return False
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(data)
+
+    _LOGGER.info(f"Generated {output_path}")
+    return True
+
+# Write translations.h and translations.cpp files into output_dir, usually the build directory
+def write_cpp_file(output_dir, keys_to_include=None):
     global current_language
     _LOGGER.info("Writing cpp translate file")
 
-    header_code = generate_header_translations_for_language(translations, current_language)
-    output_path = os.path.join(output_dir, "translations.h")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(header_code)
-
-    cpp_code = generate_cpp_translations_for_language(translations, current_language)
-    output_path = os.path.join(output_dir, "translations.cpp")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(cpp_code)
+    header_code = generate_header_translations_for_language(translations, current_language, keys_to_include)
+    write_file_if_changed(os.path.join(output_dir, "translations.h"), header_code)
 
-    _LOGGER.info(f"Generated {output_path}")  
+    cpp_code = generate_cpp_translations_for_language(translations, current_language, keys_to_include)
+    write_file_if_changed(os.path.join(output_dir, "translations.cpp"), cpp_code)
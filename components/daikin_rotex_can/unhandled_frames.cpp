@@ -0,0 +1,81 @@
+#include "esphome/components/daikin_rotex_can/unhandled_frames.h"
+#include "esphome/components/daikin_rotex_can/frame_index.h"
+#include "esphome/components/daikin_rotex_can/utils.h"
+
+#include <algorithm>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+TUnhandledFrames::TUnhandledFrames()
+: m_entries()
+, m_size(0)
+, m_total(0)
+, m_evicted(0)
+{
+}
+
+uint32_t TUnhandledFrames::getKey(TMessage const& data) {
+    return TFrameIndex::getKey(data);
+}
+
+void TUnhandledFrames::add(uint32_t can_id, TMessage const& data, uint32_t now) {
+    ++m_total;
+    const uint32_t key = getKey(data);
+
+    TEntry* pEntry = nullptr;
+    for (uint8_t index = 0; index < m_size; ++index) {
+        if (m_entries[index].can_id == can_id && m_entries[index].key == key) {
+            pEntry = &m_entries[index];
+            break;
+        }
+    }
+
+    if (pEntry == nullptr) {
+        if (m_size < CAPACITY) {
+            pEntry = &m_entries[m_size++];
+        } else {
+            pEntry = std::min_element(m_entries.begin(), m_entries.end(),
+                [now](TEntry const& a, TEntry const& b) { return now - a.last_seen > now - b.last_seen; });
+            ++m_evicted;
+        }
+        *pEntry = {can_id, key, 0, now, now, data};
+    }
+
+    ++pEntry->count;
+    pEntry->last_seen = now;
+    pEntry->data = data;
+}
+
+void TUnhandledFrames::clear() {
+    m_size = 0;
+    m_total = 0;
+    m_evicted = 0;
+}
+
+std::string TUnhandledFrames::format(std::size_t max_length) const {
+    std::array<uint8_t, CAPACITY> order;
+    for (uint8_t index = 0; index < m_size; ++index) {
+        order[index] = index;
+    }
+    std::stable_sort(order.begin(), order.begin() + m_size,
+        [this](uint8_t a, uint8_t b) { return m_entries[a].count > m_entries[b].count; });
+
+    std::string result;
+    for (uint8_t position = 0; position < m_size; ++position) {
+        TEntry const& entry = m_entries[order[position]];
+        const std::string item = Utils::format(entry.key > 0xFF ? "%03X:%06X=%u" : "%03X:%02X=%u", entry.can_id, entry.key, entry.count);
+        const std::size_t length = result.size() + (result.empty() ? 0 : 1) + item.size();
+        if (length > max_length) {
+            break;
+        }
+        if (!result.empty()) {
+            result += " ";
+        }
+        result += item;
+    }
+    return result;
+}
+
+}
+}
@@ -0,0 +1,49 @@
+#pragma once
+
+#include "esphome/components/daikin_rotex_can/types.h"
+#include <array>
+#include <cstddef>
+#include <string>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Fixed size table of the frames which no entity handled, one entry per can id and register (bytes 2-4 of
+// 0xFA frames, otherwise byte 2). If it is full, the least recently seen entry is replaced.
+class TUnhandledFrames {
+public:
+    static constexpr uint8_t CAPACITY = 16;
+
+    struct TEntry {
+        uint32_t can_id;
+        uint32_t key;
+        uint32_t count;
+        uint32_t first_seen;
+        uint32_t last_seen;
+        TMessage data;          // Last payload
+    };
+
+    TUnhandledFrames();
+
+    void add(uint32_t can_id, TMessage const& data, uint32_t now);
+    void clear();
+
+    uint8_t size() const { return m_size; }
+    TEntry const& get(uint8_t index) const { return m_entries[index]; }
+    uint32_t getTotal() const { return m_total; }
+    uint32_t getEvicted() const { return m_evicted; }
+
+    // "<can id>:<register>=<count>" per entry with the most frequent first, cut to max_length
+    std::string format(std::size_t max_length) const;
+
+    static uint32_t getKey(TMessage const& data);
+
+private:
+    std::array<TEntry, CAPACITY> m_entries;
+    uint8_t m_size;
+    uint32_t m_total;
+    uint32_t m_evicted;
+};
+
+}
+}
@@ -1,8 +1,9 @@
 #include "esphome/components/daikin_rotex_can/utils.h"
 #include "esphome/core/log.h"
 #include "esphome/core/hal.h"
+#include <cctype>
 #include <iomanip>
-#include <regex>
+#include <sstream>
 
 namespace esphome {
 namespace daikin_rotex_can {
@@ -58,55 +59,43 @@ std::string Utils::to_hex(TMessage const& data) {
     return str.str();
 }
 
-TMessage Utils::str_to_bytes(const std::string& str) {
-    TMessage bytes = {0};
-    std::stringstream ss(str);
-    std::string byteStr;
+// Accepts 1 to 7 bytes like "31 00 FA 01 12" or "0x31 0x00 0xFA", separated by single whitespaces
+bool Utils::str_to_bytes(const std::string& str, TMessage& bytes) {
+    bytes = {0};
 
-    uint8_t index = 0;
-    while (ss >> byteStr) {
-        const uint8_t byte = static_cast<uint8_t>(std::stoi(byteStr, nullptr, 16));
-        bytes[index++] = byte;
-    }
-
-    return bytes;
-}
-
-TMessage Utils::str_to_bytes_array8(const std::string& str) {
-    TMessage byte_array{};
-
-    std::string cleaned_str = std::regex_replace(str, std::regex("[^0-9A-Fa-f\\s]+"), "");
-    cleaned_str = std::regex_replace(cleaned_str, std::regex("\\s+"), " ");
-
-    std::stringstream ss(cleaned_str);
-    std::string byte_str;
-    size_t index = 0;
-
-    while (ss >> byte_str && index < byte_array.size()) {
-        byte_array[index++] = static_cast<uint8_t>(std::stoul(byte_str, nullptr, 16));
-    }
-
-    return byte_array;
-}
+    const auto hex_value = [](char chr) -> int {
+        return std::isxdigit(static_cast<unsigned char>(chr)) ?
+            (std::isdigit(static_cast<unsigned char>(chr)) ? chr - '0' : std::toupper(static_cast<unsigned char>(chr)) - 'A' + 10) : -1;
+    };
 
-std::map<uint16_t, std::string> Utils::str_to_map(const std::string& input) {
-    std::map<uint16_t, std::string> result;
-    std::stringstream ss(input);
-    std::string pair;
-
-    while (std::getline(ss, pair, '|')) {
-        size_t pos = pair.find(':');
-        if (pos != std::string::npos) {
-            std::string keyStr = pair.substr(0, pos);
-            std::string value = pair.substr(pos + 1);
-
-            uint16_t key = static_cast<uint16_t>(std::strtoul(keyStr.c_str(), nullptr, 16));
+    size_t pos = 0;
+    uint8_t index = 0;
+    while (true) {
+        if (index >= bytes.size()) {
+            return false;
+        }
+        if (str.compare(pos, 2, "0x") == 0) {
+            pos += 2;
+        }
+        if (pos + 2 > str.size()) {
+            return false;
+        }
+        const int high = hex_value(str[pos]);
+        const int low = hex_value(str[pos + 1]);
+        if (high < 0 || low < 0) {
+            return false;
+        }
+        bytes[index++] = static_cast<uint8_t>((high << 4) | low);
+        pos += 2;
 
-            result[key] = value;
+        if (pos == str.size()) {
+            return true;
+        }
+        if (!std::isspace(static_cast<unsigned char>(str[pos]))) {
+            return false;
         }
+        ++pos;
     }
-
-    return result;
 }
 
 uint16_t Utils::hex_to_uint16(const std::string& hexStr) {
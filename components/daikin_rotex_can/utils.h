@@ -3,7 +3,6 @@
 #include "esphome/components/daikin_rotex_can/types.h"
 #include <functional>
 #include <memory>
-#include <map>
 
 namespace esphome {
 namespace daikin_rotex_can {
@@ -32,9 +31,7 @@ public:
     static bool find(std::string const& haystack, std::string const& needle);
     static std::vector<std::string> split(std::string const& str);
     static std::string to_hex(uint32_t value);
-    static TMessage str_to_bytes(const std::string& str);
-    static TMessage str_to_bytes_array8(const std::string& str);
-    static std::map<uint16_t, std::string> str_to_map(const std::string& input);
+    static bool str_to_bytes(const std::string& str, TMessage& bytes);
     static uint16_t hex_to_uint16(const std::string& hexStr);
     static void setBytes(TMessage& data, uint16_t value, uint8_t offset, uint8_t len);
 
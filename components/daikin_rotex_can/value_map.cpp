@@ -0,0 +1,48 @@
+#include "esphome/components/daikin_rotex_can/value_map.h"
+
+#include <algorithm>
+#include <cstring>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+const char* TValueMap::findByKey(uint16_t key) const {
+    uint16_t const* end = keys + size;
+    uint16_t const* it = std::lower_bound(keys, end, key);
+    return (it != end && *it == key) ? labels[it - keys] : nullptr;
+}
+
+// Returns the label of the closest key. On equal distance the lower key wins.
+const char* TValueMap::findNextByKey(uint16_t key) const {
+    if (size == 0) {
+        return nullptr;
+    }
+
+    uint16_t const* end = keys + size;
+    uint16_t const* it = std::lower_bound(keys, end, key);
+    if (it == end) {
+        return labels[size - 1];
+    }
+    if (it == keys || *it == key) {
+        return labels[it - keys];
+    }
+
+    uint16_t const* prev = it - 1;
+    return (key - *prev <= *it - key) ? labels[prev - keys] : labels[it - keys];
+}
+
+bool TValueMap::findByValue(const char* label, uint16_t& key) const {
+    uint8_t const* end = label_order + size;
+    uint8_t const* it = std::lower_bound(label_order, end, label, [this](uint8_t index, const char* value) {
+        return std::strcmp(labels[index], value) < 0;
+    });
+
+    if (it != end && std::strcmp(labels[*it], label) == 0) {
+        key = keys[*it];
+        return true;
+    }
+    return false;
+}
+
+}
+}
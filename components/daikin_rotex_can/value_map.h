@@ -0,0 +1,30 @@
+#pragma once
+
+#include <cstdint>
+
+namespace esphome {
+namespace daikin_rotex_can {
+
+// Constant key/label table of a select or text sensor. The tables are generated by to_code() into
+// entity_descriptors.cpp, identical maps are emitted once and the select options point to the same labels.
+struct TValueMap {
+    uint16_t const* keys;           // Sorted ascending
+    const char* const* labels;      // labels[i] belongs to keys[i]
+    uint8_t const* label_order;     // Indices into keys/labels, sorted by label (strcmp)
+    uint8_t size;
+
+    const char* findByKey(uint16_t key) const;
+    const char* findNextByKey(uint16_t key) const;
+    bool findByValue(const char* label, uint16_t& key) const;
+};
+
+// Size of a 32 bit build as estimated by footprint.py
+#if UINTPTR_MAX == 0xFFFFFFFFu
+static_assert(sizeof(TValueMap) == 16, "footprint.py VALUE_MAP_SIZE");
+#endif
+
+extern const TValueMap g_value_maps[];
+extern const uint16_t g_value_maps_size;
+
+}
+}
@@ -0,0 +1,128 @@
+// Frames per second of the receive dispatch: the former walk over all entities (TEntity::isMatch with
+// the expected response bytes) compared to TFrameIndex, for 115 entities (full_en.yaml) and 500 entities.
+// Most frames on the bus are not handled by any entity, they pay for the full walk.
+//
+// hpsu_benchmarks [frames]
+
+#include "esphome/components/daikin_rotex_can/frame_index.h"
+
+#include <array>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <random>
+#include <vector>
+
+using namespace esphome::daikin_rotex_can;
+
+namespace {
+
+constexpr uint16_t DC = 0xFFFF;
+constexpr double HANDLED_RATIO = 0.3;
+
+struct TLinearEntity {
+    uint16_t can_id;
+    std::array<uint16_t, 7> expected_response;
+
+    bool isMatch(uint32_t can_id, TMessage const& data) const {
+        const bool is_set = (data[0] & 0x0F) == 0x00;
+        const bool is_response = (data[0] & 0x0F) == 0x02;
+        if (can_id != this->can_id && !(can_id == 0x10A && (is_response || is_set))) {
+            return false;
+        }
+        for (uint32_t index = 0; index < data.size(); ++index) {
+            if (expected_response[index] != DC && data[index] != expected_response[index]) {
+                return false;
+            }
+        }
+        return true;
+    }
+};
+
+struct TFrame {
+    uint32_t can_id;
+    TMessage data;
+};
+
+TMessage command_of(uint32_t entity) {
+    const uint8_t can_nibble = 0x10 * (1 + entity % 3);
+    if (entity % 4 == 0) {
+        return {static_cast<uint8_t>(can_nibble | 0x01), 0x00, static_cast<uint8_t>(entity / 4), 0x00, 0x00, 0x00, 0x00};
+    }
+    return {static_cast<uint8_t>(can_nibble | 0x01), 0x00, 0xFA, static_cast<uint8_t>(entity >> 8), static_cast<uint8_t>(entity), 0x00, 0x00};
+}
+
+uint16_t can_id_of(uint32_t entity) {
+    const uint16_t can_ids[] = {0x180, 0x300, 0x500};
+    return can_ids[entity % 3];
+}
+
+template <typename TFind>
+double frames_per_second(std::vector<TFrame> const& frames, uint32_t& handled, TFind find) {
+    handled = 0;
+    const auto start = std::chrono::steady_clock::now();
+    for (TFrame const& frame : frames) {
+        handled += find(frame) ? 1 : 0;
+    }
+    const std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+    return frames.size() / elapsed.count();
+}
+
+void run(uint32_t entity_count, uint32_t frame_count) {
+    std::vector<TLinearEntity> linear;
+    TFrameIndex index;
+    for (uint32_t entity = 0; entity < entity_count; ++entity) {
+        const TMessage command = command_of(entity);
+        TLinearEntity entry = {can_id_of(entity), {DC, DC, command[2], DC, DC, DC, DC}};
+        if (command[2] == 0xFA) {
+            entry.expected_response[3] = command[3];
+            entry.expected_response[4] = command[4];
+        }
+        linear.push_back(entry);
+        index.add(entry.can_id, command, entity);
+    }
+
+    std::mt19937 rng(1);
+    std::uniform_real_distribution<double> ratio(0.0, 1.0);
+    std::vector<TFrame> frames;
+    for (uint32_t frame = 0; frame < frame_count; ++frame) {
+        if (ratio(rng) < HANDLED_RATIO) {
+            const uint32_t entity = rng() % entity_count;
+            TMessage data = command_of(entity);
+            data[0] = 0xD2;
+            frames.push_back({can_id_of(entity), data});
+        } else {    // RoCon panel requests and registers nobody listens to
+            frames.push_back({0x10A, {static_cast<uint8_t>(0x30 | (rng() % 2)), 0x00, 0xFA, 0x70, static_cast<uint8_t>(rng()), 0x00, 0x00}});
+        }
+    }
+
+    uint32_t linear_handled = 0;
+    uint32_t index_handled = 0;
+    const double linear_fps = frames_per_second(frames, linear_handled, [&linear](TFrame const& frame) {
+        for (TLinearEntity const& entity : linear) {
+            if (entity.isMatch(frame.can_id, frame.data)) {
+                return true;
+            }
+        }
+        return false;
+    });
+    const double index_fps = frames_per_second(frames, index_handled, [&index](TFrame const& frame) {
+        return index.find(frame.can_id, frame.data) != TFrameIndex::NOT_FOUND;
+    });
+
+    if (linear_handled != index_handled) {
+        std::printf("Mismatch: linear handled %u, index handled %u frames\n", linear_handled, index_handled);
+        std::exit(1);
+    }
+    std::printf("%4u entities: linear %12.0f frames/s, index %12.0f frames/s, x%.1f (%u of %u frames handled)\n",
+        entity_count, linear_fps, index_fps, index_fps / linear_fps, index_handled, frame_count);
+}
+
+}
+
+int main(int argc, char* argv[]) {
+    const uint32_t frame_count = argc > 1 ? std::strtoul(argv[1], nullptr, 10) : 1000000;
+    run(115, frame_count);
+    run(500, frame_count);
+    return 0;
+}
@@ -0,0 +1,155 @@
+"""
+    Benchmarks for the Python code generation path of the daikin_rotex_can component.
+
+    Measures module import, entity schema construction, validation and to_code of the bundled
+    example configurations and translate.write_cpp_file. esphome itself is replaced by
+    esphome_stub, so only the component's own code is measured.
+
+    Usage: python3 test/python/benchmarks/benchmark_codegen.py [--rounds N] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, "..", "..", ".."))
+COMPONENTS_DIR = os.path.join(ROOT_DIR, "components")
+EXAMPLES = ["full_de", "full_en", "full_it"]
+COMPONENT = "daikin_rotex_can"
+
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "helpers"))
+sys.path.insert(0, COMPONENTS_DIR)
+
+import esphome_stub
+
+class _ExampleLoader(yaml.SafeLoader):
+    pass
+
+_ExampleLoader.add_constructor("!secret", lambda loader, node: "secret")
+
+def load_example(name):
+    with open(os.path.join(ROOT_DIR, "examples", f"{name}.yaml"), encoding="utf-8") as f:
+        return yaml.load(f, Loader=_ExampleLoader)[COMPONENT]
+
+def unload_component():
+    for module_name in list(sys.modules):
+        if module_name == COMPONENT or module_name.startswith(COMPONENT + "."):
+            del sys.modules[module_name]
+
+def import_component():
+    unload_component()
+    return importlib.import_module(COMPONENT)
+
+def clear_schema_caches(component):
+    component.get_entity_schema.cache_clear()
+    component.component_entity_schemas.cache_clear()
+
+def measure(function, setup, rounds):
+    """Runs setup() + function() rounds times. Returns timing statistics and the peak traced memory of one extra run."""
+    timings = []
+    for _ in range(rounds):
+        setup()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "rounds": rounds,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "peak_memory_kib": round(peak / 1024.0, 1),
+    }
+
+def run_benchmarks(rounds, build_path):
+    esphome_stub.install(build_path)
+    results = {}
+
+    results["import"] = measure(import_component, lambda: None, rounds)
+
+    component = import_component()
+    translate = importlib.import_module(f"{COMPONENT}.translations.translate")
+
+    def build_all_schemas():
+        for sensor_conf in component.sensor_configuration:
+            component.build_entity_schema(sensor_conf)
+        component.component_entity_schemas()
+
+    results["schema_construction"] = measure(build_all_schemas, lambda: clear_schema_caches(component), rounds)
+
+    for example in EXAMPLES:
+        example_conf = load_example(example)
+
+        results[f"validate_{example}"] = measure(
+            lambda: component.CONFIG_SCHEMA(example_conf),
+            lambda: clear_schema_caches(component),
+            rounds
+        )
+
+        validated = component.CONFIG_SCHEMA(example_conf)
+        results[f"to_code_{example}"] = measure(
+            lambda: asyncio.run(component.to_code(validated)),
+            lambda: (esphome_stub.STATEMENTS.clear(), esphome_stub.GLOBALS.clear()),
+            rounds
+        )
+        results[f"to_code_{example}"]["statements"] = len(esphome_stub.STATEMENTS)
+
+    output_dir = os.path.join(build_path, "translations")
+    results["write_cpp_file_cold"] = measure(
+        lambda: translate.write_cpp_file(output_dir),
+        lambda: shutil.rmtree(output_dir, ignore_errors=True),
+        rounds
+    )
+    results["write_cpp_file_unchanged"] = measure(
+        lambda: translate.write_cpp_file(output_dir),
+        lambda: None,
+        rounds
+    )
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sensor_configuration_entries": len(component.sensor_configuration),
+        "benchmarks": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="Timed rounds per benchmark")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as build_path:
+        results = run_benchmarks(args.rounds, build_path)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
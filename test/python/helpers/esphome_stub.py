@@ -0,0 +1,299 @@
+"""
+    Minimal stand-in for the parts of esphome used by the daikin_rotex_can component, shared by the
+    Python tests and the benchmarks.
+
+    Config validation and code generation are reduced to plain dictionaries and recorded C++ statements.
+    It does not reproduce voluptuous or the YAML types of esphome, test_esphome_config.py validates the
+    examples with the real esphome when it is installed.
+"""
+
+import os
+import sys
+import types
+
+STATEMENTS = []
+GLOBALS = []
+
+def _fmt(value):
+    if isinstance(value, Expr):
+        return str(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return '"' + value.replace('"', '\\"') + '"'
+    if isinstance(value, (list, tuple)):
+        return "{" + ", ".join(_fmt(item) for item in value) + "}"
+    return str(value)
+
+class Expr:
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return self.value
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Expr(f"{self.value}->{name}")
+
+    def __call__(self, *args):
+        return Expr(f"{self.value}(" + ", ".join(_fmt(arg) for arg in args) + ")")
+
+    def namespace(self, name):
+        return Expr(f"{self.value}::{name}")
+
+    def class_(self, name, *parents):
+        return Expr(f"{self.value}::{name}")
+
+########## esphome.config_validation ##########
+
+class Invalid(Exception):
+    def __init__(self, message, path=None):
+        super().__init__(message)
+        self.path = path or []
+
+class _Undefined:
+    pass
+
+UNDEFINED = _Undefined()
+
+class _Key(str):
+    def __new__(cls, key, default=UNDEFINED):
+        obj = str.__new__(cls, key)
+        obj.default = default
+        return obj
+
+class Optional(_Key):
+    pass
+
+class Required(_Key):
+    pass
+
+def _validate(validator, value):
+    return validator(value) if callable(validator) else value
+
+class Schema:
+    def __init__(self, schema, extra=False):
+        self.schema = dict(schema)
+        self.extra = extra
+
+    def extend(self, *others):
+        schema = dict(self.schema)
+        for other in others:
+            schema.update(other.schema if isinstance(other, Schema) else other)
+        return Schema(schema, self.extra)
+
+    def __call__(self, value):
+        if not isinstance(value, dict):
+            raise Invalid("expected a dictionary")
+        keys = {str(key): key for key in self.schema if isinstance(key, str)}
+        key_validators = [key for key in self.schema if not isinstance(key, str)]
+        result = {}
+        for key, item in value.items():
+            if str(key) in keys:
+                result[key] = _validate(self.schema[keys[str(key)]], item)
+            elif key_validators:
+                result[key_validators[0](key)] = _validate(self.schema[key_validators[0]], item)
+            elif self.extra:
+                result[key] = item
+            else:
+                raise Invalid(f"extra keys not allowed: {key}", [key])
+        for key in keys.values():
+            if str(key) not in result:
+                if isinstance(key, Required):
+                    raise Invalid(f"required key not provided: {key}", [key])
+                if key.default is not UNDEFINED:
+                    result[str(key)] = _validate(self.schema[key], key.default)
+        return result
+
+class Lambda:
+    def __init__(self, value):
+        self.value = value
+
+class TimePeriodMilliseconds:
+    def __init__(self, milliseconds):
+        self.total_milliseconds = milliseconds
+
+def All(*validators):
+    def validate(value):
+        for validator in validators:
+            value = _validate(validator, value)
+        return value
+    return validate
+
+def typed_schema(schemas, default_type=None, **kwargs):
+    def validate(value):
+        value = dict(value)
+        schema_type = value.pop("type", default_type)
+        if schema_type not in schemas:
+            raise Invalid(f"Unknown type: {schema_type}")
+        result = schemas[schema_type](value)
+        result["type"] = schema_type
+        return result
+    return validate
+
+def positive_time_period_milliseconds(value):
+    if isinstance(value, TimePeriodMilliseconds):
+        return value
+    text = str(value).strip()
+    for suffix, factor in [("ms", 1), ("min", 60000), ("s", 1000), ("h", 3600000)]:
+        if text.endswith(suffix):
+            return TimePeriodMilliseconds(int(float(text[:-len(suffix)]) * factor))
+    # Like esphome, a number without unit is rejected instead of read as seconds
+    raise Invalid(f"Don't know what '{value}' means as it has no time *unit*! Did you mean '{value}s'?")
+
+def enum(mapping, upper=False, lower=False, space=None):
+    def validate(value):
+        value = str(value).upper() if upper else str(value).lower() if lower else str(value)
+        if value not in mapping:
+            raise Invalid(f"Unknown value {value}")
+        return value
+    return validate
+
+def one_of(*values, lower=False, upper=False):
+    def validate(value):
+        value = str(value).upper() if upper else str(value).lower() if lower else value
+        if value not in values:
+            raise Invalid(f"Unknown value {value}, valid options are {', '.join(map(str, values))}")
+        return value
+    return validate
+
+def percentage(value):
+    text = str(value).strip()
+    return float(text[:-1]) / 100.0 if text.endswith("%") else float(text)
+
+def boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text not in ["true", "false", "yes", "no", "on", "off", "enable", "disable"]:
+        raise Invalid(f"Expected a boolean, got {value}")
+    return text in ["true", "yes", "on", "enable"]
+
+def float_range(min=None, max=None):
+    return float
+
+def int_range(min=None, max=None):
+    return int
+
+def declare_id(type_):
+    return str
+
+def use_id(type_):
+    return str
+
+def GenerateID():
+    return Optional("id", default="daikin_rotex_can_id")
+
+########## esphome.codegen ##########
+
+class RawStatement(Expr):
+    pass
+
+class RawExpression(Expr):
+    pass
+
+def add(expression):
+    STATEMENTS.append(f"{expression};")
+
+def add_global(expression):
+    GLOBALS.append(str(expression))
+
+def add_define(*args):
+    pass
+
+def set_cpp_standard(standard):
+    pass
+
+def add_build_unflag(flag):
+    pass
+
+def new_Pvariable(id_, *args):
+    STATEMENTS.append(f"auto {id_} = new T();")
+    return Expr(str(id_))
+
+async def register_component(var, config):
+    pass
+
+async def register_parented(var, parent):
+    STATEMENTS.append(f"{var}->set_parent({parent});")
+
+async def get_variable(id_):
+    return Expr(str(id_))
+
+async def process_lambda(lamb, params, return_type=None):
+    args = ", ".join(f"{param_type} {name}" for param_type, name in params)
+    return Expr(f"[=]({args}) -> {return_type} {{ {lamb.value} }}")
+
+########## esphome.components.* ##########
+
+def _entity_schema(*args, **kwargs):
+    return Schema({Required("name"): str}, extra=True)
+
+def _new_entity(kind):
+    async def new_entity(config, *args, **kwargs):
+        var = Expr(f"{kind}_{len(STATEMENTS)}")
+        STATEMENTS.append(f"auto {var} = new {kind}();")
+        return var
+    return new_entity
+
+class _Core:
+    build_path = None
+
+    def relative_src_path(self, *path):
+        return os.path.join(self.build_path, "src", *path)
+
+CORE = _Core()
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+def install(build_path):
+    """Registers the stub modules, generated files are written below build_path."""
+    CORE.build_path = build_path
+    STATEMENTS.clear()
+    GLOBALS.clear()
+
+    esphome = _module("esphome")
+    esphome.core = _module("esphome.core", CORE=CORE, Lambda=Lambda, TimePeriodMilliseconds=TimePeriodMilliseconds)
+    _module("esphome.cpp_generator", MockObj=Expr)
+    _module("esphome.cpp_types", std_ns=Expr("std"))
+    _module("esphome.codegen",
+        esphome_ns=Expr("esphome"), Component=Expr("Component"),
+        uint16=Expr("uint16_t"), std_string=Expr("std::string"), void=Expr("void"),
+        RawStatement=RawStatement, RawExpression=RawExpression,
+        add=add, add_global=add_global, add_define=add_define, new_Pvariable=new_Pvariable,
+        set_cpp_standard=set_cpp_standard, add_build_unflag=add_build_unflag,
+        register_component=register_component, register_parented=register_parented,
+        get_variable=get_variable, process_lambda=process_lambda,
+    )
+    _module("esphome.config_validation",
+        Invalid=Invalid, UNDEFINED=UNDEFINED, Optional=Optional, Required=Required, Schema=Schema,
+        All=All, typed_schema=typed_schema, positive_time_period_milliseconds=positive_time_period_milliseconds,
+        enum=enum, one_of=one_of, percentage=percentage, boolean=boolean, float_range=float_range, int_range=int_range, declare_id=declare_id, use_id=use_id, GenerateID=GenerateID,
+        string=str, float_=float, uint16_t=int, positive_int=int, COMPONENT_SCHEMA=Schema({}),
+    )
+    _module("esphome.const",
+        CONF_ID="id", CONF_INTERNAL="internal", CONF_MODE="mode", CONF_NAME="name",
+        DEVICE_CLASS_ENERGY_STORAGE="energy_storage", DEVICE_CLASS_POWER="power",
+        DEVICE_CLASS_PRESSURE="pressure", DEVICE_CLASS_TEMPERATURE="temperature",
+        ENTITY_CATEGORY_CONFIG="config", ENTITY_CATEGORY_DIAGNOSTIC="diagnostic",
+        STATE_CLASS_MEASUREMENT="measurement",
+        UNIT_CELSIUS="°C", UNIT_HOUR="h", UNIT_KELVIN="K", UNIT_KILOWATT="kW",
+        UNIT_KILOWATT_HOURS="kWh", UNIT_MINUTE="min", UNIT_PERCENT="%",
+    )
+
+    components = _module("esphome.components")
+    for kind in ["sensor", "binary_sensor", "button", "number", "select", "switch", "text_sensor", "canbus", "text"]:
+        module = _module(
+            f"esphome.components.{kind}",
+            CanbusComponent=Expr("CanbusComponent"),
+            NUMBER_MODES={"AUTO": 0, "BOX": 1, "SLIDER": 2},
+            **{f"{kind}_schema": _entity_schema, f"new_{kind}": _new_entity(kind)},
+        )
+        module.__getattr__ = lambda name: Expr(name)
+        setattr(components, kind, module)
@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+import esphome_stub
+
+SLOT = 270
+
+class BusScheduleTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        import daikin_rotex_can
+        from daikin_rotex_can import bus_schedule
+        cls.component = daikin_rotex_can
+        cls.schedule = bus_schedule
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def config(self, **kwargs):
+        entities = {name: {"name": name} for name in ["tv", "tr", "tvbh", "flow_rate", "water_pressure"]}
+        entities["tv"]["update_interval"] = esphome_stub.TimePeriodMilliseconds(1000)
+        return dict({
+            "update_interval": esphome_stub.TimePeriodMilliseconds(30000),
+            "delay_between_requests": 250,
+            "max_bus_utilization": 0.2,
+            "bus_overload": "warn",
+            "max_requests_in_flight": 1,
+            "max_frames_per_second": 20,
+            "entities": entities,
+        }, **kwargs)
+
+    def test_utilization(self):
+        self.assertEqual(SLOT, self.schedule.slot_time(250))
+        self.assertAlmostEqual(0.27 + 4 * 0.009, self.schedule.utilization({"a": 1000, "b": 30000, "c": 30000, "d": 30000, "e": 30000}, SLOT))
+
+    def test_pipelined_slot(self):
+        self.assertEqual(SLOT, self.schedule.slot_time(250, 1, 20))
+        self.assertEqual(20, self.schedule.slot_time(0))
+        self.assertEqual(100, self.schedule.slot_time(0, 4, 20))     # Bound by the frames per second cap
+        self.assertEqual(50, self.schedule.slot_time(0, 4, 40))
+        self.assertEqual(50, self.schedule.slot_time(250, 4, 40))     # The delay only applies with one GET in flight
+        self.assertEqual(10, self.schedule.slot_time(0, 2, 400))      # Bound by the round trip of the window
+
+        # 115 entities polled every 30 s need about 31 s per refresh with one GET at a time
+        intervals = {f"e{index}": 30000 for index in range(115)}
+        self.assertGreater(self.schedule.plan_schedule(intervals, 250)["utilization"], 1.0)
+        plan = self.schedule.plan_schedule(intervals, 0, requests_in_flight=4, max_frames_per_second=40)
+        self.assertAlmostEqual(115 * 50 / 30000, plan["utilization"])
+        self.assertIn("4 in flight), full refresh in 5.8s", self.schedule.format_schedule(plan))
+
+    def test_pipelining_avoids_overload(self):
+        config = self.config(bus_overload="fail", delay_between_requests=0, max_requests_in_flight=4, max_frames_per_second=40)
+        self.assertEqual(1000, self.component.validate_bus_schedule(config)["entities"]["tv"]["update_interval"].total_milliseconds)
+
+    def test_stretch_keeps_long_intervals(self):
+        intervals = {"fast": 1000, "medium": 5000, "slow": 60000}
+        stretched = self.schedule.stretch_intervals(intervals, SLOT, 0.1)
+        self.assertLessEqual(self.schedule.utilization(stretched, SLOT), 0.1)
+        self.assertEqual(stretched["fast"], stretched["medium"])
+        self.assertEqual(0, stretched["fast"] % 1000)
+        self.assertEqual(60000, stretched["slow"])
+        self.assertEqual(intervals, self.schedule.stretch_intervals(intervals, SLOT, 1.0))
+
+    def test_overload_equalizes_delays(self):
+        intervals = {f"e{index}": 1000 for index in range(6)}
+        delay = self.schedule.waiting_time(intervals, SLOT)
+        self.assertAlmostEqual(1.0, sum(SLOT / (interval + delay) for interval in intervals.values()), places=6)
+
+        plan = self.schedule.plan_schedule(intervals, 250)
+        self.assertAlmostEqual(1.62, plan["utilization"])
+        self.assertAlmostEqual(1000 + delay + SLOT, plan["rows"][0][4])
+
+    def test_format_schedule(self):
+        plan = self.schedule.plan_schedule({"tv": 1000, "tr": 30000}, 250, 0.2, stretch=True)
+        lines = self.schedule.format_schedule(plan).splitlines()
+        self.assertEqual(4, len(lines))
+        self.assertTrue(lines[1].startswith("tv ") and "*" in lines[1])
+        self.assertIn("2 polled entities", lines[3])
+
+    def test_overload_is_reported(self):
+        with self.assertLogs("daikin_rotex_can", level="WARNING") as logs:
+            config = self.component.validate_bus_schedule(self.config())
+        self.assertIn("max_bus_utilization", "".join(logs.output))
+        self.assertEqual(1000, config["entities"]["tv"]["update_interval"].total_milliseconds)
+
+    def test_overload_fails(self):
+        with self.assertRaisesRegex(esphome_stub.Invalid, "CAN bus"):
+            self.component.validate_bus_schedule(self.config(bus_overload="fail"))
+
+    def test_overload_stretches_intervals(self):
+        config = self.config(bus_overload="stretch")
+        stretched = self.component.validate_bus_schedule(config)
+        self.assertEqual(1000, config["entities"]["tv"]["update_interval"].total_milliseconds)
+        self.assertEqual(2000, stretched["entities"]["tv"]["update_interval"].total_milliseconds)
+        self.assertNotIn("update_interval", stretched["entities"]["tr"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+import esphome_stub
+
+ALL_STANDARD_IDS = range(0x800)
+
+class CanFilterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        from daikin_rotex_can import can_filter, descriptors, sensor_configuration
+        cls.can_filter = can_filter
+        cls.descriptors = descriptors
+        cls.sensor_configuration = sensor_configuration
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def assert_filter(self, can_ids):
+        can_filter = self.can_filter.build_can_filter(can_ids)
+        stage_1 = [can_id for can_id in ALL_STANDARD_IDS if can_id & can_filter["mask"] == can_filter["code"]]
+        self.assertEqual(can_filter["accepted"], len(stage_1))
+        self.assertTrue(set(can_ids) <= set(stage_1))
+        self.assertEqual(set(can_ids), {can_id for can_id in ALL_STANDARD_IDS if self.can_filter.is_accepted(can_filter, can_id)})
+
+        # Tightest single filter: every further compared bit rejects one of the ids
+        for bit in range(11):
+            if not can_filter["mask"] & (1 << bit):
+                self.assertEqual(2, len({can_id & (1 << bit) for can_id in can_ids}))
+        return can_filter
+
+    def test_listened_can_ids(self):
+        rows, _ = self.descriptors.build_descriptors(
+            [(sens_conf, 10000) for sens_conf in self.sensor_configuration],
+            ["thermal_power"]
+        )
+        self.assertEqual([0x10A, 0x180, 0x300, 0x500], self.can_filter.listened_can_ids(rows))
+        self.assertEqual([0x10A], self.can_filter.listened_can_ids([]))
+
+    def test_two_stage_filter(self):
+        can_filter = self.assert_filter([0x180, 0x10A, 0x300, 0x500])
+        self.assertEqual((0x100, 0x175), (can_filter["code"], can_filter["mask"]))
+        self.assertFalse(can_filter["exact"])
+        self.assertFalse(self.can_filter.is_accepted(can_filter, 0x680))
+
+    def test_exact_filter(self):
+        can_filter = self.assert_filter([0x10A])
+        self.assertEqual((0x10A, 0x7FF, True), (can_filter["code"], can_filter["mask"], can_filter["exact"]))
+        can_filter = self.assert_filter([0x108, 0x10A])
+        self.assertEqual((0x108, 0x7FD, True), (can_filter["code"], can_filter["mask"], can_filter["exact"]))
+
+    def test_random_id_sets(self):
+        rng = random.Random(2)
+        for _ in range(50):
+            self.assert_filter(rng.sample(ALL_STANDARD_IDS, rng.randint(1, 6)))
+
+    def test_invalid_ids(self):
+        with self.assertRaises(ValueError):
+            self.can_filter.build_can_filter([])
+        with self.assertRaises(ValueError):
+            self.can_filter.build_can_filter([0x800])
+
+    def test_twai_single_filter(self):
+        can_filter = self.can_filter.build_can_filter([0x108, 0x10A])
+        self.assertEqual((0x21000000, 0x005FFFFF), self.can_filter.twai_single_filter(can_filter))
+
+    def test_generated_filter(self):
+        rows, _ = self.descriptors.build_descriptors([(self.sensor_configuration[0], 10000)])
+        cpp_code = self.descriptors.generate_cpp_descriptors(rows)
+        self.assertIn('#include "esphome/components/daikin_rotex_can/can_filter.h"', cpp_code)
+        self.assertIn("constexpr TCanFilter g_can_filter = {0x100, 0x775, CAN_FILTER_IDS, 2};", cpp_code)
+        self.assertIn("static constexpr uint16_t CAN_FILTER_IDS[] = {0x10A, 0x180};", cpp_code)
+
+        exact = self.can_filter.build_can_filter([0x10A])
+        self.assertEqual("constexpr TCanFilter g_can_filter = {0x10A, 0x7FF, nullptr, 0};\n\n", self.can_filter.generate_cpp_can_filter(exact))
+
+if __name__ == "__main__":
+    unittest.main()
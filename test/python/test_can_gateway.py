@@ -0,0 +1,188 @@
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+try:
+    import can
+    import numpy as np
+except ImportError:
+    can = None
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+SENSOR_CONFS = [
+    {"type": "sensor", "name": "tv", "command": "31 00 FA C0 FD 00 00", "data_offset": 5, "data_size": 2, "divider": 10.0, "signed": True},
+    {"type": "sensor", "name": "tv_copy", "command": "31 00 FA C0 FD 00 00", "data_offset": 5, "data_size": 2, "divider": 10.0, "signed": True},
+    {"type": "sensor", "name": "water_pressure", "command": "31 00 1C 00 00 00 00", "data_offset": 3, "data_size": 2, "divider": 1000.0, "range": [0.1, 5]},
+    {"type": "sensor", "name": "status_kompressor", "can_id": 0x500, "command": "A1 00 61 00 00 00 00", "data_offset": 3, "data_size": 1},
+    {"type": "select", "name": "operating_mode", "command": "31 00 FA 01 12 00 00", "data_offset": 5, "data_size": 1, "map": {0x01: "Standby", 0x03: "Heizen", 0x05: "Sommer"}},
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class RecordingBus:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(bytes(message.data))
+
+@unittest.skipIf(can is None, "python-can or numpy is not installed")
+class CanGatewayTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import esphome_stub
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        from daikin_rotex_can import can_gateway, can_log_decoder, sensor_configuration
+        cls.gateway = can_gateway
+        cls.decoder = can_log_decoder
+        cls.sensor_configuration = sensor_configuration
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def poller(self, **kwargs):
+        self.clock = FakeClock()
+        self.bus = RecordingBus()
+        return self.gateway.HpsuPoller(self.bus, SENSOR_CONFS, clock=self.clock, **kwargs)
+
+    def test_decode_frame_matches_offline_decoder(self):
+        rng = random.Random(1)
+        frames = np.array([[rng.randrange(256) for _ in range(7)] for _ in range(200)], dtype=np.uint8)
+        for sens_conf in self.sensor_configuration:
+            entity = self.decoder.compile_entity(sens_conf)
+            decoded = self.decoder.decode_values(entity, frames)
+            with self.subTest(name=entity["name"]):
+                if decoded is None:
+                    self.assertIsNone(self.gateway.decode_frame(entity, bytes(frames[0])))
+                    continue
+                values, labels, valid = decoded
+                for index, frame in enumerate(frames):
+                    result = self.gateway.decode_frame(entity, bytes(frame))
+                    self.assertEqual(bool(valid[index]), result is not None)
+                    if result is not None:
+                        self.assertAlmostEqual(float(values[index]), float(result[0]), places=3)
+                        if labels is not None:
+                            expected = entity["labels"][labels[index]] if labels[index] >= 0 else None
+                            self.assertEqual(expected, result[1])
+
+    def test_first_entity_wins(self):
+        poller = self.poller()
+        self.assertEqual("tv", poller.handle(0x180, bytes.fromhex("D200FAC0FD00F5")).name)
+        self.assertEqual(24.5, poller.entities[0].value)
+        self.assertIsNone(poller.entities[1].last_handle)
+        self.assertIsNone(poller.handle(0x180, bytes.fromhex("A2006101000000")))     # status_kompressor listens on 0x500
+        self.assertEqual("status_kompressor", poller.handle(0x500, bytes.fromhex("A2006101000000")).name)
+
+    def test_entities_without_command_handle_no_frames(self):
+        poller = self.gateway.HpsuPoller(None, [{"type": "select", "name": "optimized_defrosting", "data_offset": 5, "data_size": 1}] + SENSOR_CONFS)
+        self.assertIsNone(poller.find_entity(0x180, bytes.fromhex("D2000000000100")))
+        self.assertIsNone(poller.find_entity(0x10A, bytes.fromhex("32100000000100")))
+        self.assertEqual("water_pressure", poller.find_entity(0x180, bytes.fromhex("D2001C0BB80000")).name)
+
+    def test_rocon_panel_frames(self):
+        poller = self.poller()
+        update = poller.handle(0x10A, bytes.fromhex("3210FA01120500"))
+        self.assertEqual(("operating_mode", 5, "Sommer"), (update.name, update.value, update.label))
+        self.assertIsNone(poller.handle(0x10A, bytes.fromhex("3110FA01120300")))     # GET of the panel
+
+    def test_invalid_value_is_handled_without_update(self):
+        poller = self.poller()
+        self.assertIsNone(poller.handle(0x180, bytes.fromhex("D2001C27100000")))     # 10 bar is out of range
+        self.assertEqual(100.0, poller.entities[2].last_handle)
+
+    def test_schedule(self):
+        poller = self.poller(update_intervals={"tv": 1.0}, default_update_interval=10.0, delay_between_requests=0.25)
+
+        entity = poller.next_request(self.clock.now)
+        self.assertEqual("tv", entity.name)     # never handled entities in order
+        poller.send_get(entity, self.clock.now)
+        self.assertIsNone(poller.next_request(self.clock.now))     # GET in progress
+
+        self.clock.now += 0.05
+        poller.handle(0x180, bytes.fromhex("D200FAC0FD00F5"))
+        self.assertIsNone(poller.next_request(self.clock.now))     # delay after the last frame
+        self.assertAlmostEqual(100.3, poller.next_request_time(self.clock.now))
+
+        self.clock.now += 0.25
+        self.assertEqual("tv_copy", poller.next_request(self.clock.now).name)
+        for entity in poller.entities:
+            entity.last_handle = self.clock.now
+        self.assertIsNone(poller.next_request(self.clock.now))
+        self.assertAlmostEqual(self.clock.now + 1.0, poller.next_request_time(self.clock.now))
+
+        # The most overdue entity first: tv by 11 s, the others by 2 s and status_kompressor by 22 s
+        self.clock.now += 12.0
+        self.assertEqual("tv", poller.next_request(self.clock.now).name)
+        poller.entities[3].last_handle -= 20.0
+        self.assertEqual("status_kompressor", poller.next_request(self.clock.now).name)
+
+    def test_lost_get(self):
+        poller = self.poller()
+        poller.send_get(poller.next_request(self.clock.now), self.clock.now)
+        self.clock.now += self.gateway.GET_TIMEOUT
+        self.assertEqual("tv", poller.next_request(self.clock.now).name)
+        self.assertEqual([bytes.fromhex("3100FAC0FD0000")], self.bus.sent)
+
+    def test_virtual_bus(self):
+        async def hpsu(bus):
+            """Answers every GET on 0x180 with the requested register set to 0x0123."""
+            reader = can.AsyncBufferedReader()
+            notifier = can.Notifier(bus, [reader], loop=asyncio.get_running_loop())
+            try:
+                while True:
+                    request = await reader.get_message()
+                    response = bytearray(request.data)
+                    response[0] = (response[0] & 0xF0) | 0x02
+                    if response[2] == 0xFA:
+                        response[5:7] = b"\x01\x23"
+                    else:
+                        response[3:5] = b"\x01\x23"
+                    bus.send(can.Message(arbitration_id=0x180, data=response, is_extended_id=False))
+            finally:
+                notifier.stop()
+
+        async def poll():
+            with can.Bus(interface="virtual", channel="hpsu", receive_own_messages=False) as gateway_bus, \
+                    can.Bus(interface="virtual", channel="hpsu", receive_own_messages=False) as hpsu_bus:
+                confs = [conf for conf in SENSOR_CONFS if conf["name"] in ["tv", "water_pressure", "operating_mode"]]
+                poller = self.gateway.HpsuPoller(gateway_bus, confs, default_update_interval=0.2, delay_between_requests=0.01)
+                callback_updates = []
+                poller.add_callback(callback_updates.append)
+
+                tasks = [asyncio.create_task(hpsu(hpsu_bus)), asyncio.create_task(poller.run())]
+                updates = []
+                try:
+                    async for update in poller.updates():
+                        updates.append(update)
+                        if len(updates) == 6:
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                return updates, callback_updates
+
+        updates, callback_updates = asyncio.run(asyncio.wait_for(poll(), 10))
+        self.assertEqual(updates, callback_updates[:6])
+        self.assertEqual(["tv", "water_pressure", "operating_mode"], [update.name for update in updates[:3]])
+        self.assertEqual([29.1, 0.291, 1], [update.value for update in updates[:3]])
+        self.assertEqual("Standby", updates[2].label)
+        self.assertEqual([False, False, False], [update.changed for update in updates[3:]])
+        self.assertGreaterEqual(updates[3].timestamp - updates[0].timestamp, 0.2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+SENSOR_CONFS = [
+    {"type": "sensor", "name": "tv", "command": "31 00 FA C0 FD 00 00", "data_offset": 5, "data_size": 2, "divider": 10.0, "signed": True},
+    {"type": "sensor", "name": "tv_copy", "command": "31 00 FA C0 FD 00 00", "data_offset": 5, "data_size": 2, "divider": 10.0, "signed": True},
+    {"type": "sensor", "name": "water_pressure", "command": "31 00 1C 00 00 00 00", "data_offset": 3, "data_size": 2, "divider": 1000.0, "range": [0.1, 5]},
+    {"type": "sensor", "name": "status_kompressor", "can_id": 0x500, "command": "A1 00 61 00 00 00 00", "data_offset": 3, "data_size": 1},
+    {"type": "select", "name": "operating_mode", "command": "31 00 FA 01 12 00 00", "data_offset": 5, "data_size": 1, "map": {0x01: "Standby", 0x03: "Heizen", 0x05: "Sommer"}},
+    {"type": "text_sensor", "name": "error_code", "command": "31 00 FA 13 88 00 00", "data_offset": 5, "data_size": 2, "map": {0: "OK", 9001: "E9001"}},
+    {"type": "binary_sensor", "name": "external_temp_sensor", "command": "31 00 FA 09 61 00 00", "data_offset": 6, "data_size": 1, "codec": {"op": "equals", "value": 0x05}},
+]
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class CanLogDecoderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import esphome_stub
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        from daikin_rotex_can import can_log_decoder, sensor_configuration
+        cls.decoder = can_log_decoder
+        cls.sensor_configuration = sensor_configuration
+        cls.index = can_log_decoder.build_index(SENSOR_CONFS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def owners(self, frames):
+        can_ids = np.array([can_id for can_id, _ in frames], dtype=np.uint32)
+        data = np.array([list(bytes.fromhex(data)) for _, data in frames], dtype=np.uint8)
+        return [int(owner) for owner in self.index.match(can_ids, data)]
+
+    def decode(self, content, **kwargs):
+        path = os.path.join(self.tmp_dir.name, "can.log")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return self.decoder.decode_file(path, self.index, **kwargs)
+
+    def test_match_follows_entity_order_and_can_id(self):
+        self.assertEqual([0, 2, 3, -1, -1, -1], self.owners([
+            (0x180, "D2 00 FA C0 FD 00 F5"),    # tv wins over tv_copy
+            (0x180, "D2 00 1C 0B B8 00 00"),    # only byte 2 is compared
+            (0x500, "A2 00 61 01 00 00 00"),
+            (0x180, "A2 00 61 01 00 00 00"),    # status_kompressor listens on 0x500
+            (0x180, "D2 00 FA C0 FE 00 F5"),
+            (0x300, "D2 00 FA C0 FD 00 F5"),
+        ]))
+
+    def test_rocon_panel_frames(self):
+        self.assertEqual([4, 4, -1, 3], self.owners([
+            (0x10A, "32 10 FA 01 12 03 00"),    # response
+            (0x10A, "30 10 FA 01 12 03 00"),    # set
+            (0x10A, "31 10 FA 01 12 03 00"),    # get
+            (0x10A, "A0 00 61 01 00 00 00"),    # accepted by an entity with another can id
+        ]))
+
+    def test_entities_without_command_handle_no_frames(self):
+        index = self.decoder.build_index([{"type": "select", "name": "optimized_defrosting", "data_offset": 5, "data_size": 1}] + SENSOR_CONFS)
+        can_ids = np.array([0x180, 0x10A, 0x180], dtype=np.uint32)
+        data = np.array([list(bytes.fromhex(frame)) for frame in ["D2 00 00 00 00 01 00", "32 10 00 00 00 01 00", "D2 00 1C 0B B8 00 00"]], dtype=np.uint8)
+        self.assertEqual([-1, -1, 3], [int(owner) for owner in index.match(can_ids, data)])
+
+    def test_values(self):
+        decoded, stats = self.decode(
+            "(1700000000.000000) can0 180#D200FAC0FDFF38\n"
+            "(1700000001.500000) can0 180#D200FAC0FD012C\n"
+            "(1700000002.000000) can0 180#D2001C0BB80000\n"
+            "(1700000003.000000) can0 180#D2001C27100000\n"
+            "(1700000004.000000) can0 180#D200FA011204FF\n"
+            "(1700000005.000000) can0 180#D200FA011209FF\n"
+            "(1700000006.000000) can0 180#D200FA13882329\n"
+            "(1700000007.000000) can0 180#D200FA13880007\n"
+            "(1700000008.000000) can0 180#D200FA09610005\n"
+            "(1700000009.000000) can0 180#D200FA09610105\n"
+            "(1700000010.000000) can0 180#D200FA09610004\n"
+        )
+        self.assertEqual("candump_compact", stats["format"])
+        self.assertEqual(11, stats["frames"])
+        self.assertEqual(11, stats["handled"])
+        self.assertEqual(1, stats["invalid"])
+
+        np.testing.assert_array_equal(np.array([-20.0, 30.0], dtype=np.float32), decoded["tv"]["value"])
+        np.testing.assert_array_equal([1700000000.0, 1700000001.5], decoded["tv"]["timestamp"])
+        np.testing.assert_array_equal(np.array([3.0], dtype=np.float32), decoded["water_pressure"]["value"])    # 10 bar is out of range
+        self.assertEqual(["Heizen", "Sommer"], [str(decoded["operating_mode"]["labels"][i]) for i in decoded["operating_mode"]["label"]])
+        np.testing.assert_array_equal([9001, 7], decoded["error_code"]["value"])
+        np.testing.assert_array_equal([1, -1], decoded["error_code"]["label"])
+        np.testing.assert_array_equal([True, True, False], decoded["external_temp_sensor"]["value"])
+        self.assertNotIn("tv_copy", decoded)
+
+    def test_log_formats(self):
+        candump = "  can0  180   [7]  D2 00 FA C0 FD 00 F5\n  can0  10A   [8]  32 10 FA 01 12 03 00 00\n"
+        esphome = (
+            "[10:00:00][I][handle :136]: millis: 1500|tv<24.5> can_id<0x180> data<D2 00 FA C0 FD 00 F5> changed<1>\n"
+            "[10:00:01][I][sendGet:168]: millis: 1600|tv can_id<0x680> command<31 00 FA C0 FD 00 00>\n"
+            "[10:00:02][I][unhandled:159]: millis: 2000|can_id<0x10A> data<32 10 FA 01 12 03 00>\n"
+        )
+
+        decoded, stats = self.decode(candump)
+        self.assertEqual("candump", stats["format"])
+        np.testing.assert_array_equal(np.array([24.5], dtype=np.float32), decoded["tv"]["value"])
+        self.assertTrue(np.isnan(decoded["tv"]["timestamp"][0]))
+        np.testing.assert_array_equal([1], decoded["operating_mode"]["label"])
+
+        decoded, stats = self.decode(esphome)
+        self.assertEqual("esphome", stats["format"])
+        self.assertEqual(2, stats["frames"])
+        np.testing.assert_array_equal([1.5], decoded["tv"]["timestamp"])
+        np.testing.assert_array_equal([2.0], decoded["operating_mode"]["timestamp"])
+
+    def test_chunks_split_lines(self):
+        lines = "".join(f"({i}.000000) can0 180#D200FAC0FD00{i:02X}\n" for i in range(100))
+        decoded, stats = self.decode(lines, chunk_size=37)
+        self.assertEqual(100, stats["frames"])
+        np.testing.assert_array_equal(np.arange(100, dtype=np.float32) / 10, decoded["tv"]["value"])
+
+    def test_npz_output(self):
+        path = os.path.join(self.tmp_dir.name, "can.log")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("(1.000000) can0 180#D200FA011205FF\n")
+
+        output_dir = os.path.join(self.tmp_dir.name, "out")
+        stats = list(self.decoder.decode_files([path], self.index, output_dir, jobs=1))
+
+        with np.load(stats[0]["output"]) as npz:
+            np.testing.assert_array_equal([5], npz["operating_mode/value"])
+            self.assertEqual("Sommer", str(npz["operating_mode/labels"][npz["operating_mode/label"][0]]))
+
+    def test_full_sensor_configuration(self):
+        index = self.decoder.build_index(self.sensor_configuration)
+        self.assertEqual(len(self.sensor_configuration), len(index.entities))
+
+if __name__ == "__main__":
+    unittest.main()
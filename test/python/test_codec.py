@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(TEST_DIR, "..", "corpus", "codec_corpus.txt")
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components", "daikin_rotex_can"))
+
+import codec
+
+def load_corpus():
+    """Returns the (line number, kind, codec, offset, size, frame, value, expected) cases of the shared corpus."""
+    cases = []
+    with open(CORPUS, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            kind, op, mask, factor, shift, value, offset, size = fields[:8]
+            entity_codec = {"op": op, "mask": int(mask, 0), "factor": int(factor, 0), "shift": int(shift, 0), "value": int(value, 0)}
+            frame = [int(byte, 16) for byte in fields[8:15]]
+            if kind == "decode":
+                cases.append((line_number, kind, entity_codec, int(offset), int(size), frame, None, int(fields[15], 0)))
+            else:
+                cases.append((line_number, kind, entity_codec, int(offset), int(size), frame, int(fields[15], 0), [int(byte, 16) for byte in fields[16:23]]))
+    return cases
+
+def read_raw(frame, offset, size):
+    return (frame[offset] << 8) + frame[offset + 1] if size == 2 else frame[offset]
+
+def write_raw(frame, raw, offset, size):
+    frame = list(frame)
+    if size == 2:
+        frame[offset] = (raw >> 8) & 0xFF
+        frame[offset + 1] = raw & 0xFF
+    else:
+        frame[offset] = raw & 0xFF
+    return frame
+
+class CodecCorpusTest(unittest.TestCase):
+    def test_corpus_is_not_empty(self):
+        kinds = [case[1] for case in load_corpus()]
+        self.assertGreater(kinds.count("decode"), 0)
+        self.assertGreater(kinds.count("encode"), 0)
+
+    def test_decode(self):
+        for line_number, kind, entity_codec, offset, size, frame, _, expected in load_corpus():
+            if kind == "decode":
+                with self.subTest(line=line_number):
+                    self.assertEqual(expected, codec.decode(entity_codec, read_raw(frame, offset, size), size))
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_decode_numpy(self):
+        for line_number, kind, entity_codec, offset, size, frame, _, expected in load_corpus():
+            if kind == "decode":
+                with self.subTest(line=line_number):
+                    raw = np.array([read_raw(frame, offset, size)] * 3, dtype=np.uint16)
+                    values = np.asarray(codec.decode(entity_codec, raw, size)).astype(np.uint16)
+                    np.testing.assert_array_equal([expected] * 3, values)
+
+    def test_encode(self):
+        for line_number, kind, entity_codec, offset, size, command, value, expected in load_corpus():
+            if kind == "encode":
+                with self.subTest(line=line_number):
+                    raw = codec.encode(entity_codec, read_raw(command, offset, size), value)
+                    self.assertEqual(expected, write_raw(command, raw, offset, size))
+
+class ParseCodecTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(codec.NO_CODEC, codec.parse_codec(None))
+        self.assertEqual(
+            {"op": "bit_count", "mask": 0x0E, "factor": 3, "shift": 0, "value": 0x01},
+            codec.parse_codec({"op": "bit_count", "mask": 0x0E, "weight": 3, "set_bits": 0x01})
+        )
+        self.assertEqual(
+            "{TCodec::SCALE, 0x0000, 100, 0, 0x0000}",
+            codec.generate_cpp_codec(codec.parse_codec({"op": "scale", "factor": 0x64}))
+        )
+
+    def test_invalid(self):
+        for spec in [
+            {"op": "divide", "factor": 2},
+            {"op": "scale"},
+            {"op": "scale", "factor": 0},
+            {"op": "mask", "mask": 0xF0, "shift": 16},
+            {"op": "mask", "mask": 0x10000},
+            {"op": "equals", "value": 5, "mask": 0xFF},
+        ]:
+            with self.subTest(spec=spec):
+                self.assertRaises(codec.InvalidCodecError, codec.parse_codec, spec)
+
+if __name__ == "__main__":
+    unittest.main()
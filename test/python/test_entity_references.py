@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+import esphome_stub
+
+SYSTEM_TIME_ENTITIES = {
+    "system_time_hour": {"name": "Hour", "type": "sensor"},
+    "system_time_minute": {"name": "Minute", "type": "sensor"},
+    "system_time_second": {"name": "Second", "type": "sensor"},
+    "system_time": {"name": "Time", "type": "text_sensor"},
+}
+
+class EntityReferenceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        import daikin_rotex_can
+        cls.component = daikin_rotex_can
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def setUp(self):
+        esphome_stub.GLOBALS.clear()
+
+    def test_configured_references_are_valid(self):
+        self.assertEqual(SYSTEM_TIME_ENTITIES, self.component.add_entity_dependencies(SYSTEM_TIME_ENTITIES))
+        self.assertEqual(SYSTEM_TIME_ENTITIES, self.component.validate_entity_dependencies(SYSTEM_TIME_ENTITIES))
+
+    def test_missing_reference_is_added_as_internal_entity(self):
+        entities = dict(SYSTEM_TIME_ENTITIES)
+        del entities["system_time_minute"]
+        entities = self.component.add_entity_dependencies(entities)
+        self.assertEqual({"name": "system_time_minute", "internal": True}, entities["system_time_minute"])
+
+    def test_reference_with_other_type_fails_validation(self):
+        entities = dict(SYSTEM_TIME_ENTITIES, system_time_second={"name": "Second", "type": "text_sensor"})
+        with self.assertRaisesRegex(esphome_stub.Invalid, "system_time_second"):
+            self.component.validate_entity_dependencies(entities)
+
+    def test_derived_sensor_sources_are_added(self):
+        entities = self.component.add_entity_dependencies({"thermal_power": {"name": "Power"}, "tv": {"name": "Tv"}})
+        self.assertEqual({"thermal_power", "tv", "tr", "flow_rate"}, set(entities))
+        self.assertEqual({"name": "Tv"}, entities["tv"])
+        self.assertTrue(entities["flow_rate"]["internal"])
+
+    def test_number_source_configured_as_select_fails_validation(self):
+        entities = self.component.add_entity_dependencies({
+            "supply_setpoint_regulated": {"name": "Regulated"},
+            "max_target_flow_temp": {"name": "Max", "type": "select"},
+        })
+        with self.assertRaisesRegex(esphome_stub.Invalid, "max_target_flow_temp"):
+            self.component.validate_entity_dependencies(entities)
+
+    def test_derived_sensors_are_triggered_by_their_sources(self):
+        for name in self.component.DERIVED_SENSORS:
+            with self.subTest(name=name):
+                sources = self.component.get_entity_dependencies(name)
+                self.assertTrue(sources)
+                for source, kind in sources:
+                    sens_conf = self.component.SENSOR_CONFIGURATION_BY_NAME[source]
+                    self.assertEqual(kind, sens_conf.get("type"))
+                    self.assertIn(name, sens_conf.get("update_entities", []))
+
+    def test_references_are_bound_to_descriptor_indices(self):
+        sens_conf = self.component.SENSOR_CONFIGURATION_BY_NAME["system_time"]
+        descriptor_index = {"system_time_hour": 4, "system_time_minute": 5, "system_time_second": 6}
+        update_functions = {}
+
+        name = self.component.get_update_function(sens_conf, update_functions, descriptor_index)
+        self.assertEqual(name, self.component.get_update_function(sens_conf, update_functions, descriptor_index))
+        self.assertEqual("nullptr", self.component.get_update_function({"name": "tv"}, update_functions, descriptor_index))
+
+        self.assertEqual(1, len(esphome_stub.GLOBALS))
+        self.assertIn("accessor.get_sensor_value(4 /* system_time_hour */)", esphome_stub.GLOBALS[0])
+        self.assertIn("accessor.get_sensor_value(6 /* system_time_second */)", esphome_stub.GLOBALS[0])
+        self.assertNotIn('"system_time_minute"', esphome_stub.GLOBALS[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import importlib.machinery
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import yaml
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+ROOT_DIR = os.path.abspath(os.path.join(TEST_DIR, "..", ".."))
+EXAMPLES = ["full_de", "full_en", "full_it"]
+
+# The other tests replace esphome in sys.modules by the stub, PathFinder only looks at the installed packages
+HAS_ESPHOME = importlib.machinery.PathFinder.find_spec("esphome") is not None
+
+SECRETS = "api_encryption_key: AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA=\nota_password: ota\nwifi_ssid: ssid\nwifi_password: password\n"
+
+# Runs in a fresh interpreter, so the real esphome and voluptuous validate instead of the stub
+VALIDATE = textwrap.dedent("""
+    import importlib, pathlib, sys
+    from esphome import yaml_util
+    from esphome.core import CORE
+
+    path, components_dir = sys.argv[1:3]
+    CORE.config_path = pathlib.Path(path)
+    config = yaml_util.load_yaml(pathlib.Path(path))
+    sys.path.insert(0, components_dir)
+    component = importlib.import_module("daikin_rotex_can")
+    component.CONFIG_SCHEMA(config["daikin_rotex_can"])
+""")
+
+class _ExampleLoader(yaml.SafeLoader):
+    pass
+
+_ExampleLoader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+def load_example(example):
+    with open(os.path.join(ROOT_DIR, "examples", f"{example}.yaml"), encoding="utf-8") as f:
+        return yaml.load(f, Loader=_ExampleLoader)["daikin_rotex_can"]
+
+class StubConfigTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import esphome_stub
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        import daikin_rotex_can
+        cls.component = daikin_rotex_can
+        cls.stub = esphome_stub
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def test_examples_validate(self):
+        for example in EXAMPLES:
+            with self.subTest(example=example):
+                config = self.component.CONFIG_SCHEMA(load_example(example))
+                self.assertEqual(40000, config["update_interval"].total_milliseconds)
+
+    def test_intervals_need_a_unit(self):
+        config = load_example("full_en")
+        for value in [40, "40"]:
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(self.stub.Invalid, "no time"):
+                    self.component.CONFIG_SCHEMA(dict(config, update_interval=value))
+        config.pop("update_interval")
+        self.assertEqual(30000, self.component.CONFIG_SCHEMA(config)["update_interval"].total_milliseconds)
+
+@unittest.skipUnless(HAS_ESPHOME, "esphome is not installed")
+class EsphomeConfigTest(unittest.TestCase):
+    def test_examples_validate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "secrets.yaml"), "w") as secrets:
+                secrets.write(SECRETS)
+            for example in EXAMPLES:
+                with self.subTest(example=example):
+                    path = os.path.join(directory, f"{example}.yaml")
+                    shutil.copy(os.path.join(ROOT_DIR, "examples", f"{example}.yaml"), path)
+                    result = subprocess.run(
+                        [sys.executable, "-c", VALIDATE, path, os.path.join(ROOT_DIR, "components")],
+                        capture_output=True, text=True, timeout=300
+                    )
+                    self.assertEqual(0, result.returncode, result.stderr)
+
+if __name__ == "__main__":
+    unittest.main()
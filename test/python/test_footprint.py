@@ -0,0 +1,108 @@
+import glob
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+COMPONENT_DIR = os.path.join(TEST_DIR, "..", "..", "components", "daikin_rotex_can")
+
+import esphome_stub
+
+ON_OFF = ((0, "Off"), (1, "On"))
+
+class FootprintTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        import daikin_rotex_can
+        from daikin_rotex_can import footprint
+        cls.component = daikin_rotex_can
+        cls.footprint = footprint
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def entity(self, name, cpp_class, **kwargs):
+        return dict({"name": name, "cpp_class": cpp_class, "display_name": name, "descriptor": True}, **kwargs)
+
+    def test_shared_value_maps_are_counted_once(self):
+        report = self.footprint.estimate_footprint([
+            self.entity("a", "CanSelect", value_map=ON_OFF, options=["Off", "On"]),
+            self.entity("bb", "CanSelect", value_map=ON_OFF, options=["Off", "On"]),
+        ])
+        (_, _, heap_a, flash_a), (_, _, heap_b, flash_b) = report["rows"]
+        self.assertEqual(heap_a, heap_b)
+        value_map = self.footprint.VALUE_MAP_SIZE + 2 * self.footprint.VALUE_MAP_ENTRY_SIZE + len("Off\0On\0")
+        self.assertEqual(flash_a + 3 - value_map, flash_b)    # bb has a longer id and name
+        self.assertEqual(heap_a + heap_b, report["heap"])
+
+    def test_select_options_are_pointers(self):
+        two = self.footprint.estimate_footprint([self.entity("a", "CanSelect", value_map=ON_OFF, options=["Off", "On"])])
+        long = self.footprint.estimate_footprint([self.entity("a", "CanSelect", value_map=ON_OFF, options=["Warmwasserbereitung", "Heizen", "Kühlen"])])
+        self.assertEqual(self.footprint.POINTER_SIZE, long["heap"] - two["heap"])
+
+    def test_long_labels_use_heap(self):
+        short = self.footprint.estimate_footprint([self.entity("a", "CanTextSensor", value_map=ON_OFF)])
+        long = self.footprint.estimate_footprint([self.entity("a", "CanTextSensor", value_map=((0, "Warmwasserbereitung"),))])
+        self.assertEqual(2 * (self.footprint.ALLOCATION_HEADER + 20), long["heap"] - short["heap"])
+
+    def test_update_functions_are_counted_once(self):
+        report = self.footprint.estimate_footprint([
+            self.entity("a", "CanTextSensor", update_function="return {};"),
+            self.entity("b", "CanTextSensor", update_function="return {};"),
+        ])
+        self.assertEqual(self.footprint.UPDATE_FUNCTION_SIZE, report["rows"][0][3] - report["rows"][1][3])
+
+    def test_polled_entities_are_indexed(self):
+        report = self.footprint.estimate_footprint([self.entity("a", "CanSensor", command=True), self.entity("b", "CanSensor")])
+        self.assertEqual(self.footprint.FRAME_INDEX_SIZE + self.footprint.POLL_SCHEDULER_SIZE, report["rows"][0][2] - report["rows"][1][2])
+
+    def test_format_footprint(self):
+        report = self.footprint.estimate_footprint([self.entity("tv", "CanSensor"), self.entity("dhw_run", "DHWRunButton", descriptor=False)])
+        lines = self.footprint.format_footprint(report).splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertTrue(lines[3].startswith("Total"))
+        self.assertIn(str(report["heap"]), lines[3])
+        self.assertIn("not calibrated", lines[4])
+
+    def test_sizes_match_static_asserts(self):
+        # The headers pin the sizes of a 32 bit build, the constants have to follow them
+        asserts = {}
+        for header in glob.glob(os.path.join(COMPONENT_DIR, "*.h")):
+            with open(header, encoding="utf-8") as f:
+                asserts.update((name, int(size)) for size, name in re.findall(r'static_assert\(sizeof\(\w+\) == (\d+), "footprint.py (\w+)"\)', f.read()))
+        self.assertEqual({"DESCRIPTOR_SIZE", "TENTITY_SIZE", "VALUE_MAP_SIZE"}, set(asserts))
+        for name, size in asserts.items():
+            with self.subTest(name=name):
+                self.assertEqual(size, getattr(self.footprint, name))
+
+    def test_cpp_class(self):
+        for sens_type, yaml_type, cpp_class in [
+            ("sensor", None, "CanSensor"), ("number", "number", "CanNumber"), ("number", "select", "CanSelect"),
+            ("switch", "switch", "CanSwitch"), ("switch", "select", "CanSelect"), ("select", None, "CanSelect"),
+        ]:
+            with self.subTest(sens_type=sens_type, yaml_type=yaml_type):
+                yaml_conf = {"type": yaml_type} if yaml_type else {}
+                self.assertEqual(cpp_class, self.component.get_cpp_class({"type": sens_type}, yaml_conf))
+
+    def test_budget(self):
+        config = {
+            "language": "en",
+            "entities": {"tv": {"name": "Tv"}, "operating_mode": {"name": "Mode", "type": "select"}, "dhw_run": {"name": "Run"}},
+        }
+        with self.assertLogs("daikin_rotex_can", level="INFO"):
+            self.component.validate_footprint(dict(config, heap_budget=10000))
+        with self.assertRaisesRegex(esphome_stub.Invalid, "heap_budget.*operating_mode"):
+            self.component.validate_footprint(dict(config, heap_budget=100))
+        with self.assertRaisesRegex(esphome_stub.Invalid, "flash_budget"):
+            self.component.validate_footprint(dict(config, flash_budget=100))
+
+if __name__ == "__main__":
+    unittest.main()
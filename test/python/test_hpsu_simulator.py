@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    import can
+    import numpy as np
+except ImportError:
+    can = None
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@unittest.skipIf(can is None, "python-can or numpy is not installed")
+class HpsuSimulatorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import esphome_stub
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        from daikin_rotex_can import can_gateway, hpsu_simulator, sensor_configuration
+        cls.gateway = can_gateway
+        cls.simulator = hpsu_simulator
+        cls.sensor_configuration = sensor_configuration
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def simulate(self, **kwargs):
+        self.clock = FakeClock()
+        return self.simulator.HpsuSimulator(None, self.sensor_configuration, clock=self.clock, seed=1, **kwargs)
+
+    def test_every_register_is_served(self):
+        simulator = self.simulate()
+        poller = self.gateway.HpsuPoller(None, self.sensor_configuration, clock=self.clock)
+        for entity in poller.entities:
+            if not entity.is_polled():
+                continue
+            with self.subTest(name=entity.name):
+                can_id, data = simulator.handle_request(entity.command, self.clock.now)
+                self.assertEqual(entity.entity["can_id"], can_id)
+                update = poller.handle(can_id, data)
+                self.assertIsNotNone(update)     # values within the range of the sensors
+                self.assertEqual(simulator.value(update.name), update.value)
+        self.assertEqual(0, simulator.stats["unknown"])
+        self.assertEqual(len(simulator.entities), sum(age == 0.0 for age in simulator.staleness().values()))
+
+    def test_values_and_sets(self):
+        simulator = self.simulate(dynamics={"tv": self.simulator.sine(35.0, 5.0, 3600.0)})
+        poller = self.gateway.HpsuPoller(None, self.sensor_configuration, clock=self.clock)
+        tv = next(entity for entity in poller.entities if entity.name == "tv")
+
+        self.clock.now += 900.0
+        self.assertEqual(40.0, poller.handle(*simulator.handle_request(tv.command, self.clock.now)).value)
+
+        simulator.set_value("water_pressure", 1.75)
+        self.assertEqual(1.75, simulator.value("water_pressure"))
+
+        # SET of the component, the register is answered with the new value afterwards
+        operating_mode = next(entity for entity in poller.entities if entity.name == "operating_mode")
+        command = bytearray(operating_mode.command)
+        command[0:2] = [0x30, 0x00]
+        command[5] = 0x05
+        self.assertIsNone(simulator.handle_request(command, self.clock.now))
+        self.assertEqual(0x05, poller.handle(*simulator.handle_request(operating_mode.command, self.clock.now)).value)
+        self.assertEqual(1, simulator.stats["sets"])
+
+    def test_loss_and_unknown_registers(self):
+        simulator = self.simulate(loss=1.0)
+        self.assertIsNone(simulator.handle_request(bytes.fromhex("3100FAC0FC0000"), self.clock.now))
+        self.assertIsNone(simulator.handle_request(bytes.fromhex("3100FAFFFF0000"), self.clock.now))
+        self.assertEqual((2, 1, 1), (simulator.stats["requests"], simulator.stats["lost"], simulator.stats["unknown"]))
+
+    def test_rocon_panel_frames(self):
+        simulator = self.simulate(rocon_set_ratio=1.0)
+        poller = self.gateway.HpsuPoller(None, self.sensor_configuration, clock=self.clock)
+        for _ in range(50):
+            can_id, data = simulator.rocon_frame(self.clock.now)
+            self.assertEqual(0x10A, can_id)
+            self.assertIn(data[0] & 0x0F, [0x00, 0x02])
+            self.assertIsNotNone(poller.find_entity(can_id, data))
+
+    def test_bus_transmitter(self):
+        transmitter = self.simulator.BusTransmitter(bitrate=20000, max_pending=3)
+        self.assertTrue(transmitter.push(1.0, 0x180, b"\x01"))
+        self.assertTrue(transmitter.push(0.5, 0x300, b"\x02"))
+        self.assertTrue(transmitter.push(1.0, 0x500, b"\x03"))
+        self.assertFalse(transmitter.push(1.0, 0x180, b"\x04"))
+
+        self.assertIsNone(transmitter.pop(0.4))
+        self.assertEqual((0x300, b"\x02"), transmitter.pop(0.5))
+        self.assertEqual((0x180, b"\x01"), transmitter.pop(1.0))
+        self.assertAlmostEqual(1.00555, transmitter.next_time())     # 111 bits at 20 kbps
+        self.assertIsNone(transmitter.pop(1.005))
+        self.assertEqual((0x500, b"\x03"), transmitter.pop(1.006))
+        self.assertIsNone(transmitter.next_time())
+
+        transmitter.occupy(2.0)
+        transmitter.push(2.0, 0x180, b"\x05")
+        self.assertAlmostEqual(2.00555, transmitter.next_time())
+
+    def test_virtual_bus(self):
+        """The gateway polls the simulator at an unlimited bus rate while the RoCon panel is active."""
+        confs = [conf for conf in self.sensor_configuration if conf.get("name") in ["tv", "tr", "water_pressure", "operating_mode", "status_kompressor"]]
+
+        async def poll():
+            with can.Bus(interface="virtual", channel="hpsu_simulator", receive_own_messages=False) as gateway_bus, \
+                    can.Bus(interface="virtual", channel="hpsu_simulator", receive_own_messages=False) as hpsu_bus:
+                simulator = self.simulator.HpsuSimulator(hpsu_bus, confs, latency=0.001, rocon_rate=50.0, bitrate=None, seed=2)
+                poller = self.gateway.HpsuPoller(gateway_bus, confs, default_update_interval=0.05, delay_between_requests=0.0)
+                tasks = [asyncio.create_task(simulator.run()), asyncio.create_task(poller.run())]
+                updates = []
+                try:
+                    async for update in poller.updates():
+                        updates.append(update)
+                        if len(updates) == 200:
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                return simulator, updates
+
+        simulator, updates = asyncio.run(asyncio.wait_for(poll(), 20))
+        self.assertEqual({conf["name"] for conf in confs}, {update.name for update in updates})
+        self.assertIn(0x10A, {update.can_id for update in updates})
+        self.assertGreater(simulator.stats["responses"], 0)
+        self.assertEqual(0, simulator.stats["overflow"])
+        self.assertTrue(all(age is not None for age in simulator.staleness().values()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, "helpers"))
+sys.path.insert(0, os.path.join(TEST_DIR, "..", "..", "components"))
+
+# PID(0.2, 0.05, 0.05, 0.2, 0.2, 0.1): state += compute(setpoint, state, dt), ceiled to 0.01 like CanSensor::update(),
+# printed by the C++ implementation on x86-64
+PID_SETPOINTS = [20.0, 20.0, 25.0, 25.0, 24.0, 26.5, 26.5, float("nan"), 22.0, 22.0, 22.0, 30.0]
+PID_DTS = [10.016, 10.016, 10.016, 10.02, 12.5, 10.016, 0.05, 10.0, 10.016, 30.0, 10.016, 10.016]
+PID_STATES = [20.0, 20.0, 20.2199993, 20.5900002, 21.0200005, 21.5900002, 21.6000004, 21.6100006, 22.0799999, 22.4400005, 22.7099991, 23.2399998]
+
+class ErrorDetection:
+    """DaikinRotexCanComponent::ErrorDetection"""
+
+    def __init__(self, detection_time_ms, stop_detection_in_good_case):
+        self.error_timestamp = 0
+        self.detection_time_ms = detection_time_ms
+        self.good_case_detected = False
+        self.stop_detection_in_good_case = stop_detection_in_good_case
+
+    def handle_error_detection(self, is_error_state, now):
+        if is_error_state:
+            if self.error_timestamp == 0 and not self.good_case_detected:
+                self.error_timestamp = now
+            if self.error_timestamp != 0 and now > self.error_timestamp + self.detection_time_ms:
+                return True
+        else:
+            self.error_timestamp = 0
+            self.good_case_detected = self.stop_detection_in_good_case
+        return False
+
+    def reset_good_case(self):
+        self.error_timestamp = 0
+        self.good_case_detected = False
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ReplayTunerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import esphome_stub
+        cls.build_dir = tempfile.TemporaryDirectory()
+        esphome_stub.install(cls.build_dir.name)
+
+        from daikin_rotex_can import replay_tuner
+        from daikin_rotex_can.translations.translate import set_language
+        cls.tuner = replay_tuner
+        set_language("en")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.build_dir.cleanup()
+
+    def recording(self, hours=3, excursions=(), faults=()):
+        """30 s samples of a heat pump in heating mode, tvbh is 0.15 K above tv besides the given (start, end, delta)."""
+        times = np.arange(0.0, hours * 3600.0, 30.0)
+        rng = np.random.default_rng(3)
+        tv = 35.0 + 2.0 * np.sin(times / 3600.0) + rng.normal(0.0, 0.1, len(times))
+        delta = np.full(len(times), 0.15)
+        for start, end, value in list(excursions) + list(faults):
+            delta[(times >= start) & (times < end)] = value
+        constant = lambda value: (times, np.full(len(times), value), None)
+        return {
+            "tv": (times, tv, None),
+            "tr": (times, tv - 5.0, None),
+            "tvbh": (times, tv + delta, None),
+            "flow_rate": constant(900.0),
+            "dhw_mixer_position": constant(0.0),
+            "bypass_valve": constant(0.0),
+            "tdhw1": constant(50.0),
+            "status_kompressor": constant(1.0),
+            "mode_of_operating": (times, np.full(len(times), 3.0), np.full(len(times), "Heating")),
+        }
+
+    def test_pid_matches_cpp(self):
+        params = {name: [value, value] for name, value in self.tuner.DEFAULT_SMOOTHING_PID.items()}
+        params["p"][1] = 0.5
+        pid = self.tuner.PidBank(params)
+        single = self.tuner.PidBank({name: [values[1]] for name, values in params.items()})
+
+        state = np.full(2, 20.0, dtype=np.float32)
+        single_state = np.full(1, 20.0, dtype=np.float32)
+        for setpoint, dt, expected in zip(PID_SETPOINTS, PID_DTS, PID_STATES):
+            state = self.tuner.smoothing_step(pid, state, setpoint, dt)
+            single_state = self.tuner.smoothing_step(single, single_state, setpoint, dt)
+            self.assertEqual(np.float32(expected), state[0])
+            self.assertEqual(single_state[0], state[1])
+
+    def test_error_detection_matches_cpp(self):
+        rng = random.Random(4)
+        for stop_detection_in_good_case in [False, True]:
+            count = 300
+            times_ms = np.cumsum([rng.randint(1000, 60000) for _ in range(count)])
+            is_error = np.array([rng.random() < 0.8 for _ in range(count)])
+            active = np.array([rng.random() < 0.9 for _ in range(count)])
+            reset = np.array([rng.random() < 0.05 for _ in range(count)])
+            detection_times = [60000, 300000, 600000]
+
+            alarms, _ = self.tuner.replay_error_detection(
+                np.tile(is_error, (len(detection_times), 1)), times_ms, detection_times, stop_detection_in_good_case, active, reset
+            )
+            for row, detection_time in enumerate(detection_times):
+                detection = ErrorDetection(detection_time, stop_detection_in_good_case)
+                expected = []
+                for index in range(count):
+                    if reset[index]:
+                        detection.reset_good_case()
+                    expected.append(bool(active[index]) and detection.handle_error_detection(bool(is_error[index]), int(times_ms[index])))
+                with self.subTest(stop_detection_in_good_case=stop_detection_in_good_case, detection_time=detection_time):
+                    self.assertEqual(expected, alarms[row].tolist())
+
+    def test_min_spread(self):
+        for tv, expected in [(50, 4.0), (40, 3.0), (35, 2.5), (29, 1.2), (27, 0.3)]:
+            self.assertAlmostEqual(expected, self.tuner.min_spread(tv), delta=0.15)
+
+    def test_load_recording(self):
+        path = os.path.join(self.build_dir.name, "recording.npz")
+        np.savez_compressed(path, **{
+            "tv/timestamp": np.array([2.0, 1.0]), "tv/value": np.array([30.5, 30.0]),
+            "mode_of_operating/timestamp": np.array([1.0, 2.0]), "mode_of_operating/value": np.array([3, 9]),
+            "mode_of_operating/label": np.array([0, -1]), "mode_of_operating/labels": np.array(["Heating"]),
+        })
+        recording = self.tuner.load_recording(path)
+        self.assertEqual([30.0, 30.5], recording["tv"][1].tolist())
+        self.assertIsNone(recording["tv"][2])
+        self.assertEqual(["Heating", ""], recording["mode_of_operating"][2].tolist())
+
+    def test_smoothing_reduces_noise(self):
+        recording = self.recording()
+        series = [self.tuner.derived_series(recording, "temperature_spread")]
+        grid = {"p": [0.05, 0.5], "i": [0.0, 0.05], "d": [0.0], "max_integral": [0.2], "alpha_p": [0.1, 1.0], "alpha_d": [0.1]}
+        result = self.tuner.tune_smoothing(series, grid, jobs=1)
+
+        self.assertEqual(8, len(result["score"]))
+        self.assertTrue(np.all(np.diff(result["score"]) >= 0))
+        self.assertLess(result["noise"][0], 0.5)
+        self.assertGreater(result["lag"][0], 0.0)
+
+    def test_detector_ignores_short_excursions(self):
+        mixer = self.tuner.detectors()[0]
+        recording = self.recording(excursions=[(3600.0, 3840.0, 0.75)])
+        result = self.tuner.tune_detector(mixer, [recording], jobs=1)
+        best = self.tuner.best(result)
+
+        self.assertEqual(0, result["false_alarms"][0])
+        self.assertEqual(210000, result["longest_run"][0])     # From the first to the last evaluation in error state
+        self.assertEqual({"mixer_error_detection_time": 420000, "max_spread_tvbh_tv": 0.2}, best)     # 210 s <= half of 7 min
+
+    def test_detector_finds_faults(self):
+        mixer = self.tuner.detectors()[0]
+        recording = self.recording(excursions=[(3600.0, 3840.0, 0.75)], faults=[(7200.0, 9000.0, 2.0)])
+        result = self.tuner.tune_detector(mixer, [recording], faults=[(7200.0, 9000.0)], jobs=1)
+
+        self.assertEqual((0, 0), (result["false_alarms"][0], result["missed"][0]))
+        self.assertEqual(90.0, result["delay"][0])
+        self.assertEqual({"mixer_error_detection_time": 60000, "max_spread_tvbh_tv": 0.8}, self.tuner.best(result))
+
+        # Undeclared, the fault is healthy data which must stay below half of the detection time
+        without_faults = self.tuner.tune_detector(mixer, [recording], jobs=1)
+        self.assertEqual(1770000, without_faults["longest_run"][0])
+        self.assertEqual(3600000, self.tuner.best(without_faults)["mixer_error_detection_time"])
+
+    def test_missing_sources(self):
+        recording = self.recording()
+        del recording["bypass_valve"]
+        self.assertIsNone(self.tuner.tune_detector(self.tuner.detectors()[1], [recording], jobs=1))
+
+    def test_format_yaml(self):
+        detectors = {detector.name: detector for detector in self.tuner.detectors()}
+        text = self.tuner.format_yaml(
+            dict(self.tuner.DEFAULT_SMOOTHING_PID, p=0.3),
+            [(detectors["spread"], {"spread_error_detection_time": 900000, "min_spread_offset": -0.5}),
+             (detectors["dhw"], {"dhw_error_detection_time": 300000})]
+        )
+        self.assertEqual([
+            "daikin_rotex_can:",
+            "  smoothing_pid:",
+            "    p: 0.3",
+            "    i: 0.05",
+            "    d: 0.05",
+            "    max_integral: 0.2",
+            "    alpha_p: 0.2",
+            "    alpha_d: 0.1",
+            "  min_spread_offset: -0.5",
+            "  spread_error_detection_time: 900s",
+            "  dhw_error_detection_time: 300s",
+        ], text.splitlines())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "components", "daikin_rotex_can"))
+
+from translations import translate
+
+OUTPUTS = ["translations.h", "translations.cpp"]
+
+class TranslationIntegrityTest(unittest.TestCase):
+    def test_all_languages_have_the_same_keys(self):
+        translate.check_translations_integrity()
+
+class TranslateOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.tmp_dir.name, "src", "daikin_rotex_can")
+        translate.set_language("de")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def snapshot(self):
+        result = {}
+        for name in OUTPUTS:
+            path = os.path.join(self.output_dir, name)
+            with open(path, "rb") as f:
+                result[name] = (os.stat(path).st_mtime_ns, f.read())
+        return result
+
+    def backdate_outputs(self):
+        for name in OUTPUTS:
+            os.utime(os.path.join(self.output_dir, name), ns=(1_000_000_000, 1_000_000_000))
+
+    def test_second_compile_touches_nothing(self):
+        translate.write_cpp_file(self.output_dir)
+        self.backdate_outputs()
+        first = self.snapshot()
+
+        translate.write_cpp_file(self.output_dir)
+
+        self.assertEqual(first, self.snapshot())
+
+    def test_output_is_deterministic(self):
+        translate.write_cpp_file(self.output_dir)
+        first = self.snapshot()
+
+        for name in OUTPUTS:
+            os.remove(os.path.join(self.output_dir, name))
+        translate.write_cpp_file(self.output_dir)
+
+        for name in OUTPUTS:
+            self.assertEqual(first[name][1], self.snapshot()[name][1])
+
+    def test_language_change_only_rewrites_cpp(self):
+        translate.write_cpp_file(self.output_dir)
+        self.backdate_outputs()
+        first = self.snapshot()
+
+        translate.set_language("en")
+        translate.write_cpp_file(self.output_dir)
+
+        second = self.snapshot()
+        self.assertEqual(first["translations.h"], second["translations.h"])
+        self.assertNotEqual(first["translations.cpp"], second["translations.cpp"])
+
+    def test_only_referenced_keys_are_generated(self):
+        keys = translate.collect_translation_keys([
+            "if (modus == Translation::T_HEATING || modus == Translation::T_SUMMER) {}",
+            "return new_state + Translation::T_DEFECT;",
+        ])
+        self.assertEqual(sorted(["heating", "summer", "defect"]), sorted(keys))
+
+        translate.write_cpp_file(self.output_dir, keys)
+        outputs = self.snapshot()
+        self.assertEqual(3, outputs["translations.h"][1].count(b"static const Translation T_"))
+        self.assertIn(b"T_HEATING", outputs["translations.h"][1])
+        self.assertNotIn(b"T_STANDBY", outputs["translations.h"][1])
+        self.assertIn(translate.translations["de"]["heating"].encode("utf-8"), outputs["translations.cpp"][1])
+
+if __name__ == "__main__":
+    unittest.main()
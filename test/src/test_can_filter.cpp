@@ -0,0 +1,29 @@
+#include <gtest/gtest.h>
+#include "esphome/components/daikin_rotex_can/can_filter.h"
+
+using namespace esphome::daikin_rotex_can;
+
+static constexpr uint16_t CAN_IDS[] = {0x10A, 0x180, 0x300, 0x500};
+static constexpr TCanFilter TWO_STAGE_FILTER = {0x100, 0x175, CAN_IDS, 4};
+static constexpr TCanFilter EXACT_FILTER = {0x108, 0x7FD, nullptr, 0};
+
+TEST(CanFilterTest, isAcceptedTwoStage) {
+    for (uint16_t can_id : CAN_IDS) {
+        EXPECT_TRUE(TWO_STAGE_FILTER.isAccepted(can_id));
+    }
+    EXPECT_FALSE(TWO_STAGE_FILTER.isAccepted(0x680));    // Stage 1
+    EXPECT_FALSE(TWO_STAGE_FILTER.isAccepted(0x100));    // Stage 2
+    EXPECT_FALSE(TWO_STAGE_FILTER.isAccepted(0x700));
+}
+
+TEST(CanFilterTest, isAcceptedExact) {
+    EXPECT_TRUE(EXACT_FILTER.isAccepted(0x108));
+    EXPECT_TRUE(EXACT_FILTER.isAccepted(0x10A));
+    EXPECT_FALSE(EXACT_FILTER.isAccepted(0x180));
+    EXPECT_FALSE(EXACT_FILTER.isAccepted(0x109));
+}
+
+TEST(CanFilterTest, twai) {
+    EXPECT_EQ(0x21000000u, EXACT_FILTER.getTwaiAcceptanceCode());
+    EXPECT_EQ(0x005FFFFFu, EXACT_FILTER.getTwaiAcceptanceMask());
+}
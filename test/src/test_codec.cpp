@@ -0,0 +1,83 @@
+#include "esphome/components/daikin_rotex_can/codec.h"
+#include <gtest/gtest.h>
+#include <fstream>
+#include <map>
+#include <sstream>
+#include <string>
+#include <vector>
+
+using namespace esphome::daikin_rotex_can;
+
+// Cases of test/corpus/codec_corpus.txt, which are also checked against codec.py by test/python/test_codec.py
+struct TCodecCase {
+    int line;
+    std::string kind;
+    TCodec codec;
+    uint8_t offset;
+    uint8_t size;
+    TMessage frame;
+    uint16_t value;
+    TMessage expected;
+};
+
+static TMessage read_message(std::istringstream& stream) {
+    TMessage message;
+    for (auto& byte : message) {
+        std::string str;
+        stream >> str;
+        byte = std::stoul(str, nullptr, 16);
+    }
+    return message;
+}
+
+static std::vector<TCodecCase> load_corpus() {
+    static const std::map<std::string, TCodec::Op> OPS = {
+        {"none", TCodec::NONE}, {"scale", TCodec::SCALE}, {"mask", TCodec::MASK},
+        {"bit_count", TCodec::BIT_COUNT}, {"equals", TCodec::EQUALS}, {"int16", TCodec::INT16}
+    };
+
+    std::vector<TCodecCase> cases;
+    std::ifstream file(CODEC_CORPUS);
+    std::string line;
+    for (int line_number = 1; std::getline(file, line); ++line_number) {
+        std::istringstream stream(line);
+        std::string kind, op, mask, factor, shift, value, offset, size;
+        if (!(stream >> kind) || kind[0] == '#') {
+            continue;
+        }
+        stream >> op >> mask >> factor >> shift >> value >> offset >> size;
+
+        TCodecCase test_case {line_number, kind};
+        test_case.codec = {OPS.at(op),
+            static_cast<uint16_t>(std::stoul(mask, nullptr, 0)), static_cast<uint16_t>(std::stoul(factor, nullptr, 0)),
+            static_cast<uint8_t>(std::stoul(shift, nullptr, 0)), static_cast<uint16_t>(std::stoul(value, nullptr, 0))};
+        test_case.offset = std::stoul(offset);
+        test_case.size = std::stoul(size);
+        test_case.frame = read_message(stream);
+
+        std::string new_value;
+        stream >> new_value;
+        test_case.value = std::stoul(new_value, nullptr, 0);
+        if (kind == "encode") {
+            test_case.expected = read_message(stream);
+        }
+        cases.push_back(test_case);
+    }
+    return cases;
+}
+
+TEST(CodecTest, corpus) {
+    const auto cases = load_corpus();
+    ASSERT_FALSE(cases.empty());
+
+    for (auto const& test_case : cases) {
+        SCOPED_TRACE("codec_corpus.txt:" + std::to_string(test_case.line));
+        if (test_case.kind == "decode") {
+            EXPECT_EQ(test_case.value, test_case.codec.decode(test_case.frame, test_case.offset, test_case.size));
+        } else {
+            TMessage command = test_case.frame;
+            test_case.codec.encode(command, test_case.value, test_case.offset, test_case.size);
+            EXPECT_EQ(test_case.expected, command);
+        }
+    }
+}
@@ -0,0 +1,93 @@
+#include <gtest/gtest.h>
+#include <random>
+#include <vector>
+#include "esphome/components/daikin_rotex_can/frame_index.h"
+
+using namespace esphome::daikin_rotex_can;
+
+namespace {
+
+struct TCommand {
+    uint16_t can_id;
+    TMessage command;
+};
+
+// Walk over all entities like TEntity::isMatch() in the order of the entity manager
+uint16_t linear_find(std::vector<TCommand> const& commands, uint32_t can_id, TMessage const& data) {
+    const uint8_t mode = data[0] & 0x0F;
+    const bool is_rocon_panel_frame = can_id == 0x10A && (mode == 0x00 || mode == 0x02);
+    for (uint16_t index = 0; index < commands.size(); ++index) {
+        TCommand const& entry = commands[index];
+        if (can_id != entry.can_id && !is_rocon_panel_frame) {
+            continue;
+        }
+        const bool extended = entry.command[2] == 0xFA;
+        if (data[2] == entry.command[2] && (!extended || (data[3] == entry.command[3] && data[4] == entry.command[4]))) {
+            return index;
+        }
+    }
+    return TFrameIndex::NOT_FOUND;
+}
+
+}
+
+TEST(FrameIndexTest, find) {
+    TFrameIndex index;
+    EXPECT_EQ(TFrameIndex::NOT_FOUND, index.find(0x180, {0xD2, 0x00, 0xFA, 0xC0, 0xFC, 0x01, 0x2C}));
+
+    index.add(0x180, {0x31, 0x00, 0xFA, 0xC0, 0xFC, 0x00, 0x00}, 0);
+    index.add(0x180, {0x31, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}, 1);
+    index.add(0x300, {0x61, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}, 2);
+    index.add(0x180, {0x31, 0x00, 0xFA, 0xC0, 0xFC, 0x00, 0x00}, 3);      // Shadowed by the first entity
+
+    EXPECT_EQ(0, index.find(0x180, {0xD2, 0x00, 0xFA, 0xC0, 0xFC, 0x01, 0x2C}));
+    EXPECT_EQ(1, index.find(0x180, {0xD2, 0x00, 0x0E, 0x01, 0x02, 0x03, 0x04}));
+    EXPECT_EQ(2, index.find(0x300, {0xD2, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}));
+    EXPECT_EQ(TFrameIndex::NOT_FOUND, index.find(0x180, {0xD2, 0x00, 0xFA, 0xC0, 0xFD, 0x01, 0x2C}));
+    EXPECT_EQ(TFrameIndex::NOT_FOUND, index.find(0x500, {0xD2, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}));
+
+    // RoCon control panel: responses and sets by register, requests are ignored
+    EXPECT_EQ(1, index.find(0x10A, {0x32, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}));
+    EXPECT_EQ(0, index.find(0x10A, {0x30, 0x00, 0xFA, 0xC0, 0xFC, 0x01, 0x2C}));
+    EXPECT_EQ(TFrameIndex::NOT_FOUND, index.find(0x10A, {0x31, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}));
+
+    index.clear();
+    EXPECT_EQ(0u, index.size());
+    EXPECT_EQ(TFrameIndex::NOT_FOUND, index.find(0x180, {0xD2, 0x00, 0x0E, 0x00, 0x00, 0x00, 0x00}));
+}
+
+TEST(FrameIndexTest, matchesLinearWalk) {
+    const uint16_t can_ids[] = {0x10A, 0x180, 0x300, 0x500, 0x680};
+    std::mt19937 rng(5);
+    auto random_message = [&rng](uint8_t mode) -> TMessage {
+        TMessage message;
+        for (auto& byte : message) {
+            byte = rng() & 0xFF;
+        }
+        message[0] = (message[0] & 0xF0) | mode;
+        if (rng() % 2 == 0) {
+            message[2] = 0xFA;
+            message[3] = rng() % 4;     // Small register ranges to get hits and shadowed duplicates
+        } else {
+            message[2] = rng() % 32;
+        }
+        return message;
+    };
+
+    std::vector<TCommand> commands;
+    TFrameIndex index;
+    for (uint16_t entity = 0; entity < 500; ++entity) {
+        TCommand entry = {can_ids[1 + rng() % 3], random_message(0x01)};
+        entry.command[4] = rng() % 16;
+        commands.push_back(entry);
+        index.add(entry.can_id, entry.command, entity);
+    }
+    EXPECT_LE(index.size() * 2, index.capacity());
+
+    for (uint32_t frame = 0; frame < 20000; ++frame) {
+        const uint32_t can_id = can_ids[rng() % 5];
+        TMessage data = random_message(rng() % 4);
+        data[4] = rng() % 16;
+        ASSERT_EQ(linear_find(commands, can_id, data), index.find(can_id, data)) << "frame " << frame;
+    }
+}
@@ -0,0 +1,29 @@
+#include <gtest/gtest.h>
+#include <cmath>
+#include "esphome/components/daikin_rotex_can/heating_curve.h"
+
+using namespace esphome::daikin_rotex_can;
+
+TEST(HeatingCurveTest, outsideTemperature) {
+    THeatingCurve curve(24.0f, 35.0f, 2.9f, -15.0f, 21.0f, 0.0f);
+
+    EXPECT_FLOAT_EQ(35.0f, curve.calculate(-15.0f, NAN));
+    EXPECT_FLOAT_EQ(35.0f, curve.calculate(-20.0f, NAN));     // Limited to min_outside
+    EXPECT_FLOAT_EQ(27.0f, curve.calculate(0.0f, NAN));
+    EXPECT_FLOAT_EQ(25.6f, curve.calculate(10.0f, NAN));
+    EXPECT_FLOAT_EQ(24.6f, curve.calculate(20.0f, NAN));
+    EXPECT_FLOAT_EQ(24.0f, curve.calculate(30.0f, NAN));      // Limited to min_supply
+    EXPECT_TRUE(std::isnan(curve.calculate(NAN, 20.0f)));
+}
+
+TEST(HeatingCurveTest, roomTemperature) {
+    THeatingCurve curve(24.0f, 35.0f, 2.9f, -15.0f, 21.0f, 1.5f);
+
+    EXPECT_FLOAT_EQ(28.5f, curve.calculate(0.0f, 20.0f));
+    EXPECT_FLOAT_EQ(25.5f, curve.calculate(0.0f, 22.0f));
+    EXPECT_FLOAT_EQ(27.0f, curve.calculate(0.0f, NAN));
+    EXPECT_FLOAT_EQ(35.0f, curve.calculate(-15.0f, 18.0f));
+
+    THeatingCurve without_room(24.0f, 35.0f, 2.9f, -15.0f, 21.0f, 0.0f);
+    EXPECT_FLOAT_EQ(27.0f, without_room.calculate(0.0f, 18.0f));
+}
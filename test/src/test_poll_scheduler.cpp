@@ -0,0 +1,194 @@
+#include <gtest/gtest.h>
+#include <random>
+#include <vector>
+#include "esphome/components/daikin_rotex_can/poll_scheduler.h"
+
+using namespace esphome::daikin_rotex_can;
+
+namespace {
+
+struct TPolledEntity {
+    bool configured;
+    uint32_t update_interval;
+    uint32_t last_update;
+    bool in_flight;
+};
+
+// Former TEntityManager::getNextRequestToSend(): isGetNeeded() and the largest getOverdueTime(), first on ties
+uint16_t overdue_scan(std::vector<TPolledEntity> const& entities, uint32_t now) {
+    uint16_t next = TPollScheduler::NONE;
+    uint32_t next_overdue = 0;
+    for (uint16_t index = 0; index < entities.size(); ++index) {
+        TPolledEntity const& entity = entities[index];
+        const uint32_t due = entity.last_update + entity.update_interval;
+        if (!entity.configured || entity.in_flight || (entity.last_update != 0 && now <= due)) {
+            continue;
+        }
+        const uint32_t overdue = now > due ? now - due : 0;
+        if (next == TPollScheduler::NONE || overdue > next_overdue) {
+            next = index;
+            next_overdue = overdue;
+        }
+    }
+    return next;
+}
+
+}
+
+TEST(PollSchedulerTest, overdueFirst) {
+    TPollScheduler scheduler;
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(1000));
+
+    scheduler.add(0, 10000, 0);
+    scheduler.add(2, 30000, 0);
+    scheduler.add(3, 10000, 0);
+
+    // Never updated: in index order until they are overdue
+    EXPECT_EQ(0, scheduler.next(1000));
+    scheduler.update(0, 1000);
+    EXPECT_EQ(2, scheduler.next(1500));
+    scheduler.update(2, 1500);
+    EXPECT_EQ(3, scheduler.next(2000));
+    scheduler.update(3, 2000);
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(11000));     // Due at 11000, not overdue yet
+
+    EXPECT_EQ(0, scheduler.next(11001));
+    EXPECT_EQ(0, scheduler.next(12500));                        // Overdue 1500 ms, 3 only 500 ms
+    scheduler.update(0, 12500);
+    EXPECT_EQ(3, scheduler.next(12500));
+    scheduler.update(3, 12600);
+    EXPECT_EQ(31500u, scheduler.getDueTime(2));
+    EXPECT_EQ(0, scheduler.next(40000));                        // Overdue 17500 ms, 3 17400 ms and 2 8500 ms
+    scheduler.update(0, 40000);
+    EXPECT_EQ(3, scheduler.next(40000));
+    scheduler.update(3, 40000);
+    EXPECT_EQ(2, scheduler.next(40000));
+
+    // Unknown indices are ignored
+    scheduler.update(1, 20000);
+    scheduler.update(7, 20000);
+    EXPECT_EQ(3u, scheduler.size());
+
+    scheduler.clear();
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(40000));
+}
+
+TEST(PollSchedulerTest, matchesOverdueScanWithFakeClock) {
+    std::mt19937 rng(7);
+    const uint32_t intervals[] = {1000, 10000, 10000, 30000, 60000, 300000};
+
+    for (uint32_t round = 0; round < 20; ++round) {
+        std::vector<TPolledEntity> entities(1 + rng() % 150);
+        TPollScheduler scheduler;
+        for (uint16_t index = 0; index < entities.size(); ++index) {
+            entities[index] = {rng() % 8 != 0, intervals[rng() % 6], 0, false};
+            if (entities[index].configured) {
+                scheduler.add(index, entities[index].update_interval, 0);
+            }
+        }
+
+        // Fake clock: a request every loop, lost responses and passive updates by the RoCon panel
+        uint32_t now = 1 + rng() % 1000;
+        for (uint32_t step = 0; step < 5000; ++step) {
+            now += 1 + rng() % 400;
+            const uint16_t expected = overdue_scan(entities, now);
+            ASSERT_EQ(expected, scheduler.next(now)) << "round " << round << " step " << step << " now " << now;
+
+            if (expected != TPollScheduler::NONE && rng() % 10 != 0) {
+                const uint32_t response = now + rng() % 50;
+                entities[expected].last_update = response;
+                scheduler.update(expected, response);
+            }
+            if (rng() % 5 == 0) {
+                const uint16_t passive = rng() % entities.size();
+                if (entities[passive].configured) {
+                    entities[passive].last_update = now;
+                    scheduler.update(passive, now);
+                }
+            }
+        }
+    }
+}
+
+TEST(PollSchedulerTest, suspendWhileInFlight) {
+    TPollScheduler scheduler;
+    scheduler.add(0, 10000, 0);
+    scheduler.add(1, 10000, 0);
+    scheduler.add(2, 10000, 500);
+
+    // GETs of the never updated entities are pipelined
+    EXPECT_EQ(0, scheduler.next(1000));
+    scheduler.suspend(0);
+    EXPECT_TRUE(scheduler.isSuspended(0));
+    EXPECT_EQ(1, scheduler.next(1000));
+    scheduler.suspend(1);
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(1000));
+    EXPECT_EQ(1u, scheduler.size());
+
+    // The response reschedules, a timeout resumes with the former due time
+    scheduler.update(0, 1100);
+    EXPECT_FALSE(scheduler.isSuspended(0));
+    EXPECT_EQ(11100u, scheduler.getDueTime(0));
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(4000));
+    scheduler.resume(1);
+    EXPECT_EQ(1, scheduler.next(4000));
+    EXPECT_EQ(3u, scheduler.size());
+
+    EXPECT_EQ(1, scheduler.next(12000));                        // Never updated before overdue 2 and 0
+    scheduler.suspend(1);
+    EXPECT_EQ(2, scheduler.next(12000));
+    scheduler.suspend(2);
+    EXPECT_EQ(0, scheduler.next(12000));
+    scheduler.suspend(0);
+    EXPECT_EQ(TPollScheduler::NONE, scheduler.next(12000));
+
+    // Suspending twice, resuming and updating unknown or scheduled entities is ignored
+    scheduler.suspend(0);
+    scheduler.resume(7);
+    scheduler.update(7, 12000);
+    scheduler.resume(2);
+    scheduler.resume(2);
+    EXPECT_EQ(1u, scheduler.size());
+    EXPECT_EQ(2, scheduler.next(12000));
+}
+
+TEST(PollSchedulerTest, matchesOverdueScanWithRequestsInFlight) {
+    std::mt19937 rng(11);
+    const uint32_t intervals[] = {1000, 10000, 10000, 30000, 60000, 300000};
+
+    for (uint32_t round = 0; round < 20; ++round) {
+        std::vector<TPolledEntity> entities(1 + rng() % 150);
+        TPollScheduler scheduler;
+        for (uint16_t index = 0; index < entities.size(); ++index) {
+            entities[index] = {true, intervals[rng() % 6], 0, false};
+            scheduler.add(index, entities[index].update_interval, 0);
+        }
+
+        // Up to four GETs in flight, answered out of order, lost or timed out
+        std::vector<uint16_t> in_flight;
+        uint32_t now = 1 + rng() % 1000;
+        for (uint32_t step = 0; step < 5000; ++step) {
+            now += 1 + rng() % 100;
+            const uint16_t expected = overdue_scan(entities, now);
+            ASSERT_EQ(expected, scheduler.next(now)) << "round " << round << " step " << step << " now " << now;
+
+            if (expected != TPollScheduler::NONE && in_flight.size() < 4) {
+                entities[expected].in_flight = true;
+                scheduler.suspend(expected);
+                in_flight.push_back(expected);
+            }
+            if (!in_flight.empty() && rng() % 3 == 0) {
+                const uint32_t position = rng() % in_flight.size();
+                const uint16_t index = in_flight[position];
+                in_flight.erase(in_flight.begin() + position);
+                entities[index].in_flight = false;
+                if (rng() % 10 != 0) {
+                    entities[index].last_update = now;
+                    scheduler.update(index, now);
+                } else {
+                    scheduler.resume(index);
+                }
+            }
+        }
+    }
+}
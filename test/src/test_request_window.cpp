@@ -0,0 +1,167 @@
+#include <gtest/gtest.h>
+#include <deque>
+#include <utility>
+#include <vector>
+#include "esphome/components/daikin_rotex_can/poll_scheduler.h"
+#include "esphome/components/daikin_rotex_can/request_window.h"
+
+using namespace esphome::daikin_rotex_can;
+
+namespace {
+
+// Milliseconds per GET with every response 20 ms after its request, like bus_schedule.RESPONSE_TIME
+double measure_slot(uint16_t delay_between_requests, uint8_t max_requests_in_flight, uint16_t max_frames_per_second) {
+    TRequestWindow window;
+    window.set_delay_between_requests(delay_between_requests);
+    window.set_pipeline(max_requests_in_flight, 3000, max_frames_per_second);
+
+    std::deque<std::pair<uint32_t, uint16_t>> responses;
+    uint32_t first = 0;
+    uint32_t last = 0;
+    uint32_t count = 0;
+    for (uint32_t now = 1000; now < 61000; ++now) {
+        while (!responses.empty() && responses.front().first <= now) {
+            window.received(now);
+            window.answered(responses.front().second);
+            responses.pop_front();
+        }
+        if (window.canSend(now)) {
+            const uint16_t index = count % 100;
+            window.sent(index, now);
+            responses.push_back({now + 20, index});
+            first = count == 0 ? now : first;
+            last = now;
+            ++count;
+        }
+    }
+    return static_cast<double>(last - first) / (count - 1);
+}
+
+}
+
+TEST(RequestWindowTest, oneRequestWaitsForResponseAndDelay) {
+    TRequestWindow window;
+    EXPECT_FALSE(window.canSend(249));
+    EXPECT_TRUE(window.canSend(250));
+    window.sent(3, 250);
+    EXPECT_FALSE(window.canSend(1000));
+
+    window.received(280);
+    EXPECT_TRUE(window.answered(3));
+    EXPECT_FALSE(window.answered(3));
+    EXPECT_FALSE(window.canSend(529));
+    EXPECT_TRUE(window.canSend(530));
+}
+
+TEST(RequestWindowTest, slotsAreRefilledWhenAnswered) {
+    TRequestWindow window;
+    window.set_pipeline(3, 3000, 40);
+    EXPECT_EQ(50, window.getMinSpacing());
+
+    ASSERT_TRUE(window.canSend(1000));
+    window.sent(0, 1000);
+    EXPECT_FALSE(window.canSend(1049));                 // Frames per second cap
+    ASSERT_TRUE(window.canSend(1050));
+    window.sent(1, 1050);
+    ASSERT_TRUE(window.canSend(1100));
+    window.sent(2, 1100);
+    EXPECT_FALSE(window.canSend(1150));                 // All slots taken
+    EXPECT_EQ(3u, window.size());
+
+    // An answered GET frees its slot right away, delay_between_requests only applies with one request in flight
+    window.received(1160);
+    window.answered(1);
+    EXPECT_TRUE(window.canSend(1160));
+    window.sent(3, 1160);
+    EXPECT_FALSE(window.canSend(1200));
+    window.received(1200);
+    window.answered(0);
+    EXPECT_FALSE(window.canSend(1209));
+    EXPECT_TRUE(window.canSend(1210));
+}
+
+TEST(RequestWindowTest, lostGetsTimeOut) {
+    TRequestWindow window;
+    window.set_pipeline(2, 3000, 20);
+    window.sent(5, 1000);
+    window.sent(6, 1100);
+    window.sent(5, 1200);                               // GET after a SET of an entity in flight
+
+    EXPECT_EQ(TRequestWindow::NONE, window.expire(4099));
+    EXPECT_EQ(6, window.expire(4100));
+    EXPECT_EQ(TRequestWindow::NONE, window.expire(4199));
+    EXPECT_EQ(5, window.expire(4200));
+    EXPECT_EQ(0u, window.size());
+    EXPECT_TRUE(window.canSend(4200));
+
+    window.sent(7, 4200);
+    window.clear();
+    EXPECT_EQ(0u, window.size());
+}
+
+// Same cases as test_bus_schedule.py test_pipelined_slot
+TEST(RequestWindowTest, matchesBusSchedule) {
+    EXPECT_NEAR(270.0, measure_slot(250, 1, 20), 1.0);
+    EXPECT_NEAR(20.0, measure_slot(0, 1, 200), 1.0);
+    EXPECT_NEAR(100.0, measure_slot(0, 4, 20), 1.0);
+    EXPECT_NEAR(50.0, measure_slot(0, 4, 40), 1.0);
+    EXPECT_NEAR(50.0, measure_slot(250, 4, 40), 1.0);
+    EXPECT_NEAR(10.0, measure_slot(0, 4, 200), 1.0);
+    EXPECT_NEAR(10.0, measure_slot(0, 2, 400), 1.0);
+}
+
+// Like TEntityManager::getNextRequestToSend(): a dropped response holds one slot until its GET times out
+TEST(RequestWindowTest, droppedResponseDoesNotStallPolling) {
+    constexpr uint16_t ENTITIES = 8;
+    constexpr uint16_t DROPPED = 2;
+    TRequestWindow window;
+    window.set_delay_between_requests(250);
+    window.set_pipeline(4, 3000, 40);
+    TPollScheduler scheduler;
+    for (uint16_t index = 0; index < ENTITIES; ++index) {
+        scheduler.add(index, 1000, 0);
+    }
+
+    std::deque<std::pair<uint32_t, uint16_t>> responses;
+    std::vector<std::vector<uint32_t>> gets(ENTITIES);
+    for (uint32_t now = 1000; now < 6000; ++now) {
+        uint16_t expired;
+        while ((expired = window.expire(now)) != TRequestWindow::NONE) {
+            scheduler.resume(expired);
+        }
+        while (!responses.empty() && responses.front().first <= now) {
+            window.received(now);
+            if (window.answered(responses.front().second)) {
+                scheduler.update(responses.front().second, now);
+            }
+            responses.pop_front();
+        }
+        const uint16_t index = window.canSend(now) ? scheduler.next(now) : TPollScheduler::NONE;
+        if (index != TPollScheduler::NONE) {
+            window.sent(index, now);
+            scheduler.suspend(index);
+            if (index != DROPPED || !gets[DROPPED].empty()) {
+                responses.push_back({now + 20, index});
+            }
+            gets[index].push_back(now);
+        }
+    }
+
+    // The first GET of DROPPED is lost, it is only sent again after the request timeout
+    ASSERT_LE(2u, gets[DROPPED].size());
+    const uint32_t lost = gets[DROPPED][0];
+    EXPECT_LE(lost + 3000, gets[DROPPED][1]);
+    EXPECT_GT(lost + 3000 + window.getMinSpacing(), gets[DROPPED][1]);
+
+    // Meanwhile the other entities are polled at their update interval
+    for (uint16_t index = 0; index < ENTITIES; ++index) {
+        if (index == DROPPED) {
+            continue;
+        }
+        uint32_t polled_before_timeout = 0;
+        for (uint32_t sent : gets[index]) {
+            polled_before_timeout += sent > lost && sent < lost + 3000 ? 1 : 0;
+        }
+        EXPECT_GE(polled_before_timeout, 2u) << "entity " << index;
+    }
+}
@@ -0,0 +1,64 @@
+#include <gtest/gtest.h>
+#include "esphome/components/daikin_rotex_can/unhandled_frames.h"
+
+using namespace esphome::daikin_rotex_can;
+
+static TMessage frame(uint8_t byte2, uint8_t byte3, uint8_t byte4, uint8_t value) {
+    return {0xD2, 0x00, byte2, byte3, byte4, 0x00, value};
+}
+
+TEST(UnhandledFramesTest, getKey) {
+    EXPECT_EQ(0xFA0A0Cu, TUnhandledFrames::getKey(frame(0xFA, 0x0A, 0x0C, 0x00)));
+    EXPECT_EQ(0x1Cu, TUnhandledFrames::getKey(frame(0x1C, 0x0A, 0x0C, 0x00)));
+}
+
+TEST(UnhandledFramesTest, aggregate) {
+    TUnhandledFrames frames;
+    frames.add(0x180, frame(0xFA, 0x0A, 0x0C, 0x01), 1000);
+    frames.add(0x10A, frame(0xFA, 0x0A, 0x0C, 0x02), 1500);
+    frames.add(0x180, frame(0xFA, 0x0A, 0x0C, 0x03), 2000);
+    frames.add(0x180, frame(0x1C, 0x0A, 0x0C, 0x04), 2500);
+
+    ASSERT_EQ(3, frames.size());
+    EXPECT_EQ(4u, frames.getTotal());
+
+    TUnhandledFrames::TEntry const& entry = frames.get(0);
+    EXPECT_EQ(0x180u, entry.can_id);
+    EXPECT_EQ(0xFA0A0Cu, entry.key);
+    EXPECT_EQ(2u, entry.count);
+    EXPECT_EQ(1000u, entry.first_seen);
+    EXPECT_EQ(2000u, entry.last_seen);
+    EXPECT_EQ(0x03, entry.data[6]);
+
+    EXPECT_EQ("180:FA0A0C=2 10A:FA0A0C=1 180:1C=1", frames.format(255));
+    EXPECT_EQ("180:FA0A0C=2 10A:FA0A0C=1", frames.format(30));
+    EXPECT_EQ("", frames.format(5));
+
+    frames.clear();
+    EXPECT_EQ(0, frames.size());
+    EXPECT_EQ(0u, frames.getTotal());
+}
+
+TEST(UnhandledFramesTest, evictLeastRecentlySeen) {
+    TUnhandledFrames frames;
+    for (uint8_t index = 0; index < TUnhandledFrames::CAPACITY; ++index) {
+        frames.add(0x180, frame(index, 0x00, 0x00, 0x00), 1000 + index);
+    }
+    frames.add(0x180, frame(0x00, 0x00, 0x00, 0x00), 2000);     // Register 0x00 is seen again
+    frames.add(0x180, frame(0xF0, 0x00, 0x00, 0x00), 2001);
+
+    EXPECT_EQ(TUnhandledFrames::CAPACITY, frames.size());
+    EXPECT_EQ(1u, frames.getEvicted());
+    EXPECT_EQ(0xF0u, frames.get(1).key);                         // Register 0x01 was the least recently seen
+    EXPECT_EQ(2u, frames.get(0).count);
+}
+
+TEST(UnhandledFramesTest, evictAcrossMillisOverflow) {
+    TUnhandledFrames frames;
+    for (uint8_t index = 0; index < TUnhandledFrames::CAPACITY; ++index) {
+        frames.add(0x180, frame(index, 0x00, 0x00, 0x00), 0xFFFFFF00u + index);
+    }
+    frames.add(0x180, frame(0x00, 0x00, 0x00, 0x00), 0x10);
+    frames.add(0x180, frame(0xF0, 0x00, 0x00, 0x00), 0x20);
+    EXPECT_EQ(0xF0u, frames.get(1).key);
+}
@@ -38,21 +38,29 @@ TEST(UtilsTest, to_hex_message) {
     EXPECT_EQ("00 23 4D 58 63 DE FF", Utils::to_hex({0, 35, 77, 88, 99, 222, 255}));
 }
 
-TEST(UtilsTest, str_to_bytes_array8) {
-    EXPECT_EQ(TMessage({1, 5, 9, 12, 27, 56, 147}), Utils::str_to_bytes_array8("01 05 09 0C 1B 38 93"));
-    EXPECT_EQ(TMessage({0, 35, 77, 88, 99, 222, 255}), Utils::str_to_bytes_array8("00 23 4D 58 63 DE FF"));
+TEST(UtilsTest, str_to_bytes) {
+    TMessage msg;
+    EXPECT_TRUE(Utils::str_to_bytes("01 05 09 0C 1B 38 93", msg));
+    EXPECT_EQ(TMessage({1, 5, 9, 12, 27, 56, 147}), msg);
+    EXPECT_TRUE(Utils::str_to_bytes("00 23 4d 58 63 de FF", msg));
+    EXPECT_EQ(TMessage({0, 35, 77, 88, 99, 222, 255}), msg);
+    EXPECT_TRUE(Utils::str_to_bytes("0x31 0x00 0xFA 01 12", msg));
+    EXPECT_EQ(TMessage({0x31, 0x00, 0xFA, 0x01, 0x12, 0x00, 0x00}), msg);
+    EXPECT_TRUE(Utils::str_to_bytes("31", msg));
+    EXPECT_EQ(TMessage({0x31, 0, 0, 0, 0, 0, 0}), msg);
 }
 
-TEST(UtilsTest, str_to_map) {
-    auto map = Utils::str_to_map("0x01:A|0x05:B|0x09:CD|0x0C:Str1|0x1B:str2|0x38:str3|0x93:str 4");
-    EXPECT_EQ("A", map.find(0x01)->second);
-    EXPECT_EQ("B", map.find(0x05)->second);
-    EXPECT_EQ("CD", map.find(0x09)->second);
-    EXPECT_EQ("Str1", map.find(0x0C)->second);
-    EXPECT_EQ("str2", map.find(0x1B)->second);
-    EXPECT_EQ("str3", map.find(0x38)->second);
-    EXPECT_EQ("str 4", map.find(0x93)->second);
-    EXPECT_TRUE(map.find(0x94) == map.end());
+TEST(UtilsTest, str_to_bytes_invalid) {
+    TMessage msg;
+    EXPECT_FALSE(Utils::str_to_bytes("", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("31 00 FA 01 12 00 00 00", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("31 OC", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("310", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("31  00", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("31 00 ", msg));
+    EXPECT_FALSE(Utils::str_to_bytes(" 31", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("0X31", msg));
+    EXPECT_FALSE(Utils::str_to_bytes("0x", msg));
 }
 
 TEST(UtilsTest, hex_to_uint16) {
@@ -0,0 +1,55 @@
+#include <gtest/gtest.h>
+#include "esphome/components/daikin_rotex_can/value_map.h"
+
+using namespace esphome::daikin_rotex_can;
+
+static constexpr uint16_t KEYS[] = {1, 3, 5, 7};
+static constexpr const char* LABELS[] = {"g", "c", "e", "a"};
+static constexpr uint8_t LABEL_ORDER[] = {3, 1, 2, 0};
+static constexpr TValueMap VALUE_MAP = {KEYS, LABELS, LABEL_ORDER, 4};
+static constexpr TValueMap EMPTY_VALUE_MAP = {nullptr, nullptr, nullptr, 0};
+
+TEST(ValueMapTest, findNextByKey) {
+    EXPECT_STREQ("g", VALUE_MAP.findNextByKey(0));
+    EXPECT_STREQ("g", VALUE_MAP.findNextByKey(1));
+    EXPECT_STREQ("g", VALUE_MAP.findNextByKey(2));
+    EXPECT_STREQ("c", VALUE_MAP.findNextByKey(3));
+    EXPECT_STREQ("c", VALUE_MAP.findNextByKey(4));
+    EXPECT_STREQ("e", VALUE_MAP.findNextByKey(5));
+    EXPECT_STREQ("e", VALUE_MAP.findNextByKey(6));
+    EXPECT_STREQ("a", VALUE_MAP.findNextByKey(7));
+    EXPECT_STREQ("a", VALUE_MAP.findNextByKey(8));
+    EXPECT_STREQ("a", VALUE_MAP.findNextByKey(0xFFFF));
+    EXPECT_EQ(nullptr, EMPTY_VALUE_MAP.findNextByKey(1));
+}
+
+TEST(ValueMapTest, findByKey) {
+    EXPECT_EQ(nullptr, VALUE_MAP.findByKey(0));
+    EXPECT_STREQ("g", VALUE_MAP.findByKey(1));
+    EXPECT_EQ(nullptr, VALUE_MAP.findByKey(2));
+    EXPECT_STREQ("c", VALUE_MAP.findByKey(3));
+    EXPECT_EQ(nullptr, VALUE_MAP.findByKey(4));
+    EXPECT_STREQ("e", VALUE_MAP.findByKey(5));
+    EXPECT_EQ(nullptr, VALUE_MAP.findByKey(6));
+    EXPECT_STREQ("a", VALUE_MAP.findByKey(7));
+    EXPECT_EQ(nullptr, VALUE_MAP.findByKey(8));
+    EXPECT_EQ(nullptr, EMPTY_VALUE_MAP.findByKey(1));
+}
+
+TEST(ValueMapTest, findByValue) {
+    uint16_t key = 0;
+    EXPECT_FALSE(VALUE_MAP.findByValue("", key));
+    EXPECT_TRUE(VALUE_MAP.findByValue("a", key));
+    EXPECT_EQ(7, key);
+    EXPECT_FALSE(VALUE_MAP.findByValue("b", key));
+    EXPECT_TRUE(VALUE_MAP.findByValue("c", key));
+    EXPECT_EQ(3, key);
+    EXPECT_FALSE(VALUE_MAP.findByValue("d", key));
+    EXPECT_TRUE(VALUE_MAP.findByValue("e", key));
+    EXPECT_EQ(5, key);
+    EXPECT_FALSE(VALUE_MAP.findByValue("f", key));
+    EXPECT_TRUE(VALUE_MAP.findByValue("g", key));
+    EXPECT_EQ(1, key);
+    EXPECT_FALSE(VALUE_MAP.findByValue("h", key));
+    EXPECT_FALSE(EMPTY_VALUE_MAP.findByValue("a", key));
+}